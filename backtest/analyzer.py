@@ -4,7 +4,6 @@ Analyze backtest results
 """
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from datetime import datetime
 import os
 
@@ -71,17 +70,30 @@ class ResultAnalyzer:
         
         return np.mean(durations) if durations else 0
     
-    def plot_equity_curve(self, save=False):
-        """Plot equity curve"""
+    @staticmethod
+    def _new_figure(figsize, interactive):
+        """pyplot figure for show(), plain Figure (no GUI backend) for headless rendering"""
+        if interactive:
+            import matplotlib.pyplot as plt
+            return plt.figure(figsize=figsize)
+        from matplotlib.figure import Figure
+        return Figure(figsize=figsize)
+    
+    def equity_figure(self, interactive=False):
+        """Equity curve + drawdown figure (None without equity data)"""
         if self.equity_df.empty:
-            print("No equity data to plot")
-            return
+            return None
+        
+        from utils.downsample import equity_plot_data
+        
+        fig = self._new_figure((12, 8), interactive)
+        ax1, ax2 = fig.subplots(2, 1, gridspec_kw={'height_ratios': [2, 1]})
         
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8), 
-                                      gridspec_kw={'height_ratios': [2, 1]})
+        # Downsampled above PLOT_MAX_POINTS (drawdown extremes kept exactly)
+        data = equity_plot_data(self.equity_df['timestamp'], self.equity_df['equity'])
         
         # Equity curve
-        ax1.plot(self.equity_df['timestamp'], self.equity_df['equity'], 
+        ax1.plot(data['equity_x'], data['equity_y'], 
                 linewidth=2, color='blue', label='Equity')
         ax1.axhline(y=self.results['initial_capital'], color='red', 
                    linestyle='--', alpha=0.5, label='Initial Capital')
@@ -92,44 +104,30 @@ class ResultAnalyzer:
         ax1.grid(True, alpha=0.3)
         
         # Drawdown
-        equity_series = pd.Series(self.equity_df['equity'].values, 
-                                 index=self.equity_df['timestamp'])
-        rolling_max = equity_series.expanding().max()
-        drawdown = (rolling_max - equity_series) / rolling_max * 100
-        
-        ax2.fill_between(self.equity_df['timestamp'], 0, drawdown, 
+        ax2.fill_between(data['drawdown_x'], 0, data['drawdown_y'], 
                         color='red', alpha=0.3)
-        ax2.plot(self.equity_df['timestamp'], drawdown, 
+        ax2.plot(data['drawdown_x'], data['drawdown_y'], 
                 color='red', linewidth=1)
         ax2.set_title(f'Drawdown (Max: {self.results["max_drawdown"]:.2f}%)')
         ax2.set_ylabel('Drawdown (%)')
         ax2.set_xlabel('Date')
         ax2.grid(True, alpha=0.3)
         
-        plt.tight_layout()
-        
-        if save:
-            os.makedirs(settings.RESULTS_DIR, exist_ok=True)
-            filename = f"equity_curve_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-            filepath = os.path.join(settings.RESULTS_DIR, filename)
-            plt.savefig(filepath, dpi=150)
-            print(f"📊 Chart saved: {filepath}")
-        
-        plt.show()
+        fig.tight_layout()
+        return fig
     
-    def plot_trade_distribution(self):
-        """Plot trade profit distribution"""
+    def trade_distribution_figure(self, interactive=False):
+        """Trade return histogram + win/loss pie (None without closed trades)"""
         if self.trades_df.empty:
-            print("No trade data to plot")
-            return
+            return None
         
         sell_trades = self.trades_df[self.trades_df['type'].str.contains('SELL')]
         
         if sell_trades.empty:
-            print("No sell trades to analyze")
-            return
+            return None
         
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
+        fig = self._new_figure((12, 5), interactive)
+        ax1, ax2 = fig.subplots(1, 2)
         
         # Histogram of returns
         ax1.hist(sell_trades['profit_pct'], bins=20, edgecolor='black', 
@@ -153,8 +151,41 @@ class ResultAnalyzer:
                    startangle=90, explode=(0.1, 0))
             ax2.set_title(f'Win/Loss Ratio ({wins}W/{losses}L)')
         
-        plt.tight_layout()
-        plt.show()
+        fig.tight_layout()
+        return fig
+    
+    def plot_equity_curve(self, save=False, show=True):
+        """Plot equity curve (show=False: save only, no blocking window)"""
+        fig = self.equity_figure(interactive=show)
+        if fig is None:
+            print("No equity data to plot")
+            return
+        
+        if save:
+            os.makedirs(settings.RESULTS_DIR, exist_ok=True)
+            filename = f"equity_curve_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+            filepath = os.path.join(settings.RESULTS_DIR, filename)
+            fig.savefig(filepath, dpi=150)
+            print(f"📊 Chart saved: {filepath}")
+        
+        if show:
+            import matplotlib.pyplot as plt
+            plt.show()
+    
+    def plot_trade_distribution(self, show=True):
+        """Plot trade profit distribution"""
+        if self.trades_df.empty:
+            print("No trade data to plot")
+            return
+        
+        fig = self.trade_distribution_figure(interactive=show)
+        if fig is None:
+            print("No sell trades to analyze")
+            return
+        
+        if show:
+            import matplotlib.pyplot as plt
+            plt.show()
     
     def save_results(self, strategy_name="sma_crossover"):
         """Save all results to files"""
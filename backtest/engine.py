@@ -6,6 +6,12 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from strategies.base_strategy import strategy_signals
+from utils.helpers import periods_per_year
 
 # Import settings
 try:
@@ -21,11 +27,14 @@ except ImportError:
     settings = SimpleSettings()
 
 class BacktestEngine:
-    def __init__(self, initial_capital=None, commission=None, stop_loss=None):
+    def __init__(self, initial_capital=None, commission=None, stop_loss=None, interval=None):
         # Akses sebagai OBJECT
         self.initial_capital = initial_capital or settings.INITIAL_CAPITAL
         self.commission = commission or settings.COMMISSION
         self.stop_loss = stop_loss or settings.DEFAULT_STOP_LOSS
+        # Bar interval for annualising; None = inferred from the data's timestamps
+        self.interval = interval
+        self.bars_per_year = periods_per_year(interval) if interval else 365 * 24
         
         self.reset()
     
@@ -38,23 +47,34 @@ class BacktestEngine:
         self.equity_curve = []
         self.current_price = 0.0
     
-    def run(self, df, strategy):
+    def run(self, df, strategy=None, signals=None):
         """
         Run backtest with given strategy
+        
+        Args:
+            signals: Precomputed int8 signal array (1 / 0 / -1) aligned
+                     with df; default: strategy.compute_signals(df)
         """
         self.reset()
+        if self.interval is None:
+            self.bars_per_year = self.infer_bars_per_year(df)
         
-        # Get signals from strategy
-        df_with_signals = strategy.generate_signals(df)
+        # Get signals from strategy (array only, df is not copied)
+        if signals is None:
+            signals = strategy_signals(strategy, df)
+        if len(signals) != len(df):
+            raise ValueError(f"{len(signals)} signals for {len(df)} candles")
         
-        print(f"📊 Running backtest with {len(df_with_signals)} candles...")
+        closes = df['close'].to_numpy(dtype=np.float64)
+        timestamps = df.index
+        
+        print(f"📊 Running backtest with {len(df)} candles...")
         print(f"💰 Initial Capital: ${self.initial_capital:,.2f}")
         print(f"📉 Stop Loss: {self.stop_loss*100}%")
         
-        for idx in range(len(df_with_signals)):
-            row = df_with_signals.iloc[idx]
-            timestamp = df_with_signals.index[idx]
-            self.current_price = row['close']
+        for idx in range(len(df)):
+            timestamp = timestamps[idx]
+            self.current_price = closes[idx]
             
             # Record equity
             current_equity = self.calculate_current_equity()
@@ -68,18 +88,27 @@ class BacktestEngine:
             stop_loss_triggered = self.check_stop_loss(timestamp)
             
             # Get signal
-            signal = -1 if stop_loss_triggered else row['signal']
+            signal = -1 if stop_loss_triggered else signals[idx]
             
             # Execute trade
             if signal == 1 and self.position == 0:
-                self.execute_buy(timestamp, row)
+                self.execute_buy(timestamp)
             
             elif signal == -1 and self.position > 0:
-                self.execute_sell(timestamp, row, stop_loss_triggered)
+                self.execute_sell(timestamp, stop_loss=stop_loss_triggered)
         
         # Final results
         return self.calculate_results()
     
+    @staticmethod
+    def infer_bars_per_year(df):
+        """Bars per year from the median timestamp spacing (hourly if unknown)"""
+        if isinstance(df.index, pd.DatetimeIndex) and len(df) > 1:
+            spacing = pd.Series(df.index).diff().median().total_seconds()
+            if spacing > 0:
+                return 365 * 86400 / spacing
+        return 365 * 24
+    
     def calculate_current_equity(self):
         """Calculate current total equity"""
         return self.capital + (self.position * self.current_price)
@@ -96,7 +125,7 @@ class BacktestEngine:
         
         return False
     
-    def execute_buy(self, timestamp, row):
+    def execute_buy(self, timestamp, row=None):
         """Execute buy order"""
         # Calculate position size (use 95% of capital)
         trade_amount = self.capital * 0.95
@@ -119,7 +148,7 @@ class BacktestEngine:
         print(f"[{timestamp.strftime('%Y-%m-%d %H:%M')}] "
               f"✅ BUY {self.position:.6f} @ ${self.current_price:,.2f}")
     
-    def execute_sell(self, timestamp, row, stop_loss=False):
+    def execute_sell(self, timestamp, row=None, stop_loss=False):
         """Execute sell order"""
         trade_value = self.position * self.current_price
         proceeds = trade_value * (1 - self.commission)
@@ -231,8 +260,8 @@ class BacktestEngine:
         if len(returns) < 2 or returns.std() == 0:
             return 0
         
-        # Assuming hourly data, annualize with √(365*24)
-        sharpe = (returns.mean() / returns.std()) * np.sqrt(365 * 24)
+        # Annualize with √(bars per year) of the data's interval
+        sharpe = (returns.mean() / returns.std()) * np.sqrt(self.bars_per_year)
         return sharpe
     
     def calculate_profit_factor(self):
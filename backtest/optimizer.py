@@ -3,27 +3,140 @@ from config.settings import settings
 """
 Strategy parameter optimization
 """
-import pandas as pd
-import numpy as np
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from itertools import product
 import warnings
+
+import pandas as pd
+import numpy as np
 warnings.filterwarnings('ignore')
 
-from config import settings
-from data.fetcher import DataFetcher
-from strategies.sma_crossover import SMACrossover
+from strategies.registry import create_strategy
 from backtest.engine import BacktestEngine
 
+METRIC_COLUMNS = ('total_return', 'total_trades', 'win_rate', 'max_drawdown',
+                  'sharpe_ratio', 'profit_factor', 'final_equity')
+
+
+def backtest_result(df, strategy, params=None, engine_kwargs=None):
+    """Backtest one strategy config (+ parameter overrides), full engine results"""
+    return BacktestEngine(**(engine_kwargs or {})).run(df, create_strategy(strategy, **(params or {})))
+
+
+def result_metrics(result):
+    """Optimizer metrics from engine results"""
+    return {
+        'total_return': result['total_return_pct'],
+        'total_trades': result['total_trades'],
+        'win_rate': result['win_rate'],
+        'max_drawdown': result['max_drawdown'],
+        'sharpe_ratio': result['sharpe_ratio'],
+        'profit_factor': result['profit_factor'],
+        'final_equity': result['final_equity']
+    }
+
+
+def backtest_metrics(df, strategy, params=None, engine_kwargs=None):
+    """Backtest one strategy config (+ parameter overrides), metrics only"""
+    return result_metrics(backtest_result(df, strategy, params, engine_kwargs))
+
+
+# Worker process state: the frame is sent once per worker, not once per job
+_worker_df = None
+
+
+def _init_worker(df):
+    global _worker_df
+    _worker_df = df
+    sys.stdout = open(os.devnull, 'w')   # engine trade logs from N processes are noise
+
+
+def _run_job(df, job):
+    strategy, params, engine_kwargs, full = job
+    try:
+        run = backtest_result if full else backtest_metrics
+        return run(df, strategy, params, engine_kwargs), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _worker_job(job):
+    return _run_job(_worker_df, job)
+
+
+def backtest_many(df, jobs, workers=1, engine_kwargs=None, progress=None, full=False):
+    """
+    Backtest many (strategy, params) jobs on one frame
+
+    Args:
+        jobs: [(strategy config, params dict)]
+        workers: Processes (1 = in this process)
+        progress: Optional callback(done, total, job, error)
+        full: Return full engine results (trades, equity curve) instead of metrics
+
+    Returns:
+        [(metrics or None, error or None)] in job order
+    """
+    jobs = [(strategy, params, engine_kwargs, full) for strategy, params in jobs]
+    results = [None] * len(jobs)
+
+    if workers <= 1 or len(jobs) <= 1:
+        for i, job in enumerate(jobs):
+            results[i] = _run_job(df, job)
+            if progress:
+                progress(i + 1, len(jobs), job[:2], results[i][1])
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(df,)) as executor:
+        futures = {executor.submit(_worker_job, job): i for i, job in enumerate(jobs)}
+        for done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            results[i] = future.result()
+            if progress:
+                progress(done, len(jobs), jobs[i][:2], results[i][1])
+    return results
+
+
 class StrategyOptimizer:
     def __init__(self, data_fetcher=None):
-        self.fetcher = data_fetcher or DataFetcher()
+        self._fetcher = data_fetcher
         self.results = []
     
-    def optimize_sma(self, df=None, fast_range=None, slow_range=None):
+    @property
+    def fetcher(self):
+        """DataFetcher created on first use (no exchange client when df is given)"""
+        if self._fetcher is None:
+            from data.fetcher import DataFetcher
+            self._fetcher = DataFetcher()
+        return self._fetcher
+    
+    def optimize_sma(self, df=None, fast_range=None, slow_range=None, workers=1):
         """
         Optimize SMA parameters
         """
-        print("🔍 OPTIMIZING SMA PARAMETERS")
+        fast_range = fast_range or range(5, 51, 5)  # 5 to 50 step 5
+        slow_range = slow_range or range(20, 101, 10)  # 20 to 100 step 10
+        grid = {'fast_period': fast_range, 'slow_period': slow_range}
+        return self.optimize('sma_crossover', grid, df,
+                             valid=lambda p: p['slow_period'] > p['fast_period'],
+                             workers=workers)
+    
+    def optimize(self, strategy, grid, df=None, valid=None, workers=1, save=True,
+                 engine_kwargs=None):
+        """
+        Grid search over any registered strategy
+        
+        Args:
+            strategy: Registry name, e.g. 'sma_rsi_combo'
+            grid: {parameter: values}, every combination is tested
+            valid: Optional filter(params) -> bool for invalid combinations
+            workers: Backtests run in parallel processes
+            save: Write the results CSV to RESULTS_DIR
+        """
+        print(f"🔍 OPTIMIZING {strategy.upper()} PARAMETERS")
         print("="*50)
         
         # Load data if not provided
@@ -37,46 +150,21 @@ class StrategyOptimizer:
             print("❌ No data available for optimization")
             return pd.DataFrame()
         
-        # Parameter ranges
-        fast_range = fast_range or range(5, 51, 5)  # 5 to 50 step 5
-        slow_range = slow_range or range(20, 101, 10)  # 20 to 100 step 10
+        names = list(grid)
+        combinations = [dict(zip(names, values)) for values in product(*grid.values())]
+        combinations = [p for p in combinations if valid is None or valid(p)]
         
-        self.results = []
+        def progress(done, total, job, error):
+            label = ', '.join(f"{k}={v}" for k, v in job[1].items())
+            if error:
+                print(f"\n⚠️  Error with {strategy}({label}): {error}")
+            else:
+                print(f"Testing {strategy}({label}) [{done}/{total}]", end="\r")
         
-        total_combinations = len(fast_range) * len(slow_range)
-        current = 0
-        
-        for fast, slow in product(fast_range, slow_range):
-            if slow <= fast:  # Skip invalid combinations
-                continue
-            
-            current += 1
-            print(f"Testing SMA({fast:2}/{slow:3}) "
-                  f"[{current}/{total_combinations}]", end="\r")
-            
-            try:
-                # Create strategy and backtest
-                strategy = SMACrossover(fast_period=fast, slow_period=slow)
-                backtester = BacktestEngine()
-                
-                result = backtester.run(df, strategy)
-                
-                # Collect metrics
-                self.results.append({
-                    'fast_period': fast,
-                    'slow_period': slow,
-                    'total_return': result['total_return_pct'],
-                    'total_trades': result['total_trades'],
-                    'win_rate': result['win_rate'],
-                    'max_drawdown': result['max_drawdown'],
-                    'sharpe_ratio': result['sharpe_ratio'],
-                    'profit_factor': result['profit_factor'],
-                    'final_equity': result['final_equity']
-                })
-                
-            except Exception as e:
-                print(f"\n⚠️  Error with SMA({fast}/{slow}): {e}")
-                continue
+        outcomes = backtest_many(df, [(strategy, params) for params in combinations],
+                                 workers=workers, engine_kwargs=engine_kwargs, progress=progress)
+        self.results = [{**params, **metrics} for params, (metrics, error)
+                        in zip(combinations, outcomes) if metrics is not None]
         
         print("\n" + "="*50)
         
@@ -91,7 +179,8 @@ class StrategyOptimizer:
         self.display_top_results(results_df)
         
         # Save results
-        self.save_optimization_results(results_df)
+        if save:
+            self.save_optimization_results(results_df)
         
         return results_df
     
@@ -103,13 +192,16 @@ class StrategyOptimizer:
         # Sort by return (descending)
         sorted_df = results_df.sort_values('total_return', ascending=False)
         
-        print(f"{'Fast':>5} {'Slow':>5} {'Return':>8} {'WinRate':>8} "
-              f"{'Drawdown':>10} {'Sharpe':>8} {'Trades':>8}")
-        print("-" * 60)
+        # Parameter columns: everything that is not a metric
+        params = [c for c in results_df.columns if c not in METRIC_COLUMNS]
+        
+        print("".join(f"{p[:10]:>11}" for p in params) +
+              f" {'Return':>8} {'WinRate':>8} {'Drawdown':>10} {'Sharpe':>8} {'Trades':>8}")
+        print("-" * (11 * len(params) + 48))
         
         for i, row in sorted_df.head(top_n).iterrows():
-            print(f"{row['fast_period']:5} {row['slow_period']:5} "
-                  f"{row['total_return']:8.2f}% {row['win_rate']:8.1f}% "
+            print("".join(f"{str(row[p])[:10]:>11}" for p in params) +
+                  f" {row['total_return']:8.2f}% {row['win_rate']:8.1f}% "
                   f"{row['max_drawdown']:10.2f}% {row['sharpe_ratio']:8.2f} "
                   f"{row['total_trades']:8}")
         
@@ -117,7 +209,7 @@ class StrategyOptimizer:
         best = sorted_df.iloc[0]
         print("\n" + "="*60)
         print("🎯 RECOMMENDED PARAMETERS:")
-        print(f"   SMA({best['fast_period']}/{best['slow_period']})")
+        print(f"   {', '.join(f'{p}={best[p]}' for p in params)}")
         print(f"   Expected Return: {best['total_return']:.2f}%")
         print(f"   Win Rate: {best['win_rate']:.1f}%")
         print(f"   Max Drawdown: {best['max_drawdown']:.2f}%")
@@ -137,28 +229,41 @@ class StrategyOptimizer:
         results_df.to_csv(filepath, index=False)
         print(f"\n💾 Optimization results saved: {filepath}")
     
-    def plot_optimization_heatmap(self, results_df):
-        """Create heatmap of optimization results"""
-        try:
+    @staticmethod
+    def heatmap_figure(results_df, index='fast_period', columns='slow_period',
+                       values='total_return', interactive=False):
+        """Parameter heatmap figure (plain Figure unless interactive)"""
+        import seaborn as sns
+        
+        # Pivot data for heatmap
+        pivot_data = results_df.pivot_table(
+            index=index,
+            columns=columns,
+            values=values,
+            aggfunc='mean'
+        )
+        
+        if interactive:
             import matplotlib.pyplot as plt
-            import seaborn as sns
-            
-            # Pivot data for heatmap
-            pivot_data = results_df.pivot_table(
-                index='fast_period',
-                columns='slow_period',
-                values='total_return',
-                aggfunc='mean'
-            )
-            
-            plt.figure(figsize=(12, 8))
-            sns.heatmap(pivot_data, annot=True, fmt=".1f", cmap="RdYlGn",
-                       center=0, cbar_kws={'label': 'Return (%)'})
-            
-            plt.title('SMA Parameter Optimization Heatmap')
-            plt.xlabel('Slow Period')
-            plt.ylabel('Fast Period')
-            plt.tight_layout()
+            fig = plt.figure(figsize=(12, 8))
+        else:
+            from matplotlib.figure import Figure
+            fig = Figure(figsize=(12, 8))
+        ax = fig.subplots()
+        sns.heatmap(pivot_data, annot=True, fmt=".1f", cmap="RdYlGn", ax=ax,
+                   center=0, cbar_kws={'label': values.replace('_', ' ').title()})
+        
+        ax.set_title('Parameter Optimization Heatmap')
+        ax.set_xlabel(columns.replace('_', ' ').title())
+        ax.set_ylabel(index.replace('_', ' ').title())
+        fig.tight_layout()
+        return fig
+    
+    def plot_optimization_heatmap(self, results_df, index='fast_period',
+                                  columns='slow_period', show=True):
+        """Create heatmap of optimization results (show=False: save only)"""
+        try:
+            fig = self.heatmap_figure(results_df, index, columns, interactive=show)
             
             # Save plot
             import os
@@ -168,10 +273,12 @@ class StrategyOptimizer:
             filename = f"optimization_heatmap_{timestamp}.png"
             filepath = os.path.join(settings.RESULTS_DIR, filename)
             
-            plt.savefig(filepath, dpi=150, bbox_inches='tight')
+            fig.savefig(filepath, dpi=150, bbox_inches='tight')
             print(f"📊 Heatmap saved: {filepath}")
             
-            plt.show()
+            if show:
+                import matplotlib.pyplot as plt
+                plt.show()
             
         except Exception as e:
             print(f"⚠️  Could not create heatmap: {e}")
@@ -0,0 +1,3 @@
+from .harness import BenchmarkHarness, make_synthetic_ohlcv
+
+__all__ = ['BenchmarkHarness', 'make_synthetic_ohlcv']
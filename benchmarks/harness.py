@@ -0,0 +1,424 @@
+# benchmarks/harness.py
+"""
+Performance benchmark harness
+
+Times the hot paths (backtest engine, optimizer, paper simulator, strategy
+signals, indicators, result analyzer) on deterministic synthetic OHLCV data, records
+throughput and peak memory, and compares against a stored baseline.
+
+Usage:
+    python -m benchmarks                       # run + compare
+    python -m benchmarks --sizes 10000 --save-baseline
+    python -m benchmarks --threshold 0.1 --targets engine.run
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import settings
+try:
+    from config.settings import settings
+except ImportError:
+    # Fallback
+    class SimpleSettings:
+        BENCHMARK_SIZES = [10_000, 100_000, 1_000_000]
+        BENCHMARK_SEED = 42
+        BENCHMARK_REPEAT = 3
+        BENCHMARK_BASELINE_FILE = "benchmarks/baseline.json"
+        BENCHMARK_REGRESSION_THRESHOLD = 0.20
+
+    settings = SimpleSettings()
+
+from data.synthetic import SyntheticMarketGenerator
+
+def make_synthetic_ohlcv(n_candles, seed=42, start_price=0.45, interval='1m', model='gbm'):
+    """
+    Generate deterministic OHLCV data
+
+    Same (n_candles, seed, model) always returns identical data, so timings
+    are comparable between runs and machines.
+    """
+    generator = SyntheticMarketGenerator(seed=seed, interval=interval, start_price=start_price)
+    return generator.generate(n_candles, model=model, start='2020-01-01')
+
+
+def _synthetic_results(df, trade_every=50, initial_capital=1000.0):
+    """Build an engine-style results dict without running the engine"""
+    close = df['close'].to_numpy()
+    equity = initial_capital * close / close[0]
+    timestamps = df.index
+
+    equity_curve = [
+        {'timestamp': ts, 'equity': eq, 'price': px}
+        for ts, eq, px in zip(timestamps, equity, close)
+    ]
+
+    trades = []
+    for i in range(0, len(df) - trade_every, trade_every * 2):
+        j = i + trade_every
+        profit_pct = (close[j] / close[i] - 1) * 100
+        trades.append({'timestamp': timestamps[i], 'type': 'BUY', 'price': close[i],
+                       'commission': 1.0})
+        trades.append({'timestamp': timestamps[j], 'type': 'SELL', 'price': close[j],
+                       'profit_pct': profit_pct, 'profit_usd': profit_pct,
+                       'commission': 1.0})
+
+    return {
+        'initial_capital': initial_capital,
+        'final_equity': equity[-1],
+        'total_return_pct': (equity[-1] / initial_capital - 1) * 100,
+        'total_return_usd': equity[-1] - initial_capital,
+        'win_rate': 50.0,
+        'max_drawdown': 0.0,
+        'sharpe_ratio': 0.0,
+        'profit_factor': 1.0,
+        'trades': trades,
+        'equity_curve': equity_curve
+    }
+
+
+class _FrameFetcher:
+    """Stand-in DataFetcher that serves an in-memory frame (no network)"""
+
+    def __init__(self, df):
+        self.df = df
+
+    def fetch_historical_data(self, *args, **kwargs):
+        return self.df
+
+
+class BenchmarkTarget:
+    """
+    One benchmarked callable
+
+    Args:
+        name: Result key prefix (e.g. 'engine.run')
+        setup: f(df) -> state, untimed
+        run: f(state) -> units processed (candles, candle*combos, ...)
+        max_size: Skip datasets bigger than this (None = no limit)
+    """
+
+    def __init__(self, name, setup, run, max_size=None):
+        self.name = name
+        self.setup = setup
+        self.run = run
+        self.max_size = max_size
+
+
+def _engine_target():
+    from backtest.engine import BacktestEngine
+    from strategies.sma_crossover import SMACrossover
+
+    def run(df):
+        BacktestEngine().run(df, SMACrossover())
+        return len(df)
+
+    return BenchmarkTarget('engine.run', lambda df: df, run)
+
+
+def _optimizer_target():
+    from backtest.optimizer import StrategyOptimizer
+
+    fast_range, slow_range = [10, 20], [30, 50]
+    combos = len(fast_range) * len(slow_range)
+
+    def run(df):
+        optimizer = StrategyOptimizer(data_fetcher=_FrameFetcher(df))
+        optimizer.optimize_sma(df, fast_range=fast_range, slow_range=slow_range)
+        return len(df) * combos
+
+    return BenchmarkTarget('optimizer.optimize_sma', lambda df: df, run, max_size=100_000)
+
+
+def _simulator_target():
+    from paper_trade.simulator import PaperTradingSimulator
+    from strategies.sma_crossover import SMACrossover
+
+    def run(df):
+        simulator = PaperTradingSimulator(SMACrossover(), initial_balance=1000)
+        simulator.run(df=df)
+        return len(df)
+
+    # Simulator re-generates signals on a growing window (quadratic)
+    return BenchmarkTarget('simulator.run', lambda df: df, run, max_size=10_000)
+
+
+def _signal_targets():
+    from strategies.sma_crossover import SMACrossover
+    strategies = [SMACrossover()]
+
+    try:
+        from strategies.sma_rsi_combo import SMA_RSI_Combo
+        strategies.append(SMA_RSI_Combo())
+    except ImportError as e:
+        print(f"⚠️  SMA_RSI_Combo skipped: {e}")
+
+    # generate_signals keeps the name already in saved baselines; the
+    # int8 compute_signals path is measured next to it
+    targets = []
+    for strategy in strategies:
+        def run(df, strategy=strategy):
+            strategy.generate_signals(df)
+            return len(df)
+
+        def run_int8(df, strategy=strategy):
+            strategy.compute_signals(df)
+            return len(df)
+
+        targets.append(BenchmarkTarget(f"signals.{strategy.name}", lambda df: df, run))
+        targets.append(BenchmarkTarget(f"signals_int8.{strategy.name}", lambda df: df, run_int8))
+
+    return targets
+
+
+def _indicator_target():
+    from strategies import indicators
+
+    def run(df):
+        close = df['close'].to_numpy()
+        indicators.sma(close, 50)
+        indicators.ema(close, 50)
+        indicators.rsi(close, 14)
+        indicators.atr(df['high'].to_numpy(), df['low'].to_numpy(), close, 14)
+        indicators.bollinger(close, 20)
+        indicators.macd(close)
+        return len(df)
+
+    return BenchmarkTarget('indicators.batch', lambda df: df, run)
+
+
+def _analyzer_target():
+    from backtest.analyzer import ResultAnalyzer
+
+    def run(results):
+        ResultAnalyzer(results).generate_report()
+        return len(results['equity_curve'])
+
+    return BenchmarkTarget('analyzer.generate_report', _synthetic_results, run)
+
+
+TARGET_FACTORIES = [
+    _engine_target,
+    _optimizer_target,
+    _simulator_target,
+    _signal_targets,
+    _indicator_target,
+    _analyzer_target,
+]
+
+
+class BenchmarkHarness:
+    def __init__(self, sizes=None, repeat=None, seed=None, threshold=None,
+                 baseline_file=None, targets=None, model='gbm'):
+        self.sizes = sizes or settings.BENCHMARK_SIZES
+        self.repeat = repeat or settings.BENCHMARK_REPEAT
+        self.seed = settings.BENCHMARK_SEED if seed is None else seed
+        self.threshold = settings.BENCHMARK_REGRESSION_THRESHOLD if threshold is None else threshold
+        self.baseline_file = baseline_file or settings.BENCHMARK_BASELINE_FILE
+        self.target_filter = targets
+        self.model = model
+        self.results = {}
+
+    def load_targets(self):
+        """Build benchmark targets, skipping those whose dependencies are missing"""
+        targets = []
+        for factory in TARGET_FACTORIES:
+            try:
+                built = factory()
+            except ImportError as e:
+                print(f"⚠️  {factory.__name__.strip('_')} skipped: {e}")
+                continue
+
+            targets.extend(built if isinstance(built, list) else [built])
+
+        if self.target_filter:
+            targets = [t for t in targets
+                       if any(t.name.startswith(f) for f in self.target_filter)]
+        return targets
+
+    def _measure(self, target, state):
+        """Return (best_seconds, median_seconds, units, peak_mb)"""
+        timings = []
+        units = 0
+
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            for _ in range(self.repeat):
+                start = time.perf_counter()
+                units = target.run(state)
+                timings.append(time.perf_counter() - start)
+
+            # Separate pass: tracemalloc slows execution, keep it out of timings
+            tracemalloc.start()
+            try:
+                target.run(state)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+        return min(timings), float(np.median(timings)), units, peak / 1024 / 1024
+
+    def run(self):
+        """Run all targets on all sizes"""
+        targets = self.load_targets()
+
+        print("⏱️  PERFORMANCE BENCHMARK")
+        print("=" * 70)
+        print(f"Sizes: {self.sizes} | Repeat: {self.repeat} | Seed: {self.seed} | Model: {self.model}")
+        print("-" * 70)
+
+        self.results = {}
+        for size in self.sizes:
+            df = make_synthetic_ohlcv(size, seed=self.seed, model=self.model)
+
+            for target in targets:
+                key = f"{target.name}@{size}"
+
+                if target.max_size is not None and size > target.max_size:
+                    self.results[key] = {'size': size, 'skipped': f"size > {target.max_size}"}
+                    continue
+
+                try:
+                    state = target.setup(df)
+                    best, median, units, peak_mb = self._measure(target, state)
+                except Exception as e:
+                    print(f"❌ {key}: {type(e).__name__}: {e}")
+                    self.results[key] = {'size': size, 'skipped': f"error: {e}"}
+                    continue
+
+                self.results[key] = {
+                    'size': size,
+                    'seconds': best,
+                    'median_seconds': median,
+                    'throughput': units / best if best > 0 else float('inf'),
+                    'peak_mb': peak_mb
+                }
+                print(f"{key:45} {best:9.3f}s {units / best:14,.0f}/s {peak_mb:9.1f} MB")
+
+        print("=" * 70)
+        return self.results
+
+    def _payload(self):
+        return {
+            'meta': {
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'pandas': pd.__version__,
+                'machine': platform.machine(),
+                'seed': self.seed,
+                'model': self.model,
+                'repeat': self.repeat
+            },
+            'results': self.results
+        }
+
+    def save(self, path):
+        """Write current results as JSON"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with open(path, 'w') as f:
+            json.dump(self._payload(), f, indent=2)
+        print(f"💾 Benchmark results saved: {path}")
+
+    def save_baseline(self):
+        self.save(self.baseline_file)
+
+    def compare(self, baseline_file=None):
+        """
+        Compare current results against the stored baseline
+
+        Returns: list of regression descriptions (empty = OK)
+        """
+        path = baseline_file or self.baseline_file
+        if not os.path.exists(path):
+            print(f"⚠️  No baseline at {path} (run with --save-baseline first)")
+            return []
+
+        with open(path) as f:
+            baseline = json.load(f).get('results', {})
+
+        regressions = []
+        limit = 1 + self.threshold
+
+        print(f"\n📊 COMPARISON vs {path} (threshold +{self.threshold*100:.0f}%)")
+        print("-" * 70)
+        print(f"{'Benchmark':45} {'Time':>10} {'Memory':>10}")
+
+        for key, current in self.results.items():
+            base = baseline.get(key)
+            if not base or 'seconds' not in base or 'seconds' not in current:
+                continue
+
+            time_ratio = current['seconds'] / base['seconds'] if base['seconds'] > 0 else 1.0
+            mem_ratio = current['peak_mb'] / base['peak_mb'] if base['peak_mb'] > 0 else 1.0
+
+            flags = []
+            if time_ratio > limit:
+                flags.append(f"time x{time_ratio:.2f}")
+            if mem_ratio > limit:
+                flags.append(f"memory x{mem_ratio:.2f}")
+
+            status = "🔴" if flags else "🟢"
+            print(f"{status} {key:43} {(time_ratio - 1)*100:+9.1f}% {(mem_ratio - 1)*100:+9.1f}%")
+
+            if flags:
+                regressions.append(f"{key}: {', '.join(flags)}")
+
+        print("-" * 70)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) detected")
+        else:
+            print("✅ No regressions")
+
+        return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Trading bot performance benchmarks")
+    parser.add_argument('--sizes', type=int, nargs='+', help="Dataset sizes in candles")
+    parser.add_argument('--repeat', type=int, help="Timed runs per target")
+    parser.add_argument('--seed', type=int, help="Synthetic data seed")
+    parser.add_argument('--model', choices=SyntheticMarketGenerator.MODELS, help="Synthetic price process")
+    parser.add_argument('--threshold', type=float, help="Allowed slowdown ratio (0.2 = 20%%)")
+    parser.add_argument('--baseline', help="Baseline JSON path")
+    parser.add_argument('--targets', nargs='+', help="Only run targets with these prefixes")
+    parser.add_argument('--save-baseline', action='store_true', help="Store results as new baseline")
+    parser.add_argument('--output', help="Also write results JSON here")
+    args = parser.parse_args(argv)
+
+    harness = BenchmarkHarness(
+        sizes=args.sizes,
+        repeat=args.repeat,
+        seed=args.seed,
+        threshold=args.threshold,
+        baseline_file=args.baseline,
+        targets=args.targets,
+        model=args.model or 'gbm'
+    )
+    harness.run()
+
+    if args.output:
+        harness.save(args.output)
+
+    if args.save_baseline:
+        harness.save_baseline()
+        return 0
+
+    return 1 if harness.compare() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -168,6 +168,22 @@ except:
         ./start_config_bot.sh
         ;;
     
+    host)
+        print_header
+        if [ -f "host.pid" ] && ps -p "$(cat host.pid)" > /dev/null 2>&1; then
+            print_error "Bot host is already running (PID: $(cat host.pid))"
+        else
+            echo "🖥️  Starting multi-bot host (telegram_config.py + bots/*.py)..."
+            mkdir -p "$LOG_DIR"
+            HOST_LOG="$LOG_DIR/host_$(date +"%Y%m%d_%H%M%S").log"
+            nohup python -m runtime.host > "$HOST_LOG" 2>&1 &
+            echo $! > host.pid
+            print_status "Host started (PID: $!)"
+            echo "   Log: $HOST_LOG"
+            echo "   Add/remove bots by adding/removing files in bots/"
+        fi
+        ;;
+    
     logs)
         print_header
         LATEST_LOG=$(get_latest_log)
@@ -292,6 +308,9 @@ except Exception as e:
         echo -e "${GREEN}  ./bot_control.sh restart${NC}"
         echo "     Restart the bot"
         echo ""
+        echo -e "${GREEN}  ./bot_control.sh host${NC}"
+        echo "     Run all bots (bots/*.py) in one process"
+        echo ""
         echo -e "${GREEN}  ./bot_control.sh logs${NC}"
         echo "     Show recent logs"
         echo ""
@@ -0,0 +1,415 @@
+# cli.py
+"""
+Non-interactive command line for batch, scheduled and parallel runs
+
+Same features as the main.py menu without input() prompts, so backtests
+and sweeps can run on headless workers, from cron or CI, many at a time:
+
+    python cli.py backtest --strategy "sma_crossover(20, 45)" --interval 1h --start 2024-01-01
+    python cli.py optimize --strategy sma_crossover --grid fast_period=5:50:5 slow_period=20:100:10 \\
+                           --where "slow_period > fast_period" --workers 8 --json
+    python cli.py compare --strategy "sma_crossover(10, 30)" sma_rsi_combo --synthetic 20000
+    python cli.py compare --strategy sma_crossover sma_rsi_combo --charts reports/compare --workers 0
+    python cli.py optimize --strategy sma_crossover --grid fast_period=5:50:5 --top 100 --report reports/sweep
+    python cli.py paper --strategy sma_rsi_combo --days 7 --balance 100
+    python cli.py fetch --symbol NXPCUSDT --interval 1m --start 2024-06-01 --output data/nxpc_1m.csv
+    python cli.py bench --sizes 10000 --targets engine
+
+Market data comes from Binance (default), a file (--data, csv/parquet)
+or the synthetic generator (--synthetic N candles). Strategies are
+registry config strings (strategies/registry.py).
+
+With --json only the JSON result is written to stdout (progress goes to
+stderr); --output also writes it to a file. --charts renders PNG/HTML charts
+(utils/render.py) on a non-interactive backend instead of opening windows;
+--report writes one HTML report for all runs (utils/report_builder.py). Exit code: 0 = ok, 1 = no data
+or a failed run, 2 = usage error.
+"""
+import argparse
+import ast
+import contextlib
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+class CLIError(Exception):
+    """Run cannot proceed (no data, bad grid spec...); exit code 1"""
+
+
+# ==================== ARGUMENT HELPERS ====================
+
+def parse_grid(specs):
+    """
+    Grid specs -> {parameter: values}
+
+        fast_period=5:50:5      inclusive range (ints or floats)
+        rsi_period=7,14,21      list of literals
+        mode=fast               single literal (strings allowed unquoted)
+    """
+    grid = {}
+    for spec in specs:
+        name, sep, values = spec.partition('=')
+        if not sep or not name.isidentifier():
+            raise CLIError(f"Invalid grid spec {spec!r} (expected name=values)")
+        if values.count(':') == 2:
+            start, stop, step = (_literal(v) for v in values.split(':'))
+            if not all(isinstance(v, (int, float)) for v in (start, stop, step)) or step <= 0:
+                raise CLIError(f"Invalid range {values!r} (expected start:stop:step, step > 0)")
+            count = int(round((stop - start) / step)) + 1
+            grid[name] = [start + i * step for i in range(count) if start + i * step <= stop + 1e-12]
+        else:
+            grid[name] = [_literal(v) for v in values.split(',')]
+    return grid
+
+
+def _literal(text):
+    try:
+        return ast.literal_eval(text.strip())
+    except (ValueError, SyntaxError):
+        return text.strip()
+
+
+def _where(expression):
+    """Combination filter from an expression over parameter names (operator input)"""
+    if not expression:
+        return None
+    code = compile(expression, '<where>', 'eval')
+    return lambda params: bool(eval(code, {'__builtins__': {}}, dict(params)))
+
+
+def _json_default(value):
+    if hasattr(value, 'item'):
+        return value.item()      # numpy scalars
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+# ==================== DATA ====================
+
+def _utc(text):
+    """Date string -> naive UTC Timestamp (the frames' index convention)"""
+    if not text:
+        return None
+    import pandas as pd
+    ts = pd.Timestamp(text)
+    return ts.tz_convert('UTC').tz_localize(None) if ts.tzinfo is not None else ts
+
+
+def load_data(args):
+    """
+    OHLCV frame (lower-case columns, DatetimeIndex) for --data / --synthetic / Binance
+
+    Returns:
+        (df, meta dict)
+    """
+    import pandas as pd
+
+    start, end = _utc(args.start), _utc(args.end)
+
+    if args.data:
+        source = args.data
+        if args.data.endswith('.parquet'):
+            df = pd.read_parquet(args.data)
+        else:
+            df = pd.read_csv(args.data, index_col=0, parse_dates=True)
+    elif args.synthetic:
+        from data.synthetic import SyntheticMarketGenerator
+        from utils.helpers import interval_to_seconds
+
+        source = 'synthetic'
+        n_bars = args.synthetic
+        if start is not None and end is not None:
+            n_bars = int((end - start).total_seconds() // interval_to_seconds(args.interval))
+        generator = SyntheticMarketGenerator(seed=args.seed, interval=args.interval)
+        df = generator.generate(n_bars, model=args.model, start=start, end=end)
+    else:
+        from data.fetcher import DataFetcher
+
+        source = 'binance'
+        df = DataFetcher(args.symbol).fetch_historical_data(
+            days_back=args.days, interval=args.interval, start=start, end=end)
+
+    df.columns = [str(c).lower() for c in df.columns]
+    if getattr(df.index, 'tz', None) is not None:
+        df.index = df.index.tz_convert('UTC').tz_localize(None)
+    if start is not None:
+        df = df[df.index >= start]
+    if end is not None:
+        df = df[df.index < end]
+
+    if df.empty:
+        raise CLIError(f"No market data ({source})")
+    meta = {
+        'source': source,
+        'symbol': args.symbol,
+        'interval': args.interval,
+        'candles': len(df),
+        'start': df.index[0],
+        'end': df.index[-1],
+    }
+    return df, meta
+
+
+def _engine_kwargs(args):
+    kwargs = {'interval': args.interval}
+    if args.capital is not None:
+        kwargs['initial_capital'] = args.capital
+    if args.commission is not None:
+        kwargs['commission'] = args.commission
+    if args.stop_loss is not None:
+        kwargs['stop_loss'] = args.stop_loss
+    return kwargs
+
+
+def _workers(args):
+    return args.workers if args.workers > 0 else (os.cpu_count() or 1)
+
+
+def _render_charts(args, named_results):
+    """Render {name: engine results} to --charts DIR (unchanged results skipped)"""
+    from utils.render import render_batch, print_summary
+
+    out_dir = args.charts if isinstance(args.charts, str) else None
+    summary = render_batch(named_results, out_dir, workers=args.workers or None)
+    print_summary(summary)
+    return {key: summary[key] for key in ('out_dir', 'rendered', 'skipped', 'failed', 'files')}
+
+
+def _outputs(args, named_results, params=None):
+    """--charts / --report outputs for {name: engine results}"""
+    outputs = {}
+    if args.charts:
+        outputs['charts'] = _render_charts(args, named_results)
+    if args.report:
+        from utils.report_builder import build_report
+        out_dir = args.report if isinstance(args.report, str) else None
+        title = f"trads {args.command}: {args.symbol} {args.interval}"
+        outputs['report'] = build_report(named_results, out_dir, title, params)
+    return outputs
+
+
+# ==================== COMMANDS ====================
+
+def cmd_backtest(args):
+    from backtest.engine import BacktestEngine
+    from strategies.registry import create_strategy
+
+    df, meta = load_data(args)
+    strategy = create_strategy(args.strategy[0])
+    engine = BacktestEngine(**_engine_kwargs(args))
+    results = engine.run(df, strategy)
+    engine.print_results(results)
+
+    metrics = {k: v for k, v in results.items() if k not in ('trades', 'equity_curve')}
+    payload = {'command': 'backtest', 'strategy': strategy.name, 'config': args.strategy[0],
+               'data': meta, 'metrics': metrics}
+    if args.trades:
+        payload['trades'] = results['trades']
+    payload.update(_outputs(args, {args.strategy[0]: results}))
+    return payload
+
+
+def cmd_optimize(args):
+    from backtest.optimizer import StrategyOptimizer
+
+    grid = parse_grid(args.grid)
+    if not grid:
+        raise CLIError("optimize needs --grid (e.g. fast_period=5:50:5)")
+    df, meta = load_data(args)
+
+    optimizer = StrategyOptimizer()
+    results_df = optimizer.optimize(args.strategy[0], grid, df, valid=_where(args.where),
+                                    workers=_workers(args), save=args.save,
+                                    engine_kwargs=_engine_kwargs(args))
+    if results_df.empty:
+        raise CLIError("No valid results")
+
+    ranked = results_df.sort_values(args.metric, ascending=args.metric == 'max_drawdown')
+    if args.top:
+        ranked = ranked.head(args.top)
+    payload = {'command': 'optimize', 'strategy': args.strategy[0], 'grid': grid,
+               'metric': args.metric, 'combinations': len(results_df), 'data': meta,
+               'results': ranked.to_dict('records')}
+
+    if args.charts or args.report:
+        # The grid search keeps metrics only: re-run the ranked combinations in full
+        from backtest.optimizer import backtest_many
+
+        params = [{name: row[name].item() if hasattr(row[name], 'item') else row[name] for name in grid}
+                  for row in ranked.to_dict('records')]
+        outcomes = backtest_many(df, [(args.strategy[0], p) for p in params], workers=_workers(args),
+                                 engine_kwargs=_engine_kwargs(args), full=True)
+        names = ['_'.join(f"{k}={v}" for k, v in p.items()) for p in params]
+        named = {name: result for name, (result, error) in zip(names, outcomes) if not error}
+        payload.update(_outputs(args, named, dict(zip(names, params))))
+    return payload
+
+
+def cmd_compare(args):
+    from backtest.optimizer import backtest_many
+
+    df, meta = load_data(args)
+    outcomes = backtest_many(df, [(config, {}) for config in args.strategy],
+                             workers=_workers(args), engine_kwargs=_engine_kwargs(args),
+                             full=bool(args.charts or args.report))
+    full_results = {}
+    if args.charts or args.report:
+        from backtest.optimizer import result_metrics
+
+        full_results = {config: result for config, (result, error) in zip(args.strategy, outcomes)
+                        if not error}
+        outcomes = [(result_metrics(result), None) if not error else (None, error)
+                    for result, error in outcomes]
+
+    rows = []
+    print(f"\n📊 STRATEGY COMPARISON ({meta['candles']} candles)")
+    print("-" * 70)
+    for config, (metrics, error) in zip(args.strategy, outcomes):
+        if error:
+            print(f"   ❌ {config}: {error}")
+            rows.append({'strategy': config, 'error': error})
+            continue
+        print(f"   {config:<40} {metrics['total_return']:+8.2f}%  "
+              f"win {metrics['win_rate']:5.1f}%  sharpe {metrics['sharpe_ratio']:6.2f}")
+        rows.append({'strategy': config, **metrics})
+
+    if all('error' in row for row in rows):
+        raise CLIError("Every strategy failed")
+    payload = {'command': 'compare', 'data': meta, 'results': rows}
+    payload.update(_outputs(args, full_results))
+    return payload
+
+
+def cmd_paper(args):
+    from paper_trade.simulator import PaperTradingSimulator
+
+    df, meta = (None, {'source': 'exchange'})
+    if args.data or args.synthetic:
+        df, meta = load_data(args)
+
+    simulator = PaperTradingSimulator(args.strategy[0], initial_balance=args.balance,
+                                      compounding=not args.no_compounding)
+    symbol = args.symbol if '/' in args.symbol else f"{args.symbol[:-4]}/{args.symbol[-4:]}"
+    simulator.run(symbol=symbol, timeframe=args.interval, days=args.days, df=df)
+    return {'command': 'paper', 'data': meta, 'summary': simulator.get_performance_summary()}
+
+
+def cmd_fetch(args):
+    df, meta = load_data(args)
+    output = args.output or f"data/{args.symbol.replace('/', '')}_{args.interval}.csv"
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    if output.endswith('.parquet'):
+        df.to_parquet(output)
+    else:
+        df.to_csv(output)
+    print(f"💾 {len(df)} candles saved: {output}")
+    return {'command': 'fetch', 'data': meta, 'file': output}
+
+
+# ==================== PARSER ====================
+
+def build_parser():
+    try:
+        from config.api_config import api_config
+        default_symbol = api_config.DEFAULT_SYMBOL
+    except Exception:
+        default_symbol = 'NXPCUSDT'
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--symbol', default=default_symbol, help=f"Symbol (default: {default_symbol})")
+    common.add_argument('--interval', default='1h', help="Candle interval (default: 1h)")
+    common.add_argument('--start', help="Start date, UTC (e.g. 2024-01-01)")
+    common.add_argument('--end', help="End date, UTC, exclusive")
+    common.add_argument('--days', type=int, default=90, help="Days back when --start is not given")
+    common.add_argument('--data', help="Read candles from a CSV / parquet file instead of Binance")
+    common.add_argument('--synthetic', type=int, metavar='N', help="Use N synthetic candles")
+    common.add_argument('--seed', type=int, default=42, help="Synthetic data seed")
+    common.add_argument('--model', default='gbm', help="Synthetic price model (gbm, regime, jump)")
+    common.add_argument('--json', action='store_true', help="Print the result as JSON only")
+    common.add_argument('--output', help="Also write the JSON result here (fetch: data file)")
+
+    engine = argparse.ArgumentParser(add_help=False)
+    engine.add_argument('--strategy', nargs='+', default=None,
+                        help="Registry config string(s), e.g. \"sma_crossover(20, 45)\"")
+    engine.add_argument('--workers', type=int, default=1, help="Parallel processes (0 = all CPUs)")
+    engine.add_argument('--capital', type=float, help="Initial capital")
+    engine.add_argument('--commission', type=float, help="Commission per trade (0.001 = 0.1%%)")
+    engine.add_argument('--stop-loss', type=float, help="Stop loss (0.05 = 5%%)")
+
+    charts = argparse.ArgumentParser(add_help=False)
+    charts.add_argument('--charts', metavar='DIR', nargs='?', const=True,
+                        help="Render PNG/HTML charts headless into DIR (default: RENDER_DIR); "
+                             "unchanged results are skipped")
+    charts.add_argument('--report', metavar='DIR', nargs='?', const=True,
+                        help="Write one HTML report for all runs into DIR (default: REPORT_DIR)")
+
+    parser = argparse.ArgumentParser(prog='trads', description="Trading bot command line")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('backtest', parents=[common, engine, charts], help="Backtest one strategy")
+    p.add_argument('--trades', action='store_true', help="Include the trade list in the JSON")
+    p.set_defaults(func=cmd_backtest)
+
+    p = commands.add_parser('optimize', parents=[common, engine, charts], help="Parameter grid search")
+    p.add_argument('--grid', nargs='+', default=[], help="name=start:stop:step or name=v1,v2")
+    p.add_argument('--where', help="Keep combinations where this holds, e.g. \"slow_period > fast_period\"")
+    p.add_argument('--metric', default='total_return',
+                   choices=['total_return', 'sharpe_ratio', 'profit_factor', 'win_rate', 'max_drawdown'])
+    p.add_argument('--top', type=int, default=10, help="Results in the output (0 = all)")
+    p.add_argument('--save', action='store_true', help="Also save the CSV to RESULTS_DIR")
+    p.set_defaults(func=cmd_optimize)
+
+    p = commands.add_parser('compare', parents=[common, engine, charts], help="Backtest several strategies")
+    p.set_defaults(func=cmd_compare)
+
+    p = commands.add_parser('paper', parents=[common, engine], help="Paper trading simulation")
+    p.add_argument('--balance', type=float, help="Initial balance (default: PAPER_INITIAL_BALANCE)")
+    p.add_argument('--no-compounding', action='store_true')
+    p.set_defaults(func=cmd_paper, days=7)
+
+    p = commands.add_parser('fetch', parents=[common], help="Download candles to a file")
+    p.set_defaults(func=cmd_fetch)
+
+    # Handled in main(): every flag is passed to benchmarks/harness.py
+    commands.add_parser('bench', help="Performance benchmarks (benchmarks/harness.py flags)")
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv[:1] == ['bench'] and not {'-h', '--help'} & set(argv[1:2]):
+        # Flags belong to the harness (argparse REMAINDER cannot take leading options)
+        from benchmarks.harness import main as bench_main
+        return bench_main([a for a in argv[1:] if a != '--'])
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, 'strategy', None) is None and args.command not in ('fetch', 'bench'):
+        from config.settings import settings
+        args.strategy = [settings.STRATEGY]
+
+    # JSON mode: everything the modules print goes to stderr, stdout is the result
+    target = sys.stderr if args.json else sys.stdout
+    try:
+        with contextlib.redirect_stdout(target):
+            payload = args.func(args)
+        code = 0
+    except (CLIError, KeyError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        payload, code = {'command': args.command, 'error': str(e)}, 1
+
+    text = json.dumps(payload, indent=2, default=_json_default)
+    if args.json:
+        print(text)
+    if args.output and args.command != 'fetch':
+        with open(args.output, 'w') as f:
+            f.write(text)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,10 @@
 """
 Simple Binance Compounding Bot for NXPC/USDT
 """
-import time
-import schedule
 from datetime import datetime
 from binance.client import Client
 import python_binance
+from runtime import BotRuntime
 
 class SimpleBinanceBot:
     """Simple compounding bot for Binance"""
@@ -52,24 +51,20 @@ class SimpleBinanceBot:
         print(f"\n🔄 Running every {interval_minutes} minutes")
         print("Press Ctrl+C to stop\n")
         
-        # Run immediately once
-        self.check_and_trade()
-        
-        # Schedule
-        schedule.every(interval_minutes).minutes.do(self.check_and_trade)
-        
-        try:
-            while True:
-                schedule.run_pending()
-                time.sleep(1)
-        except KeyboardInterrupt:
-            print("\n\n🛑 Bot stopped by user")
-            print(f"📈 Final check...")
-            price = self.get_price()
-            total_value = self.nxpc_balance * price
-            print(f"   Final NXPC: {self.nxpc_balance:.2f}")
-            print(f"   Final Price: ${price:.4f}")
-            print(f"   Total Value: ${total_value:.2f}")
+        runtime = BotRuntime(name='SimpleBinanceBot')
+        runtime.every(interval_minutes * 60, self.check_and_trade)
+        runtime.on_stop(self.final_check)
+        runtime.run()
+    
+    def final_check(self):
+        """Print final position value"""
+        print("\n\n🛑 Bot stopped by user")
+        print(f"📈 Final check...")
+        price = self.get_price()
+        total_value = self.nxpc_balance * price
+        print(f"   Final NXPC: {self.nxpc_balance:.2f}")
+        print(f"   Final Price: ${price:.4f}")
+        print(f"   Total Value: ${total_value:.2f}")
 
 if __name__ == "__main__":
     # Get initial NXPC from account
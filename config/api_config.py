@@ -28,11 +28,25 @@ class BinanceConfig:
     # API URLs
     TESTNET_URL = 'https://testnet.binance.vision'
     MAINNET_URL = 'https://api.binance.com'
+    TESTNET_STREAM_URL = 'wss://stream.testnet.binance.vision'
+    MAINNET_STREAM_URL = 'wss://stream.binance.com:9443'
+    
+    # Local fake exchange (python -m exchange.fake_server) - empty = real Binance
+    FAKE_EXCHANGE_URL = os.getenv('FAKE_EXCHANGE_URL', '')
+    FAKE_EXCHANGE_WS_URL = os.getenv('FAKE_EXCHANGE_WS_URL', '')
     
     @property
     def base_url(self):
+        if self.FAKE_EXCHANGE_URL:
+            return self.FAKE_EXCHANGE_URL
         return self.TESTNET_URL if self.USE_TESTNET else self.MAINNET_URL
     
+    @property
+    def stream_url(self):
+        if self.FAKE_EXCHANGE_WS_URL:
+            return self.FAKE_EXCHANGE_WS_URL
+        return self.TESTNET_STREAM_URL if self.USE_TESTNET else self.MAINNET_STREAM_URL
+    
     @property
     def is_testnet(self):
         return self.USE_TESTNET
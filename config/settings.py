@@ -31,7 +31,13 @@ class Settings:
     RSI_PERIOD = 14
     RSI_OVERBOUGHT = 70
     RSI_OVERSOLD = 30
-    
+
+    # ==================== STRATEGY REGISTRY ====================
+    # Strategy for backtest / optimizer / simulator, by registry name with
+    # optional parameters, e.g. "sma_rsi_combo(sma_fast=20, sma_slow=45)"
+    STRATEGY = "sma_crossover"
+    STRATEGY_ENTRY_POINT_GROUP = "trads.strategies"   # plugins from installed packages
+
     # ==================== RISK MANAGEMENT (OPTIMIZED FOR SMALL CAPITAL) ====================
     DEFAULT_STOP_LOSS = 0.05        # ⬅️ UBAH: 5% (lebih ketat untuk modal kecil)
     DEFAULT_TAKE_PROFIT = 0.10      # ⬅️ UBAH: 10% (1:2 risk-reward tetap)
@@ -76,6 +82,103 @@ class Settings:
         'take_profit': [0.08, 0.10, 0.12]
     }
     
+    # ==================== BENCHMARK SETTINGS ====================
+    BENCHMARK_SIZES = [10_000, 100_000, 1_000_000]   # Candles per dataset
+    BENCHMARK_SEED = 42                               # Deterministic synthetic data
+    BENCHMARK_REPEAT = 3                              # Timed runs per target (best is kept)
+    BENCHMARK_BASELINE_FILE = "benchmarks/baseline.json"
+    BENCHMARK_REGRESSION_THRESHOLD = 0.20             # 20% slower / bigger = regression
+
+    # ==================== EXCHANGE CLIENT SETTINGS ====================
+    CLIENT_POOL_SIZE = 10             # Keep-alive connections per host per client
+    CLIENT_SYNC_TIME = True           # Measure server time offset once per exchange
+    EXCHANGE_INFO_TTL = 3600          # Symbol filters refreshed in background after this
+
+    # ==================== ORDER GATEWAY SETTINGS ====================
+    GATEWAY_WORKERS = 2               # Concurrent order submissions
+    GATEWAY_MAX_RETRIES = 2           # Resends after an unknown-outcome error (same client ID)
+    GATEWAY_RETRY_DELAY = 0.5         # Seconds, doubles per retry
+    GATEWAY_ORDER_PREFIX = "trads"    # newClientOrderId prefix
+    GATEWAY_LOOKUP_SETTLE = 1.0       # Seconds before "order does not exist" is believed
+
+    # ==================== ORDER STORE SETTINGS ====================
+    ORDER_STORE_DIR = "state"         # <bot>.json snapshot + <bot>.log journal
+    ORDER_STORE_SNAPSHOT_EVERY = 500  # Journal entries folded into a new snapshot
+    ORDER_STORE_MAX_TRADES = 1000     # Recent fills kept in the snapshot
+    ORDER_STORE_FSYNC = True          # fsync every journal line (order state survives power loss)
+
+    # ==================== MARKET DATA CACHE SETTINGS ====================
+    # Seconds a REST snapshot stays fresh (klines also expire at candle close)
+    MARKET_CACHE_TTL = {
+        'ticker_price': 2.0,
+        'ticker_24h': 10.0,
+        'account': 5.0,
+        'klines': 30.0,
+        'depth': 1.0,
+        'open_orders': 5.0,
+        'exchange_info': 3600.0,
+    }
+
+    # ==================== MARKET STREAM SETTINGS ====================
+    STREAM_QUEUE_SIZE = 1000          # Per subscriber; oldest dropped when full
+    STREAM_RECONNECT_DELAY = 1.0      # First retry (seconds), doubles per failure
+    STREAM_MAX_RECONNECT_DELAY = 60.0
+    STREAM_STALE_TIMEOUT = 30.0       # No message for this long = reconnect
+    STREAM_BACKFILL_LIMIT = 1000      # Max candles fetched per REST backfill call
+    CANDLE_BUFFER_CAPACITY = 1000     # Candles kept per symbol/interval ring buffer
+
+    # ==================== USER DATA STREAM SETTINGS ====================
+    USER_STREAM_RECONCILE_INTERVAL = 900   # Seconds between REST get_account reconciliations
+    USER_STREAM_KEEPALIVE_INTERVAL = 1800  # Listen key keep-alive (expires after 60 min)
+
+    # ==================== BOT RUNTIME SETTINGS ====================
+    RUNTIME_JOB_TIMEOUT = 120.0       # Seconds before a strategy check is abandoned
+    RUNTIME_ORDER_TIMEOUT = 30.0      # Per order submission
+    RUNTIME_NOTIFY_TIMEOUT = 15.0     # Per notification send
+    RUNTIME_QUEUE_SIZE = 100          # Order / notification / event queues
+    RUNTIME_WORKERS = 8               # Threads for blocking bot code
+    RUNTIME_SHUTDOWN_TIMEOUT = 10.0   # Drain time for queued notifications on stop
+
+    # ==================== BOT HOST SETTINGS ====================
+    HOST_CONFIG_DIR = "bots"          # telegram_config-style files, one bot per file
+    HOST_RELOAD_INTERVAL = 10         # Seconds between config dir scans (hot add/remove)
+    HOST_STATS_INTERVAL = 900         # Seconds between per-bot stats prints
+
+    # ==================== STARTUP SETTINGS ====================
+    # Cold import budget per entry point in ms (python -m utils.startup)
+    STARTUP_BUDGET_MS = {
+        'main': 400,
+        'runtime.host': 1500,
+    }
+    # Heavy packages the menu must not load before an option is picked
+    STARTUP_DEFERRED_MODULES = ['pandas', 'matplotlib', 'plotly', 'ccxt', 'binance']
+
+    # ==================== BATCH RENDER SETTINGS ====================
+    RENDER_DIR = "reports/batch"      # <name>_equity.png, _trades.png, _dashboard.html + manifest
+    RENDER_WORKERS = 0                # Render processes (0 = one per CPU)
+    RENDER_DPI = 100
+    RENDER_KINDS = ['equity', 'trades', 'dashboard']
+    RENDER_PLOTLYJS = "cdn"           # "cdn" = small HTML files, True = self-contained
+
+    # ==================== CHART DOWNSAMPLING SETTINGS ====================
+    PLOT_MAX_POINTS = 5000            # Points per line trace before downsampling
+    PLOT_MAX_CANDLES = 2000           # Candles per chart before merging into coarser candles
+    PLOT_DOWNSAMPLE = "lttb"          # lttb (shape) / minmax (envelope) / none
+
+    # ==================== HTML REPORT SETTINGS ====================
+    REPORT_DIR = "reports/report"     # index.html + assets/ + data/ (utils/report_builder.py)
+    REPORT_MAX_POINTS = 2000          # Points per run chart
+    REPORT_OVERVIEW_RUNS = 20         # Best runs drawn together in the overview chart
+    REPORT_PLOTLYJS = "local"         # "local" = assets/plotly.min.js (offline), "cdn"
+
+    # ==================== LOGGING SETTINGS ====================
+    LOG_LEVEL = "INFO"
+    LOG_CONSOLE = True                # Echo text log lines to stderr
+    LOG_QUEUE_SIZE = 10000            # Pending records before new ones are dropped
+    LOG_BATCH_SIZE = 500              # Records per write
+    LOG_FLUSH_INTERVAL = 0.2          # Seconds a batch waits for more records
+    LOG_MAX_BYTES = 50 * 1024 * 1024  # Per file; rolls to <name>.1, .2 ... (and daily)
+
     # ==================== PERFORMANCE METRICS ====================
     MIN_WIN_RATE = 0.40
     MIN_PROFIT_FACTOR = 1.30
@@ -85,6 +188,14 @@ class Settings:
     ENABLE_NOTIFICATIONS = False
     TELEGRAM_BOT_TOKEN = ""
     TELEGRAM_CHAT_ID = ""
+    NOTIFY_QUEUE_SIZE = 500           # Pending messages before spilling / dropping
+    NOTIFY_BATCH_WINDOW = 2.0         # Seconds to wait for a burst to coalesce
+    NOTIFY_MAX_BATCH = 20             # Messages per digest
+    NOTIFY_MAX_RETRIES = 5
+    NOTIFY_RETRY_BACKOFF = 1.0        # First retry delay (seconds), doubles per attempt
+    NOTIFY_TIMEOUT = 10.0             # HTTP timeout per send
+    NOTIFY_SPILL_FILE = "logs/notifications_spill.jsonl"  # "" = drop when full
+    NOTIFY_DEAD_LETTER_FILE = "logs/notifications_dead.jsonl"  # Texts Telegram rejected (4xx)
     
     # ==================== ADVANCED SETTINGS ====================
     ENABLE_HEDGING = False
@@ -92,12 +203,14 @@ class Settings:
     MAX_PYRAMID_LEVELS = 3
     
     def __init__(self):
-        """Initialize and create directories"""
-        self.create_directories()
+        """Initialize (no filesystem access: directories are created on demand)"""
+        self._directories_ready = False
         self.validate_settings()
     
     def create_directories(self):
-        """Create necessary directories"""
+        """Create necessary directories (once; called by entry points before writing)"""
+        if self._directories_ready:
+            return
         dirs = [
             self.DATA_DIR, 
             self.RESULTS_DIR, 
@@ -108,6 +221,8 @@ class Settings:
         
         for dir_path in dirs:
             os.makedirs(dir_path, exist_ok=True)
+            print(f"📁 Directory ready: {dir_path}")
+        self._directories_ready = True
     
     def validate_settings(self):
         """Validate all settings for consistency - UPDATED FOR SMALL CAPITAL"""
@@ -136,7 +251,7 @@ class Settings:
         
         categories = {
             "Exchange": ["EXCHANGE", "DEFAULT_SYMBOL", "DEFAULT_TIMEFRAME", "USE_TESTNET"],
-            "Strategy (Small Capital)": ["SMA_FAST", "SMA_SLOW", "RSI_PERIOD"],
+            "Strategy (Small Capital)": ["STRATEGY", "SMA_FAST", "SMA_SLOW", "RSI_PERIOD"],
             "Risk Management": ["DEFAULT_STOP_LOSS", "DEFAULT_TAKE_PROFIT", 
                                "MIN_TRADE_SIZE", "MAX_POSITION_SIZE", "RISK_PER_TRADE"],
             "Compounding Bot": ["COMPOUNDING_ENABLED", "TRADE_FREQUENCY", 
@@ -214,11 +329,6 @@ class Settings:
 settings = Settings()
 
 # Print initialization message
-print("📁 Directory ready: data")
-print("📁 Directory ready: results")
-print("📁 Directory ready: logs")
-print("📁 Directory ready: reports")
-print("📁 Directory ready: charts")
 print("💰 Initial Capital: 15 NXPC (≈$7.00)")
 print("⚡ Strategy: SMA(20/45) with 5% Stop Loss")
 print("🔄 Compounding: ENABLED (100% reinvest)")
@@ -0,0 +1,272 @@
+# data/candle_buffer.py
+"""
+Rolling candle buffer for live strategies
+
+A fixed-capacity NumPy ring buffer of the most recent candles of one
+symbol/interval. Every row is written twice (at i and i + capacity), so
+the last n candles are always one contiguous slice: windows are views,
+never copies, and appending is O(1) with no allocation.
+
+The buffer is fed by MarketStream (attach) or by one small incremental
+kline request per cycle (update) instead of refetching the whole history.
+
+Usage:
+    buffer = CandleBuffer.shared('NXPCUSDT', '1h', capacity=500)
+    buffer.update(client)                 # or buffer.attach(stream)
+    closes = buffer.column('close', 20)   # view, last 20 closes
+    df = buffer.frame(200)                # DataFrame over the same memory
+    signals = strategy.generate_signals(df)
+"""
+import os
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.stream import parse_kline
+from utils.helpers import interval_to_seconds
+
+# Import settings
+try:
+    from config.settings import settings
+except ImportError:
+    # Fallback
+    class SimpleSettings:
+        CANDLE_BUFFER_CAPACITY = 1000
+    settings = SimpleSettings()
+
+COLUMNS = ('open_time', 'open', 'high', 'low', 'close', 'volume')
+_COLUMN_INDEX = {name: i for i, name in enumerate(COLUMNS)}
+
+
+class CandleBuffer:
+    """Last `capacity` candles of one symbol/interval, readable as zero-copy views"""
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, symbol, interval='1h', capacity=None):
+        self.symbol = symbol.upper()
+        self.interval = interval
+        self.capacity = capacity or settings.CANDLE_BUFFER_CAPACITY
+        self.interval_ms = interval_to_seconds(interval) * 1000
+
+        # Row-major by column: _data[col, i] and _data[col, i + capacity] hold the same value
+        self._data = np.zeros((len(COLUMNS), 2 * self.capacity), dtype=np.float64)
+        self._next = 0          # slot of the next new candle (0 .. capacity-1)
+        self.size = 0
+        self.last_open_time = None
+        self.last_closed = True
+        self.version = 0        # bumps on every change (cheap "anything new?" check)
+        self._lock = threading.Lock()
+        self._subscription = None
+        self._stream = None
+
+        self.appended = 0
+        self.updated = 0
+        self.fetches = 0
+
+    @classmethod
+    def shared(cls, symbol, interval='1h', capacity=None):
+        """One buffer per (symbol, interval) per process; capacity only grows"""
+        key = (symbol.upper(), interval)
+        with cls._shared_lock:
+            buffer = cls._shared.get(key)
+            if buffer is None or (capacity and capacity > buffer.capacity):
+                grown = cls(symbol, interval, capacity)
+                if buffer is not None:
+                    grown.extend_rows(buffer.window().T)
+                cls._shared[key] = buffer = grown
+            return buffer
+
+    def __len__(self):
+        return self.size
+
+    # ==================== WRITING ====================
+
+    def _write(self, slot, row):
+        self._data[:, slot] = row
+        self._data[:, slot + self.capacity] = row
+
+    def append(self, candle):
+        """
+        Add a candle dict (parse_kline / parse_kline_event)
+
+        The candle still in progress is updated in place; candles older
+        than the newest one are ignored.
+
+        Returns:
+            True if the buffer changed
+        """
+        open_time = candle['open_time']
+        row = (open_time, candle['open'], candle['high'], candle['low'],
+               candle['close'], candle['volume'])
+
+        with self._lock:
+            if self.last_open_time is not None and open_time < self.last_open_time:
+                return False
+            if open_time == self.last_open_time:
+                self._write((self._next - 1) % self.capacity, row)
+                self.updated += 1
+            else:
+                self._write(self._next, row)
+                self._next = (self._next + 1) % self.capacity
+                self.size = min(self.size + 1, self.capacity)
+                self.last_open_time = open_time
+                self.appended += 1
+            self.last_closed = candle.get('closed', True)
+            self.version += 1
+        return True
+
+    def extend(self, candles):
+        for candle in candles:
+            self.append(candle)
+        return self
+
+    def extend_rows(self, rows):
+        """Rows ordered like COLUMNS (e.g. another buffer's window().T)"""
+        for row in rows:
+            self.append(dict(zip(COLUMNS, row)))
+        return self
+
+    def load_klines(self, rows, last_closed=False):
+        """
+        REST kline rows (client.get_klines)
+
+        Args:
+            last_closed: False when the last row is the candle still in progress
+        """
+        for i, row in enumerate(rows):
+            closed = last_closed or i < len(rows) - 1
+            self.append(parse_kline(self.symbol, self.interval, row, closed=closed))
+        return self
+
+    # ==================== FEEDING ====================
+
+    def update(self, client):
+        """
+        Bring the buffer up to date with one small kline request
+
+        Only candles from the newest one held onwards are fetched; the
+        first call loads a full window.
+
+        Returns:
+            Number of new candles
+        """
+        before = self.appended
+        if self.last_open_time is None:
+            rows = client.get_klines(symbol=self.symbol, interval=self.interval,
+                                     limit=min(self.capacity, 1000))
+        else:
+            # The newest candle held may have been in progress: refetch it too
+            rows = client.get_klines(symbol=self.symbol, interval=self.interval,
+                                     startTime=int(self.last_open_time), limit=1000)
+        self.fetches += 1
+        self.load_klines(rows)
+        return self.appended - before
+
+    def attach(self, stream, history=0):
+        """
+        Follow a MarketStream kline subscription (intrabar updates included)
+
+        Args:
+            history: Closed candles to preload from REST (default: fill the buffer)
+        """
+        self.detach()
+        history = history or (self.capacity if not self.size else 0)
+        self._subscription = stream.subscribe_klines(self.symbol, self.interval,
+                                                     closed_only=False, history=history,
+                                                     maxsize=max(history, 1))
+        # Preloaded history is already queued; live candles arrive via the listener
+        self.extend(self._subscription.drain())
+        self._subscription.add_listener(self.append)
+        self._stream = stream
+        return self
+
+    def detach(self):
+        if self._subscription is not None:
+            self._stream.unsubscribe(self._subscription)
+            self._subscription = None
+
+    # ==================== READING (views) ====================
+
+    def _bounds(self, n, closed_only):
+        """Slice [start, end) in the doubled array for the last n candles"""
+        end = self._next + self.capacity
+        available = self.size
+        if closed_only and not self.last_closed and available:
+            end -= 1
+            available -= 1
+        n = available if n is None else min(n, available)
+        return end - n, end
+
+    def window(self, n=None, closed_only=False):
+        """
+        Last n candles as a (len(COLUMNS), n) view
+
+        Args:
+            closed_only: Leave out the candle still in progress
+        """
+        start, end = self._bounds(n, closed_only)
+        return self._data[:, start:end]
+
+    def column(self, name, n=None, closed_only=False):
+        """Last n values of one column (1-D view)"""
+        start, end = self._bounds(n, closed_only)
+        return self._data[_COLUMN_INDEX[name], start:end]
+
+    def closes(self, n=None, closed_only=False):
+        return self.column('close', n, closed_only)
+
+    def last(self, name='close'):
+        if not self.size:
+            return None
+        return float(self._data[_COLUMN_INDEX[name], self._next + self.capacity - 1])
+
+    def frame(self, n=None, closed_only=False):
+        """
+        Last n candles as a DataFrame sharing the buffer's memory
+
+        Only the frame header is allocated; the data is not copied. The
+        frame is a snapshot in time only until the next append: take
+        .copy() to keep it.
+        """
+        view = self.window(n, closed_only)
+        df = pd.DataFrame(view.T, columns=list(COLUMNS), copy=False)
+        df.index = pd.to_datetime(view[0].astype(np.int64), unit='ms')
+        df.index.name = 'timestamp'
+        return df
+
+    def stats(self):
+        return {
+            'symbol': self.symbol,
+            'interval': self.interval,
+            'size': self.size,
+            'capacity': self.capacity,
+            'appended': self.appended,
+            'updated': self.updated,
+            'fetches': self.fetches,
+            'bytes': self._data.nbytes,
+        }
+
+
+if __name__ == "__main__":
+    import time
+    from data.synthetic import SyntheticMarketGenerator
+
+    df = SyntheticMarketGenerator(seed=42).generate(5000, interval='1m')
+    buffer = CandleBuffer('NXPCUSDT', '1m', capacity=1000)
+
+    started = time.perf_counter()
+    for ts, row in zip(df.index.as_unit('ms').asi8, df[['open', 'high', 'low', 'close', 'volume']].values):
+        buffer.append({'open_time': ts, 'open': row[0], 'high': row[1], 'low': row[2],
+                       'close': row[3], 'volume': row[4]})
+    elapsed = time.perf_counter() - started
+    print(f"✅ {len(df)} appends in {elapsed * 1000:.1f}ms ({elapsed / len(df) * 1e6:.1f}µs each)")
+
+    frame = buffer.frame(200)
+    print(f"   frame(200) shares buffer memory: {np.shares_memory(frame['close'].values, buffer._data)}")
+    print(f"   last close {buffer.last():.4f} == source {df['close'].iloc[-1]:.4f}")
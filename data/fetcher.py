@@ -4,9 +4,16 @@ Binance Data Fetcher - Updated for Binance API
 import pandas as pd
 import time
 from datetime import datetime, timedelta
-from binance.client import Client
+from exchange.client import get_client
 from config.api_config import api_config
 
+def utc_ms(value):
+    """Date string / datetime as epoch milliseconds (naive values are UTC)"""
+    ts = pd.Timestamp(value)
+    ts = ts.tz_localize('UTC') if ts.tzinfo is None else ts.tz_convert('UTC')
+    return int(ts.timestamp() * 1000)
+
+
 class DataFetcher:
     """Fetch market data from Binance"""
     
@@ -18,7 +25,7 @@ class DataFetcher:
     def _init_client(self):
         """Initialize Binance client"""
         try:
-            self.client = Client(
+            self.client = get_client(
                 api_key=api_config.API_KEY,
                 api_secret=api_config.API_SECRET,
                 testnet=api_config.is_testnet
@@ -42,13 +49,15 @@ class DataFetcher:
             print(f"❌ Error fetching price for {symbol}: {e}")
             return None
     
-    def fetch_historical_data(self, days_back=30, interval='1h'):
+    def fetch_historical_data(self, days_back=30, interval='1h', start=None, end=None):
         """
         Fetch historical kline/candlestick data
         
         Args:
             days_back: Number of days to fetch
             interval: Kline interval (1m, 5m, 15m, 30m, 1h, 4h, 1d, 1w)
+            start / end: Explicit UTC date range (str or datetime); start
+                         overrides days_back, end defaults to now
         
         Returns:
             pandas.DataFrame with OHLCV data
@@ -57,17 +66,19 @@ class DataFetcher:
             print(f"📥 Fetching {self.symbol} data: {days_back} days, {interval} interval")
             
             # Calculate start time
-            end_time = datetime.now()
-            start_time = end_time - timedelta(days=days_back)
-            
-            # Convert to milliseconds
-            start_ms = int(start_time.timestamp() * 1000)
+            if start is not None:
+                start_ms = utc_ms(start)
+            else:
+                start_time = datetime.now() - timedelta(days=days_back)
+                start_ms = int(start_time.timestamp() * 1000)
+            end_ms = utc_ms(end) if end is not None else None
             
             # Fetch klines
             klines = self.client.get_historical_klines(
                 symbol=self.symbol,
                 interval=interval,
                 start_str=start_ms,
+                end_str=end_ms,
                 limit=1000
             )
             
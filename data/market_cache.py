@@ -0,0 +1,293 @@
+# data/market_cache.py
+"""
+Market data snapshot cache
+
+Shared per-symbol cache in front of the Binance REST client. Every endpoint
+has its own TTL, klines also expire when the candle closes, and concurrent
+callers asking for the same key share one in-flight request (coalescing).
+A bot decision cycle costs at most one round-trip per endpoint.
+
+Usage:
+    client = CachedClient(python_binance.get_client())
+    client.get_symbol_ticker(symbol='NXPCUSDT')   # REST
+    client.get_symbol_ticker(symbol='NXPCUSDT')   # cache hit
+"""
+import threading
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.helpers import interval_to_seconds
+
+# Import settings
+try:
+    from config.settings import settings
+except ImportError:
+    # Fallback
+    class SimpleSettings:
+        MARKET_CACHE_TTL = {
+            'ticker_price': 2.0,
+            'ticker_24h': 10.0,
+            'account': 5.0,
+            'klines': 30.0,
+            'depth': 1.0,
+            'open_orders': 5.0,
+            'exchange_info': 3600.0,
+        }
+    settings = SimpleSettings()
+
+# Smallest klines window fetched; SMA20/RSI14/SMA50 callers share one request
+KLINES_MIN_WINDOW = 100
+
+# Binance request weight per cached endpoint (single symbol)
+REQUEST_WEIGHTS = {
+    'ticker_price': 2,
+    'ticker_24h': 2,
+    'account': 20,
+    'klines': 2,
+    'depth': 5,
+    'open_orders': 6,
+    'exchange_info': 20,
+}
+
+
+class _InFlight:
+    """A request other callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class MarketDataCache:
+    """TTL + request-coalescing cache keyed by (endpoint, args)"""
+
+    def __init__(self, ttls=None, clock=time.monotonic):
+        self.ttls = dict(settings.MARKET_CACHE_TTL, **(ttls or {}))
+        self.clock = clock
+        self._entries = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.weight_used = 0
+        self.weight_saved = 0
+
+    def get(self, endpoint, key, fetch, ttl=None, expires_at=None):
+        """
+        Return the cached value for (endpoint, key) or call fetch() once
+
+        Args:
+            fetch: Zero-arg callable doing the REST call
+            ttl: Override the endpoint TTL (seconds)
+            expires_at: Absolute clock deadline (e.g. candle close)
+        """
+        cache_key = (endpoint, key)
+        weight = REQUEST_WEIGHTS.get(endpoint, 1)
+
+        with self._lock:
+            now = self.clock()
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry[1] > now:
+                self.hits += 1
+                self.weight_saved += weight
+                return entry[0]
+
+            flight = self._inflight.get(cache_key)
+            if flight is None:
+                flight = self._inflight[cache_key] = _InFlight()
+                leader = True
+                self.misses += 1
+                self.weight_used += weight
+            else:
+                leader = False
+                self.coalesced += 1
+                self.weight_saved += weight
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = fetch()
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if flight.error is None:
+                    ttl = self.ttls.get(endpoint, 1.0) if ttl is None else ttl
+                    deadline = self.clock() + ttl
+                    if expires_at is not None:
+                        deadline = min(deadline, expires_at)
+                    self._entries[cache_key] = (flight.value, deadline)
+                del self._inflight[cache_key]
+            flight.done.set()
+
+        return flight.value
+
+    def peek(self, endpoint, key):
+        """Cached value if still fresh, else None (never fetches)"""
+        with self._lock:
+            entry = self._entries.get((endpoint, key))
+            if entry is not None and entry[1] > self.clock():
+                return entry[0]
+        return None
+
+    def record_hit(self, endpoint):
+        """Count a hit served from a peek()ed value"""
+        with self._lock:
+            self.hits += 1
+            self.weight_saved += REQUEST_WEIGHTS.get(endpoint, 1)
+
+    def invalidate(self, endpoint=None, key=None):
+        """Drop entries: all, one endpoint, or one (endpoint, key)"""
+        with self._lock:
+            if endpoint is None:
+                self._entries.clear()
+            elif key is None:
+                for cache_key in [k for k in self._entries if k[0] == endpoint]:
+                    del self._entries[cache_key]
+            else:
+                self._entries.pop((endpoint, key), None)
+
+    def stats(self):
+        requests = self.hits + self.misses + self.coalesced
+        return {
+            'requests': requests,
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'hit_rate': (self.hits + self.coalesced) / requests if requests else 0.0,
+            'weight_used': self.weight_used,
+            'weight_saved': self.weight_saved,
+        }
+
+
+class CachedClient:
+    """
+    Drop-in wrapper around a python-binance Client
+
+    Read endpoints go through a MarketDataCache; order calls pass straight
+    through and invalidate account / open-order snapshots. Anything else is
+    delegated to the wrapped client unchanged.
+    """
+
+    ORDER_METHODS = ('create_order', 'order_market_buy', 'order_market_sell',
+                     'order_limit_buy', 'order_limit_sell', 'order_market',
+                     'order_limit', 'cancel_order')
+
+    def __init__(self, client, cache=None, ttls=None):
+        self.client = client
+        self.cache = cache or MarketDataCache(ttls=ttls)
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if name in self.ORDER_METHODS:
+            def order_call(*args, **kwargs):
+                try:
+                    return attr(*args, **kwargs)
+                finally:
+                    self.cache.invalidate('account')
+                    self.cache.invalidate('open_orders')
+            return order_call
+        return attr
+
+    @property
+    def uncached(self):
+        """The wrapped client, for callers that must see live exchange state"""
+        return self.client
+
+    def get_symbol_ticker(self, **params):
+        if set(params) != {'symbol'}:
+            return self.client.get_symbol_ticker(**params)
+        symbol = params['symbol']
+        return self.cache.get('ticker_price', symbol,
+                              lambda: self.client.get_symbol_ticker(symbol=symbol))
+
+    def get_ticker(self, **params):
+        if set(params) != {'symbol'}:
+            return self.client.get_ticker(**params)
+        symbol = params['symbol']
+        return self.cache.get('ticker_24h', symbol,
+                              lambda: self.client.get_ticker(symbol=symbol))
+
+    def get_account(self, **params):
+        if params:
+            return self.client.get_account(**params)
+        return self.cache.get('account', None, self.client.get_account)
+
+    def get_open_orders(self, **params):
+        if not set(params) <= {'symbol'}:
+            return self.client.get_open_orders(**params)
+        return self.cache.get('open_orders', params.get('symbol'),
+                              lambda: self.client.get_open_orders(**params))
+
+    def get_order_book(self, **params):
+        if not set(params) <= {'symbol', 'limit'}:
+            return self.client.get_order_book(**params)
+        return self.cache.get('depth', (params.get('symbol'), params.get('limit')),
+                              lambda: self.client.get_order_book(**params))
+
+    def get_symbol_info(self, symbol):
+        return self.cache.get('exchange_info', symbol,
+                              lambda: self.client.get_symbol_info(symbol))
+
+    def get_klines(self, **params):
+        if not set(params) <= {'symbol', 'interval', 'limit'}:
+            return self.client.get_klines(**params)
+        return self._latest_klines(params['symbol'], params['interval'], params.get('limit', 500))
+
+    def get_historical_klines(self, symbol, interval, start_str=None, end_str=None,
+                              limit=None, **params):
+        # Only "latest N candles" is cacheable; ranges go straight to REST
+        if start_str is not None or end_str is not None or params or not limit or limit > 1000:
+            return self.client.get_historical_klines(symbol, interval, start_str=start_str,
+                                                     end_str=end_str, limit=limit or 1000, **params)
+        return self._latest_klines(symbol, interval, limit)
+
+    def _latest_klines(self, symbol, interval, limit):
+        """
+        Latest `limit` candles, served from the largest window fetched
+
+        One entry per (symbol, interval): SMA20 and RSI14 on the same
+        timeframe share a single request. The entry expires at candle
+        close at the latest. It holds (requested window, rows): a young
+        symbol returns fewer rows than asked for, and that must not make
+        every call refetch.
+        """
+        key = (symbol, interval)
+        cached = self.cache.peek('klines', key)
+        if cached is not None and cached[0] >= limit:
+            self.cache.record_hit('klines')
+            return cached[1][-limit:]
+
+        if cached is not None:
+            # Wider window needed: refetch and replace
+            self.cache.invalidate('klines', key)
+
+        window = max(limit, KLINES_MIN_WINDOW)
+        interval_ms = interval_to_seconds(interval) * 1000
+
+        def fetch():
+            return window, self.client.get_klines(symbol=symbol, interval=interval, limit=window)
+
+        while True:
+            now_ms = time.time() * 1000
+            until_close = (interval_ms - now_ms % interval_ms) / 1000
+            entry = self.cache.get('klines', key, fetch,
+                                   expires_at=self.cache.clock() + until_close)
+            if entry[0] >= limit:
+                return entry[1][-limit:]
+            # Coalesced onto a narrower request in flight: fetch our own window
+            self.cache.invalidate('klines', key)
+
+    def stats(self):
+        return self.cache.stats()
@@ -0,0 +1,282 @@
+# data/resampler.py
+"""
+Multi-timeframe resampling from one base (1m) feed
+
+Higher timeframes (5m, 15m, 1h, 4h, 1d...) are derived from the 1m candles
+instead of being downloaded and stored separately:
+
+    - batch: resample_ohlcv(df_1m, '4h') over stored history
+    - live:  Resampler folds each 1m candle into every higher timeframe
+             incrementally (O(1) per candle per timeframe); the bar still
+             forming is updated in place, like the exchange does
+
+Buckets are aligned the Binance way: to the epoch for minutes, hours and
+days, to Monday 00:00 UTC for weeks.
+
+Usage:
+    resampler = Resampler('NXPCUSDT', ['5m', '15m', '1h', '4h'])
+    resampler.attach(stream)                  # or .load(df_1m) / .on_candle(c)
+    df_15m = resampler.frame('15m', 200)
+"""
+import os
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.candle_buffer import CandleBuffer
+from utils.helpers import interval_to_seconds
+
+# Import settings
+try:
+    from config.settings import settings
+except ImportError:
+    # Fallback
+    class SimpleSettings:
+        CANDLE_BUFFER_CAPACITY = 1000
+    settings = SimpleSettings()
+
+# Binance weeks start on Monday; 1970-01-01 was a Thursday
+WEEK_ORIGIN_MS = 4 * 86_400_000
+
+OHLCV_AGG = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+
+
+def interval_ms(interval):
+    if interval.endswith('M'):
+        raise ValueError("Monthly bars have no fixed length; resample to '1w' or '1d' instead")
+    return interval_to_seconds(interval) * 1000
+
+
+def bucket_start(open_time, interval):
+    """Open time (ms) of the `interval` bar containing open_time"""
+    step = interval_ms(interval)
+    origin = WEEK_ORIGIN_MS if interval.endswith('w') else 0
+    return open_time - (open_time - origin) % step
+
+
+def resample_ohlcv(df, interval, base_interval='1m', include_partial=False):
+    """
+    Resample an OHLCV DataFrame (DatetimeIndex) to a higher timeframe
+
+    Works with lower-case (open..volume) and capitalised (Open..Volume)
+    columns, as returned by the backtest data and DataFetcher respectively.
+
+    Args:
+        include_partial: Keep the last bar even if the data ends mid-bar
+    """
+    step = pd.Timedelta(milliseconds=interval_ms(interval))
+    base_step = pd.Timedelta(milliseconds=interval_ms(base_interval))
+    if step < base_step or step % base_step:
+        raise ValueError(f"Cannot build {interval} bars from {base_interval} candles")
+
+    columns = {c.lower(): c for c in df.columns if c.lower() in OHLCV_AGG}
+    agg = {columns[name]: how for name, how in OHLCV_AGG.items() if name in columns}
+    origin = pd.Timestamp(WEEK_ORIGIN_MS, unit='ms', tz=df.index.tz) if interval.endswith('w') \
+        else 'epoch'
+
+    bars = df.resample(step, origin=origin, label='left', closed='left').agg(agg)
+    bars = bars.dropna(subset=[columns['close']]) if 'close' in columns else bars.dropna(how='all')
+
+    if not include_partial and len(bars) and df.index[-1] + base_step < bars.index[-1] + step:
+        bars = bars.iloc[:-1]
+    return bars
+
+
+class Resampler:
+    """Higher-timeframe candle buffers maintained from base candles"""
+
+    def __init__(self, symbol, intervals, base_interval='1m', capacity=None, base_capacity=None):
+        """
+        Args:
+            intervals: Higher timeframes to maintain, e.g. ['5m', '15m', '1h', '4h']
+            capacity: Candles kept per higher timeframe
+            base_capacity: Base candles kept (default: enough for the largest bar)
+        """
+        self.symbol = symbol.upper()
+        self.base_interval = base_interval
+        self.base_ms = interval_ms(base_interval)
+        self.capacity = capacity or settings.CANDLE_BUFFER_CAPACITY
+
+        self.intervals = sorted(set(intervals) - {base_interval}, key=interval_ms)
+        for interval in self.intervals:
+            if interval_ms(interval) % self.base_ms:
+                raise ValueError(f"{interval} is not a multiple of {base_interval}")
+
+        largest = max((interval_ms(i) // self.base_ms for i in self.intervals), default=1)
+        self.base = CandleBuffer(symbol, base_interval, base_capacity or max(self.capacity, largest))
+        self.buffers = {i: CandleBuffer(symbol, i, self.capacity) for i in self.intervals}
+
+        # Per timeframe: the forming bar built from closed base candles [open_time, o, h, l, c, v]
+        self._partial = {i: None for i in self.intervals}
+        self._lock = threading.Lock()
+        self._subscription = None
+        self._stream = None
+        self.base_candles = 0
+
+    # ==================== LIVE ====================
+
+    def on_candle(self, candle):
+        """
+        Fold one base candle (closed or intrabar update) into every timeframe
+
+        Returns:
+            Timeframes whose bar closed with this candle
+        """
+        with self._lock:
+            if not self.base.append(candle):
+                return []
+            self.base_candles += 1
+            closed = candle.get('closed', True)
+            open_time = candle['open_time']
+            finished = []
+
+            for interval in self.intervals:
+                start = bucket_start(open_time, interval)
+                partial = self._partial[interval]
+                if partial is not None and partial[0] != start:
+                    partial = None   # a gap in the base feed ended the old bar
+
+                # Bar so far = closed base candles + this one (possibly still forming)
+                if partial is None:
+                    bar = [start, candle['open'], candle['high'], candle['low'],
+                           candle['close'], candle['volume']]
+                else:
+                    bar = [start, partial[1], max(partial[2], candle['high']),
+                           min(partial[3], candle['low']), candle['close'],
+                           partial[5] + candle['volume']]
+
+                bar_closed = closed and open_time + self.base_ms >= start + interval_ms(interval)
+                self.buffers[interval].append({
+                    'open_time': start, 'open': bar[1], 'high': bar[2], 'low': bar[3],
+                    'close': bar[4], 'volume': bar[5], 'closed': bar_closed,
+                })
+
+                if bar_closed:
+                    self._partial[interval] = None
+                    finished.append(interval)
+                elif closed:
+                    self._partial[interval] = bar
+            return finished
+
+    def attach(self, stream, history=0):
+        """
+        Follow the base interval on a MarketStream (one subscription for all timeframes)
+
+        Args:
+            history: Base candles preloaded over REST (default: the base capacity)
+        """
+        self.detach()
+        history = history or self.base.capacity
+        self._subscription = stream.subscribe_klines(self.symbol, self.base_interval,
+                                                     closed_only=False, history=history,
+                                                     maxsize=max(history, 1))
+        for candle in self._subscription.drain():
+            self.on_candle(candle)
+        self._subscription.add_listener(self.on_candle)
+        self._stream = stream
+        return self
+
+    def detach(self):
+        if self._subscription is not None:
+            self._stream.unsubscribe(self._subscription)
+            self._subscription = None
+
+    def update(self, client):
+        """Poll the base interval with one small kline request (no stream)"""
+        last = self.base.last_open_time
+        if last is None:
+            rows = client.get_klines(symbol=self.symbol, interval=self.base_interval,
+                                     limit=min(self.base.capacity, 1000))
+        else:
+            rows = client.get_klines(symbol=self.symbol, interval=self.base_interval,
+                                     startTime=int(last), limit=1000)
+        for i, row in enumerate(rows):
+            self.on_candle({'open_time': int(row[0]), 'open': float(row[1]),
+                            'high': float(row[2]), 'low': float(row[3]),
+                            'close': float(row[4]), 'volume': float(row[5]),
+                            'closed': i < len(rows) - 1})
+        return len(rows)
+
+    # ==================== BATCH ====================
+
+    def load(self, df):
+        """Replay stored base candles (DatetimeIndex OHLCV DataFrame), vectorised"""
+        columns = {c.lower(): c for c in df.columns}
+        times = df.index.as_unit('ms').asi8
+        values = {name: df[columns[name]].to_numpy(dtype=np.float64) for name in OHLCV_AGG}
+
+        # Only the tail fits the buffers; older candles would be overwritten anyway
+        for interval in self.intervals:
+            bars = resample_ohlcv(df, interval, self.base_interval, include_partial=True)
+            tail = bars.iloc[-self.capacity:]
+            bar_times = tail.index.as_unit('ms').asi8
+            buffer = self.buffers[interval]
+            for t, row in zip(bar_times, tail[[columns[n] for n in OHLCV_AGG]].to_numpy()):
+                buffer.append({'open_time': int(t), 'open': row[0], 'high': row[1],
+                               'low': row[2], 'close': row[3], 'volume': row[4]})
+
+            # The last bar may still be forming: keep it as the partial
+            last_start = int(bar_times[-1]) if len(bar_times) else None
+            complete = last_start is not None and \
+                times[-1] + self.base_ms >= last_start + interval_ms(interval)
+            buffer.last_closed = complete
+            self._partial[interval] = None if complete else [
+                last_start, *tail.iloc[-1][[columns[n] for n in OHLCV_AGG]].tolist()]
+
+        start = max(0, len(df) - self.base.capacity)
+        for i in range(start, len(df)):
+            self.base.append({'open_time': int(times[i]), 'open': values['open'][i],
+                              'high': values['high'][i], 'low': values['low'][i],
+                              'close': values['close'][i], 'volume': values['volume'][i]})
+        self.base_candles += len(df)
+        return self
+
+    # ==================== READING ====================
+
+    def buffer(self, interval):
+        return self.base if interval == self.base_interval else self.buffers[interval]
+
+    def frame(self, interval, n=None, closed_only=False):
+        """Last n bars of a timeframe as a DataFrame (zero-copy, see CandleBuffer.frame)"""
+        return self.buffer(interval).frame(n, closed_only)
+
+    def closes(self, interval, n=None, closed_only=False):
+        return self.buffer(interval).closes(n, closed_only)
+
+    def stats(self):
+        return {
+            'symbol': self.symbol,
+            'base_candles': self.base_candles,
+            'bars': {i: len(b) for i, b in [(self.base_interval, self.base), *self.buffers.items()]},
+            'bytes': self.base._data.nbytes + sum(b._data.nbytes for b in self.buffers.values()),
+        }
+
+
+if __name__ == "__main__":
+    import time
+    from data.synthetic import SyntheticMarketGenerator
+
+    df = SyntheticMarketGenerator(seed=42).generate(20_000, interval='1m')
+    intervals = ['5m', '15m', '1h', '4h']
+
+    started = time.perf_counter()
+    batch = {i: resample_ohlcv(df, i) for i in intervals}
+    print(f"✅ Batch: {len(df)} 1m candles -> {', '.join(f'{len(b)} {i}' for i, b in batch.items())} "
+          f"in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    resampler = Resampler('NXPCUSDT', intervals, capacity=500)
+    times = df.index.as_unit('ms').asi8
+    rows = df[['open', 'high', 'low', 'close', 'volume']].to_numpy()
+    started = time.perf_counter()
+    for t, row in zip(times, rows):
+        resampler.on_candle({'open_time': int(t), 'open': row[0], 'high': row[1], 'low': row[2],
+                             'close': row[3], 'volume': row[4]})
+    elapsed = time.perf_counter() - started
+    print(f"✅ Live: {elapsed / len(df) * 1e6:.1f}µs per 1m candle for {len(intervals)} timeframes")
+
+    live = resampler.frame('4h', closed_only=True)
+    print(f"   4h live == batch: {np.allclose(live['close'].values, batch['4h']['close'].values[-len(live):])}")
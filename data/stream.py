@@ -0,0 +1,493 @@
+# data/stream.py
+"""
+Streaming market data (Binance WebSocket)
+
+One multiplexed stream connection per process carries every kline and
+ticker subscription. The connection reconnects with exponential backoff,
+and candles missed while disconnected are backfilled over REST, so
+subscribers see a gap-free sequence of closed candles.
+
+Consumers read from in-process queues (Subscription) or poll the latest
+ticker; nothing polls REST on a timer.
+
+Usage:
+    stream = MarketStream.shared()
+    candles = stream.subscribe_klines('NXPCUSDT', '1m')
+    ticker = stream.subscribe_ticker('NXPCUSDT')
+    stream.start()
+    candle = candles.get(timeout=60)
+    price = stream.latest_price('NXPCUSDT')
+"""
+import asyncio
+import json
+import queue
+import random
+import threading
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.helpers import interval_to_seconds
+
+try:
+    from websockets.exceptions import ConnectionClosed
+    try:
+        from websockets.asyncio.client import connect as ws_connect
+    except ImportError:  # websockets < 13
+        from websockets import connect as ws_connect
+except ImportError:
+    ws_connect = None
+    ConnectionClosed = Exception
+
+# Import settings
+try:
+    from config.settings import settings
+except ImportError:
+    # Fallback
+    class SimpleSettings:
+        STREAM_QUEUE_SIZE = 1000
+        STREAM_RECONNECT_DELAY = 1.0
+        STREAM_MAX_RECONNECT_DELAY = 60.0
+        STREAM_STALE_TIMEOUT = 30.0
+        STREAM_BACKFILL_LIMIT = 1000
+    settings = SimpleSettings()
+
+
+def parse_kline(symbol, interval, row, closed=True):
+    """REST kline row -> candle dict"""
+    return {
+        'symbol': symbol,
+        'interval': interval,
+        'open_time': int(row[0]),
+        'close_time': int(row[6]),
+        'open': float(row[1]),
+        'high': float(row[2]),
+        'low': float(row[3]),
+        'close': float(row[4]),
+        'volume': float(row[5]),
+        'closed': closed,
+    }
+
+
+def parse_kline_event(data):
+    """Stream kline payload -> candle dict"""
+    k = data['k']
+    return {
+        'symbol': k['s'],
+        'interval': k['i'],
+        'open_time': int(k['t']),
+        'close_time': int(k['T']),
+        'open': float(k['o']),
+        'high': float(k['h']),
+        'low': float(k['l']),
+        'close': float(k['c']),
+        'volume': float(k['v']),
+        'closed': bool(k['x']),
+    }
+
+
+def parse_ticker_event(data):
+    """Stream 24hrTicker payload -> ticker dict"""
+    return {
+        'symbol': data['s'],
+        'price': float(data['c']),
+        'change_pct': float(data['P']),
+        'open': float(data['o']),
+        'high': float(data['h']),
+        'low': float(data['l']),
+        'volume': float(data['v']),
+        'quote_volume': float(data['q']),
+        'event_time': int(data['E']),
+    }
+
+
+class Subscription:
+    """Bounded in-process queue fed by the stream thread"""
+
+    def __init__(self, stream_name, maxsize=None, closed_only=True):
+        self.stream_name = stream_name
+        self.closed_only = closed_only
+        self.queue = queue.Queue(maxsize or settings.STREAM_QUEUE_SIZE)
+        self.listeners = []
+        self.dropped = 0
+
+    def put(self, item):
+        # Never block the stream: drop the oldest item instead
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                break
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+        for callback in self.listeners:
+            callback(item)
+
+    def get(self, timeout=None):
+        """Next item (blocks); None on timeout"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def drain(self):
+        """All queued items without blocking"""
+        items = []
+        while True:
+            try:
+                items.append(self.queue.get_nowait())
+            except queue.Empty:
+                return items
+
+    def add_listener(self, callback):
+        """Call callback(item) on the stream thread for every item"""
+        self.listeners.append(callback)
+
+
+class MarketStream:
+    """Multiplexed kline/ticker stream with reconnect and REST backfill"""
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, ws_url=None, client=None, reconnect_delay=None,
+                 max_reconnect_delay=None, stale_timeout=None):
+        self._ws_url = ws_url
+        self._client = client
+        self.reconnect_delay = reconnect_delay or settings.STREAM_RECONNECT_DELAY
+        self.max_reconnect_delay = max_reconnect_delay or settings.STREAM_MAX_RECONNECT_DELAY
+        self.stale_timeout = stale_timeout or settings.STREAM_STALE_TIMEOUT
+
+        self.subscriptions = {}       # stream name -> [Subscription]
+        self.tickers = {}             # symbol -> latest ticker dict
+        self.candles = {}             # (symbol, interval) -> latest candle dict
+        self._last_closed = {}        # (symbol, interval) -> last closed open_time
+
+        self._lock = threading.Lock()
+        self._loop = None
+        self._ws = None
+        self._thread = None
+        self._stopping = False
+        self.connected = threading.Event()
+
+        self.messages = 0
+        self.reconnects = 0
+        self.backfilled = 0
+        self.last_message = None
+
+    @classmethod
+    def shared(cls, **kwargs):
+        """Process-wide stream (one connection for every consumer)"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(**kwargs)
+            return cls._shared
+
+    @property
+    def ws_url(self):
+        if self._ws_url is None:
+            from config.api_config import api_config
+            self._ws_url = api_config.stream_url
+        return self._ws_url.rstrip('/')
+
+    @property
+    def client(self):
+        """REST client for backfill (created on first use)"""
+        if self._client is None:
+            from config.api_config import api_config
+            from exchange.client import get_client
+            self._client = get_client(api_config.API_KEY, api_config.API_SECRET,
+                                      testnet=api_config.is_testnet)
+        return self._client
+
+    # ==================== SUBSCRIPTIONS ====================
+
+    def _subscribe(self, stream_name, subscription):
+        with self._lock:
+            is_new = stream_name not in self.subscriptions
+            self.subscriptions.setdefault(stream_name, []).append(subscription)
+            # Not connected yet: run() subscribes everything once the socket is up
+            is_new = is_new and self._ws is not None
+
+        if is_new and self._loop is not None:
+            asyncio.run_coroutine_threadsafe(
+                self._send({'method': 'SUBSCRIBE', 'params': [stream_name],
+                            'id': int(time.time() * 1000)}), self._loop)
+        return subscription
+
+    def subscribe_klines(self, symbol, interval='1m', closed_only=True, history=0, maxsize=None):
+        """
+        Candle queue for symbol/interval
+
+        Args:
+            closed_only: Only emit closed candles (else intrabar updates too)
+            history: Closed candles to preload from REST before live data
+        """
+        stream_name = f"{symbol.lower()}@kline_{interval}"
+        subscription = Subscription(stream_name, maxsize, closed_only)
+
+        if history:
+            rows = self.client.get_klines(symbol=symbol, interval=interval,
+                                          limit=min(history + 1, settings.STREAM_BACKFILL_LIMIT))
+            # Last REST row is the candle still in progress
+            for row in rows[:-1]:
+                subscription.put(parse_kline(symbol, interval, row))
+            if len(rows) > 1:
+                key = (symbol.upper(), interval)
+                self._last_closed[key] = max(self._last_closed.get(key, 0), int(rows[-2][0]))
+
+        return self._subscribe(stream_name, subscription)
+
+    def subscribe_ticker(self, symbol, maxsize=None):
+        """24h ticker queue for symbol"""
+        stream_name = f"{symbol.lower()}@ticker"
+        return self._subscribe(stream_name, Subscription(stream_name, maxsize, closed_only=False))
+
+    def unsubscribe(self, subscription):
+        """Detach a subscription; the stream is dropped when unused"""
+        with self._lock:
+            subs = self.subscriptions.get(subscription.stream_name, [])
+            if subscription in subs:
+                subs.remove(subscription)
+            is_last = not subs and subscription.stream_name in self.subscriptions
+            if is_last:
+                del self.subscriptions[subscription.stream_name]
+            is_last = is_last and self._ws is not None
+
+        if is_last and self._loop is not None:
+            asyncio.run_coroutine_threadsafe(
+                self._send({'method': 'UNSUBSCRIBE', 'params': [subscription.stream_name],
+                            'id': int(time.time() * 1000)}), self._loop)
+
+    def latest_ticker(self, symbol):
+        return self.tickers.get(symbol.upper())
+
+    def latest_price(self, symbol, max_age=None):
+        """
+        Last streamed price, or None before the first tick
+
+        Args:
+            max_age: Also None if the last tick is older than this (seconds)
+        """
+        ticker = self.tickers.get(symbol.upper())
+        if ticker is None:
+            return None
+        if max_age is not None and time.monotonic() - ticker['received'] > max_age:
+            return None
+        return ticker['price']
+
+    def wait_for_price(self, symbol, timeout=10):
+        """Block until the first tick for symbol arrives"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            price = self.latest_price(symbol)
+            if price is not None:
+                return price
+            time.sleep(0.05)
+        return None
+
+    # ==================== DISPATCH ====================
+
+    def _publish(self, stream_name, item, closed=True):
+        # Copy: subscribe / unsubscribe run on other threads
+        with self._lock:
+            subscriptions = list(self.subscriptions.get(stream_name, ()))
+        for subscription in subscriptions:
+            if closed or not subscription.closed_only:
+                subscription.put(item)
+
+    def _backfill(self, symbol, interval, until_open_time=None):
+        """Emit closed candles missed since the last one seen"""
+        key = (symbol, interval)
+        last = self._last_closed.get(key)
+        if last is None:
+            return
+
+        step_ms = interval_to_seconds(interval) * 1000
+        stream_name = f"{symbol.lower()}@kline_{interval}"
+        start = last + step_ms
+
+        while until_open_time is None or start < until_open_time:
+            params = {'symbol': symbol, 'interval': interval, 'startTime': start,
+                      'limit': settings.STREAM_BACKFILL_LIMIT}
+            if until_open_time is not None:
+                params['endTime'] = until_open_time - 1
+            rows = self.client.get_klines(**params)
+            if until_open_time is None and rows:
+                rows = rows[:-1]   # drop the in-progress candle
+            if not rows:
+                break
+
+            for row in rows:
+                self._publish(stream_name, parse_kline(symbol, interval, row))
+                self._last_closed[key] = int(row[0])
+                self.backfilled += 1
+
+            if len(rows) < settings.STREAM_BACKFILL_LIMIT - 1:
+                break
+            start = self._last_closed[key] + step_ms
+
+    async def _handle(self, message):
+        payload = json.loads(message)
+        if 'result' in payload and 'id' in payload:
+            return   # SUBSCRIBE ack
+
+        stream_name = payload.get('stream')
+        data = payload.get('data', payload)
+        event = data.get('e')
+
+        self.messages += 1
+        self.last_message = time.monotonic()
+
+        if event == 'kline':
+            candle = parse_kline_event(data)
+            key = (candle['symbol'], candle['interval'])
+            stream_name = stream_name or f"{candle['symbol'].lower()}@kline_{candle['interval']}"
+            self.candles[key] = candle
+
+            if candle['closed']:
+                last = self._last_closed.get(key)
+                if last is not None and candle['open_time'] <= last:
+                    return   # already delivered (backfill / duplicate)
+                step_ms = interval_to_seconds(candle['interval']) * 1000
+                if last is not None and candle['open_time'] > last + step_ms:
+                    # Blocking REST: off the event loop, like the reconnect backfill
+                    await self._loop.run_in_executor(None, self._backfill, candle['symbol'],
+                                                     candle['interval'], candle['open_time'])
+                self._last_closed[key] = candle['open_time']
+
+            self._publish(stream_name, candle, closed=candle['closed'])
+
+        elif event in ('24hrTicker', '24hrMiniTicker'):
+            ticker = parse_ticker_event(data) if event == '24hrTicker' else {
+                'symbol': data['s'], 'price': float(data['c']), 'event_time': int(data['E'])}
+            ticker['received'] = self.last_message
+            self.tickers[ticker['symbol']] = ticker
+            self._publish(stream_name or f"{ticker['symbol'].lower()}@ticker", ticker)
+
+    # ==================== CONNECTION ====================
+
+    async def _send(self, message):
+        if self._ws is not None:
+            await self._ws.send(json.dumps(message))
+
+    def _url(self, names):
+        return f"{self.ws_url}/stream?streams={'/'.join(names)}"
+
+    async def run(self):
+        """Connect, consume and reconnect until stop() (coroutine)"""
+        if ws_connect is None:
+            raise ImportError("websockets is required for MarketStream (pip install websockets)")
+
+        self._loop = asyncio.get_running_loop()
+        delay = self.reconnect_delay
+
+        while not self._stopping:
+            try:
+                with self._lock:
+                    in_url = sorted(self.subscriptions)
+                async with ws_connect(self._url(in_url)) as ws:
+                    # Streams added or dropped while connecting missed their
+                    # (UN)SUBSCRIBE: _ws was not set yet
+                    with self._lock:
+                        self._ws = ws
+                        current = sorted(self.subscriptions)
+                        dropped = sorted(set(in_url) - set(current))
+                    request_id = int(time.time() * 1000)
+                    if current:
+                        await self._send({'method': 'SUBSCRIBE', 'params': current,
+                                          'id': request_id})
+                    if dropped:
+                        await self._send({'method': 'UNSUBSCRIBE', 'params': dropped,
+                                          'id': request_id + 1})
+                    self.connected.set()
+                    delay = self.reconnect_delay
+
+                    # Catch up on candles closed while we were away
+                    for symbol, interval in list(self._last_closed):
+                        await self._loop.run_in_executor(None, self._backfill, symbol, interval)
+
+                    while not self._stopping:
+                        message = await asyncio.wait_for(ws.recv(), timeout=self.stale_timeout)
+                        await self._handle(message)
+
+            except (ConnectionClosed, asyncio.TimeoutError, OSError) as e:
+                if self._stopping:
+                    break
+                print(f"⚠️  Market stream disconnected ({type(e).__name__}), "
+                      f"reconnecting in {delay:.1f}s")
+            except Exception as e:
+                if self._stopping:
+                    break
+                print(f"❌ Market stream error: {e}")
+            finally:
+                self._ws = None
+                self.connected.clear()
+
+            if self._stopping:
+                break
+            self.reconnects += 1
+            await asyncio.sleep(delay * (1 + random.random() * 0.1))
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def start(self, wait=True, timeout=10):
+        """Run the stream on a background thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        if ws_connect is None:
+            # Fail here, not on the stream thread where nobody sees it
+            raise ImportError("websockets is required for MarketStream (pip install websockets)")
+
+        self._stopping = False
+        self._thread = threading.Thread(target=lambda: asyncio.run(self.run()),
+                                        name='market-stream', daemon=True)
+        self._thread.start()
+
+        if wait and not self.connected.wait(timeout):
+            print(f"⚠️  Market stream not connected after {timeout}s (will keep retrying)")
+        return self
+
+    def stop(self):
+        self._stopping = True
+        if self._ws is not None and self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._ws.close(), self._loop)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self):
+        return {
+            'connected': self.connected.is_set(),
+            'streams': sorted(self.subscriptions),
+            'messages': self.messages,
+            'reconnects': self.reconnects,
+            'backfilled': self.backfilled,
+            'dropped': sum(s.dropped for subs in self.subscriptions.values() for s in subs),
+            'last_message_age': time.monotonic() - self.last_message if self.last_message else None,
+        }
+
+
+if __name__ == "__main__":
+    stream = MarketStream()
+    candles = stream.subscribe_klines('NXPCUSDT', '1m')
+    stream.subscribe_ticker('NXPCUSDT')
+    stream.start()
+
+    print(f"📡 Streaming NXPCUSDT from {stream.ws_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            candle = candles.get(timeout=1)
+            if candle:
+                print(f"🕯️  {candle['open_time']} close={candle['close']:.4f} vol={candle['volume']:.0f}")
+            price = stream.latest_price('NXPCUSDT')
+            if price:
+                print(f"   💰 {price:.4f}", end='\r')
+    except KeyboardInterrupt:
+        stream.stop()
+        print(f"\n🛑 Stream stopped: {stream.stats()}")
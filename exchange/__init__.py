@@ -0,0 +1,3 @@
+from .client import ClientRegistry, create_client, fake_exchange_url, get_client, registry
+
+__all__ = ['ClientRegistry', 'create_client', 'fake_exchange_url', 'get_client', 'registry']
@@ -0,0 +1,202 @@
+# exchange/client.py
+"""
+Binance client factory
+
+Every component should get its client from here so the whole stack can be
+pointed at the local fake exchange (exchange/fake_server.py) by setting
+FAKE_EXCHANGE_URL, without code changes.
+
+    get_client()      shared, pooled client (use this)
+    create_client()   new, unshared client
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from binance.client import Client
+from requests.adapters import HTTPAdapter
+
+# Import settings
+try:
+    from config.settings import settings
+except ImportError:
+    # Fallback
+    class SimpleSettings:
+        CLIENT_POOL_SIZE = 10
+        CLIENT_SYNC_TIME = True
+    settings = SimpleSettings()
+
+
+def fake_exchange_url():
+    """Local fake exchange REST URL from the environment ('' = real Binance)"""
+    return os.getenv('FAKE_EXCHANGE_URL', '').rstrip('/')
+
+
+def _local_client_class(base_url):
+    """Client subclass whose spot endpoints point at base_url"""
+    api_url = f"{base_url.rstrip('/')}/api"
+    return type('LocalClient', (Client,), {'API_URL': api_url, 'API_TESTNET_URL': api_url})
+
+
+def create_client(api_key=None, api_secret=None, testnet=True, base_url=None, **kwargs):
+    """
+    Create a python-binance Client
+
+    Args:
+        testnet: Use the Binance spot testnet (ignored for a local exchange)
+        base_url: Explicit REST root, e.g. 'http://127.0.0.1:8765';
+                  defaults to FAKE_EXCHANGE_URL
+    """
+    base_url = base_url if base_url is not None else fake_exchange_url()
+
+    if base_url:
+        client = _local_client_class(base_url)(api_key or 'fake', api_secret or 'fake', **kwargs)
+        client.testnet = True
+        client.local = True
+        return client
+
+    client = Client(api_key, api_secret, testnet=testnet, **kwargs)
+    client.testnet = testnet
+    client.local = False
+    return client
+
+
+class ClientRegistry:
+    """
+    Process-wide pool of warm clients
+
+    One client per (exchange, testnet, api key): every get() after the
+    first reuses the same requests session, so its keep-alive connections
+    (TLS already negotiated) and its server-time offset are shared by all
+    bots, dashboards and fetchers in the process.
+    """
+
+    def __init__(self, pool_size=None, sync_time=None):
+        self.pool_size = pool_size or settings.CLIENT_POOL_SIZE
+        self.sync_time = settings.CLIENT_SYNC_TIME if sync_time is None else sync_time
+        self._clients = {}
+        self._offsets = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+        self.created = 0
+        self.reused = 0
+        self.time_syncs = 0
+
+    def get(self, api_key=None, api_secret=None, testnet=True, base_url=None, **kwargs):
+        """Shared client for these credentials (created and warmed on first use)"""
+        base_url = base_url if base_url is not None else fake_exchange_url()
+        key = (base_url or 'binance', bool(testnet) or bool(base_url), api_key)
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self.reused += 1
+                return client
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Per-key lock: two threads asking for a new client build it once
+        with key_lock:
+            client = self._clients.get(key)
+            if client is not None:
+                with self._lock:
+                    self.reused += 1
+                return client
+
+            kwargs.setdefault('ping', False)
+            client = create_client(api_key, api_secret, testnet=testnet, base_url=base_url, **kwargs)
+            self._mount_pool(client)
+            self._apply_time_offset(client, key[:2])
+
+            with self._lock:
+                self._clients[key] = client
+                self.created += 1
+            return client
+
+    def _mount_pool(self, client):
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+        client.session.mount('https://', adapter)
+        client.session.mount('http://', adapter)
+
+    def _apply_time_offset(self, client, exchange_key):
+        """
+        Server-time offset, measured once per exchange
+
+        The /time request also opens (and keeps) the first connection, so
+        the client is warm when the first real call is made.
+        """
+        if not self.sync_time:
+            return
+
+        offset = self._offsets.get(exchange_key)
+        if offset is None:
+            try:
+                offset = self.measure_offset(client)
+            except Exception as e:
+                print(f"⚠️  Server time sync failed: {e}")
+                return
+            self._offsets[exchange_key] = offset
+            self.time_syncs += 1
+        client.timestamp_offset = offset
+
+    @staticmethod
+    def measure_offset(client):
+        """Server clock minus local clock (ms), corrected for half the round trip"""
+        sent = time.time() * 1000
+        server_time = client.get_server_time()['serverTime']
+        received = time.time() * 1000
+        return int(server_time - (sent + received) / 2)
+
+    def resync_time(self):
+        """Re-measure offsets (e.g. after a -1021 timestamp error)"""
+        with self._lock:
+            self._offsets.clear()
+            clients = list(self._clients.items())
+        for key, client in clients:
+            self._apply_time_offset(client, key[:2])
+
+    def close(self):
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), {}
+            self._offsets.clear()
+        for client in clients:
+            client.session.close()
+
+    def stats(self):
+        """Registry and connection-pool reuse metrics"""
+        requests_made = connections = 0
+        with self._lock:
+            clients = list(self._clients.values())
+
+        for client in clients:
+            # One adapter is mounted for both schemes: count it once
+            for adapter in {id(a): a for a in client.session.adapters.values()}.values():
+                pools = adapter.poolmanager.pools
+                for pool in [pools[key] for key in pools.keys()]:
+                    requests_made += pool.num_requests
+                    connections += pool.num_connections
+
+        lookups = self.created + self.reused
+        return {
+            'clients': len(clients),
+            'created': self.created,
+            'reused': self.reused,
+            'client_reuse_rate': self.reused / lookups if lookups else 0.0,
+            'requests': requests_made,
+            'connections_opened': connections,
+            'connection_reuse_rate': 1 - connections / requests_made if requests_made else 0.0,
+            'time_syncs': self.time_syncs,
+            'time_offsets_ms': {f"{k[0]}{'/testnet' if k[1] else ''}": v
+                                for k, v in self._offsets.items()},
+        }
+
+
+registry = ClientRegistry()
+
+
+def get_client(api_key=None, api_secret=None, testnet=True, base_url=None, **kwargs):
+    """Shared pooled client from the process-wide registry"""
+    return registry.get(api_key, api_secret, testnet=testnet, base_url=base_url, **kwargs)
@@ -0,0 +1,1005 @@
+# exchange/fake_server.py
+"""
+Local fake Binance exchange (REST + WebSocket)
+
+Serves the spot endpoints our bots use (ping, time, exchangeInfo, ticker,
+klines, depth, trades, account, order, openOrders, userDataStream) and the
+kline / ticker / user-data streams from replayed or synthetic candles, on a
+simulated clock. Latency, errors and stream drops can be injected.
+
+Point the bots at it with:
+    FAKE_EXCHANGE_URL=http://127.0.0.1:8765 FAKE_EXCHANGE_WS_URL=ws://127.0.0.1:8766
+
+Run standalone:
+    python -m exchange.fake_server --symbols NXPCUSDT BTCUSDT --speed 60
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.synthetic import SyntheticMarketGenerator
+from utils.helpers import interval_to_seconds
+
+try:
+    from websockets.exceptions import ConnectionClosed
+    try:
+        from websockets.asyncio.server import serve as ws_serve
+    except ImportError:  # websockets < 13
+        from websockets import serve as ws_serve
+except ImportError:
+    ws_serve = None
+    ConnectionClosed = Exception
+
+DAY_MS = 86_400_000
+QUOTE_ASSETS = ('USDT', 'BUSD', 'USDC', 'FDUSD', 'BTC', 'ETH', 'BNB')
+
+DEFAULT_FILTERS = {
+    'tick_size': 0.0001,
+    'step_size': 0.1,
+    'min_qty': 0.1,
+    'min_notional': 5.0,
+}
+
+# Request weight per endpoint (Binance spot, single symbol)
+ENDPOINT_WEIGHTS = {
+    'ping': 1,
+    'time': 1,
+    'exchangeInfo': 20,
+    'ticker/price': 2,
+    'ticker/24hr': 2,
+    'klines': 2,
+    'depth': 5,
+    'trades': 25,
+    'account': 20,
+    'order': 1,
+    'order/test': 1,
+    'openOrders': 6,
+    'userDataStream': 2,
+}
+
+INJECTED_ERRORS = [
+    (503, -1001, "Internal error; unable to process your request. Please try again."),
+    (429, -1003, "Too many requests; current limit is 1200 request weight per 1 MINUTE."),
+    (504, -1007, "Timeout waiting for response from backend server."),
+]
+
+
+class ApiError(Exception):
+    """Binance-style error: HTTP status + {'code', 'msg'} body"""
+
+    def __init__(self, code, msg, status=400):
+        super().__init__(msg)
+        self.code = code
+        self.msg = msg
+        self.status = status
+
+
+def split_symbol(symbol):
+    """'NXPCUSDT' -> ('NXPC', 'USDT')"""
+    for quote in QUOTE_ASSETS:
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            return symbol[:-len(quote)], quote
+    raise ApiError(-1121, "Invalid symbol.")
+
+
+def fmt(value):
+    return f"{value:.8f}"
+
+
+class FakeMarket:
+    """Candles of one symbol laid out on the exchange clock"""
+
+    def __init__(self, symbol, df, interval, anchor_ms, filters=None):
+        self.symbol = symbol
+        self.base_asset, self.quote_asset = split_symbol(symbol)
+        self.interval = interval
+        self.base_ms = interval_to_seconds(interval) * 1000
+        self.anchor_ms = anchor_ms
+        self.filters = dict(DEFAULT_FILTERS, **(filters or {}))
+
+        cols = {c.lower(): c for c in df.columns}
+        self.open = df[cols['open']].to_numpy(dtype=float)
+        self.high = df[cols['high']].to_numpy(dtype=float)
+        self.low = df[cols['low']].to_numpy(dtype=float)
+        self.close = df[cols['close']].to_numpy(dtype=float)
+        self.volume = df[cols['volume']].to_numpy(dtype=float)
+
+    def cursor(self, now_ms):
+        """Index of the in-progress bar at exchange time now_ms"""
+        idx = (now_ms - self.anchor_ms) // self.base_ms
+        return int(min(max(idx, 0), len(self.close) - 1))
+
+    def last_price(self, now_ms):
+        return self.close[self.cursor(now_ms)]
+
+    def klines(self, interval, now_ms, start_ms=None, end_ms=None, limit=500):
+        """Binance kline rows, aggregating base bars for larger intervals"""
+        step_ms = interval_to_seconds(interval) * 1000
+        if step_ms % self.base_ms:
+            raise ApiError(-1120, "Invalid interval.")
+
+        k = step_ms // self.base_ms
+        cur = self.cursor(now_ms)
+        last_bucket = cur // k
+
+        if end_ms is not None:
+            last_bucket = min(last_bucket, (end_ms - self.anchor_ms) // step_ms)
+
+        if start_ms is not None:
+            first = max(0, -(-(start_ms - self.anchor_ms) // step_ms))
+            last = min(last_bucket, first + limit - 1)
+        else:
+            last = last_bucket
+            first = max(0, last - limit + 1)
+
+        if last < first:
+            return []
+
+        lo, hi = first * k, min(last * k + k - 1, cur)
+        starts = np.arange(0, hi - lo + 1, k)
+        ends = np.minimum(starts + k - 1, hi - lo)
+
+        o = self.open[lo:hi + 1][starts]
+        c = self.close[lo:hi + 1][ends]
+        h = np.maximum.reduceat(self.high[lo:hi + 1], starts)
+        l = np.minimum.reduceat(self.low[lo:hi + 1], starts)
+        v = np.add.reduceat(self.volume[lo:hi + 1], starts)
+
+        rows = []
+        for j, bucket in enumerate(range(first, last + 1)):
+            open_time = self.anchor_ms + bucket * step_ms
+            rows.append([
+                open_time, fmt(o[j]), fmt(h[j]), fmt(l[j]), fmt(c[j]), fmt(v[j]),
+                open_time + step_ms - 1, fmt(v[j] * c[j]), int(k), fmt(v[j] / 2),
+                fmt(v[j] * c[j] / 2), "0"
+            ])
+        return rows
+
+    def ticker_24h(self, now_ms):
+        cur = self.cursor(now_ms)
+        lo = max(0, cur - DAY_MS // self.base_ms + 1)
+        open_price, last = self.open[lo], self.close[cur]
+        volume = self.volume[lo:cur + 1].sum()
+
+        return {
+            'symbol': self.symbol,
+            'priceChange': fmt(last - open_price),
+            'priceChangePercent': f"{(last / open_price - 1) * 100:.3f}",
+            'weightedAvgPrice': fmt(self.close[lo:cur + 1].mean()),
+            'openPrice': fmt(open_price),
+            'highPrice': fmt(self.high[lo:cur + 1].max()),
+            'lowPrice': fmt(self.low[lo:cur + 1].min()),
+            'lastPrice': fmt(last),
+            'volume': fmt(volume),
+            'quoteVolume': fmt(volume * last),
+            'openTime': self.anchor_ms + lo * self.base_ms,
+            'closeTime': now_ms,
+            'count': cur - lo + 1,
+        }
+
+    def depth(self, now_ms, limit=100):
+        """Synthetic book around the last price"""
+        price = self.last_price(now_ms)
+        tick = self.filters['tick_size']
+        levels = np.arange(1, limit + 1)
+        qty = 50.0 + 25.0 * np.sin(levels + self.cursor(now_ms)) ** 2 * levels
+
+        bids = [[fmt(price - tick * i), fmt(q)] for i, q in zip(levels, qty)]
+        asks = [[fmt(price + tick * i), fmt(q)] for i, q in zip(levels, qty)]
+        return {'lastUpdateId': self.cursor(now_ms), 'bids': bids, 'asks': asks}
+
+    def symbol_info(self):
+        f = self.filters
+        return {
+            'symbol': self.symbol,
+            'status': 'TRADING',
+            'baseAsset': self.base_asset,
+            'baseAssetPrecision': 8,
+            'quoteAsset': self.quote_asset,
+            'quotePrecision': 8,
+            'quoteAssetPrecision': 8,
+            'orderTypes': ['LIMIT', 'LIMIT_MAKER', 'MARKET'],
+            'isSpotTradingAllowed': True,
+            'filters': [
+                {'filterType': 'PRICE_FILTER', 'minPrice': fmt(f['tick_size']),
+                 'maxPrice': '1000000.00000000', 'tickSize': fmt(f['tick_size'])},
+                {'filterType': 'LOT_SIZE', 'minQty': fmt(f['min_qty']),
+                 'maxQty': '9000000.00000000', 'stepSize': fmt(f['step_size'])},
+                {'filterType': 'NOTIONAL', 'minNotional': fmt(f['min_notional']),
+                 'applyMinToMarket': True, 'maxNotional': '9000000.00000000',
+                 'applyMaxToMarket': False, 'avgPriceMins': 5},
+            ],
+        }
+
+
+class StreamClient:
+    """One stream connection: subscriptions, outbound queue, kline cursors"""
+
+    def __init__(self, streams, combined):
+        self.streams = set(streams)
+        self.combined = combined
+        self.queue = asyncio.Queue()
+        self.state = {}
+
+
+class FakeBinanceExchange:
+    """
+    In-process fake exchange
+
+    Args:
+        markets: {symbol: OHLCV DataFrame} to replay; generated when omitted
+        symbols: Symbols to generate when markets is None
+        interval: Base candle interval of the data
+        history_bars: Bars already "in the past" when the exchange starts
+        future_bars: Generated bars available ahead of the clock
+        speed: Simulated seconds per wall-clock second
+        latency_ms / jitter_ms: Added to every REST response
+        error_rate: Probability of an injected 5xx/429 per REST request
+        endpoint_error_rates: {'order': 0.2, ...} overrides per endpoint
+        ws_disconnect_rate: Probability per stream tick of dropping a stream
+        balances: {'USDT': 10000.0, ...} starting free balances
+    """
+
+    def __init__(self, markets=None, symbols=('NXPCUSDT',), interval='1m',
+                 history_bars=5000, future_bars=100_000, seed=42, speed=1.0,
+                 latency_ms=0.0, jitter_ms=0.0, error_rate=0.0,
+                 endpoint_error_rates=None, ws_disconnect_rate=0.0,
+                 balances=None, filters=None, commission=0.001,
+                 host='127.0.0.1', port=0, ws_port=0, ws_tick=0.25):
+        self.interval = interval
+        self.speed = speed
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.endpoint_error_rates = endpoint_error_rates or {}
+        self.ws_disconnect_rate = ws_disconnect_rate
+        self.commission = commission
+        self.host = host
+        self.port = port
+        self.ws_port = ws_port
+        self.ws_tick = ws_tick
+        self.rng = random.Random(seed)
+
+        base_ms = interval_to_seconds(interval) * 1000
+        self._start_ms = int(time.time() * 1000) // base_ms * base_ms
+        self._start_wall = time.monotonic()
+        self._offset_ms = 0
+        # Day-aligned anchor keeps 1m..1d buckets aligned like the real exchange
+        anchor_ms = (self._start_ms - history_bars * base_ms) // DAY_MS * DAY_MS
+
+        if markets is None:
+            generator = SyntheticMarketGenerator(seed=seed, interval=interval)
+            markets = generator.generate_multi(list(symbols), history_bars + future_bars + 1440,
+                                               corr=0.5, model='regime')
+
+        self.markets = {
+            symbol: FakeMarket(symbol, df, interval, anchor_ms, filters)
+            for symbol, df in markets.items()
+        }
+
+        self.balances = defaultdict(lambda: {'free': 0.0, 'locked': 0.0})
+        for asset, amount in (balances or {'USDT': 10000.0}).items():
+            self.balances[asset] = {'free': float(amount), 'locked': 0.0}
+
+        self.orders = {}
+        self.open_orders = {}
+        self._order_ids = itertools.count(1)
+        self._trade_ids = itertools.count(1)
+        self.listen_keys = set()
+
+        self._lock = threading.RLock()
+        self._weight_window = deque()
+        self.request_counts = defaultdict(int)
+        self.injected_errors = 0
+        self.total_weight = 0
+
+        self._http = None
+        self._ws_loop = None
+        self._ws_server = None
+        self._ws_clients = set()
+        self._threads = []
+
+    # ==================== CLOCK ====================
+
+    def now_ms(self):
+        """Exchange time (simulated)"""
+        elapsed = (time.monotonic() - self._start_wall) * 1000 * self.speed
+        return int(self._start_ms + elapsed + self._offset_ms)
+
+    def advance(self, bars=1):
+        """Move the clock forward by whole base bars (deterministic tests)"""
+        with self._lock:
+            self._offset_ms += bars * interval_to_seconds(self.interval) * 1000
+
+    def market(self, symbol):
+        try:
+            return self.markets[symbol]
+        except KeyError:
+            raise ApiError(-1121, "Invalid symbol.")
+
+    # ==================== ACCOUNTING ====================
+
+    def _record(self, endpoint):
+        weight = ENDPOINT_WEIGHTS.get(endpoint, 1)
+        now = time.monotonic()
+
+        with self._lock:
+            self.request_counts[endpoint] += 1
+            self.total_weight += weight
+            self._weight_window.append((now, weight))
+            while self._weight_window and now - self._weight_window[0][0] > 60:
+                self._weight_window.popleft()
+            return sum(w for _, w in self._weight_window)
+
+    def stats(self):
+        """Request counts, weight and injected errors so far"""
+        with self._lock:
+            return {
+                'requests': dict(self.request_counts),
+                'total_requests': sum(self.request_counts.values()),
+                'total_weight': self.total_weight,
+                'injected_errors': self.injected_errors,
+                'open_orders': len(self.open_orders),
+            }
+
+    def _account_payload(self):
+        return {
+            'makerCommission': 10,
+            'takerCommission': 10,
+            'canTrade': True,
+            'canWithdraw': True,
+            'canDeposit': True,
+            'updateTime': self.now_ms(),
+            'accountType': 'SPOT',
+            'balances': [
+                {'asset': asset, 'free': fmt(b['free']), 'locked': fmt(b['locked'])}
+                for asset, b in sorted(self.balances.items())
+            ],
+            'permissions': ['SPOT'],
+        }
+
+    # ==================== ORDERS ====================
+
+    def _validate(self, market, qty, price):
+        f = market.filters
+        if qty < f['min_qty'] - 1e-12:
+            raise ApiError(-1013, "Filter failure: LOT_SIZE")
+        steps = qty / f['step_size']
+        if abs(steps - round(steps)) > 1e-6:
+            raise ApiError(-1013, "Filter failure: LOT_SIZE")
+        if price is not None:
+            ticks = price / f['tick_size']
+            if abs(ticks - round(ticks)) > 1e-6:
+                raise ApiError(-1013, "Filter failure: PRICE_FILTER")
+        if qty * (price or market.last_price(self.now_ms())) < f['min_notional'] - 1e-12:
+            raise ApiError(-1013, "Filter failure: NOTIONAL")
+
+    def _fill(self, order, market, price):
+        """Fill an order completely at price and settle balances"""
+        qty = order['qty']
+        quote_qty = qty * price
+        base, quote = self.balances[market.base_asset], self.balances[market.quote_asset]
+
+        if order['side'] == 'BUY':
+            if order['status'] == 'NEW':
+                quote['locked'] -= order['qty'] * order['price']
+                quote['free'] += order['qty'] * order['price'] - quote_qty
+            else:
+                quote['free'] -= quote_qty
+            commission = qty * self.commission
+            base['free'] += qty - commission
+            commission_asset = market.base_asset
+        else:
+            if order['status'] == 'NEW':
+                base['locked'] -= qty
+            else:
+                base['free'] -= qty
+            commission = quote_qty * self.commission
+            quote['free'] += quote_qty - commission
+            commission_asset = market.quote_asset
+
+        order['status'] = 'FILLED'
+        order['executedQty'] = qty
+        order['cummulativeQuoteQty'] = quote_qty
+        order['updateTime'] = self.now_ms()
+        order['fills'] = [{
+            'price': fmt(price),
+            'qty': fmt(qty),
+            'commission': fmt(commission),
+            'commissionAsset': commission_asset,
+            'tradeId': next(self._trade_ids),
+        }]
+        self.open_orders.pop(order['orderId'], None)
+        self._emit_user_event(order, market, last_price=price, commission=commission,
+                              commission_asset=commission_asset)
+
+    def place_order(self, params):
+        symbol = params.get('symbol', '')
+        market = self.market(symbol)
+        side = params.get('side', '').upper()
+        order_type = params.get('type', '').upper()
+
+        if side not in ('BUY', 'SELL'):
+            raise ApiError(-1102, "Mandatory parameter 'side' was not sent, was empty/null, or malformed.")
+        if order_type not in ('MARKET', 'LIMIT', 'LIMIT_MAKER'):
+            raise ApiError(-1116, "Invalid orderType.")
+
+        last = market.last_price(self.now_ms())
+        if 'quoteOrderQty' in params and 'quantity' not in params:
+            step = market.filters['step_size']
+            qty = np.floor(float(params['quoteOrderQty']) / last / step) * step
+        else:
+            qty = float(params.get('quantity', 0))
+        price = float(params['price']) if order_type != 'MARKET' else None
+
+        self._validate(market, qty, price)
+
+        client_order_id = params.get('newClientOrderId') or f"fake_{uuid.uuid4().hex[:16]}"
+        with self._lock:
+            for existing in self.open_orders.values():
+                if existing['clientOrderId'] == client_order_id:
+                    raise ApiError(-2010, "Duplicate order sent.")
+
+            base, quote = self.balances[market.base_asset], self.balances[market.quote_asset]
+            needed = qty * (price or last)
+            if side == 'BUY' and quote['free'] < needed:
+                raise ApiError(-2010, "Account has insufficient balance for requested action.")
+            if side == 'SELL' and base['free'] < qty:
+                raise ApiError(-2010, "Account has insufficient balance for requested action.")
+
+            now = self.now_ms()
+            order = {
+                'symbol': symbol,
+                'orderId': next(self._order_ids),
+                'orderListId': -1,
+                'clientOrderId': client_order_id,
+                'transactTime': now,
+                'price': price or 0.0,
+                'qty': qty,
+                'executedQty': 0.0,
+                'cummulativeQuoteQty': 0.0,
+                'status': 'PENDING',
+                'timeInForce': params.get('timeInForce', 'GTC'),
+                'type': order_type,
+                'side': side,
+                'time': now,
+                'updateTime': now,
+                'fills': [],
+            }
+            self.orders[order['orderId']] = order
+
+            marketable = (order_type == 'MARKET'
+                          or (side == 'BUY' and last <= price)
+                          or (side == 'SELL' and last >= price))
+
+            if marketable and order_type == 'LIMIT_MAKER':
+                order['status'] = 'REJECTED'
+                raise ApiError(-2010, "Order would immediately match and take.")
+
+            if marketable:
+                if order_type == 'MARKET':
+                    fill_price = last
+                else:
+                    fill_price = min(last, price) if side == 'BUY' else max(last, price)
+                self._fill(order, market, fill_price)
+            else:
+                order['status'] = 'NEW'
+                if side == 'BUY':
+                    quote['free'] -= qty * price
+                    quote['locked'] += qty * price
+                else:
+                    base['free'] -= qty
+                    base['locked'] += qty
+                self.open_orders[order['orderId']] = order
+                self._emit_user_event(order, market)
+
+            return self._order_payload(order, full=True)
+
+    def cancel_order(self, params):
+        market = self.market(params.get('symbol', ''))
+        with self._lock:
+            order = self._find_order(params)
+            if order['orderId'] not in self.open_orders:
+                raise ApiError(-2011, "Unknown order sent.")
+
+            if order['side'] == 'BUY':
+                amount = order['qty'] * order['price']
+                self.balances[market.quote_asset]['locked'] -= amount
+                self.balances[market.quote_asset]['free'] += amount
+            else:
+                self.balances[market.base_asset]['locked'] -= order['qty']
+                self.balances[market.base_asset]['free'] += order['qty']
+
+            order['status'] = 'CANCELED'
+            order['updateTime'] = self.now_ms()
+            del self.open_orders[order['orderId']]
+            self._emit_user_event(order, market)
+            return self._order_payload(order)
+
+    def _find_order(self, params):
+        if 'orderId' in params:
+            order = self.orders.get(int(params['orderId']))
+        else:
+            client_id = params.get('origClientOrderId')
+            order = next((o for o in self.orders.values() if o['clientOrderId'] == client_id), None)
+
+        if order is None:
+            raise ApiError(-2013, "Order does not exist.")
+        return order
+
+    def match_open_orders(self):
+        """Fill resting limit orders the price has crossed"""
+        with self._lock:
+            now = self.now_ms()
+            for order in list(self.open_orders.values()):
+                market = self.markets[order['symbol']]
+                last = market.last_price(now)
+                if ((order['side'] == 'BUY' and last <= order['price'])
+                        or (order['side'] == 'SELL' and last >= order['price'])):
+                    self._fill(order, market, order['price'])
+
+    def _order_payload(self, order, full=False):
+        payload = {
+            'symbol': order['symbol'],
+            'orderId': order['orderId'],
+            'orderListId': -1,
+            'clientOrderId': order['clientOrderId'],
+            'transactTime': order['transactTime'],
+            'price': fmt(order['price']),
+            'origQty': fmt(order['qty']),
+            'executedQty': fmt(order['executedQty']),
+            'cummulativeQuoteQty': fmt(order['cummulativeQuoteQty']),
+            'status': order['status'],
+            'timeInForce': order['timeInForce'],
+            'type': order['type'],
+            'side': order['side'],
+            'time': order['time'],
+            'updateTime': order['updateTime'],
+        }
+        if full:
+            payload['fills'] = order['fills']
+        return payload
+
+    # ==================== REST DISPATCH ====================
+
+    def handle(self, method, path, params):
+        """Route one REST call -> (status, payload, used_weight)"""
+        endpoint = path.split('/api/v3/', 1)[-1].strip('/')
+        used_weight = self._record(endpoint)
+
+        delay = self.latency_ms + (self.rng.uniform(-1, 1) * self.jitter_ms if self.jitter_ms else 0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        error_rate = self.endpoint_error_rates.get(endpoint, self.error_rate)
+        if error_rate and self.rng.random() < error_rate:
+            status, code, msg = self.rng.choice(INJECTED_ERRORS)
+            with self._lock:
+                self.injected_errors += 1
+            return status, {'code': code, 'msg': msg}, used_weight
+
+        try:
+            self.match_open_orders()
+            return 200, self._dispatch(method, endpoint, params), used_weight
+        except ApiError as e:
+            return e.status, {'code': e.code, 'msg': e.msg}, used_weight
+        except (KeyError, ValueError) as e:
+            return 400, {'code': -1102, 'msg': f"Invalid parameter: {e}"}, used_weight
+
+    def _dispatch(self, method, endpoint, params):
+        now = self.now_ms()
+
+        if endpoint == 'ping':
+            return {}
+        if endpoint == 'time':
+            return {'serverTime': now}
+        if endpoint == 'exchangeInfo':
+            symbols = [params['symbol']] if 'symbol' in params else list(self.markets)
+            return {
+                'timezone': 'UTC',
+                'serverTime': now,
+                'rateLimits': [{'rateLimitType': 'REQUEST_WEIGHT', 'interval': 'MINUTE',
+                                'intervalNum': 1, 'limit': 6000}],
+                'symbols': [self.market(s).symbol_info() for s in symbols],
+            }
+        if endpoint == 'ticker/price':
+            if 'symbol' not in params:
+                return [{'symbol': s, 'price': fmt(m.last_price(now))} for s, m in self.markets.items()]
+            return {'symbol': params['symbol'], 'price': fmt(self.market(params['symbol']).last_price(now))}
+        if endpoint == 'ticker/24hr':
+            if 'symbol' not in params:
+                return [m.ticker_24h(now) for m in self.markets.values()]
+            return self.market(params['symbol']).ticker_24h(now)
+        if endpoint == 'klines':
+            return self.market(params['symbol']).klines(
+                params['interval'], now,
+                start_ms=int(params['startTime']) if 'startTime' in params else None,
+                end_ms=int(params['endTime']) if 'endTime' in params else None,
+                limit=min(int(params.get('limit', 500)), 1000))
+        if endpoint == 'depth':
+            return self.market(params['symbol']).depth(now, int(params.get('limit', 100)))
+        if endpoint == 'trades':
+            market = self.market(params['symbol'])
+            price = market.last_price(now)
+            return [{'id': i, 'price': fmt(price), 'qty': fmt(1.0 + i % 7), 'quoteQty': fmt(price * (1.0 + i % 7)),
+                     'time': now - i * 1000, 'isBuyerMaker': bool(i % 2), 'isBestMatch': True}
+                    for i in range(int(params.get('limit', 500)))]
+        if endpoint == 'account':
+            with self._lock:
+                return self._account_payload()
+        if endpoint == 'order/test':
+            self._validate(self.market(params['symbol']), float(params.get('quantity', 0)),
+                           float(params['price']) if 'price' in params else None)
+            return {}
+        if endpoint == 'order':
+            if method == 'POST':
+                return self.place_order(params)
+            if method == 'DELETE':
+                return self.cancel_order(params)
+            with self._lock:
+                return self._order_payload(self._find_order(params))
+        if endpoint == 'openOrders':
+            with self._lock:
+                return [self._order_payload(o) for o in self.open_orders.values()
+                        if 'symbol' not in params or o['symbol'] == params['symbol']]
+        if endpoint == 'userDataStream':
+            if method == 'POST':
+                key = uuid.uuid4().hex * 2
+                self.listen_keys.add(key)
+                return {'listenKey': key}
+            if method == 'DELETE':
+                self.listen_keys.discard(params.get('listenKey'))
+            return {}
+
+        raise ApiError(-1100, f"Unknown endpoint: {endpoint}", status=404)
+
+    def _make_handler(self):
+        exchange = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _serve(self, method):
+                url = urlparse(self.path)
+                params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    body = self.rfile.read(length).decode()
+                    params.update({k: v[-1] for k, v in parse_qs(body).items()})
+
+                status, payload, used_weight = exchange.handle(method, url.path, params)
+                data = json.dumps(payload).encode()
+
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.send_header('X-MBX-USED-WEIGHT-1M', str(used_weight))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._serve('GET')
+
+            def do_POST(self):
+                self._serve('POST')
+
+            def do_PUT(self):
+                self._serve('PUT')
+
+            def do_DELETE(self):
+                self._serve('DELETE')
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    # ==================== STREAMS ====================
+
+    def _emit_user_event(self, order, market, last_price=0.0, commission=0.0, commission_asset=None):
+        """Push executionReport + outboundAccountPosition to user-data streams"""
+        if not self._ws_loop or not self._ws_clients:
+            return
+
+        now = self.now_ms()
+        report = {
+            'e': 'executionReport', 'E': now, 's': order['symbol'],
+            'c': order['clientOrderId'], 'S': order['side'], 'o': order['type'],
+            'f': order['timeInForce'], 'q': fmt(order['qty']), 'p': fmt(order['price']),
+            'x': 'TRADE' if order['status'] == 'FILLED' else order['status'],
+            'X': order['status'], 'i': order['orderId'],
+            'l': fmt(order['executedQty'] if order['status'] == 'FILLED' else 0.0),
+            'z': fmt(order['executedQty']), 'L': fmt(last_price),
+            'n': fmt(commission), 'N': commission_asset, 'T': now, 't': -1,
+            'Z': fmt(order['cummulativeQuoteQty']), 'O': order['time'],
+        }
+        position = {
+            'e': 'outboundAccountPosition', 'E': now, 'u': now,
+            'B': [{'a': asset, 'f': fmt(self.balances[asset]['free']),
+                   'l': fmt(self.balances[asset]['locked'])}
+                  for asset in (market.base_asset, market.quote_asset)],
+        }
+        for event in (report, position):
+            self._ws_loop.call_soon_threadsafe(self._broadcast_user, event)
+
+    def _broadcast_user(self, event):
+        for client in list(self._ws_clients):
+            for key in client.streams & self.listen_keys:
+                client.queue.put_nowait((event, key))
+
+    def _mark_subscribed(self, client, streams):
+        """Start kline cursors at subscribe time, not at the first tick"""
+        now = self.now_ms()
+        for stream in streams:
+            name, _, kind = stream.partition('@')
+            market = self.markets.get(name.upper())
+            if market is not None and kind.startswith('kline_'):
+                step_ms = interval_to_seconds(kind[len('kline_'):]) * 1000
+                client.state.setdefault(stream, (now - market.anchor_ms) // step_ms)
+
+    def _stream_events(self, stream, state, now):
+        """Events for one market stream since the last tick"""
+        name, _, kind = stream.partition('@')
+        market = self.markets.get(name.upper())
+        if market is None:
+            return []
+
+        if kind.startswith('kline_'):
+            interval = kind[len('kline_'):]
+            step_ms = interval_to_seconds(interval) * 1000
+            bucket = (now - market.anchor_ms) // step_ms
+            last_bucket = state.get(stream)
+            if last_bucket is None:
+                last_bucket = bucket
+            state[stream] = bucket
+
+            events = []
+            first_closed = max(last_bucket, bucket - 1000)
+            start_ms = market.anchor_ms + first_closed * step_ms
+            for row in market.klines(interval, now, start_ms=start_ms, limit=bucket - first_closed + 1):
+                closed = row[0] < market.anchor_ms + bucket * step_ms
+                events.append({
+                    'e': 'kline', 'E': now, 's': market.symbol,
+                    'k': {'t': row[0], 'T': row[6], 's': market.symbol, 'i': interval,
+                          'o': row[1], 'h': row[2], 'l': row[3], 'c': row[4], 'v': row[5],
+                          'n': row[8], 'x': closed, 'q': row[7], 'V': row[9], 'Q': row[10], 'B': '0'},
+                })
+            return events
+
+        if kind in ('ticker', 'miniTicker'):
+            t = market.ticker_24h(now)
+            return [{'e': '24hrTicker' if kind == 'ticker' else '24hrMiniTicker', 'E': now,
+                     's': market.symbol, 'p': t['priceChange'], 'P': t['priceChangePercent'],
+                     'w': t['weightedAvgPrice'], 'c': t['lastPrice'], 'o': t['openPrice'],
+                     'h': t['highPrice'], 'l': t['lowPrice'], 'v': t['volume'],
+                     'q': t['quoteVolume'], 'O': t['openTime'], 'C': t['closeTime']}]
+
+        return []
+
+    async def _ws_handler(self, connection, path=None):
+        if path is None:
+            request = getattr(connection, 'request', None)
+            path = request.path if request is not None else connection.path
+
+        url = urlparse(path)
+        combined = url.path.startswith('/stream')
+        if combined:
+            streams = set(parse_qs(url.query).get('streams', [''])[0].split('/')) - {''}
+        else:
+            streams = {url.path.split('/ws/', 1)[-1]} - {''}
+
+        client = StreamClient(streams, combined)
+        self._mark_subscribed(client, streams)
+        self._ws_clients.add(client)
+
+        async def reader():
+            async for raw in connection:
+                try:
+                    msg = json.loads(raw)
+                except ValueError:
+                    continue
+                params = set(msg.get('params') or [])
+                if msg.get('method') == 'SUBSCRIBE':
+                    self._mark_subscribed(client, params)
+                    client.streams |= params
+                elif msg.get('method') == 'UNSUBSCRIBE':
+                    client.streams -= params
+                    for stream in params:
+                        client.state.pop(stream, None)
+                result = sorted(client.streams) if msg.get('method') == 'LIST_SUBSCRIPTIONS' else None
+                await connection.send(json.dumps({'result': result, 'id': msg.get('id')}))
+
+        async def writer():
+            while True:
+                event, stream = await client.queue.get()
+                if stream is None:
+                    # Injected drop: close like a server-side disconnect
+                    await connection.close()
+                    return
+                if client.combined:
+                    event = {'stream': stream, 'data': event}
+                await connection.send(json.dumps(event))
+
+        tasks = [asyncio.ensure_future(reader()), asyncio.ensure_future(writer())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            self._ws_clients.discard(client)
+
+    async def _ws_ticker(self):
+        """Push market stream updates every ws_tick seconds"""
+        while True:
+            await asyncio.sleep(self.ws_tick)
+            now = self.now_ms()
+
+            for client in list(self._ws_clients):
+                if self.ws_disconnect_rate and self.rng.random() < self.ws_disconnect_rate:
+                    client.queue.put_nowait(({'e': 'disconnect'}, None))
+                    continue
+                for stream in list(client.streams):
+                    if stream in self.listen_keys:
+                        continue
+                    for event in self._stream_events(stream, client.state, now):
+                        client.queue.put_nowait((event, stream))
+
+    def _run_ws(self, ready):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._ws_loop = loop
+
+        async def start():
+            self._ws_server = await ws_serve(self._ws_entry, self.host, self.ws_port)
+            self.ws_port = list(self._ws_server.sockets)[0].getsockname()[1]
+            loop.create_task(self._ws_ticker())
+            ready.set()
+
+        loop.run_until_complete(start())
+        loop.run_forever()
+        loop.close()
+
+    async def _ws_shutdown(self):
+        self._ws_server.close()
+        current = asyncio.current_task()
+        tasks = [t for t in asyncio.all_tasks() if t is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _ws_entry(self, connection, path=None):
+        try:
+            await self._ws_handler(connection, path)
+        except ConnectionClosed:
+            pass
+
+    # ==================== LIFECYCLE ====================
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def ws_url(self):
+        return f"ws://{self.host}:{self.ws_port}"
+
+    def start(self, websocket=True):
+        """Start REST (and stream) servers in background threads"""
+        self._http = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self._http.daemon_threads = True
+        self.port = self._http.server_address[1]
+
+        http_thread = threading.Thread(target=self._http.serve_forever, daemon=True)
+        http_thread.start()
+        self._threads.append(http_thread)
+
+        if websocket:
+            if ws_serve is None:
+                print("⚠️  websockets not installed - stream server disabled")
+            else:
+                ready = threading.Event()
+                ws_thread = threading.Thread(target=self._run_ws, args=(ready,), daemon=True)
+                ws_thread.start()
+                ready.wait(5)
+                self._threads.append(ws_thread)
+
+        return self
+
+    def stop(self):
+        if self._http:
+            self._http.shutdown()
+            self._http.server_close()
+            self._http = None
+
+        if self._ws_loop:
+            future = asyncio.run_coroutine_threadsafe(self._ws_shutdown(), self._ws_loop)
+            future.result(5)
+            self._ws_loop.call_soon_threadsafe(self._ws_loop.stop)
+            self._ws_loop = None
+
+    def env(self):
+        """Environment variables that point the client factory here"""
+        return {'FAKE_EXCHANGE_URL': self.base_url, 'FAKE_EXCHANGE_WS_URL': self.ws_url}
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def load_replay(path):
+    """Read an OHLCV CSV (timestamp index + open/high/low/close/volume)"""
+    df = pd.read_csv(path, index_col=0, parse_dates=True)
+    df.columns = [c.lower() for c in df.columns]
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local fake Binance exchange")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--ws-port', type=int, default=8766)
+    parser.add_argument('--symbols', nargs='+', default=['NXPCUSDT'])
+    parser.add_argument('--replay', nargs='+', metavar='SYMBOL=CSV', help="Replay CSV per symbol")
+    parser.add_argument('--interval', default='1m')
+    parser.add_argument('--speed', type=float, default=1.0)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--ws-disconnect-rate', type=float, default=0.0)
+    parser.add_argument('--usdt', type=float, default=10000.0)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    markets = None
+    if args.replay:
+        markets = dict((item.split('=', 1)[0], load_replay(item.split('=', 1)[1])) for item in args.replay)
+
+    exchange = FakeBinanceExchange(
+        markets=markets, symbols=args.symbols, interval=args.interval, seed=args.seed,
+        speed=args.speed, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, ws_disconnect_rate=args.ws_disconnect_rate,
+        balances={'USDT': args.usdt}, host=args.host, port=args.port, ws_port=args.ws_port
+    ).start()
+
+    print("🧪 FAKE BINANCE EXCHANGE")
+    print("=" * 50)
+    print(f"   REST:    {exchange.base_url}")
+    print(f"   Streams: {exchange.ws_url}")
+    print(f"   Symbols: {', '.join(exchange.markets)}")
+    print(f"   Speed:   x{args.speed}  Latency: {args.latency_ms}ms  Errors: {args.error_rate*100:.1f}%")
+    print("-" * 50)
+    for key, value in exchange.env().items():
+        print(f"   export {key}={value}")
+    print("Press Ctrl+C to stop")
+
+    try:
+        while True:
+            time.sleep(10)
+            stats = exchange.stats()
+            print(f"[{time.strftime('%H:%M:%S')}] requests={stats['total_requests']} "
+                  f"weight={stats['total_weight']} errors={stats['injected_errors']}")
+    except KeyboardInterrupt:
+        print("\n🛑 Fake exchange stopped")
+        exchange.stop()
+
+
+if __name__ == "__main__":
+    main()
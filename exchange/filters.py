@@ -0,0 +1,294 @@
+# exchange/filters.py
+"""
+Exchange metadata cache
+
+Symbol trading rules (tick size, step size, min qty, min notional) are
+loaded once from exchangeInfo and kept in memory with a long TTL, refreshed
+in the background. Rounding and order validation are then local O(1)
+operations: an order that would be rejected with -1013 (filter failure)
+never reaches the network.
+
+Usage:
+    filters = ExchangeInfoCache.shared(client).get('NXPCUSDT')
+    qty = filters.round_qty(5.5 / price)
+    reason = filters.validate(qty, price)      # None = valid
+"""
+import math
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import settings
+try:
+    from config.settings import settings
+except ImportError:
+    # Fallback
+    class SimpleSettings:
+        EXCHANGE_INFO_TTL = 3600
+    settings = SimpleSettings()
+
+# Tolerance for float noise in x / step (e.g. 0.3 / 0.1 = 2.9999999999999996)
+EPSILON = 1e-9
+
+
+class OrderRejected(ValueError):
+    """Order fails the symbol's trading rules (caught before sending it)"""
+
+    def __init__(self, symbol, reason):
+        super().__init__(f"{symbol}: {reason}")
+        self.symbol = symbol
+        self.reason = reason
+
+
+def decimals(step):
+    """Decimal places of a tick / step size (0.0001 -> 4, 1 -> 0)"""
+    if step <= 0:
+        return 8
+    return max(0, -int(math.floor(math.log10(step) + EPSILON)))
+
+
+class SymbolFilters:
+    """Trading rules of one symbol"""
+
+    def __init__(self, symbol, tick_size, step_size, min_qty, min_notional,
+                 max_qty=None, min_price=0.0, max_price=None, market_max_qty=None,
+                 base_asset=None, quote_asset=None, status='TRADING', info=None):
+        self.symbol = symbol
+        self.tick_size = tick_size
+        self.step_size = step_size
+        self.min_qty = min_qty
+        self.max_qty = max_qty
+        self.min_notional = min_notional
+        self.min_price = min_price
+        self.max_price = max_price
+        self.market_max_qty = market_max_qty
+        self.base_asset = base_asset
+        self.quote_asset = quote_asset
+        self.status = status
+        self.info = info or {}
+
+        self.price_decimals = decimals(tick_size)
+        self.qty_decimals = decimals(step_size)
+
+    @classmethod
+    def from_symbol_info(cls, info):
+        """Build from one exchangeInfo['symbols'] entry"""
+        filters = {f['filterType']: f for f in info.get('filters', [])}
+        price = filters.get('PRICE_FILTER', {})
+        lot = filters.get('LOT_SIZE', {})
+        market_lot = filters.get('MARKET_LOT_SIZE', {})
+        # Spot uses NOTIONAL now; older symbols / testnet still report MIN_NOTIONAL
+        notional = filters.get('NOTIONAL') or filters.get('MIN_NOTIONAL') or {}
+
+        def num(section, key, default=None):
+            value = float(section.get(key, 0) or 0)
+            return value if value > 0 else default
+
+        return cls(
+            symbol=info['symbol'],
+            tick_size=num(price, 'tickSize', 1e-8),
+            step_size=num(lot, 'stepSize', 1e-8),
+            min_qty=num(lot, 'minQty', 0.0),
+            max_qty=num(lot, 'maxQty'),
+            min_notional=num(notional, 'minNotional', 0.0),
+            min_price=num(price, 'minPrice', 0.0),
+            max_price=num(price, 'maxPrice'),
+            market_max_qty=num(market_lot, 'maxQty'),
+            base_asset=info.get('baseAsset'),
+            quote_asset=info.get('quoteAsset'),
+            status=info.get('status', 'TRADING'),
+            info=info,
+        )
+
+    # ==================== ROUNDING ====================
+
+    def round_price(self, price, up=False):
+        """Price on the tick grid (down by default, up for e.g. sell limits)"""
+        ticks = price / self.tick_size
+        ticks = math.ceil(ticks - EPSILON) if up else math.floor(ticks + EPSILON)
+        return round(ticks * self.tick_size, self.price_decimals)
+
+    def round_qty(self, quantity, up=False):
+        """Quantity on the step grid (down by default: never exceed a balance)"""
+        steps = quantity / self.step_size
+        steps = math.ceil(steps - EPSILON) if up else math.floor(steps + EPSILON)
+        return round(steps * self.step_size, self.qty_decimals)
+
+    def format_price(self, price):
+        """String for the API (no 0.30000000000000004)"""
+        return f"{self.round_price(price):.{self.price_decimals}f}"
+
+    def format_qty(self, quantity):
+        return f"{self.round_qty(quantity):.{self.qty_decimals}f}"
+
+    def min_order_qty(self, price):
+        """Smallest valid quantity at price (min qty and min notional)"""
+        by_notional = self.min_notional / price if price > 0 else 0.0
+        return self.round_qty(max(self.min_qty, by_notional), up=True)
+
+    # ==================== VALIDATION ====================
+
+    def validate(self, quantity, price, market=False):
+        """
+        Check an order locally
+
+        Args:
+            price: Limit price, or the current price for a market order
+            market: Market order (price is not checked against the tick grid)
+
+        Returns:
+            None if valid, else the reason the exchange would reject it
+        """
+        if self.status != 'TRADING':
+            return f"symbol status is {self.status}"
+        if quantity < self.min_qty - EPSILON:
+            return f"quantity {quantity} < min {self.min_qty:g} {self.base_asset or ''}".rstrip()
+        max_qty = self.market_max_qty if market and self.market_max_qty else self.max_qty
+        if max_qty and quantity > max_qty + EPSILON:
+            return f"quantity {quantity} > max {max_qty:g}"
+        if abs(quantity - self.round_qty(quantity)) > EPSILON * max(1.0, quantity):
+            return f"quantity {quantity} is not a multiple of step {self.step_size:g}"
+
+        if not market:
+            if price < self.min_price - EPSILON:
+                return f"price {price} < min {self.min_price:g}"
+            if self.max_price and price > self.max_price + EPSILON:
+                return f"price {price} > max {self.max_price:g}"
+            if abs(price - self.round_price(price)) > EPSILON * max(1.0, price):
+                return f"price {price} is not a multiple of tick {self.tick_size:g}"
+
+        notional = quantity * price
+        if notional < self.min_notional - EPSILON:
+            return f"order value ${notional:.2f} < min ${self.min_notional:.2f}"
+        return None
+
+    def check(self, quantity, price, market=False):
+        """validate() that raises OrderRejected"""
+        reason = self.validate(quantity, price, market)
+        if reason is not None:
+            raise OrderRejected(self.symbol, reason)
+
+    def __repr__(self):
+        return (f"SymbolFilters({self.symbol}, tick={self.tick_size:g}, step={self.step_size:g}, "
+                f"min_qty={self.min_qty:g}, min_notional={self.min_notional:g})")
+
+
+class ExchangeInfoCache:
+    """
+    All symbols' filters in memory, loaded with one exchangeInfo call
+
+    get() is a dict lookup. After EXCHANGE_INFO_TTL the stale entry is
+    still served while a background thread reloads (stale-while-revalidate),
+    so no caller ever waits for a refresh.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, client=None, ttl=None, clock=time.monotonic):
+        self._client = client
+        self.ttl = settings.EXCHANGE_INFO_TTL if ttl is None else ttl
+        self.clock = clock
+        self.symbols = {}
+        self.loaded_at = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+        self.loads = 0
+        self.symbol_fetches = 0
+        self.lookups = 0
+
+    @classmethod
+    def shared(cls, client=None, **kwargs):
+        """Process-wide instance (client only used on first call)"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(client=client, **kwargs)
+            elif cls._shared._client is None:
+                cls._shared._client = client
+            return cls._shared
+
+    @property
+    def client(self):
+        if self._client is None:
+            from config.api_config import api_config
+            from exchange.client import get_client
+            self._client = get_client(api_config.API_KEY, api_config.API_SECRET,
+                                      testnet=api_config.is_testnet)
+        return self._client
+
+    def load(self):
+        """(Re)load every symbol's filters (one request)"""
+        info = self.client.get_exchange_info()
+        symbols = {s['symbol']: SymbolFilters.from_symbol_info(s) for s in info['symbols']}
+        with self._lock:
+            self.symbols = symbols
+            self.loaded_at = self.clock()
+            self.loads += 1
+        return len(symbols)
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def refresh():
+            try:
+                self.load()
+            except Exception as e:
+                print(f"⚠️  Exchange info refresh failed (keeping cached filters): {e}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=refresh, name='exchange-info-refresh', daemon=True).start()
+
+    def get(self, symbol):
+        """Filters for symbol; only the first call (or an unknown symbol) hits the network"""
+        symbol = symbol.upper()
+        self.lookups += 1
+
+        if self.loaded_at is None:
+            self.load()
+        elif self.clock() - self.loaded_at > self.ttl:
+            self._refresh_in_background()
+
+        filters = self.symbols.get(symbol)
+        if filters is None:
+            # Listed after the last load
+            info = self.client.get_symbol_info(symbol)
+            if info is None:
+                raise KeyError(f"Unknown symbol: {symbol}")
+            filters = SymbolFilters.from_symbol_info(info)
+            with self._lock:
+                self.symbols[symbol] = filters
+            self.symbol_fetches += 1
+        return filters
+
+    def get_symbol_info(self, symbol):
+        """Raw exchangeInfo entry (drop-in for client.get_symbol_info)"""
+        return self.get(symbol).info
+
+    def stats(self):
+        return {
+            'symbols': len(self.symbols),
+            'loads': self.loads,
+            'symbol_fetches': self.symbol_fetches,
+            'lookups': self.lookups,
+            'age_s': self.clock() - self.loaded_at if self.loaded_at is not None else None,
+        }
+
+
+if __name__ == "__main__":
+    cache = ExchangeInfoCache.shared()
+    filters = cache.get('NXPCUSDT')
+    print(f"✅ {filters}")
+    print(f"   Symbols cached: {cache.stats()['symbols']}")
+
+    started = time.perf_counter()
+    for _ in range(100_000):
+        filters.validate(filters.round_qty(12.345), filters.round_price(0.45678))
+    print(f"   100k round+validate: {(time.perf_counter() - started) * 1000:.0f}ms (no network)")
@@ -0,0 +1,498 @@
+# exchange/gateway.py
+"""
+Order execution gateway
+
+Strategies hand the gateway an OrderIntent instead of calling
+client.order_market_buy() inline:
+
+    - the intent is rounded and validated against the cached symbol
+      filters; invalid orders never reach the network
+    - submission runs on a worker thread; submit() returns at once
+    - every order carries a client order ID generated once per intent, so
+      a retry after a timeout can never place the order twice
+    - fills are tracked from the order response, from user-data
+      executionReport events (on_execution_report) or by polling
+    - latency is recorded per stage: signal -> submit -> ack -> fill
+    - with a store (exchange/order_store.py) every transition is persisted
+
+Usage:
+    gateway = OrderGateway(client)
+    order = gateway.submit(OrderIntent('NXPCUSDT', 'BUY', 12.0))
+    gateway.wait(order, timeout=30)
+    gateway.print_stats()
+"""
+import concurrent.futures
+import itertools
+import os
+import sys
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from binance.exceptions import BinanceAPIException, BinanceRequestException
+from requests.exceptions import RequestException
+
+from exchange.filters import ExchangeInfoCache, OrderRejected
+
+# Import settings
+try:
+    from config.settings import settings
+except ImportError:
+    # Fallback
+    class SimpleSettings:
+        GATEWAY_WORKERS = 2
+        GATEWAY_MAX_RETRIES = 2
+        GATEWAY_RETRY_DELAY = 0.5
+        GATEWAY_ORDER_PREFIX = "trads"
+        GATEWAY_LOOKUP_SETTLE = 1.0
+    settings = SimpleSettings()
+
+TERMINAL_STATUSES = ('FILLED', 'CANCELED', 'REJECTED', 'EXPIRED', 'EXPIRED_IN_MATCH')
+
+# Binance codes where the order may or may not have been placed
+UNKNOWN_STATUS_CODES = (-1001, -1003, -1006, -1007)
+
+# "Order does not exist" (get_order by client order ID)
+NO_SUCH_ORDER = -2013
+
+STAGES = ('signal_to_submit', 'submit_to_ack', 'ack_to_fill', 'signal_to_fill')
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram (ms), constant memory"""
+
+    # Bucket upper bounds: 0.1ms .. ~100s, 4 buckets per power of ten
+    BOUNDS = [0.1 * 10 ** (i / 4) for i in range(25)]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, ms):
+        for i, bound in enumerate(self.BOUNDS):
+            if ms <= bound:
+                break
+        else:
+            i = len(self.BOUNDS)
+        self.counts[i] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile"""
+        if not self.count:
+            return 0.0
+        target = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return min(self.BOUNDS[i], self.max) if i < len(self.BOUNDS) else self.max
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count if self.count else 0.0,
+            'p50_ms': self.percentile(50),
+            'p90_ms': self.percentile(90),
+            'p99_ms': self.percentile(99),
+            'max_ms': self.max,
+        }
+
+
+class OrderIntent:
+    """What a strategy wants to trade; created at signal time"""
+
+    def __init__(self, symbol, side, quantity, price=None, order_type=None,
+                 time_in_force='GTC', reason='', signal_time=None, reference_price=None):
+        """
+        Args:
+            price: Limit price; None = market order
+            order_type: MARKET / LIMIT / LIMIT_MAKER (default from price)
+            signal_time: time.perf_counter() when the signal fired (default: now)
+            reference_price: Current price for validating a market order
+                             (saves a ticker request when the strategy knows it)
+        """
+        self.symbol = symbol.upper()
+        self.side = side.upper()
+        self.quantity = quantity
+        self.price = price
+        self.order_type = (order_type or ('MARKET' if price is None else 'LIMIT')).upper()
+        self.time_in_force = time_in_force
+        self.reason = reason
+        self.reference_price = reference_price
+        self.signal_time = signal_time if signal_time is not None else time.perf_counter()
+
+    def __repr__(self):
+        price = f" @ {self.price}" if self.price is not None else ""
+        return f"OrderIntent({self.side} {self.quantity} {self.symbol} {self.order_type}{price})"
+
+
+class GatewayOrder:
+    """One order's lifecycle as seen by the gateway"""
+
+    def __init__(self, intent, client_order_id):
+        self.intent = intent
+        self.client_order_id = client_order_id
+        self.order_id = None
+        self.status = 'PENDING'
+        self.executed_qty = 0.0
+        self.quote_qty = 0.0
+        self.response = None
+        self.error = None
+        self.attempts = 0
+
+        self.submitted_at = None
+        self.acked_at = None
+        self.filled_at = None
+        self.ack = concurrent.futures.Future()
+        self.done = threading.Event()
+
+    @property
+    def avg_price(self):
+        return self.quote_qty / self.executed_qty if self.executed_qty else 0.0
+
+    @property
+    def is_open(self):
+        return self.status not in TERMINAL_STATUSES and self.error is None
+
+    def result(self, timeout=None):
+        """Exchange response once acknowledged (raises if the order failed)"""
+        return self.ack.result(timeout)
+
+    def __repr__(self):
+        return (f"GatewayOrder({self.client_order_id} {self.intent.side} {self.intent.symbol} "
+                f"{self.status} {self.executed_qty:g} @ {self.avg_price:g})")
+
+
+class OrderGateway:
+    """Validates, submits and tracks orders; records stage latencies"""
+
+    def __init__(self, client, filters=None, workers=None, max_retries=None,
+                 retry_delay=None, prefix=None, store=None, lookup_settle=None):
+        """
+        Args:
+            filters: ExchangeInfoCache (default: the shared one)
+            lookup_settle: Seconds to wait before trusting "order does not exist"
+            prefix: Client order ID prefix (identifies this bot's orders)
+            store: OrderStore recording every order transition (survives restarts)
+        """
+        self.client = client
+        self.filters = filters or ExchangeInfoCache.shared(client)
+        self.store = store
+        self.max_retries = settings.GATEWAY_MAX_RETRIES if max_retries is None else max_retries
+        self.retry_delay = settings.GATEWAY_RETRY_DELAY if retry_delay is None else retry_delay
+        self.prefix = prefix or settings.GATEWAY_ORDER_PREFIX
+        self.lookup_settle = (settings.GATEWAY_LOOKUP_SETTLE if lookup_settle is None
+                              else lookup_settle)
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers or settings.GATEWAY_WORKERS, thread_name_prefix='order-gateway')
+
+        self.orders = {}
+        self._lock = threading.Lock()
+        self._sequence = itertools.count(1)
+        self._session = uuid.uuid4().hex[:6]
+
+        self.latency = {stage: LatencyHistogram() for stage in STAGES}
+        self.local_rejects = 0
+        self.exchange_rejects = 0
+        self.retries = 0
+        self.recovered = 0
+
+    def new_client_order_id(self):
+        """Unique per intent; reused by every retry of that intent"""
+        return f"{self.prefix}-{self._session}-{next(self._sequence)}"
+
+    # ==================== SUBMISSION ====================
+
+    def prepare(self, intent):
+        """Round to the symbol's grid and validate locally (raises OrderRejected)"""
+        filters = self.filters.get(intent.symbol)
+        intent.quantity = filters.round_qty(intent.quantity)
+        if intent.price is not None:
+            intent.price = filters.round_price(intent.price, up=intent.side == 'SELL')
+
+        check_price = intent.price or intent.reference_price
+        if check_price is None:
+            ticker = self.client.get_symbol_ticker(symbol=intent.symbol)
+            check_price = float(ticker['price'])
+
+        try:
+            filters.check(intent.quantity, check_price, market=intent.order_type == 'MARKET')
+        except OrderRejected:
+            self.local_rejects += 1
+            raise
+
+        params = {
+            'symbol': intent.symbol,
+            'side': intent.side,
+            'type': intent.order_type,
+            'quantity': filters.format_qty(intent.quantity),
+            'newOrderRespType': 'FULL',
+        }
+        if intent.price is not None:
+            params['price'] = filters.format_price(intent.price)
+        if intent.order_type == 'LIMIT':
+            params['timeInForce'] = intent.time_in_force
+        return params
+
+    def submit(self, intent):
+        """
+        Validate now, send in the background
+
+        Returns:
+            GatewayOrder (its .ack future resolves with the exchange response)
+
+        Raises:
+            OrderRejected: The order breaks the symbol filters (nothing sent)
+        """
+        params = self.prepare(intent)
+        order = GatewayOrder(intent, self.new_client_order_id())
+        params['newClientOrderId'] = order.client_order_id
+
+        with self._lock:
+            self.orders[order.client_order_id] = order
+        if self.store is not None:
+            # Journaled before sending: a crash now is found by reconcile()
+            self.store.track(order)
+        self.executor.submit(self._send, order, params)
+        return order
+
+    def execute(self, intent, timeout=30):
+        """Blocking submit: wait for the acknowledgement, return the GatewayOrder"""
+        order = self.submit(intent)
+        order.result(timeout)
+        return order
+
+    def _send(self, order, params):
+        try:
+            self._send_order(order, params)
+        except Exception as e:
+            # Bad response shape, store error...: the ack future must still resolve
+            if not order.ack.done():
+                self._fail(order, e, status='ERROR')
+
+    def _send_order(self, order, params):
+        order.submitted_at = time.perf_counter()
+        self._record('signal_to_submit', order.intent.signal_time, order.submitted_at)
+
+        for attempt in range(self.max_retries + 1):
+            order.attempts += 1
+            try:
+                response = self.client.create_order(**params)
+                break
+            except BinanceAPIException as e:
+                if e.code not in UNKNOWN_STATUS_CODES and (e.status_code or 0) < 500:
+                    self._fail(order, e, status='REJECTED')
+                    self.exchange_rejects += 1
+                    return
+                error = e
+            except (BinanceRequestException, RequestException) as e:
+                error = e
+
+            # Unknown outcome: the order may exist. Look it up by our ID before resending.
+            try:
+                response = self._lookup(order)
+            except Exception as e:
+                # Still unknown: a resend could fill a second time (Binance only
+                # rejects a duplicate client ID while the first order is open)
+                self._unknown(order, e)
+                return
+            if response is not None:
+                self.recovered += 1
+                break
+            if attempt < self.max_retries:
+                self.retries += 1
+                time.sleep(self.retry_delay * (2 ** attempt))
+        else:
+            self._fail(order, error, status='ERROR')
+            return
+
+        order.acked_at = time.perf_counter()
+        self._record('submit_to_ack', order.submitted_at, order.acked_at)
+        self._apply(order, response)
+        order.ack.set_result(response)
+
+    def _lookup(self, order):
+        """
+        The order as the exchange has it, or None if it was never placed
+
+        "Does not exist" is only believed after lookup_settle seconds (a
+        just-placed order can take a moment to become visible). Any other
+        lookup error is retried, then raised: the outcome is unknown.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                try:
+                    return self._get_order(order)
+                except BinanceAPIException as e:
+                    if e.code != NO_SUCH_ORDER:
+                        raise
+                time.sleep(self.lookup_settle)
+                try:
+                    return self._get_order(order)
+                except BinanceAPIException as e:
+                    if e.code == NO_SUCH_ORDER:
+                        return None
+                    raise
+            except (BinanceAPIException, BinanceRequestException, RequestException) as e:
+                error = e
+            if attempt < self.max_retries:
+                time.sleep(self.retry_delay * (2 ** attempt))
+        raise error
+
+    def _get_order(self, order):
+        return self.client.get_order(symbol=order.intent.symbol,
+                                     origClientOrderId=order.client_order_id)
+
+    def _unknown(self, order, error):
+        """
+        The order may or may not exist: no resend, no final state
+
+        It stays open (and in the store as such); refresh() or the store's
+        reconcile() find out what happened.
+        """
+        order.status = 'UNKNOWN'
+        if self.store is not None:
+            self.store.track(order)
+        print(f"⚠️  Order {order.client_order_id} outcome unknown: {error}")
+        if not order.ack.done():
+            order.ack.set_exception(error)
+
+    def _fail(self, order, error, status):
+        order.status = status
+        order.error = error
+        order.done.set()
+        if self.store is not None:
+            self.store.track(order)
+        print(f"❌ Order {order.client_order_id} failed: {error}")
+        if not order.ack.done():
+            order.ack.set_exception(error)
+
+    # ==================== FILL TRACKING ====================
+
+    def _apply(self, order, response):
+        """Update from an order response (REST)"""
+        self._update(order,
+                     status=response.get('status', order.status),
+                     order_id=response.get('orderId'),
+                     executed_qty=float(response.get('executedQty', 0) or 0),
+                     quote_qty=float(response.get('cummulativeQuoteQty', 0) or 0))
+        order.response = response
+
+    def _update(self, order, status, order_id, executed_qty, quote_qty):
+        order.order_id = order_id or order.order_id
+        # Events can arrive out of order: never move executed quantity backwards
+        if executed_qty >= order.executed_qty:
+            order.executed_qty = executed_qty
+            order.quote_qty = quote_qty
+        if order.status not in TERMINAL_STATUSES:
+            order.status = status
+
+        if order.status == 'FILLED' and order.filled_at is None:
+            order.filled_at = time.perf_counter()
+            if order.acked_at is not None:
+                self._record('ack_to_fill', order.acked_at, order.filled_at)
+            self._record('signal_to_fill', order.intent.signal_time, order.filled_at)
+        if order.status in TERMINAL_STATUSES:
+            order.done.set()
+        if self.store is not None:
+            self.store.track(order)
+
+    def on_execution_report(self, event):
+        """Feed user-data 'executionReport' events (fills without polling)"""
+        order = self.orders.get(event.get('c'))
+        if order is None:
+            # Placed before a restart: only the store knows it
+            return self.store is not None and self.store.on_execution_report(event)
+        self._update(order, status=event['X'], order_id=event.get('i'),
+                     executed_qty=float(event.get('z', 0)), quote_qty=float(event.get('Z', 0)))
+        return True
+
+    def refresh(self, order):
+        """Poll one open order's state (when no user-data stream is attached)"""
+        if not order.is_open or (order.acked_at is None and order.status != 'UNKNOWN'):
+            return order
+        try:
+            response = self._lookup(order)
+        except Exception as e:
+            print(f"⚠️  Cannot refresh order {order.client_order_id}: {e}")
+            return order
+        if response is None:
+            if order.status == 'UNKNOWN':
+                # The lost request never reached the exchange
+                self._update(order, status='EXPIRED', order_id=None, executed_qty=0.0,
+                             quote_qty=0.0)
+        else:
+            self._update(order, status=response['status'], order_id=response.get('orderId'),
+                         executed_qty=float(response.get('executedQty', 0)),
+                         quote_qty=float(response.get('cummulativeQuoteQty', 0)))
+        return order
+
+    def wait(self, order, timeout=30, poll_interval=1.0):
+        """Wait for a terminal state (polls if no events arrive); True if done"""
+        deadline = time.monotonic() + timeout
+        try:
+            order.result(timeout)
+        except concurrent.futures.TimeoutError:
+            return False      # no acknowledgement yet: status unknown, not final
+        except Exception:
+            return order.done.is_set()   # rejected / failed (resolved by _fail)
+        while not order.done.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if not order.done.wait(min(poll_interval, remaining)):
+                self.refresh(order)
+        return True
+
+    def cancel(self, order):
+        """Cancel an open order; the result arrives like any other update"""
+        response = self.client.cancel_order(symbol=order.intent.symbol,
+                                            origClientOrderId=order.client_order_id)
+        self._apply(order, response)
+        return order
+
+    def open_orders(self):
+        with self._lock:
+            return [o for o in self.orders.values() if o.is_open]
+
+    # ==================== STATS ====================
+
+    def _record(self, stage, start, end):
+        if start is not None and end is not None:
+            self.latency[stage].record((end - start) * 1000)
+
+    def stats(self):
+        with self._lock:
+            orders = list(self.orders.values())
+        statuses = {}
+        for order in orders:
+            statuses[order.status] = statuses.get(order.status, 0) + 1
+        return {
+            'orders': len(orders),
+            'statuses': statuses,
+            'local_rejects': self.local_rejects,
+            'exchange_rejects': self.exchange_rejects,
+            'retries': self.retries,
+            'recovered': self.recovered,
+            'latency': {stage: hist.summary() for stage, hist in self.latency.items()},
+        }
+
+    def print_stats(self):
+        stats = self.stats()
+        print(f"\n⚡ ORDER GATEWAY: {stats['orders']} orders {stats['statuses']}, "
+              f"{stats['local_rejects']} rejected locally, {stats['retries']} retries")
+        for stage, s in stats['latency'].items():
+            if s['count']:
+                print(f"   {stage:<17} n={s['count']:<4} p50={s['p50_ms']:.1f}ms "
+                      f"p90={s['p90_ms']:.1f}ms p99={s['p99_ms']:.1f}ms max={s['max_ms']:.1f}ms")
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
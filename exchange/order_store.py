@@ -0,0 +1,401 @@
+# exchange/order_store.py
+"""
+Persistent order and position state
+
+Bots used to keep their position in plain attributes (in_position,
+entry_price, trades...) and lost it on every restart. The store keeps it
+on disk as:
+
+    <name>.json   snapshot: orders, positions, recent trades, last seq
+    <name>.log    append-only JSONL journal of every change since
+
+Every order transition is one journal line (written before the call
+returns). Boot = load snapshot + replay the journal tail: no API calls.
+The journal is folded into a new snapshot every ORDER_STORE_SNAPSHOT_EVERY
+entries. Reconciliation with the exchange is incremental: only orders the
+store still considers open are looked up.
+
+Usage:
+    store = OrderStore.open(store_name('NXPCUSDT', 'telegram_config.py'))
+    gateway = OrderGateway(client, store=store)   # transitions recorded
+    store.reconcile(client)                       # after a restart
+    store.position('NXPCUSDT').quantity
+"""
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import settings
+try:
+    from config.settings import settings
+except ImportError:
+    # Fallback
+    class SimpleSettings:
+        ORDER_STORE_DIR = "state"
+        ORDER_STORE_SNAPSHOT_EVERY = 500
+        ORDER_STORE_MAX_TRADES = 1000
+        ORDER_STORE_FSYNC = True
+    settings = SimpleSettings()
+
+TERMINAL_STATUSES = ('FILLED', 'CANCELED', 'REJECTED', 'EXPIRED', 'EXPIRED_IN_MATCH', 'ERROR')
+
+# Quantities below this are rounding dust, not a position
+DUST = 1e-9
+
+ORDER_FIELDS = ('symbol', 'side', 'type', 'quantity', 'price', 'status', 'order_id',
+                'executed_qty', 'quote_qty', 'reason')
+
+
+def store_name(symbol, config_file=None):
+    """
+    Stable store name for a bot: the symbol plus its config file name
+
+    The same config gives the same store whether the bot runs standalone or
+    under runtime/host.py (where bot names come from the file name).
+    """
+    if not config_file:
+        return symbol
+    return f"{symbol}_{os.path.splitext(os.path.basename(config_file))[0]}"
+
+
+class Position:
+    """Net position of one symbol, average entry price and realized P&L"""
+
+    def __init__(self, symbol, quantity=0.0, entry_price=0.0, realized_pnl=0.0, opened=None):
+        self.symbol = symbol
+        self.quantity = quantity
+        self.entry_price = entry_price
+        self.realized_pnl = realized_pnl
+        self.opened = opened
+
+    @property
+    def is_open(self):
+        return self.quantity > DUST
+
+    def pnl_pct(self, price):
+        if not self.is_open or not self.entry_price:
+            return 0.0
+        return (price - self.entry_price) / self.entry_price * 100
+
+    def fill(self, side, quantity, price, when):
+        """Apply a fill; returns the realized P&L of a sell"""
+        if side == 'BUY':
+            total = self.quantity + quantity
+            self.entry_price = (self.entry_price * self.quantity + price * quantity) / total
+            self.quantity = total
+            self.opened = self.opened or when
+            return 0.0
+
+        sold = min(quantity, self.quantity)
+        pnl = (price - self.entry_price) * sold
+        self.realized_pnl += pnl
+        self.quantity -= sold
+        if self.quantity <= DUST:
+            self.quantity, self.entry_price, self.opened = 0.0, 0.0, None
+        return pnl
+
+    def to_dict(self):
+        return {'quantity': self.quantity, 'entry_price': self.entry_price,
+                'realized_pnl': self.realized_pnl, 'opened': self.opened}
+
+    def __repr__(self):
+        return f"Position({self.symbol} {self.quantity:g} @ {self.entry_price:g})"
+
+
+class OrderStore:
+    """Orders, positions and trades; snapshot + append-only journal"""
+
+    def __init__(self, path, snapshot_every=None, max_trades=None, fsync=None):
+        """
+        Args:
+            path: File prefix; <path>.json and <path>.log are created
+            snapshot_every: Journal entries before they are folded into the snapshot
+            fsync: fsync each journal line (survives power loss, ~ms per write)
+        """
+        self.path = path
+        self.snapshot_file = path + '.json'
+        self.journal_file = path + '.log'
+        self.snapshot_every = snapshot_every or settings.ORDER_STORE_SNAPSHOT_EVERY
+        self.max_trades = max_trades or settings.ORDER_STORE_MAX_TRADES
+        self.fsync = settings.ORDER_STORE_FSYNC if fsync is None else fsync
+
+        self.orders = {}        # client order ID -> record dict
+        self.positions = {}     # symbol -> Position
+        self.trades = []        # fills, newest last
+        self.seq = 0
+        self._lock = threading.RLock()
+        self._journal = None
+        self._pending = 0       # journal entries not yet in the snapshot
+
+        self.replayed = 0
+        self.truncated = False  # a torn journal tail was cut on recovery
+        self.writes = 0
+        self.snapshots = 0
+        self.reconcile_calls = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._recover()
+
+    @classmethod
+    def open(cls, name, directory=None, **kwargs):
+        """Store for one bot: <ORDER_STORE_DIR>/<name>.json|.log"""
+        return cls(os.path.join(directory or settings.ORDER_STORE_DIR, name), **kwargs)
+
+    # ==================== RECOVERY ====================
+
+    def _recover(self):
+        """Snapshot + journal tail -> in-memory state (no network)"""
+        if os.path.exists(self.snapshot_file):
+            with open(self.snapshot_file, encoding='utf-8') as f:
+                snapshot = json.load(f)
+            self.seq = snapshot['seq']
+            self.orders = snapshot['orders']
+            self.positions = {s: Position(s, **p) for s, p in snapshot['positions'].items()}
+            self.trades = snapshot['trades']
+
+        if os.path.exists(self.journal_file):
+            good = 0    # byte offset after the last complete entry
+            with open(self.journal_file, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break   # torn last line from a crash mid-write
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    good += len(line)
+                    if entry['seq'] <= self.seq:
+                        continue   # already in the snapshot
+                    self._apply(entry)
+                    self.seq = entry['seq']
+                    self._pending += 1
+                    self.replayed += 1
+
+            # Drop the torn fragment, or the next entry would be glued to it
+            # and the replay after the next crash would stop there
+            if good < os.path.getsize(self.journal_file):
+                with open(self.journal_file, 'r+b') as f:
+                    f.truncate(good)
+                self.truncated = True
+
+        self._journal = open(self.journal_file, 'a', encoding='utf-8')
+
+    # ==================== JOURNAL ====================
+
+    def _write(self, kind, **data):
+        """Journal one change, then apply it"""
+        with self._lock:
+            self.seq += 1
+            entry = {'seq': self.seq, 'time': datetime.now().isoformat(), 'kind': kind, **data}
+            self._journal.write(json.dumps(entry) + '\n')
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+            self.writes += 1
+            self._apply(entry)
+
+            self._pending += 1
+            if self._pending >= self.snapshot_every:
+                self.snapshot()
+            return entry
+
+    def _apply(self, entry):
+        kind = entry['kind']
+        if kind == 'order':
+            record = self.orders.setdefault(entry['id'], {'created': entry['time']})
+            previous_qty = record.get('executed_qty', 0.0)
+            previous_quote = record.get('quote_qty', 0.0)
+            record.update({k: entry[k] for k in ORDER_FIELDS if k in entry})
+            record['updated'] = entry['time']
+
+            filled = record.get('executed_qty', 0.0) - previous_qty
+            if filled > DUST:
+                price = (record.get('quote_qty', 0.0) - previous_quote) / filled
+                self._fill(entry['id'], record, filled, price, entry['time'])
+
+        elif kind == 'position':
+            position = self.positions.setdefault(entry['symbol'], Position(entry['symbol']))
+            position.quantity = entry['quantity']
+            position.entry_price = entry['entry_price'] if position.is_open else 0.0
+            position.opened = (position.opened or entry['time']) if position.is_open else None
+
+    def _fill(self, client_order_id, record, quantity, price, when):
+        symbol = record['symbol']
+        position = self.positions.setdefault(symbol, Position(symbol))
+        pnl = position.fill(record['side'], quantity, price, when)
+        self.trades.append({'time': when, 'symbol': symbol, 'side': record['side'],
+                            'quantity': quantity, 'price': price, 'pnl': pnl,
+                            'order': client_order_id, 'reason': record.get('reason', '')})
+        if len(self.trades) > self.max_trades:
+            del self.trades[:len(self.trades) - self.max_trades]
+
+    def snapshot(self):
+        """Fold the journal into a new snapshot (atomic replace), then truncate it"""
+        with self._lock:
+            # Terminal orders are already reflected in positions / trades; the
+            # most recent are kept so a late duplicate event is still recognised
+            terminal = [cid for cid, r in self.orders.items()
+                        if r.get('status') in TERMINAL_STATUSES]
+            dropped = set(terminal[:max(0, len(terminal) - self.max_trades)])
+            orders = {cid: r for cid, r in self.orders.items() if cid not in dropped}
+            state = {
+                'seq': self.seq,
+                'orders': orders,
+                'positions': {s: p.to_dict() for s, p in self.positions.items()},
+                'trades': self.trades,
+            }
+            tmp = self.snapshot_file + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.snapshot_file)
+
+            # A crash before this truncate is harmless: replay skips seq <= snapshot
+            self._journal.close()
+            self._journal = open(self.journal_file, 'w', encoding='utf-8')
+            self.orders = orders
+            self._pending = 0
+            self.snapshots += 1
+
+    def close(self):
+        with self._lock:
+            if self._journal is not None:
+                if self._pending:
+                    self.snapshot()
+                self._journal.close()
+                self._journal = None
+
+    # ==================== ORDER TRANSITIONS ====================
+
+    def record(self, client_order_id, **fields):
+        """
+        Record an order's new state; unchanged states are not journaled
+
+        Fields: symbol, side, type, quantity, price, status, order_id,
+        executed_qty (cumulative), quote_qty (cumulative), reason
+        """
+        with self._lock:
+            record = self.orders.get(client_order_id)
+            if record is not None:
+                if record.get('status') in TERMINAL_STATUSES:
+                    return None   # late / duplicate event
+                if fields.get('executed_qty', 0.0) < record.get('executed_qty', 0.0):
+                    # Out-of-order event: keep the larger cumulative fill
+                    fields.pop('executed_qty', None)
+                    fields.pop('quote_qty', None)
+                if all(record.get(k) == v for k, v in fields.items()):
+                    return None
+            return self._write('order', id=client_order_id, **fields)
+
+    def track(self, order):
+        """Record a GatewayOrder's current state"""
+        intent = order.intent
+        return self.record(order.client_order_id, symbol=intent.symbol, side=intent.side,
+                           type=intent.order_type, quantity=intent.quantity, price=intent.price,
+                           status=order.status, order_id=order.order_id,
+                           executed_qty=order.executed_qty, quote_qty=order.quote_qty,
+                           reason=intent.reason)
+
+    def on_execution_report(self, event):
+        """User-data executionReport for an order the store knows (e.g. placed before a restart)"""
+        if event.get('c') not in self.orders:
+            return False
+        self.record(event['c'], status=event['X'], order_id=event.get('i'),
+                    executed_qty=float(event.get('z', 0)), quote_qty=float(event.get('Z', 0)))
+        return True
+
+    def set_position(self, symbol, quantity, entry_price=0.0):
+        """Override a position (manual correction / adopting existing holdings)"""
+        return self._write('position', symbol=symbol, quantity=quantity, entry_price=entry_price)
+
+    # ==================== QUERIES ====================
+
+    def position(self, symbol):
+        return self.positions.get(symbol) or Position(symbol)
+
+    def open_orders(self, symbol=None):
+        return {cid: r for cid, r in self.orders.items()
+                if r.get('status') not in TERMINAL_STATUSES
+                and (symbol is None or r.get('symbol') == symbol)}
+
+    def symbol_trades(self, symbol):
+        return [t for t in self.trades if t['symbol'] == symbol]
+
+    def realized_pnl(self, symbol=None):
+        return sum(p.realized_pnl for s, p in self.positions.items() if symbol in (None, s))
+
+    # ==================== RECONCILIATION ====================
+
+    def reconcile(self, client):
+        """
+        Bring open orders up to date (one get_order per order still open)
+
+        Returns:
+            Number of orders whose state changed on the exchange
+        """
+        changed = 0
+        for cid, record in list(self.open_orders().items()):
+            self.reconcile_calls += 1
+            try:
+                response = client.get_order(symbol=record['symbol'], origClientOrderId=cid)
+            except Exception as e:
+                if getattr(e, 'code', None) == -2013:
+                    # Never reached the exchange (crash between journal and send)
+                    changed += self.record(cid, status='EXPIRED') is not None
+                else:
+                    print(f"⚠️  Cannot reconcile order {cid}: {e}")
+                continue
+            changed += self.record(cid, status=response['status'],
+                                   order_id=response.get('orderId'),
+                                   executed_qty=float(response.get('executedQty', 0)),
+                                   quote_qty=float(response.get('cummulativeQuoteQty', 0))) is not None
+        return changed
+
+    def reconcile_position(self, symbol, held):
+        """
+        Cap the position at what the account actually holds (local, no API call)
+
+        A position larger than the balance means coins were sold or moved
+        outside the bot. A larger balance is left alone: the account may
+        hold coins the bot never bought.
+        """
+        position = self.position(symbol)
+        if position.quantity > held + DUST:
+            print(f"🔄 {symbol} position {position.quantity:g} > balance {held:g}, corrected")
+            self.set_position(symbol, held, position.entry_price)
+            return True
+        return False
+
+    def stats(self):
+        return {
+            'seq': self.seq,
+            'open_orders': len(self.open_orders()),
+            'positions': {s: p.to_dict() for s, p in self.positions.items() if p.is_open},
+            'trades': len(self.trades),
+            'replayed': self.replayed,
+            'writes': self.writes,
+            'snapshots': self.snapshots,
+            'reconcile_calls': self.reconcile_calls,
+        }
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    directory = tempfile.mkdtemp()
+    store = OrderStore.open('demo', directory, fsync=False)
+    store.record('demo-1', symbol='NXPCUSDT', side='BUY', type='MARKET', quantity=10.0,
+                 status='PENDING')
+    store.record('demo-1', status='FILLED', executed_qty=10.0, quote_qty=5.0)
+    store.close()
+
+    started = time.perf_counter()
+    store = OrderStore.open('demo', directory, fsync=False)
+    print(f"✅ Recovered in {(time.perf_counter() - started) * 1000:.2f}ms: "
+          f"{store.position('NXPCUSDT')}, {len(store.trades)} trade(s)")
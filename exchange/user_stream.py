@@ -0,0 +1,398 @@
+# exchange/user_stream.py
+"""
+User-data stream and local balance book
+
+get_account() costs weight 20 and returns every asset just so a bot can
+read NXPC and USDT. Instead the balance book is loaded once over REST and
+then kept current by the user-data WebSocket stream:
+
+    - outboundAccountPosition / balanceUpdate events update balances
+    - executionReport events are forwarded to the order gateway (fills)
+    - the listen key is kept alive, the socket reconnects with backoff,
+      and a REST reconciliation runs on every reconnect and every
+      USER_STREAM_RECONCILE_INTERVAL to correct any drift
+
+Balance reads are dict lookups:
+
+    user = UserDataStream.shared(client=client).start()
+    usdt = user.book.free('USDT')
+"""
+import asyncio
+import json
+import random
+import threading
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from websockets.exceptions import ConnectionClosed
+    try:
+        from websockets.asyncio.client import connect as ws_connect
+    except ImportError:  # websockets < 13
+        from websockets import connect as ws_connect
+except ImportError:
+    ws_connect = None
+    ConnectionClosed = OSError
+
+# Import settings
+try:
+    from config.settings import settings
+except ImportError:
+    # Fallback
+    class SimpleSettings:
+        STREAM_RECONNECT_DELAY = 1.0
+        STREAM_MAX_RECONNECT_DELAY = 60.0
+        USER_STREAM_RECONCILE_INTERVAL = 900
+        USER_STREAM_KEEPALIVE_INTERVAL = 1800
+    settings = SimpleSettings()
+
+# Differences below this are float noise, not drift
+DRIFT_TOLERANCE = 1e-8
+
+
+class BalanceBook:
+    """Free / locked balance per asset, updated by events and REST snapshots"""
+
+    def __init__(self):
+        self.balances = {}      # asset -> [free, locked, exchange update time (ms)]
+        self._delta_ms = {}     # asset -> time of the latest balanceUpdate applied
+        self._lock = threading.Lock()
+        self.updated = None
+
+        self.events = 0
+        self.snapshots = 0
+        self.corrections = 0
+
+    def free(self, asset):
+        entry = self.balances.get(asset)
+        return entry[0] if entry else 0.0
+
+    def locked(self, asset):
+        entry = self.balances.get(asset)
+        return entry[1] if entry else 0.0
+
+    def total(self, asset):
+        entry = self.balances.get(asset)
+        return entry[0] + entry[1] if entry else 0.0
+
+    def get(self, asset):
+        return {'asset': asset, 'free': self.free(asset), 'locked': self.locked(asset)}
+
+    def assets(self):
+        """Assets with a non-zero balance"""
+        return sorted(a for a, (free, locked, _) in self.balances.items() if free or locked)
+
+    def as_account(self):
+        """get_account()-shaped dict for code that still expects it"""
+        return {'balances': [{'asset': a, 'free': f"{free:.8f}", 'locked': f"{locked:.8f}"}
+                             for a, (free, locked, _) in self.balances.items()]}
+
+    def _set(self, asset, free, locked, update_ms):
+        entry = self.balances.get(asset)
+        if entry is not None and update_ms < entry[2]:
+            return False   # older than what we already have
+        self.balances[asset] = [free, locked, update_ms]
+        return True
+
+    def apply_position(self, event):
+        """outboundAccountPosition: absolute balances of the changed assets"""
+        update_ms = int(event.get('u') or event.get('E') or 0)
+        with self._lock:
+            for balance in event.get('B', []):
+                self._set(balance['a'], float(balance['f']), float(balance['l']), update_ms)
+            self.events += 1
+            self.updated = time.monotonic()
+
+    def apply_delta(self, event):
+        """
+        balanceUpdate: deposit / withdrawal / transfer delta on free
+
+        Skipped when an absolute balance (position event or snapshot) at or
+        after the delta's clear time is already in the book - it includes the
+        delta. The delta does not advance the entry's update time, so a second
+        delta cleared in the same millisecond still applies.
+        """
+        asset = event['a']
+        update_ms = int(event.get('T') or event.get('E') or 0)
+        with self._lock:
+            entry = self.balances.setdefault(asset, [0.0, 0.0, 0])
+            if update_ms > entry[2]:
+                entry[0] += float(event['d'])
+                self._delta_ms[asset] = max(self._delta_ms.get(asset, 0), update_ms)
+            self.events += 1
+            self.updated = time.monotonic()
+
+    def apply_snapshot(self, account):
+        """
+        Reconcile with a REST get_account() response
+
+        Returns:
+            Number of assets whose book value was wrong (drift corrected)
+        """
+        update_ms = int(account.get('updateTime') or 0)
+        corrections = 0
+        with self._lock:
+            seen = set()
+            for balance in account['balances']:
+                asset = balance['asset']
+                free, locked = float(balance['free']), float(balance['locked'])
+                seen.add(asset)
+                entry = self.balances.get(asset)
+                if entry is not None and (abs(entry[0] - free) > DRIFT_TOLERANCE
+                                          or abs(entry[1] - locked) > DRIFT_TOLERANCE):
+                    if update_ms and update_ms < max(entry[2], self._delta_ms.get(asset, 0)):
+                        continue   # an event newer than this snapshot already applied
+                    corrections += 1
+                self.balances[asset] = [free, locked, max(update_ms, entry[2] if entry else 0)]
+
+            # Assets no longer reported have a zero balance
+            for asset in set(self.balances) - seen:
+                if self.balances[asset][0] or self.balances[asset][1]:
+                    corrections += 1
+                del self.balances[asset]
+                self._delta_ms.pop(asset, None)
+
+            self.snapshots += 1
+            if self.snapshots > 1:
+                self.corrections += corrections
+            self.updated = time.monotonic()
+        return corrections
+
+
+class UserDataStream:
+    """Keeps a BalanceBook current from the Binance user-data stream"""
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, client=None, ws_url=None, gateway=None, reconcile_interval=None,
+                 keepalive_interval=None, reconnect_delay=None, max_reconnect_delay=None):
+        """
+        Args:
+            gateway: OrderGateway receiving executionReport events (fills)
+            reconcile_interval: Seconds between REST get_account reconciliations
+        """
+        self._client = client
+        self._ws_url = ws_url
+        self.gateway = gateway
+        self.reconcile_interval = reconcile_interval or settings.USER_STREAM_RECONCILE_INTERVAL
+        self.keepalive_interval = keepalive_interval or settings.USER_STREAM_KEEPALIVE_INTERVAL
+        self.reconnect_delay = reconnect_delay or settings.STREAM_RECONNECT_DELAY
+        self.max_reconnect_delay = max_reconnect_delay or settings.STREAM_MAX_RECONNECT_DELAY
+
+        self.book = BalanceBook()
+        self.listen_key = None
+        self.listeners = []
+        self.connected = threading.Event()
+        self._loop = None
+        self._ws = None
+        self._thread = None
+        self._stopping = False
+
+        self.messages = 0
+        self.reconnects = 0
+        self.reconciles = 0
+        self.last_reconcile = None
+
+    @classmethod
+    def shared(cls, **kwargs):
+        """Process-wide stream (kwargs only used on first call)"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(**kwargs)
+            elif cls._shared.gateway is None and kwargs.get('gateway') is not None:
+                cls._shared.gateway = kwargs['gateway']
+            return cls._shared
+
+    @property
+    def ws_url(self):
+        if self._ws_url is None:
+            from config.api_config import api_config
+            self._ws_url = api_config.stream_url
+        return self._ws_url.rstrip('/')
+
+    @property
+    def client(self):
+        if self._client is None:
+            from config.api_config import api_config
+            from exchange.client import get_client
+            self._client = get_client(api_config.API_KEY, api_config.API_SECRET,
+                                      testnet=api_config.is_testnet)
+        return self._client
+
+    def add_listener(self, callback):
+        """callback(event) for every executionReport (called on the stream thread)"""
+        self.listeners.append(callback)
+        return callback
+
+    # ==================== RECONCILIATION ====================
+
+    def reconcile(self):
+        """
+        Correct the book from REST (one get_account call)
+
+        Always asks the exchange: a CachedClient snapshot can be seconds old
+        and would undo events applied since it was taken.
+        """
+        account = getattr(self.client, 'uncached', self.client).get_account()
+        corrections = self.book.apply_snapshot(account)
+        self.reconciles += 1
+        self.last_reconcile = time.monotonic()
+        if corrections and self.book.snapshots > 1:
+            print(f"🔄 Balance book: {corrections} asset(s) corrected by reconciliation")
+        return corrections
+
+    # ==================== DISPATCH ====================
+
+    def _handle(self, message):
+        event = json.loads(message)
+        kind = event.get('e')
+        self.messages += 1
+
+        if kind == 'outboundAccountPosition':
+            self.book.apply_position(event)
+        elif kind == 'balanceUpdate':
+            self.book.apply_delta(event)
+        elif kind == 'executionReport':
+            if self.gateway is not None:
+                self.gateway.on_execution_report(event)
+            for callback in self.listeners:
+                try:
+                    callback(event)
+                except Exception as e:
+                    print(f"⚠️  User stream listener failed: {e}")
+        elif kind == 'listenKeyExpired':
+            self.listen_key = None
+            raise ConnectionError("listen key expired")
+
+    # ==================== CONNECTION ====================
+
+    async def _periodic(self):
+        """Listen key keep-alive and REST reconciliation"""
+        last_keepalive = time.monotonic()
+        while not self._stopping:
+            await asyncio.sleep(1.0)
+            now = time.monotonic()
+            try:
+                if self.listen_key and now - last_keepalive >= self.keepalive_interval:
+                    await self._loop.run_in_executor(None, self.client.stream_keepalive,
+                                                     self.listen_key)
+                    last_keepalive = now
+                if self.last_reconcile is None or now - self.last_reconcile >= self.reconcile_interval:
+                    await self._loop.run_in_executor(None, self.reconcile)
+            except Exception as e:
+                print(f"⚠️  User stream maintenance failed: {e}")
+                self.last_reconcile = now   # retry next interval, not every second
+
+    async def run(self):
+        """Connect, consume and reconnect until stop() (coroutine)"""
+        if ws_connect is None:
+            raise ImportError("websockets is required for UserDataStream (pip install websockets)")
+
+        self._loop = asyncio.get_running_loop()
+        periodic = asyncio.ensure_future(self._periodic())
+        delay = self.reconnect_delay
+
+        try:
+            while not self._stopping:
+                try:
+                    if self.listen_key is None:
+                        self.listen_key = await self._loop.run_in_executor(
+                            None, self.client.stream_get_listen_key)
+
+                    async with ws_connect(f"{self.ws_url}/ws/{self.listen_key}") as ws:
+                        self._ws = ws
+                        if self.reconnects:
+                            # Events may have been missed while disconnected
+                            await self._loop.run_in_executor(None, self.reconcile)
+                        self.connected.set()
+                        delay = self.reconnect_delay
+
+                        async for message in ws:
+                            self._handle(message)
+
+                except (ConnectionClosed, ConnectionError, OSError) as e:
+                    if self._stopping:
+                        break
+                    print(f"⚠️  User stream disconnected ({type(e).__name__}), "
+                          f"reconnecting in {delay:.1f}s")
+                except Exception as e:
+                    if self._stopping:
+                        break
+                    print(f"❌ User stream error: {e}")
+                    self.listen_key = None
+                finally:
+                    self._ws = None
+                    self.connected.clear()
+
+                if self._stopping:
+                    break
+                self.reconnects += 1
+                await asyncio.sleep(delay * (1 + random.random() * 0.1))
+                delay = min(delay * 2, self.max_reconnect_delay)
+        finally:
+            periodic.cancel()
+
+    def start(self, wait=True, timeout=10):
+        """Load balances over REST, then follow the stream on a background thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        if ws_connect is None:
+            # Without the stream nothing would keep the book current
+            raise ImportError("websockets is required for UserDataStream (pip install websockets)")
+
+        if self.last_reconcile is None:
+            self.reconcile()
+
+        self._stopping = False
+        self._thread = threading.Thread(target=lambda: asyncio.run(self.run()),
+                                        name='user-data-stream', daemon=True)
+        self._thread.start()
+
+        if wait and not self.connected.wait(timeout):
+            print(f"⚠️  User stream not connected after {timeout}s "
+                  f"(balances still reconciled every {self.reconcile_interval:g}s)")
+        return self
+
+    def stop(self):
+        self._stopping = True
+        if self._ws is not None and self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._ws.close(), self._loop)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self.listen_key:
+            try:
+                self.client.stream_close(self.listen_key)
+            except Exception:
+                pass
+            self.listen_key = None
+
+    def stats(self):
+        return {
+            'connected': self.connected.is_set(),
+            'messages': self.messages,
+            'events_applied': self.book.events,
+            'reconnects': self.reconnects,
+            'reconciles': self.reconciles,
+            'drift_corrections': self.book.corrections,
+            'assets': self.book.assets(),
+            'last_reconcile_age': time.monotonic() - self.last_reconcile
+            if self.last_reconcile else None,
+        }
+
+
+if __name__ == "__main__":
+    user = UserDataStream.shared().start()
+    print(f"👤 Following user data from {user.ws_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(10)
+            balances = ', '.join(f"{a}: {user.book.free(a):.4f}" for a in user.book.assets())
+            print(f"   {balances}")
+    except KeyboardInterrupt:
+        print(f"\n📊 {user.stats()}")
+        user.stop()
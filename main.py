@@ -12,18 +12,14 @@ warnings.filterwarnings('ignore')
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-# Import modules
-from config.settings import settings  # Ini akan create directories
+# Import modules - ringan saja; pandas, matplotlib, plotly, ccxt dan binance
+# di-import di dalam menu yang memakainya (cek: python -m utils.startup main)
+from config.settings import settings
 from config.api_config import api_config
-from data.fetcher import DataFetcher
-from strategies.sma_crossover import SMACrossover
-from backtest.engine import BacktestEngine
-from backtest.analyzer import ResultAnalyzer
-from backtest.optimizer import StrategyOptimizer
+from strategies.registry import create_strategy
 
 # Import logger functions - PAKAI INI
 from utils.logger import get_logger, log_info, log_warning, log_error, log_trade
-from utils.visualization import ChartBuilder
 
 # Initialize logger
 logger = get_logger(logs_dir=settings.LOGS_DIR)
@@ -49,12 +45,17 @@ def main_menu():
 
 def run_backtest():
     """Run backtest with current strategy"""
+    from data.fetcher import DataFetcher
+    from backtest.engine import BacktestEngine
+    from backtest.analyzer import ResultAnalyzer
+    from utils.visualization import ChartBuilder
+    
     print("\n🔍 RUNNING BACKTEST")
     print("-" * 40)
     
     # Initialize
     fetcher = DataFetcher()
-    strategy = SMACrossover(fast_period=settings.SMA_FAST, slow_period=settings.SMA_SLOW)
+    strategy = create_strategy(settings.STRATEGY)
     backtester = BacktestEngine()
     
     # Fetch data
@@ -98,6 +99,9 @@ def run_backtest():
 
 def run_optimization():
     """Optimize strategy parameters"""
+    from backtest.engine import BacktestEngine
+    from backtest.optimizer import StrategyOptimizer
+    
     print("\n⚙️ STRATEGY OPTIMIZATION")
     print("-" * 40)
     
@@ -135,7 +139,8 @@ def run_optimization():
         if run_optimized == 'y':
             print("\nRunning optimized backtest...")
             
-            strategy = SMACrossover(
+            strategy = create_strategy(
+                'sma_crossover',
                 fast_period=int(best['fast_period']),
                 slow_period=int(best['slow_period'])
             )
@@ -149,13 +154,17 @@ def run_optimization():
 
 def compare_strategies():
     """Compare multiple strategies"""
+    from data.fetcher import DataFetcher
+    from backtest.engine import BacktestEngine
+    from utils.visualization import ChartBuilder
+    
     print("\n📊 STRATEGY COMPARISON")
     print("-" * 40)
     
     strategies = [
-        ("SMA(20/50)", SMACrossover(20, 50)),
-        ("SMA(10/30)", SMACrossover(10, 30)),
-        ("SMA(30/70)", SMACrossover(30, 70)),
+        ("SMA(20/50)", "sma_crossover(20, 50)"),
+        ("SMA(10/30)", "sma_crossover(10, 30)"),
+        ("SMA(30/70)", "sma_crossover(30, 70)"),
     ]
     
     # Fetch data
@@ -172,7 +181,7 @@ def compare_strategies():
         print(f"\nTesting {name}...")
         
         backtester = BacktestEngine()
-        results = backtester.run(df, strategy)
+        results = backtester.run(df, create_strategy(strategy))
         
         results_dict[name] = results
         
@@ -228,11 +237,10 @@ def paper_trading():
     choice = input("\nSelect option (1-5): ").strip()
     
     if choice == '1':
-        from strategies.sma_crossover import SMACrossover
         from paper_trade.simulator import PaperTradingSimulator
         
         print(f"\n🤖 LOADING SMA({settings.SMA_FAST}/{settings.SMA_SLOW}) STRATEGY...")
-        strategy = SMACrossover(fast_period=settings.SMA_FAST, slow_period=settings.SMA_SLOW)
+        strategy = create_strategy('sma_crossover', fast_period=settings.SMA_FAST, slow_period=settings.SMA_SLOW)
         
         # Get simulation settings
         try:
@@ -271,11 +279,11 @@ def paper_trading():
         
     elif choice == '2':
         try:
-            from strategies.sma_rsi_combo import SMA_RSI_Combo
             from paper_trade.simulator import PaperTradingSimulator
             
             print("\n🤖 LOADING SMA+RSI COMBO STRATEGY...")
-            strategy = SMA_RSI_Combo(
+            strategy = create_strategy(
+                'sma_rsi_combo',
                 sma_fast=50, 
                 sma_slow=80, 
                 rsi_period=14,
@@ -290,7 +298,7 @@ def paper_trading():
             print(f"   Strategy: {strategy.name}")
             simulator.run(days=3)
             
-        except ImportError as e:
+        except (ImportError, KeyError) as e:
             print(f"❌ Error: {e}")
             print("Make sure strategies/sma_rsi_combo.py exists!")
     
@@ -374,27 +382,31 @@ def paper_trading():
         print("\n📈 REAL-TIME PRICE MONITOR")
         print("-" * 40)
         
-        from data.fetcher import DataFetcher
+        from data.stream import MarketStream
         
-        fetcher = DataFetcher()
-        print("Starting real-time price monitor...")
+        stream = MarketStream.shared()
+        ticker = stream.subscribe_ticker(api_config.DEFAULT_SYMBOL)
+        print(f"Streaming {api_config.DEFAULT_SYMBOL} from {stream.ws_url}...")
         print("Press Ctrl+C to stop\n")
+        stream.start()
         
         try:
             while True:
-                price_data = fetcher.fetch_current_price('NXPC/USDT')
+                # Pushed by the exchange on every update; no REST polling
+                price_data = ticker.get(timeout=30)
                 if price_data:
                     timestamp = datetime.now().strftime('%H:%M:%S')
                     print(f"[{timestamp}] "
-                          f"NXPC: ${price_data['price']:,.4f} | "
-                          f"Change: {price_data['change']:+.2f}% | "
-                          f"Vol: ${price_data['volume']:,.0f}")
-                time.sleep(5)  # Update every 5 seconds
+                          f"{price_data['symbol']}: ${price_data['price']:,.4f} | "
+                          f"Change: {price_data['change_pct']:+.2f}% | "
+                          f"Vol: {price_data['volume']:,.0f}")
                 
         except KeyboardInterrupt:
             print("\n⏹️  Price monitor stopped")
         except Exception as e:
             print(f"\n⚠️  Price monitor error: {e}")
+        finally:
+            stream.unsubscribe(ticker)
     
     elif choice == '5':
         return  # Back to main menu
@@ -437,7 +449,8 @@ def nxpc_market_analysis():
     print("-" * 40)
     
     try:
-        from binance.client import Client
+        from exchange.client import get_client
+        from exchange.filters import ExchangeInfoCache
         
         # Load API keys dari file python_binance.py atau .env
         try:
@@ -453,12 +466,14 @@ def nxpc_market_analysis():
             return
         
         # Inisialisasi client
-        client = Client(api_key, api_secret, testnet=True)
+        client = get_client(api_key, api_secret, testnet=True)
         
-        # 1. Dapatkan info pair
-        symbol_info = client.get_symbol_info('NXPCUSDT')
+        # 1. Dapatkan info pair (exchangeInfo di-cache, tidak di-request tiap run)
+        filters = ExchangeInfoCache.shared(client).get('NXPCUSDT')
         print("✅ Pair NXPC/USDT tersedia")
-        print(f"   Status: {symbol_info['status']}")
+        print(f"   Status: {filters.status}")
+        print(f"   Tick: {filters.tick_size:g} | Step: {filters.step_size:g} | "
+              f"Min: {filters.min_qty:g} NXPC / ${filters.min_notional:.2f}")
         
         # 2. Harga saat ini
         ticker = client.get_symbol_ticker(symbol='NXPCUSDT')
@@ -518,7 +533,7 @@ def nxpc_paper_trade_sim():
     print("-" * 40)
     
     try:
-        from binance.client import Client
+        from exchange.client import get_client
         
         # Load API keys
         try:
@@ -529,7 +544,7 @@ def nxpc_paper_trade_sim():
             print("⚠️  API Key tidak ditemukan!")
             return
         
-        client = Client(api_key, api_secret, testnet=True)
+        client = get_client(api_key, api_secret, testnet=True)
         
         # Dapatkan data
         ticker = client.get_symbol_ticker(symbol='NXPCUSDT')
@@ -663,7 +678,9 @@ def nxpc_real_testnet():
         return
     
     try:
-        from binance.client import Client
+        from exchange.client import get_client
+        from exchange.filters import ExchangeInfoCache
+        from exchange.gateway import OrderGateway, OrderIntent
         
         # Load API keys
         try:
@@ -674,7 +691,7 @@ def nxpc_real_testnet():
             print("⚠️  API Key tidak ditemukan!")
             return
         
-        client = Client(api_key, api_secret, testnet=True)
+        client = get_client(api_key, api_secret, testnet=True)
         
         # Cek balance dulu
         print("\n💼 Balance Akun:")
@@ -685,6 +702,12 @@ def nxpc_real_testnet():
                 if free > 0:
                     print(f"   {balance['asset']}: {free:.6f}")
         
+        # Aturan order (tick/step/min notional) dari cache exchangeInfo
+        filters = ExchangeInfoCache.shared(client).get('NXPCUSDT')
+        
+        # Semua order lewat gateway (validasi, client order ID, latency)
+        gateway = OrderGateway(client)
+        
         # Cek harga
         ticker = client.get_symbol_ticker(symbol='NXPCUSDT')
         current_price = float(ticker['price'])
@@ -705,11 +728,12 @@ def nxpc_real_testnet():
             
             if choice == '1':
                 try:
-                    qty = float(input("Jumlah NXPC yang ingin dibeli: "))
+                    qty = filters.round_qty(float(input("Jumlah NXPC yang ingin dibeli: ")))
                     
-                    # Cek min quantity (0.1)
-                    if qty < 0.1:
-                        print(f"❌ Minimal beli 0.1 NXPC")
+                    # Validasi lokal (min qty, step, min notional) sebelum kirim order
+                    reason = filters.validate(qty, current_price, market=True)
+                    if reason:
+                        print(f"❌ Order tidak valid: {reason}")
                         continue
                     
                     print(f"\n⚠️  Eksekusi MARKET BUY...")
@@ -718,10 +742,9 @@ def nxpc_real_testnet():
                     
                     confirm = input("\nKonfirmasi order? (y/n): ").strip().lower()
                     if confirm == 'y':
-                        order = client.order_market_buy(
-                            symbol='NXPCUSDT',
-                            quantity=qty
-                        )
+                        order = gateway.execute(OrderIntent(
+                            'NXPCUSDT', 'BUY', qty, reference_price=current_price
+                        )).response
                         print(f"\n✅ ORDER BERHASIL!")
                         print(f"   Order ID: {order['orderId']}")
                         print(f"   Status: {order['status']}")
@@ -735,10 +758,11 @@ def nxpc_real_testnet():
                     
             elif choice == '2':
                 try:
-                    qty = float(input("Jumlah NXPC yang ingin dijual: "))
+                    qty = filters.round_qty(float(input("Jumlah NXPC yang ingin dijual: ")))
                     
-                    if qty < 0.1:
-                        print(f"❌ Minimal jual 0.1 NXPC")
+                    reason = filters.validate(qty, current_price, market=True)
+                    if reason:
+                        print(f"❌ Order tidak valid: {reason}")
                         continue
                     
                     print(f"\n⚠️  Eksekusi MARKET SELL...")
@@ -747,10 +771,9 @@ def nxpc_real_testnet():
                     
                     confirm = input("\nKonfirmasi order? (y/n): ").strip().lower()
                     if confirm == 'y':
-                        order = client.order_market_sell(
-                            symbol='NXPCUSDT',
-                            quantity=qty
-                        )
+                        order = gateway.execute(OrderIntent(
+                            'NXPCUSDT', 'SELL', qty, reference_price=current_price
+                        )).response
                         print(f"\n✅ ORDER BERHASIL!")
                         print(f"   Order ID: {order['orderId']}")
                         print(f"   Status: {order['status']}")
@@ -764,19 +787,16 @@ def nxpc_real_testnet():
                     
             elif choice == '3':  # Limit Buy
                 try:
-                    qty = float(input("Jumlah NXPC yang ingin dibeli: "))
-                    
-                    if qty < 0.1:
-                        print(f"❌ Minimal beli 0.1 NXPC")
-                        continue
+                    qty = filters.round_qty(float(input("Jumlah NXPC yang ingin dibeli: ")))
                     
                     current_price = float(ticker['price'])
                     limit_price = float(input(f"Harga limit (current: ${current_price:.4f}): ") or str(round(current_price * 0.99, 4)))
+                    limit_price = filters.round_price(limit_price)
                     
                     order_value = qty * limit_price
-                    if order_value < 5:
-                        print(f"❌ Order value terlalu kecil! Minimal $5.00")
-                        print(f"   Value: ${order_value:.2f}")
+                    reason = filters.validate(qty, limit_price)
+                    if reason:
+                        print(f"❌ Order tidak valid: {reason}")
                         continue
                     
                     print(f"\n⚠️  Eksekusi LIMIT BUY...")
@@ -786,11 +806,9 @@ def nxpc_real_testnet():
                     
                     confirm = input("\nKonfirmasi order? (y/n): ").strip().lower()
                     if confirm == 'y':
-                        order = client.order_limit_buy(
-                            symbol='NXPCUSDT',
-                            quantity=qty,
-                            price=str(limit_price)
-                        )
+                        order = gateway.execute(OrderIntent(
+                            'NXPCUSDT', 'BUY', qty, price=limit_price
+                        )).response
                         print(f"\n✅ LIMIT BUY ORDER BERHASIL!")
                         print(f"   Order ID: {order['orderId']}")
                         print(f"   Status: {order['status']}")
@@ -804,19 +822,16 @@ def nxpc_real_testnet():
                     
             elif choice == '4':  # Limit Sell
                 try:
-                    qty = float(input("Jumlah NXPC yang ingin dijual: "))
-                    
-                    if qty < 0.1:
-                        print(f"❌ Minimal jual 0.1 NXPC")
-                        continue
+                    qty = filters.round_qty(float(input("Jumlah NXPC yang ingin dijual: ")))
                     
                     current_price = float(ticker['price'])
                     limit_price = float(input(f"Harga limit (current: ${current_price:.4f}): ") or str(round(current_price * 1.01, 4)))
+                    limit_price = filters.round_price(limit_price, up=True)
                     
                     order_value = qty * limit_price
-                    if order_value < 5:
-                        print(f"❌ Order value terlalu kecil! Minimal $5.00")
-                        print(f"   Value: ${order_value:.2f}")
+                    reason = filters.validate(qty, limit_price)
+                    if reason:
+                        print(f"❌ Order tidak valid: {reason}")
                         continue
                     
                     print(f"\n⚠️  Eksekusi LIMIT SELL...")
@@ -826,11 +841,9 @@ def nxpc_real_testnet():
                     
                     confirm = input("\nKonfirmasi order? (y/n): ").strip().lower()
                     if confirm == 'y':
-                        order = client.order_limit_sell(
-                            symbol='NXPCUSDT',
-                            quantity=qty,
-                            price=str(limit_price)
-                        )
+                        order = gateway.execute(OrderIntent(
+                            'NXPCUSDT', 'SELL', qty, price=limit_price
+                        )).response
                         print(f"\n✅ LIMIT SELL ORDER BERHASIL!")
                         print(f"   Order ID: {order['orderId']}")
                         print(f"   Status: {order['status']}")
@@ -863,6 +876,7 @@ def nxpc_real_testnet():
                     print(f"❌ Error: {e}")
                     
             elif choice == '7':
+                gateway.print_stats()
                 break
                 
             else:
@@ -897,6 +911,7 @@ def view_settings():
 
 def main():
     """Main program loop"""
+    settings.create_directories()
     logger.info("Trading Bot started")
     
     while True:
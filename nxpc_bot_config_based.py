@@ -3,71 +3,89 @@
 NXPC Trading Bot - Config Based Version
 Menggunakan telegram_config.py untuk semua settings
 """
-import time
-import schedule
-import requests
 from datetime import datetime
 import python_binance
+from data.stream import MarketStream
+from exchange.order_store import OrderStore, store_name
+from runtime import BotRuntime
+from utils.notifier import TelegramNotifier
 import sys
 import os
 
 # Import config
 try:
-    from telegram_config import (
-        TELEGRAM_TOKEN,
-        CHAT_ID,
-        CHECK_INTERVAL,
-        SYMBOL,
-        USE_TESTNET,
-        TARGET_PROFIT_PERCENT,
-        STOP_LOSS_PERCENT,
-        COMPOUND_PERCENT
-    )
+    import telegram_config
     print("✅ Config loaded successfully")
 except ImportError as e:
+    telegram_config = None
     print(f"❌ Error loading config: {e}")
     print("   Make sure telegram_config.py exists")
-    sys.exit(1)
 
 class NXPCConfigBot:
     """Bot menggunakan config file"""
     
-    def __init__(self):
+    def __init__(self, config=None, client=None, stream=None, notifier=None, name=None,
+                 store=None):
+        """
+        Args:
+            config: telegram_config-style module (default: telegram_config.py)
+            client, stream, notifier: Shared instances when hosted (runtime/host.py)
+            name: Bot name, prefixed to Telegram messages when set
+            store: Order store name (default: symbol + config file name)
+        """
+        config = config or telegram_config
+        if config is None:
+            raise ValueError("No config: create telegram_config.py or pass config=")
+        
         print("🤖 NXPC TRADING BOT - CONFIG BASED")
         print("=" * 50)
         
         # Load from config
-        self.telegram_token = TELEGRAM_TOKEN
-        self.chat_id = CHAT_ID
-        self.symbol = SYMBOL
-        self.use_testnet = USE_TESTNET
+        self.name = name or config.SYMBOL
+        self.tag = f"[{name}] " if name else ""
+        self.telegram_token = config.TELEGRAM_TOKEN
+        self.chat_id = config.CHAT_ID
+        self.symbol = config.SYMBOL
+        self.base_asset = self.symbol[:-4] if self.symbol.endswith('USDT') else self.symbol
+        self.use_testnet = config.USE_TESTNET
+        self.check_interval = config.CHECK_INTERVAL
         
         # Strategy from config
-        self.target_profit = TARGET_PROFIT_PERCENT
-        self.stop_loss = STOP_LOSS_PERCENT
-        self.compound_percent = COMPOUND_PERCENT
+        self.target_profit = config.TARGET_PROFIT_PERCENT
+        self.stop_loss = config.STOP_LOSS_PERCENT
+        self.compound_percent = config.COMPOUND_PERCENT
         
         # Telegram enabled check
         self.telegram_enabled = bool(self.telegram_token and self.chat_id)
         
+        # Background sender: the trading loop only enqueues
+        self.owns_notifier = notifier is None
+        self.notifier = notifier
+        if self.telegram_enabled and self.notifier is None:
+            self.notifier = TelegramNotifier(self.telegram_token, self.chat_id)
+        
         # Binance client
-        self.client = python_binance.get_client(testnet=self.use_testnet)
+        self.client = client or python_binance.get_client(testnet=self.use_testnet)
         
-        # State
-        self.in_position = False
-        self.entry_price = 0
-        self.position_size = 0
-        self.total_profit = 0
-        self.trades = []
+        # Live price via the shared market stream (REST only as fallback)
+        self.stream = stream or MarketStream.shared(client=self.client)
+        self.ticker_sub = self.stream.subscribe_ticker(self.symbol)
+        
+        # Position / orders / trades persisted per bot, recovered instantly on restart
+        self.store = OrderStore.open(store or store_name(self.symbol, getattr(config, '__file__', None)))
+        self.store.reconcile(self.client)
+        self.runtime = None
         
         # Display config
         print(f"   Symbol: {self.symbol}")
         print(f"   Mode: {'TESTNET' if self.use_testnet else 'LIVE'}")
         print(f"   Telegram: {'✅ ENABLED' if self.telegram_enabled else '❌ DISABLED'}")
-        print(f"   Check Interval: {CHECK_INTERVAL} minutes")
+        print(f"   Check Interval: {self.check_interval} minutes")
         print(f"   Target Profit: {self.target_profit}%")
         print(f"   Stop Loss: {self.stop_loss}%")
         print(f"   Compound: {self.compound_percent}%")
+        if self.in_position:
+            print(f"   Restored position: {self.position_size:g} @ ${self.entry_price:.4f}")
         print("-" * 50)
         
         # Send startup notification
@@ -76,35 +94,41 @@ class NXPCConfigBot:
                 f"🚀 NXPC Trading Bot Started\n"
                 f"Mode: {'TESTNET' if self.use_testnet else 'LIVE'}\n"
                 f"Symbol: {self.symbol}\n"
-                f"Interval: {CHECK_INTERVAL} minutes\n"
+                f"Interval: {self.check_interval} minutes\n"
                 f"Strategy: {self.target_profit}% target, {self.compound_percent}% compounding"
             )
     
+    # State lives in the store; these read it
+    @property
+    def position(self):
+        return self.store.position(self.symbol)
+    
+    @property
+    def in_position(self):
+        return self.position.is_open
+    
+    @property
+    def entry_price(self):
+        return self.position.entry_price
+    
+    @property
+    def position_size(self):
+        return self.position.quantity
+    
+    @property
+    def total_profit(self):
+        return self.position.realized_pnl
+    
+    @property
+    def trades(self):
+        return self.store.symbol_trades(self.symbol)
+    
     def send_telegram(self, message):
-        """Send Telegram message"""
+        """Queue a Telegram message (delivered by the background notifier)"""
         if not self.telegram_enabled:
             return False
-            
-        try:
-            url = f"https://api.telegram.org/bot{self.telegram_token}/sendMessage"
-            payload = {
-                'chat_id': self.chat_id,
-                'text': message,
-                'parse_mode': 'HTML'
-            }
-            
-            response = requests.post(url, json=payload, timeout=10)
-            
-            if response.status_code == 200:
-                print(f"   ✅ Telegram sent: {message[:40]}...")
-                return True
-            else:
-                print(f"   ❌ Telegram failed: {response.status_code}")
-                return False
-                
-        except Exception as e:
-            print(f"   ❌ Telegram error: {e}")
-            return False
+        
+        return self.notifier.send(self.tag + message)
     
     def market_check(self):
         """Market check function"""
@@ -114,28 +138,36 @@ class NXPCConfigBot:
         
         try:
             # Get price
-            ticker = self.client.get_symbol_ticker(symbol=self.symbol)
-            price = float(ticker['price'])
+            price = self.stream.latest_price(self.symbol, max_age=60)
+            if price is None:
+                ticker = self.client.get_symbol_ticker(symbol=self.symbol)
+                price = float(ticker['price'])
             
             # Get account info
             account = self.client.get_account()
             
             usdt_balance = 0
-            nxpc_balance = 0
+            base_balance = 0
+            base_total = 0
             
             for balance in account['balances']:
                 if balance['asset'] == 'USDT':
                     usdt_balance = float(balance['free'])
-                elif balance['asset'] == 'NXPC':
-                    nxpc_balance = float(balance['free'])
+                elif balance['asset'] == self.base_asset:
+                    base_balance = float(balance['free'])
+                    base_total = base_balance + float(balance.get('locked', 0))
+            
+            # Coins sold / moved outside the bot shrink the stored position
+            # (coins locked in open orders are still held)
+            self.store.reconcile_position(self.symbol, base_total)
             
             # Calculate total value
-            total_value = usdt_balance + (nxpc_balance * price)
+            total_value = usdt_balance + (base_balance * price)
             
             # Display info
             print(f"   Price: ${price:.4f}")
             print(f"   USDT: ${usdt_balance:.2f}")
-            print(f"   NXPC: {nxpc_balance:.2f}")
+            print(f"   {self.base_asset}: {base_balance:.2f}")
             print(f"   Total: ${total_value:.2f}")
             
             if self.in_position:
@@ -169,7 +201,7 @@ class NXPCConfigBot:
                     f"⏰ Hourly Update\n"
                     f"Price: ${price:.4f}\n"
                     f"USDT: ${usdt_balance:.2f}\n"
-                    f"NXPC: {nxpc_balance:.2f}\n"
+                    f"{self.base_asset}: {base_balance:.2f}\n"
                     f"In Position: {'Yes' if self.in_position else 'No'}"
                 )
                 if self.in_position:
@@ -190,43 +222,56 @@ class NXPCConfigBot:
             
             return False
     
+    def register(self, runtime, group=None):
+        """Add this bot's jobs to a runtime (its own, or a shared host runtime)"""
+        prefix = f"{group}." if group else ""
+        self.runtime = runtime
+        return [
+            runtime.every(self.check_interval * 60, self.market_check,
+                          name=prefix + 'market_check', group=group),
+            # Daily summary at 23:00
+            runtime.daily('23:00', lambda: self.send_telegram("📅 Daily summary: Bot is running"),
+                          name=prefix + 'daily_summary', group=group),
+            # Keep alive message every 6 hours
+            runtime.every(6 * 3600, lambda: self.send_telegram("🤖 Bot is alive and monitoring"),
+                          name=prefix + 'keep_alive', run_immediately=False, group=group),
+        ]
+    
     def run_24_7(self):
         """Run bot 24/7"""
-        interval = CHECK_INTERVAL
+        interval = self.check_interval
         
         print(f"\n🔄 Starting 24/7 Operation")
         print(f"   Interval: {interval} minutes")
         print(f"   Press Ctrl+C to stop")
         print("=" * 50)
         
-        # Initial market check
-        self.market_check()
+        self.stream.start()
         
-        # Schedule periodic checks
-        schedule.every(interval).minutes.do(self.market_check)
+        self.register(BotRuntime(name='NXPCConfigBot'))
+        self.runtime.on_stop(self._on_stop)
+        self.runtime.run()
+    
+    def _on_stop(self):
+        """Shutdown: stop the stream, notify, summarize"""
+        print("\n\n🛑 Bot stopped by user")
+        self.stream.stop()
         
-        # Daily summary at 23:00
-        schedule.every().day.at("23:00").do(
-            lambda: self.send_telegram("📅 Daily summary: Bot is running")
-        )
+        if self.telegram_enabled:
+            self.send_telegram("🛑 Bot stopped manually\nUser interrupt")
+        self.close()
         
-        # Keep alive message every 6 hours
-        schedule.every(6).hours.do(
-            lambda: self.send_telegram("🤖 Bot is alive and monitoring")
-        )
+        self.print_summary()
+    
+    def close(self):
+        """Release the ticker subscription, snapshot state; flush the notifier if it is ours"""
+        self.stream.unsubscribe(self.ticker_sub)
+        self.store.close()
         
-        try:
-            while True:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
-                
-        except KeyboardInterrupt:
-            print("\n\n🛑 Bot stopped by user")
-            
-            if self.telegram_enabled:
-                self.send_telegram("🛑 Bot stopped manually\nUser interrupt")
-            
-            self.print_summary()
+        if self.notifier is not None and self.owns_notifier:
+            self.notifier.stop()
+            stats = self.notifier.stats()
+            print(f"   📨 Telegram: {stats['messages_sent']} sent, {stats['spilled']} spilled to disk")
     
     def print_summary(self):
         """Print summary"""
@@ -240,12 +285,13 @@ class NXPCConfigBot:
         if self.trades:
             print("\nLast 3 trades:")
             for trade in self.trades[-3:]:
-                time_str = trade.get('time', 'N/A')
-                if hasattr(time_str, 'strftime'):
-                    time_str = time_str.strftime('%H:%M:%S')
-                print(f"  [{time_str}] {trade.get('type', 'N/A')}")
+                print(f"  [{trade['time'][11:19]}] {trade['side']} "
+                      f"{trade['quantity']:g} @ ${trade['price']:.4f}")
 
 if __name__ == "__main__":
+    if telegram_config is None:
+        sys.exit(1)
+    
     print("🤖 LOADING CONFIG BASED BOT...")
     bot = NXPCConfigBot()
     bot.run_24_7()
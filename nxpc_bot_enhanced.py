@@ -5,18 +5,32 @@ Enhanced NXPC Trading Bot with RSI + SMA
 import time
 import schedule
 from datetime import datetime
-import pandas as pd
 from binance.client import Client
 import python_binance
+from data.candle_buffer import CandleBuffer
+from data.market_cache import CachedClient
+from exchange.filters import ExchangeInfoCache
+from exchange.user_stream import UserDataStream
+from strategies.indicators import rsi
 import numpy as np
 
 class EnhancedNXPCTradingBot:
     """Enhanced bot dengan RSI + SMA strategy"""
     
     def __init__(self):
-        self.client = python_binance.get_client()
+        # Cached so one decision cycle costs one REST call per endpoint
+        self.client = CachedClient(python_binance.get_client())
         self.symbol = 'NXPCUSDT'
-        self.min_notional = 5.0
+        
+        # Trading rules from exchangeInfo (loaded once, cached)
+        self.filters = ExchangeInfoCache.shared(self.client).get(self.symbol)
+        self.min_notional = self.filters.min_notional
+        
+        # Balances from the user-data stream (no get_account per cycle)
+        self.user = UserDataStream.shared(client=self.client).start()
+        
+        # Recent 1h candles kept in memory; one small kline request per cycle
+        self.candles = CandleBuffer.shared(self.symbol, '1h', capacity=200)
         self.trades = []
         
         print(f"🚀 ENHANCED NXPC TRADING BOT")
@@ -25,26 +39,12 @@ class EnhancedNXPCTradingBot:
         print("-" * 50)
     
     def calculate_rsi(self, period=14):
-        """Calculate RSI indicator"""
+        """Calculate RSI indicator (Wilder, same as the backtest strategies)"""
         try:
-            klines = self.client.get_historical_klines(
-                symbol=self.symbol,
-                interval='1h',
-                limit=period + 1
-            )
-            
-            if len(klines) > period:
-                closes = [float(k[4]) for k in klines]
-                prices = pd.Series(closes)
-                
-                # Calculate RSI
-                delta = prices.diff()
-                gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-                loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-                rs = gain / loss
-                rsi = 100 - (100 / (1 + rs))
-                
-                return rsi.iloc[-1]
+            # Whole buffer: Wilder smoothing needs history to converge
+            closes = self.candles.closes()
+            if len(closes) > period:
+                return float(rsi(closes, period)[-1])
             return None
         except:
             return None
@@ -52,15 +52,9 @@ class EnhancedNXPCTradingBot:
     def calculate_sma(self, period=20):
         """Calculate Simple Moving Average"""
         try:
-            klines = self.client.get_historical_klines(
-                symbol=self.symbol,
-                interval='1h',
-                limit=period
-            )
-            
-            if len(klines) >= period:
-                closes = [float(k[4]) for k in klines]
-                return sum(closes) / len(closes)
+            closes = self.candles.closes(period)
+            if len(closes) >= period:
+                return float(closes.mean())
             return None
         except:
             return None
@@ -77,18 +71,12 @@ class EnhancedNXPCTradingBot:
             change = float(ticker_24h['priceChangePercent'])
             volume = float(ticker_24h['volume'])
             
-            # Balance
-            account = self.client.get_account()
-            nxpc_balance = 0
-            usdt_balance = 0
-            
-            for balance in account['balances']:
-                if balance['asset'] == 'NXPC':
-                    nxpc_balance = float(balance['free'])
-                elif balance['asset'] == 'USDT':
-                    usdt_balance = float(balance['free'])
+            # Balance (local book, kept current by the user-data stream)
+            nxpc_balance = self.user.book.free('NXPC')
+            usdt_balance = self.user.book.free('USDT')
             
-            # Indicators
+            # Indicators (from the candle buffer, no full kline refetch)
+            self.candles.update(self.client)
             sma_20 = self.calculate_sma(20)
             rsi_14 = self.calculate_rsi(14)
             
@@ -123,10 +111,9 @@ class EnhancedNXPCTradingBot:
         # BUY Signal: Price below SMA20 AND RSI < 30 (oversold)
         if price < sma_20 and rsi_14 < 30 and usdt_balance > 10:
             min_value = 5.5
-            quantity = min_value / price
-            quantity = round(quantity * 10) / 10
+            quantity = self.filters.round_qty(min_value / price)
             
-            if quantity >= 0.1:
+            if self.filters.validate(quantity, price, market=True) is None:
                 signal = 'BUY'
                 reason = f"Price${price:.4f}<SMA20${sma_20:.4f}, RSI{rsi_14:.1f}<30"
                 return {'signal': signal, 'quantity': quantity, 'reason': reason}
@@ -134,10 +121,9 @@ class EnhancedNXPCTradingBot:
         # SELL Signal: Price above SMA20+2% AND RSI > 70 (overbought)
         elif price > sma_20 * 1.02 and rsi_14 > 70 and nxpc_balance > 1:
             # Sell 30% of position (less aggressive)
-            quantity = max(0.1, nxpc_balance * 0.3)
-            quantity = round(quantity * 10) / 10
+            quantity = self.filters.round_qty(max(self.filters.min_qty, nxpc_balance * 0.3))
             
-            if quantity * price >= self.min_notional:
+            if self.filters.validate(quantity, price, market=True) is None:
                 signal = 'SELL'
                 reason = f"Price${price:.4f}>SMA20+2%${sma_20*1.02:.4f}, RSI{rsi_14:.1f}>70"
                 return {'signal': signal, 'quantity': quantity, 'reason': reason}
@@ -5,29 +5,39 @@ Simple NXPC Trading Dashboard
 import time
 from datetime import datetime
 import python_binance
+from data.stream import MarketStream
+from exchange.user_stream import UserDataStream
 
-def get_dashboard_data():
-    """Get data for dashboard"""
-    client = python_binance.get_client()
-    
-    # Account
-    account = client.get_account()
-    nxpc_free = 0
-    usdt_free = 0
+def get_dashboard_data(client=None, stream=None, user=None):
+    """Get data for dashboard (market data and balances from the streams)"""
+    client = client or python_binance.get_client()
     
-    for balance in account['balances']:
-        if balance['asset'] == 'NXPC':
-            nxpc_free = float(balance['free'])
-        elif balance['asset'] == 'USDT':
-            usdt_free = float(balance['free'])
+    # Account (user-data balance book; REST only without one)
+    if user is not None:
+        nxpc_free = user.book.free('NXPC')
+        usdt_free = user.book.free('USDT')
+    else:
+        account = client.get_account()
+        nxpc_free = 0
+        usdt_free = 0
+        
+        for balance in account['balances']:
+            if balance['asset'] == 'NXPC':
+                nxpc_free = float(balance['free'])
+            elif balance['asset'] == 'USDT':
+                usdt_free = float(balance['free'])
     
     # Market
-    ticker = client.get_symbol_ticker(symbol='NXPCUSDT')
-    price = float(ticker['price'])
-    
-    ticker_24h = client.get_ticker(symbol='NXPCUSDT')
-    change = float(ticker_24h['priceChangePercent'])
-    volume = float(ticker_24h['volume'])
+    ticker = stream.latest_ticker('NXPCUSDT') if stream else None
+    if ticker:
+        price = ticker['price']
+        change = ticker['change_pct']
+        volume = ticker['volume']
+    else:
+        ticker_24h = client.get_ticker(symbol='NXPCUSDT')
+        price = float(ticker_24h['lastPrice'])
+        change = float(ticker_24h['priceChangePercent'])
+        volume = float(ticker_24h['volume'])
     
     # Portfolio value
     nxpc_value = nxpc_free * price
@@ -74,9 +84,15 @@ def main():
     """Main dashboard loop"""
     print("🚀 Starting NXPC Trading Dashboard...")
     
+    client = python_binance.get_client()
+    stream = MarketStream.shared()
+    stream.subscribe_ticker('NXPCUSDT')
+    stream.start()
+    user = UserDataStream.shared(client=client).start()
+    
     while True:
         try:
-            data = get_dashboard_data()
+            data = get_dashboard_data(client, stream, user)
             print_dashboard(data)
             
             cmd = input("\n> ").strip().lower()
@@ -101,6 +117,9 @@ def main():
         except Exception as e:
             print(f"❌ Error: {e}")
             time.sleep(5)
+    
+    user.stop()
+    stream.stop()
 
 if __name__ == "__main__":
     main()
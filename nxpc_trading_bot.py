@@ -5,18 +5,38 @@ Simple NXPC/USDT Trading Bot
 import time
 import schedule
 from datetime import datetime
-import pandas as pd
 from binance.client import Client
 import python_binance
+from data.market_cache import CachedClient
+from exchange.filters import ExchangeInfoCache
+from exchange.gateway import OrderGateway, OrderIntent
+from exchange.order_store import OrderStore
+from exchange.user_stream import UserDataStream
 
 class NXPCTradingBot:
     """Trading bot khusus untuk NXPC/USDT"""
     
     def __init__(self):
-        self.client = python_binance.get_client()
+        # Cached so one decision cycle costs one REST call per endpoint
+        self.client = CachedClient(python_binance.get_client())
         self.symbol = 'NXPCUSDT'
-        self.min_notional = 5.0  # $5 minimum
-        self.min_qty = 0.1  # 0.1 NXPC minimum
+        
+        # Trading rules from exchangeInfo (loaded once, cached)
+        self.filters = ExchangeInfoCache.shared(self.client).get(self.symbol)
+        self.min_notional = self.filters.min_notional
+        self.min_qty = self.filters.min_qty
+        
+        # Order / position state persisted across restarts (no REST rebuild on boot)
+        self.store = OrderStore.open('nxpc_trading_bot')
+        
+        # Orders go through the gateway (validation, client order IDs, latency)
+        self.gateway = OrderGateway(self.client, store=self.store)
+        
+        # Only orders still open before the restart are looked up
+        self.store.reconcile(self.client)
+        
+        # Balances from the user-data stream (no get_account per cycle)
+        self.user = UserDataStream.shared(client=self.client, gateway=self.gateway).start()
         
         # Trading history
         self.trades = []
@@ -40,16 +60,9 @@ class NXPCTradingBot:
             change = float(ticker_24h['priceChangePercent'])
             volume = float(ticker_24h['volume'])
             
-            # Get balance
-            account = self.client.get_account()
-            nxpc_balance = 0
-            usdt_balance = 0
-            
-            for balance in account['balances']:
-                if balance['asset'] == 'NXPC':
-                    nxpc_balance = float(balance['free'])
-                elif balance['asset'] == 'USDT':
-                    usdt_balance = float(balance['free'])
+            # Get balance (local book, kept current by the user-data stream)
+            nxpc_balance = self.user.book.free('NXPC')
+            usdt_balance = self.user.book.free('USDT')
             
             return {
                 'price': price,
@@ -103,11 +116,10 @@ class NXPCTradingBot:
         if price < sma_20 and usdt_balance > 10:
             # Calculate quantity (min $5.50 for safety)
             min_value = 5.5
-            quantity = min_value / price
-            # Round to nearest 0.1
-            quantity = round(quantity * 10) / 10
+            # Round down to the symbol's step size
+            quantity = self.filters.round_qty(min_value / price)
             
-            if quantity >= self.min_qty:
+            if self.filters.validate(quantity, price, market=True) is None:
                 signal = 'BUY'
                 reason = f"Price ${price:.4f} < SMA20 ${sma_20:.4f}"
                 return {'signal': signal, 'quantity': quantity, 'reason': reason}
@@ -115,10 +127,9 @@ class NXPCTradingBot:
         # SELL signal: Price above SMA * 1.02 and we have NXPC
         elif price > sma_20 * 1.02 and nxpc_balance > 1:
             # Sell half of NXPC balance
-            quantity = max(self.min_qty, nxpc_balance * 0.5)
-            quantity = round(quantity * 10) / 10  # Round to 0.1
+            quantity = self.filters.round_qty(max(self.min_qty, nxpc_balance * 0.5))
             
-            if quantity * price >= self.min_notional:
+            if self.filters.validate(quantity, price, market=True) is None:
                 signal = 'SELL'
                 reason = f"Price ${price:.4f} > SMA20+2% ${sma_20*1.02:.4f}"
                 return {'signal': signal, 'quantity': quantity, 'reason': reason}
@@ -147,35 +158,38 @@ class NXPCTradingBot:
             print(f"   Price: ${price:.4f}")
             print(f"   Value: ${value:.2f}")
             
+            # Rejected locally instead of by the exchange (-1013)
+            invalid = self.filters.validate(quantity, price, market=True)
+            if invalid:
+                print(f"❌ Invalid order: {invalid}")
+                return False
+            
             confirm = input(f"\nExecute {signal} order? (y/n): ").strip().lower()
             
             if confirm != 'y':
                 print("❌ Trade cancelled")
                 return False
             
-            # Execute order
-            if signal == 'BUY':
-                order = self.client.order_market_buy(
-                    symbol=self.symbol,
-                    quantity=quantity
-                )
-            else:  # SELL
-                order = self.client.order_market_sell(
-                    symbol=self.symbol,
-                    quantity=quantity
-                )
+            # Execute order (signal_time = now: latency stages start after the
+            # manual confirmation, not while waiting for the operator)
+            intent = OrderIntent(self.symbol, signal, quantity, reason=reason,
+                                 signal_time=time.perf_counter(), reference_price=price)
+            order = self.gateway.execute(intent)
+            self.gateway.wait(order, timeout=30)
             
             print(f"✅ {signal} ORDER EXECUTED!")
-            print(f"   Order ID: {order['orderId']}")
-            print(f"   Status: {order['status']}")
+            print(f"   Order ID: {order.order_id}")
+            print(f"   Status: {order.status}")
+            if order.executed_qty:
+                print(f"   Filled: {order.executed_qty:g} NXPC @ ${order.avg_price:.4f}")
             
             # Record trade
             trade = {
                 'timestamp': datetime.now(),
                 'signal': signal,
-                'quantity': quantity,
-                'price': price,
-                'order_id': order['orderId'],
+                'quantity': order.executed_qty or quantity,
+                'price': order.avg_price or price,
+                'order_id': order.order_id,
                 'reason': reason
             }
             self.trades.append(trade)
@@ -255,6 +269,8 @@ class NXPCTradingBot:
             for trade in self.trades[-5:]:
                 time_str = trade['timestamp'].strftime('%H:%M:%S')
                 print(f"  [{time_str}] {trade['signal']} {trade['quantity']} NXPC @ ${trade['price']:.4f}")
+        
+        self.gateway.print_stats()
 
 if __name__ == "__main__":
     bot = NXPCTradingBot()
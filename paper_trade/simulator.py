@@ -10,6 +10,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.settings import settings
 from config.api_config import api_config
+from strategies.base_strategy import strategy_signals
+from strategies.registry import resolve_strategy
 
 
 class PaperTradingSimulator:
@@ -18,11 +20,12 @@ class PaperTradingSimulator:
         Initialize Paper Trading Simulator dengan support compounding
         
         Args:
-            strategy: Trading strategy instance
+            strategy: Trading strategy instance or registry config string
+                      (e.g. "sma_rsi_combo(sma_fast=20)")
             initial_balance: Starting balance (default from settings)
             compounding: True untuk reinvest semua profit (compounding mode)
         """
-        self.strategy = strategy
+        self.strategy = resolve_strategy(strategy)
         self.compounding = compounding
         
         if initial_balance is None:
@@ -62,8 +65,13 @@ class PaperTradingSimulator:
             print(f"⚠️  Exchange connection error: {e}")
             self.exchange = None
     
-    def run(self, symbol='NXPC/USDT', timeframe='1h', days=7):
-        """Run paper trading simulation dengan support compounding"""
+    def run(self, symbol='NXPC/USDT', timeframe='1h', days=7, df=None):
+        """
+        Run paper trading simulation dengan support compounding
+
+        Args:
+            df: Optional OHLCV DataFrame; when given, the download step is skipped
+        """
         print(f"\n📝 PAPER TRADING: {symbol} {timeframe}")
         print(f"💰 Initial Balance: ${self.balance:.2f}")
         print(f"🤖 Strategy: {self.strategy.name}")
@@ -81,43 +89,9 @@ class PaperTradingSimulator:
         self.trades = []
         self._trade_logs = []
         
-        # 1. Fetch historical data
-        print(f"\n📥 Downloading {days} days of data...")
-        
-        download_start = time.time()
-        
-        try:
-            print("   Download [", end="", flush=True)
-            
-            if self.exchange:
-                self.exchange.timeout = 20000
-                ohlcv = self.exchange.fetch_ohlcv(
-                    symbol, 
-                    timeframe, 
-                    limit=days * 24
-                )
-                
-                for i in range(10):
-                    time.sleep(0.05)
-                    print("=", end="", flush=True)
-                
-                print(f"] ✅ ({time.time() - download_start:.1f}s)")
-                
-                if ohlcv and len(ohlcv) > 50:
-                    print(f"   Downloaded {len(ohlcv)} candles")
-                    df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-                    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-                    df.set_index('timestamp', inplace=True)
-                else:
-                    print(f"   ⚠️  Insufficient data: {len(ohlcv) if ohlcv else 0} candles")
-                    df = self._generate_fallback_data(days)
-            
-            else:
-                df = self._generate_fallback_data(days)
-                
-        except Exception as e:
-            print(f"] ❌ ERROR: {type(e).__name__}")
-            df = self._generate_fallback_data(days)
+        # 1. Fetch historical data (skipped when caller supplies a frame)
+        if df is None:
+            df = self._download_data(symbol, timeframe, days)
         
         print(f"✅ Ready: {len(df)} candles for simulation")
         
@@ -160,8 +134,7 @@ class PaperTradingSimulator:
                     continue
             
             try:
-                df_with_signals = self.strategy.generate_signals(current_data)
-                latest_signal = df_with_signals['signal'].iloc[-1]
+                latest_signal = strategy_signals(self.strategy, current_data)[-1]
                 
                 # Execute based on signal
                 if latest_signal == 1 and self.position == 0:
@@ -193,42 +166,64 @@ class PaperTradingSimulator:
         # Final results
         self._print_results()
     
-    def _generate_fallback_data(self, days):
+    def _download_data(self, symbol, timeframe, days):
+        """Download OHLCV from the exchange, falling back to generated data"""
+        print(f"\n📥 Downloading {days} days of data...")
+        
+        download_start = time.time()
+        
+        try:
+            print("   Download [", end="", flush=True)
+            
+            if self.exchange:
+                self.exchange.timeout = 20000
+                ohlcv = self.exchange.fetch_ohlcv(
+                    symbol, 
+                    timeframe, 
+                    limit=days * 24
+                )
+                
+                for i in range(10):
+                    time.sleep(0.05)
+                    print("=", end="", flush=True)
+                
+                print(f"] ✅ ({time.time() - download_start:.1f}s)")
+                
+                if ohlcv and len(ohlcv) > 50:
+                    print(f"   Downloaded {len(ohlcv)} candles")
+                    df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+                    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+                    df.set_index('timestamp', inplace=True)
+                else:
+                    print(f"   ⚠️  Insufficient data: {len(ohlcv) if ohlcv else 0} candles")
+                    df = self._generate_fallback_data(days, timeframe)
+            
+            else:
+                df = self._generate_fallback_data(days, timeframe)
+                
+        except Exception as e:
+            print(f"] ❌ ERROR: {type(e).__name__}")
+            df = self._generate_fallback_data(days, timeframe)
+        
+        return df
+    
+    def _generate_fallback_data(self, days, timeframe='1h'):
         """Generate fallback data yang lebih realistic untuk small capital"""
-        import numpy as np
+        from data.synthetic import SyntheticMarketGenerator, SECONDS_PER_YEAR
+        from utils.helpers import interval_to_seconds
         
-        n_candles = days * 24
-        base_price = 0.45
+        n_candles = days * 86400 // interval_to_seconds(timeframe)
         
-        # Generate returns yang lebih volatile untuk crypto small cap
-        returns = np.random.normal(0.002, 0.03, n_candles)  # Lebih volatile
-        prices = base_price * np.exp(np.cumsum(returns))
+        # Hourly log returns ~ N(0.2%, 3%) - volatile small cap crypto, annualized
+        hours_per_year = SECONDS_PER_YEAR / 3600
+        sigma = 0.03 * hours_per_year ** 0.5
+        mu = 0.002 * hours_per_year + 0.5 * sigma ** 2
         
-        fallback_data = []
-        current_time = int(time.time() * 1000) - (n_candles * 3600000)
+        generator = SyntheticMarketGenerator(interval=timeframe, start_price=0.45, base_volume=5000.0)
+        df = generator.generate(n_candles, model='gbm', mu=mu, sigma=sigma)
+        df.index.name = 'timestamp'
         
-        for i in range(n_candles):
-            timestamp = current_time + (i * 3600000)
-            close_price = prices[i]
-            open_price = close_price * (1 + np.random.normal(0, 0.015))  # Spread lebih besar
-            high_price = max(open_price, close_price) * (1 + abs(np.random.normal(0, 0.02)))
-            low_price = min(open_price, close_price) * (1 - abs(np.random.normal(0, 0.02)))
-            volume = 5000 + np.random.normal(0, 3000)  # Volume lebih kecil untuk small cap
-            
-            fallback_data.append([
-                timestamp,
-                open_price,
-                high_price,
-                low_price,
-                close_price,
-                abs(volume)
-            ])
-        
-        df = pd.DataFrame(fallback_data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df.set_index('timestamp', inplace=True)
-        
-        print(f"   Generated {len(fallback_data)} fallback candles (small cap simulation)")
+        print(f"   Generated {len(df)} fallback candles (small cap simulation)")
         return df
     
     def _execute_buy(self, price, symbol_base, add_to_trade_list=True):
@@ -0,0 +1,4 @@
+from .bot_runtime import BotRuntime, Job, run_bot
+from .host import BotHost
+
+__all__ = ['BotRuntime', 'Job', 'run_bot', 'BotHost']
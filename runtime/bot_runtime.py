@@ -0,0 +1,477 @@
+# runtime/bot_runtime.py
+"""
+Event-driven asyncio bot runtime
+
+Replaces the `schedule.run_pending(); time.sleep(1)` loops. Strategy
+checks, stream events, order execution and notifications are independent
+asyncio tasks:
+
+    - jobs run on a thread pool with a timeout, so one slow REST call never
+      delays another job; a job still running when it is due again is
+      skipped instead of piling up
+    - orders go through a bounded queue consumed one at a time (callers
+      block when it is full = backpressure)
+    - notifications go through a bounded queue that drops the oldest
+      message when full; they never block a decision
+
+Usage:
+    runtime = BotRuntime(name='nxpc')
+    runtime.every(300, bot.check_and_trade)
+    runtime.daily('23:00', bot.daily_report)
+    runtime.on_stop(bot.print_summary)
+    runtime.run()
+
+    run_bot(bot, interval_minutes=5)      # any existing bot class
+"""
+import asyncio
+import concurrent.futures
+import signal
+import threading
+import time
+from datetime import datetime, timedelta
+
+# Import settings
+try:
+    from config.settings import settings
+except ImportError:
+    # Fallback
+    class SimpleSettings:
+        RUNTIME_JOB_TIMEOUT = 120.0
+        RUNTIME_ORDER_TIMEOUT = 30.0
+        RUNTIME_NOTIFY_TIMEOUT = 15.0
+        RUNTIME_QUEUE_SIZE = 100
+        RUNTIME_WORKERS = 8
+        RUNTIME_SHUTDOWN_TIMEOUT = 10.0
+    settings = SimpleSettings()
+
+
+class Job:
+    """One scheduled or event-driven unit of bot work"""
+
+    def __init__(self, name, func, timeout=None, interval=None, hourly_minute=None,
+                 daily_at=None, subscription=None, run_immediately=False, group=None):
+        self.name = name
+        self.group = group
+        self.func = func
+        self.timeout = timeout or settings.RUNTIME_JOB_TIMEOUT
+        self.interval = interval
+        self.hourly_minute = hourly_minute
+        self.daily_at = daily_at
+        self.subscription = subscription
+        self.run_immediately = run_immediately
+
+        self.running = False
+        self.future = None      # current / last run (executor or coroutine future)
+        self.runs = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.cpu_time = 0.0
+        self.last_error = None
+
+    def next_delay(self, now=None):
+        """Seconds until the next scheduled run"""
+        now = now or datetime.now()
+
+        if self.interval is not None:
+            return self.interval
+
+        if self.hourly_minute is not None:
+            target = now.replace(minute=self.hourly_minute, second=0, microsecond=0)
+            if target <= now:
+                target += timedelta(hours=1)
+            return (target - now).total_seconds()
+
+        hour, minute = (int(x) for x in self.daily_at.split(':'))
+        target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if target <= now:
+            target += timedelta(days=1)
+        return (target - now).total_seconds()
+
+    def stats(self):
+        return {
+            'runs': self.runs,
+            'errors': self.errors,
+            'timeouts': self.timeouts,
+            'skipped': self.skipped,
+            'dropped': self.dropped,
+            'avg_ms': self.total_time / self.runs * 1000 if self.runs else 0.0,
+            'max_ms': self.max_time * 1000,
+            'cpu_ms': self.cpu_time * 1000,
+            'last_error': self.last_error,
+        }
+
+
+class BotRuntime:
+    """Runs bot jobs, order execution and notifications as asyncio tasks"""
+
+    def __init__(self, name='bot', notify_sink=None, workers=None, queue_size=None):
+        """
+        Args:
+            notify_sink: Blocking callable(message) that delivers a notification
+            workers: Thread pool size for blocking bot code
+        """
+        self.name = name
+        self.notify_sink = notify_sink
+        self.queue_size = queue_size or settings.RUNTIME_QUEUE_SIZE
+        self.jobs = []
+        self.stop_hooks = []
+
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers or settings.RUNTIME_WORKERS, thread_name_prefix=f"{name}-job")
+        self.loop = None
+        self._loop_thread = None
+        self._stop_event = None
+        self._orders = None
+        self._notifications = None
+        self._tasks = []
+        self._job_tasks = {}
+        self._inflight = set()
+
+        self.orders_done = 0
+        self.orders_failed = 0
+        self.notifications_sent = 0
+        self.notifications_failed = 0
+        self.notifications_dropped = 0
+
+    # ==================== REGISTRATION ====================
+
+    def every(self, seconds, func, name=None, timeout=None, run_immediately=True, group=None):
+        """Run func every `seconds` (first run immediately by default)"""
+        return self.add(Job(name or func.__name__, func, timeout, interval=seconds,
+                            run_immediately=run_immediately, group=group))
+
+    def hourly(self, func, minute=0, name=None, timeout=None, run_immediately=False, group=None):
+        """Run func every hour at :minute"""
+        return self.add(Job(name or func.__name__, func, timeout, hourly_minute=minute,
+                            run_immediately=run_immediately, group=group))
+
+    def daily(self, at, func, name=None, timeout=None, group=None):
+        """Run func every day at 'HH:MM' (local time)"""
+        return self.add(Job(name or func.__name__, func, timeout, daily_at=at, group=group))
+
+    def on_event(self, subscription, func, name=None, timeout=None, group=None):
+        """Run func(item) for every item of a data.stream Subscription"""
+        return self.add(Job(name or f"{func.__name__}[{subscription.stream_name}]", func, timeout,
+                            subscription=subscription, group=group))
+
+    def add(self, job):
+        """Register a job; starts right away when the runtime is running (thread-safe)"""
+        self.jobs.append(job)
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._start_job, job)
+        return job
+
+    def remove(self, job):
+        """Unregister a job (thread-safe); a run already in progress finishes"""
+        if job in self.jobs:
+            self.jobs.remove(job)
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._cancel_job, job)
+
+    def remove_group(self, group, timeout=None):
+        """
+        Unregister every job of one group (e.g. one hosted bot)
+
+        Also waits (up to `timeout`, default RUNTIME_SHUTDOWN_TIMEOUT) for
+        runs already in progress, so the caller can release what those jobs
+        use (order store, notifier) once this returns. Called from the event
+        loop thread it cannot wait and only cancels.
+
+        Returns:
+            (removed jobs, jobs still running after the timeout)
+        """
+        jobs = [job for job in self.jobs if job.group == group]
+        for job in jobs:
+            self.remove(job)
+
+        running = []
+        if self.loop is not None and not self.loop.is_closed() \
+                and threading.current_thread() is not self._loop_thread:
+            drain = asyncio.run_coroutine_threadsafe(
+                self._drain(jobs, timeout or settings.RUNTIME_SHUTDOWN_TIMEOUT), self.loop)
+            running = drain.result()
+        return jobs, running
+
+    def on_stop(self, func):
+        """Blocking callable run once on shutdown (summaries, final reports)"""
+        self.stop_hooks.append(func)
+        return func
+
+    # ==================== EXECUTION ====================
+
+    async def _call(self, job, *args):
+        """Run one job invocation with timeout; never raises"""
+        if job not in self.jobs:
+            return   # removed while this run was being scheduled
+        job.running = True
+        started = time.perf_counter()
+
+        try:
+            if asyncio.iscoroutinefunction(job.func):
+                job.future = asyncio.ensure_future(job.func(*args))
+                try:
+                    await asyncio.wait_for(job.future, job.timeout)
+                finally:
+                    job.running = False
+            else:
+                job.future = self.loop.run_in_executor(self.executor, self._timed, job, *args)
+                # The thread cannot be killed: keep `running` until it really ends
+                job.future.add_done_callback(lambda _: setattr(job, 'running', False))
+                await asyncio.wait_for(asyncio.shield(job.future), job.timeout)
+            job.runs += 1
+        except asyncio.TimeoutError:
+            job.timeouts += 1
+            print(f"⏱️  [{self.name}] {job.name} exceeded {job.timeout:g}s")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.errors += 1
+            job.last_error = str(e)
+            job.running = False
+            print(f"❌ [{self.name}] {job.name} failed: {e}")
+        finally:
+            elapsed = time.perf_counter() - started
+            job.total_time += elapsed
+            job.max_time = max(job.max_time, elapsed)
+
+    @staticmethod
+    def _timed(job, *args):
+        """Executor side of a sync job: also accounts the thread's CPU time"""
+        started = time.thread_time()
+        try:
+            return job.func(*args)
+        finally:
+            job.cpu_time += time.thread_time() - started
+
+    def _start_job(self, job):
+        if job in self._job_tasks or job not in self.jobs:
+            return
+        runner = self._run_event if job.subscription is not None else self._run_scheduled
+        self._job_tasks[job] = asyncio.ensure_future(runner(job))
+
+    def _cancel_job(self, job):
+        task = self._job_tasks.pop(job, None)
+        if task is not None:
+            task.cancel()
+
+    async def _drain(self, jobs, timeout):
+        """Cancel removed jobs and wait for their runs in progress; returns the stuck ones"""
+        for job in jobs:
+            self._cancel_job(job)
+        pending = {job.future for job in jobs if job.future is not None and not job.future.done()}
+        if pending:
+            await asyncio.wait(pending, timeout=timeout)
+        return [job for job in jobs if job.future is not None and not job.future.done()]
+
+    async def _run_scheduled(self, job):
+        if not job.run_immediately:
+            await asyncio.sleep(job.next_delay())
+
+        while True:
+            started = time.monotonic()
+            if job.running:
+                job.skipped += 1
+            else:
+                # Own task: a slow run does not shift this job's schedule
+                task = asyncio.ensure_future(self._call(job))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+
+            delay = job.next_delay()
+            if job.interval is not None:
+                delay = max(0.0, delay - (time.monotonic() - started))
+            await asyncio.sleep(delay)
+
+    async def _run_event(self, job):
+        events = asyncio.Queue(self.queue_size)
+
+        def enqueue(item):
+            # Stream thread -> loop; drop the oldest event rather than block the stream
+            if events.full():
+                events.get_nowait()
+                job.dropped += 1
+            events.put_nowait(item)
+
+        job.subscription.add_listener(lambda item: self.loop.call_soon_threadsafe(enqueue, item))
+
+        while True:
+            item = await events.get()
+            await self._call(job, item)
+
+    # ==================== ORDERS ====================
+
+    def submit_order(self, func, *args, **kwargs):
+        """
+        Queue an order call (thread-safe); returns a concurrent Future
+
+        Orders run one at a time in submission order. When the queue is
+        full the caller blocks (backpressure) up to RUNTIME_ORDER_TIMEOUT.
+        """
+        if self.loop is None:
+            raise RuntimeError("BotRuntime is not running")
+        if threading.current_thread() is self._loop_thread:
+            raise RuntimeError("submit_order blocks; call it from job code, not the event loop")
+
+        result = concurrent.futures.Future()
+        put = asyncio.run_coroutine_threadsafe(
+            self._orders.put((func, args, kwargs, result)), self.loop)
+        put.result(timeout=settings.RUNTIME_ORDER_TIMEOUT)
+        return result
+
+    async def _order_worker(self):
+        while True:
+            func, args, kwargs, result = await self._orders.get()
+            try:
+                value = await asyncio.wait_for(
+                    self.loop.run_in_executor(self.executor, lambda: func(*args, **kwargs)),
+                    settings.RUNTIME_ORDER_TIMEOUT)
+                self.orders_done += 1
+                result.set_result(value)
+            except Exception as e:
+                self.orders_failed += 1
+                result.set_exception(e)
+                print(f"❌ [{self.name}] order failed: {e}")
+
+    # ==================== NOTIFICATIONS ====================
+
+    def notify(self, message):
+        """Queue a notification (thread-safe, never blocks)"""
+        if self.loop is None or self.notify_sink is None:
+            return False
+        self.loop.call_soon_threadsafe(self._enqueue_notification, message)
+        return True
+
+    def _enqueue_notification(self, message):
+        if self._notifications.full():
+            self._notifications.get_nowait()
+            self.notifications_dropped += 1
+        self._notifications.put_nowait(message)
+
+    async def _send_notification(self, message):
+        try:
+            await asyncio.wait_for(
+                self.loop.run_in_executor(self.executor, self.notify_sink, message),
+                settings.RUNTIME_NOTIFY_TIMEOUT)
+            self.notifications_sent += 1
+        except Exception as e:
+            self.notifications_failed += 1
+            print(f"⚠️  [{self.name}] notification failed: {e}")
+
+    async def _notification_worker(self):
+        while True:
+            message = await self._notifications.get()
+            await self._send_notification(message)
+
+    # ==================== LIFECYCLE ====================
+
+    def stop(self):
+        """Request shutdown (thread-safe)"""
+        if self.loop is not None and self._stop_event is not None:
+            self.loop.call_soon_threadsafe(self._stop_event.set)
+
+    async def main(self):
+        """Run until stop() / SIGINT / SIGTERM (coroutine)"""
+        self.loop = asyncio.get_running_loop()
+        self._loop_thread = threading.current_thread()
+        self._stop_event = asyncio.Event()
+        self._orders = asyncio.Queue(self.queue_size)
+        self._notifications = asyncio.Queue(self.queue_size)
+
+        if threading.current_thread() is threading.main_thread():
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                try:
+                    self.loop.add_signal_handler(sig, self._stop_event.set)
+                except (NotImplementedError, RuntimeError):
+                    pass   # Windows: KeyboardInterrupt handled in run()
+
+        self._tasks = [asyncio.ensure_future(self._order_worker()),
+                       asyncio.ensure_future(self._notification_worker())]
+        for job in list(self.jobs):
+            self._start_job(job)
+
+        try:
+            await self._stop_event.wait()
+        finally:
+            await self._shutdown()
+
+    async def _shutdown(self):
+        tasks = self._tasks + list(self._job_tasks.values()) + list(self._inflight)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        for hook in self.stop_hooks:
+            try:
+                await self.loop.run_in_executor(self.executor, hook)
+            except Exception as e:
+                print(f"⚠️  [{self.name}] stop hook {getattr(hook, '__name__', hook)} failed: {e}")
+
+        # Deliver what is still queued (e.g. "bot stopped"), within a bound
+        deadline = time.monotonic() + settings.RUNTIME_SHUTDOWN_TIMEOUT
+        while not self._notifications.empty() and time.monotonic() < deadline:
+            await self._send_notification(self._notifications.get_nowait())
+
+        self.executor.shutdown(wait=False)
+
+    def run(self):
+        """Blocking entry point"""
+        try:
+            asyncio.run(self.main())
+        except KeyboardInterrupt:
+            pass
+
+    def stats(self):
+        return {
+            'jobs': {job.name: job.stats() for job in self.jobs},
+            'orders_done': self.orders_done,
+            'orders_failed': self.orders_failed,
+            'notifications_sent': self.notifications_sent,
+            'notifications_failed': self.notifications_failed,
+            'notifications_dropped': self.notifications_dropped,
+        }
+
+    def print_stats(self):
+        print(f"\n⚙️  RUNTIME STATS [{self.name}]")
+        print("-" * 50)
+        for name, s in self.stats()['jobs'].items():
+            print(f"   {name:<28} runs={s['runs']:<5} err={s['errors']:<3} "
+                  f"timeout={s['timeouts']:<3} skipped={s['skipped']:<3} "
+                  f"avg={s['avg_ms']:.0f}ms max={s['max_ms']:.0f}ms cpu={s['cpu_ms']:.0f}ms")
+        print(f"   notifications: {self.notifications_sent} sent, "
+              f"{self.notifications_failed} failed, {self.notifications_dropped} dropped")
+
+
+# Decision method per existing bot class, in lookup order
+CHECK_METHODS = ('check_and_trade', 'market_check', 'run_once', 'run_analysis')
+SUMMARY_METHODS = ('final_report', 'print_summary', 'final_check')
+
+
+def run_bot(bot, interval_minutes=5, runtime=None, notify_sink=None):
+    """
+    Run any existing bot class on a BotRuntime
+
+    The bot's decision method (check_and_trade / market_check / run_once /
+    run_analysis) runs every interval_minutes, daily_report at 17:00 when
+    present, and final_report / print_summary / final_check on shutdown.
+    """
+    runtime = runtime or BotRuntime(name=type(bot).__name__, notify_sink=notify_sink)
+
+    check = next((getattr(bot, m) for m in CHECK_METHODS if hasattr(bot, m)), None)
+    if check is None:
+        raise ValueError(f"{type(bot).__name__} has none of {CHECK_METHODS}")
+    runtime.every(interval_minutes * 60, check)
+
+    if hasattr(bot, 'daily_report'):
+        runtime.daily('17:00', bot.daily_report)
+
+    summary = next((getattr(bot, m) for m in SUMMARY_METHODS if hasattr(bot, m)), None)
+    if summary is not None:
+        runtime.on_stop(summary)
+
+    bot.runtime = runtime
+    runtime.run()
+    return runtime
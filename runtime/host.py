@@ -0,0 +1,323 @@
+# runtime/host.py
+"""
+Multi-bot host
+
+Runs several bots in one process instead of one process per bot (what
+bot_control.sh does). All bots share:
+
+    - one BotRuntime (event loop + thread pool)
+    - one Binance client behind one CachedClient (market-data cache)
+    - one MarketStream websocket
+    - one TelegramNotifier per (token, chat)
+
+Bots are telegram_config-style files. Files in the config directory are
+picked up, reloaded and removed while the host runs (hot add / remove).
+
+Usage:
+    python -m runtime.host                      # telegram_config.py + bots/*.py
+    python -m runtime.host bots/nxpc.py bots/sol.py --watch bots
+"""
+import argparse
+import glob
+import importlib.util
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.market_cache import CachedClient
+from data.stream import MarketStream
+from exchange.order_store import store_name
+from runtime.bot_runtime import BotRuntime
+from utils.notifier import TelegramNotifier
+
+# Import settings
+try:
+    from config.settings import settings
+except ImportError:
+    # Fallback
+    class SimpleSettings:
+        HOST_CONFIG_DIR = "bots"
+        HOST_RELOAD_INTERVAL = 10
+        HOST_STATS_INTERVAL = 900
+    settings = SimpleSettings()
+
+
+def load_config(path):
+    """Load a telegram_config-style file as a module"""
+    name = f"bot_config_{os.path.splitext(os.path.basename(path))[0]}"
+    spec = importlib.util.spec_from_file_location(name, path)
+    config = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(config)
+    return config
+
+
+class HostedBot:
+    """A bot running on the host, with the jobs it registered"""
+
+    def __init__(self, name, bot, jobs, path=None):
+        self.name = name
+        self.bot = bot
+        self.jobs = jobs
+        self.path = path
+        self.mtime = os.path.getmtime(path) if path else None
+        self.added = time.monotonic()
+
+
+class BotHost:
+    """Runs several bots on one runtime, client, cache and stream"""
+
+    def __init__(self, bot_class=None, testnet=None, config_dir=None, runtime=None,
+                 client=None, stream=None):
+        """
+        Args:
+            bot_class: Bot taking (config, client=, stream=, notifier=, name=, store=)
+                       (default: NXPCConfigBot)
+            testnet: Network for the shared client; default from the first config
+            config_dir: Directory watched for bot configs (hot add / remove)
+        """
+        self.bot_class = bot_class
+        self.testnet = testnet
+        self.config_dir = config_dir
+        self.runtime = runtime or BotRuntime(name='host')
+        self.bots = {}
+        self.notifiers = {}
+        self._client = client
+        self._stream = stream
+        self._lock = threading.RLock()
+        self._failed = {}
+
+        self.started = time.monotonic()
+        self.cpu_started = time.process_time()
+
+    # ==================== SHARED RESOURCES ====================
+
+    @property
+    def client(self):
+        """Shared cached Binance client (created on first use)"""
+        if self._client is None:
+            import python_binance
+            self._client = CachedClient(python_binance.get_client(testnet=self.testnet))
+        return self._client
+
+    @property
+    def stream(self):
+        """Shared market stream (created on first use)"""
+        if self._stream is None:
+            self._stream = MarketStream.shared(client=self.client)
+        return self._stream
+
+    def _notifier(self, config):
+        """One background notifier per Telegram (token, chat)"""
+        token, chat_id = getattr(config, 'TELEGRAM_TOKEN', ''), getattr(config, 'CHAT_ID', '')
+        if not (token and chat_id):
+            return None
+        key = (token, str(chat_id))
+        if key not in self.notifiers:
+            self.notifiers[key] = TelegramNotifier(token, chat_id)
+        return self.notifiers[key]
+
+    # ==================== BOTS ====================
+
+    def add_bot(self, config, name=None):
+        """
+        Start a bot (also while the host is running)
+
+        Args:
+            config: Path to a telegram_config-style file, or a loaded module
+            name: Unique bot name (default: file name / symbol)
+        """
+        path = None
+        if isinstance(config, str):
+            path = os.path.abspath(config)
+            config = load_config(path)
+            name = name or os.path.splitext(os.path.basename(path))[0]
+        name = name or config.SYMBOL
+
+        with self._lock:
+            if name in self.bots:
+                raise ValueError(f"Bot '{name}' is already running")
+
+            use_testnet = getattr(config, 'USE_TESTNET', True)
+            if self.testnet is None:
+                self.testnet = use_testnet
+            elif use_testnet != self.testnet:
+                raise ValueError(f"Bot '{name}' wants {'testnet' if use_testnet else 'live'}, "
+                                 f"host runs {'testnet' if self.testnet else 'live'}")
+
+            bot_class = self.bot_class
+            if bot_class is None:
+                from nxpc_bot_config_based import NXPCConfigBot as bot_class
+
+            # Store keyed on symbol + config file, as when the bot runs standalone
+            store = store_name(config.SYMBOL, path or getattr(config, '__file__', None))
+            bot = bot_class(config, client=self.client, stream=self.stream,
+                            notifier=self._notifier(config), name=name, store=store)
+            jobs = bot.register(self.runtime, group=name)
+            self.bots[name] = HostedBot(name, bot, jobs, path)
+
+        print(f"➕ Bot added: {name} ({bot.symbol}, {len(jobs)} jobs)")
+        return bot
+
+    def remove_bot(self, name, reason="removed from host"):
+        """
+        Stop a bot's jobs and release its subscriptions; other bots keep running
+
+        The bot's store and notifier are closed only after its runs in
+        progress have finished (bounded by RUNTIME_SHUTDOWN_TIMEOUT).
+        """
+        with self._lock:
+            hosted = self.bots.pop(name, None)
+        if hosted is None:
+            return False
+
+        # Runs already in the pool may still be writing to the bot's store
+        _, running = self.runtime.remove_group(name)
+        if running:
+            print(f"⚠️  {name}: {', '.join(job.name for job in running)} still running, "
+                  f"closing the bot anyway")
+        bot = hosted.bot
+        if bot.telegram_enabled:
+            bot.send_telegram(f"🛑 Bot stopped\n{reason}")
+        bot.close()
+        bot.print_summary()
+        print(f"➖ Bot removed: {name} ({reason})")
+        return True
+
+    def sync_config_dir(self):
+        """Hot add / reload / remove bots to match the config directory"""
+        if not self.config_dir or not os.path.isdir(self.config_dir):
+            return
+
+        paths = {os.path.abspath(p) for p in glob.glob(os.path.join(self.config_dir, '*.py'))
+                 if not os.path.basename(p).startswith('_')}
+
+        config_dir = os.path.abspath(self.config_dir)
+        with self._lock:
+            watched = {h.path: h for h in self.bots.values()
+                       if h.path and os.path.dirname(h.path) == config_dir}
+
+        reload = set()
+        for path, hosted in watched.items():
+            if path not in paths:
+                self.remove_bot(hosted.name, reason="config file deleted")
+            elif os.path.getmtime(path) != hosted.mtime:
+                self.remove_bot(hosted.name, reason="config changed, reloading")
+                reload.add(path)
+
+        for path in sorted((paths - set(watched)) | reload):
+            mtime = os.path.getmtime(path)
+            if self._failed.get(path) == mtime:
+                continue   # Still broken; retried once the file changes
+            try:
+                self.add_bot(path)
+                self._failed.pop(path, None)
+            except Exception as e:
+                # A broken config must not take the other bots down
+                self._failed[path] = mtime
+                print(f"❌ Cannot start bot from {path}: {e}")
+
+    # ==================== STATS ====================
+
+    def bot_stats(self, name):
+        """Aggregated job stats of one bot: CPU time and decision latency"""
+        hosted = self.bots[name]
+        jobs = [job for job in self.runtime.jobs if job.group == name]
+        runs = sum(job.runs for job in jobs)
+        cpu = sum(job.cpu_time for job in jobs)
+        host_cpu = time.process_time() - self.cpu_started
+        check = next((job for job in jobs if job.name.endswith('.market_check')), None)
+
+        return {
+            'symbol': hosted.bot.symbol,
+            'uptime_s': time.monotonic() - hosted.added,
+            'runs': runs,
+            'errors': sum(job.errors for job in jobs),
+            'timeouts': sum(job.timeouts for job in jobs),
+            'skipped': sum(job.skipped for job in jobs),
+            'cpu_ms': cpu * 1000,
+            'cpu_share': cpu / host_cpu if host_cpu > 0 else 0.0,
+            'latency_avg_ms': check.stats()['avg_ms'] if check else 0.0,
+            'latency_max_ms': check.stats()['max_ms'] if check else 0.0,
+        }
+
+    def stats(self):
+        with self._lock:
+            names = list(self.bots)
+        return {
+            'bots': {name: self.bot_stats(name) for name in names if name in self.bots},
+            'uptime_s': time.monotonic() - self.started,
+            'cpu_s': time.process_time() - self.cpu_started,
+            'cache': self.client.stats() if self._client is not None else {},
+            'stream': self._stream.stats() if self._stream is not None else {},
+        }
+
+    def print_stats(self):
+        stats = self.stats()
+        print(f"\n🖥️  HOST STATS ({len(stats['bots'])} bots, "
+              f"cpu {stats['cpu_s']:.1f}s / {stats['uptime_s'] / 60:.0f} min)")
+        print("-" * 70)
+        for name, s in stats['bots'].items():
+            print(f"   {name:<16} {s['symbol']:<10} runs={s['runs']:<5} err={s['errors']:<3} "
+                  f"cpu={s['cpu_ms']:.0f}ms ({s['cpu_share']:.1%}) "
+                  f"latency avg={s['latency_avg_ms']:.0f}ms max={s['latency_max_ms']:.0f}ms")
+        cache = stats['cache']
+        if cache:
+            print(f"   cache: {cache['hit_rate']:.0%} hit rate, "
+                  f"weight used {cache['weight_used']}, saved {cache['weight_saved']}")
+
+    # ==================== LIFECYCLE ====================
+
+    def run(self):
+        """Blocking: run all bots until Ctrl+C / SIGTERM"""
+        self.sync_config_dir()
+        if self.config_dir:
+            self.runtime.every(settings.HOST_RELOAD_INTERVAL, self.sync_config_dir,
+                               name='host.sync_config_dir', run_immediately=False)
+        self.runtime.every(settings.HOST_STATS_INTERVAL, self.print_stats,
+                           name='host.stats', run_immediately=False)
+        self.runtime.on_stop(self._on_stop)
+
+        print(f"\n🖥️  Bot host running {len(self.bots)} bots (Ctrl+C to stop)")
+        if self.config_dir:
+            print(f"   Watching {self.config_dir}/ for bot configs")
+        self.stream.start()
+        self.runtime.run()
+
+    def stop(self):
+        """Request shutdown (thread-safe)"""
+        self.runtime.stop()
+
+    def _on_stop(self):
+        self.print_stats()
+        for name in list(self.bots):
+            self.remove_bot(name, reason="host shutdown")
+        for notifier in self.notifiers.values():
+            notifier.stop()
+        if self._stream is not None:
+            self._stream.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run several bots in one process')
+    parser.add_argument('configs', nargs='*', help='telegram_config-style files')
+    parser.add_argument('--watch', default=None,
+                        help=f'Config directory for hot add/remove (default: {settings.HOST_CONFIG_DIR})')
+    args = parser.parse_args()
+
+    configs = args.configs
+    config_dir = args.watch or settings.HOST_CONFIG_DIR
+    if not configs and not glob.glob(os.path.join(config_dir, '*.py')) \
+            and os.path.exists('telegram_config.py'):
+        configs = ['telegram_config.py']
+
+    host = BotHost(config_dir=config_dir)
+    for path in configs:
+        host.add_bot(path)
+    host.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,18 @@
-from config.settings import settings
 # setup_live_paper.py
-import schedule
-import time
 from datetime import datetime
 import sys
 import os
 sys.path.append('.')
 
-from config import settings
-from strategies.sma_rsi_combo import SMA_RSI_Combo
+from config.settings import settings
+from runtime import BotRuntime
+from strategies.registry import create_strategy
 from paper_trade import PaperTradingSimulator
 
 class LivePaperTrader:
     def __init__(self):
-        self.strategy = SMA_RSI_Combo(
+        self.strategy = create_strategy(
+            'sma_rsi_combo',
             sma_fast=settings.SMA_FAST,
             sma_slow=settings.SMA_SLOW,
             rsi_period=settings.RSI_PERIOD,
@@ -80,32 +79,18 @@ class LivePaperTrader:
     
     def run(self):
         """Run the live paper trading system"""
-        # Schedule jobs
-        schedule.every().hour.at(":00").do(self.check_and_trade)
-        schedule.every().day.at("17:00").do(self.daily_report)  # Report setiap sore
+        runtime = BotRuntime(name='LivePaperTrader')
+        runtime.hourly(self.check_and_trade, minute=0, run_immediately=True)
+        runtime.daily('17:00', self.daily_report)  # Report setiap sore
+        runtime.on_stop(lambda: print("\n\n🛑 Stopping Live Paper Trading..."))
+        runtime.on_stop(self.final_report)
         
         print(f"\n✅ Live Paper Trading Started at {datetime.now().strftime('%H:%M:%S')}")
         print("   Will check for trades every hour at :00")
         print("   Daily report at 17:00")
         
-        # Initial check
-        self.check_and_trade()
-        
-        # Main loop
-        while self.running:
-            try:
-                schedule.run_pending()
-                time.sleep(1)
-            except KeyboardInterrupt:
-                print("\n\n🛑 Stopping Live Paper Trading...")
-                self.running = False
-                break
-            except Exception as e:
-                print(f"⚠️  Error in main loop: {e}")
-                time.sleep(60)
-        
-        # Final report
-        self.final_report()
+        runtime.run()
+        self.running = False
     
     def final_report(self):
         """Generate final report when stopping"""
@@ -126,6 +111,7 @@ class LivePaperTrader:
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"{settings.RESULTS_DIR}/live_paper_final_{timestamp}.txt"
+            os.makedirs(settings.RESULTS_DIR, exist_ok=True)
             
             with open(filename, 'w') as f:
                 f.write(f"Live Paper Trading Final Report\n")
@@ -148,13 +134,5 @@ class LivePaperTrader:
         print(f"{'='*60}")
 
 if __name__ == "__main__":
-    # Install schedule jika belum: pip install schedule
-    try:
-        import schedule
-    except ImportError:
-        print("Installing schedule library...")
-        os.system("pip install schedule")
-        import schedule
-    
     trader = LivePaperTrader()
     trader.run()
\ No newline at end of file
@@ -3,8 +3,24 @@
 Base class for all trading strategies
 """
 from abc import ABC, abstractmethod
+import numpy as np
 import pandas as pd
 
+# Signal values (int8)
+BUY, HOLD, SELL = 1, 0, -1
+
+
+def df_signal_array(df):
+    return df['signal'].to_numpy(dtype=np.int8)
+
+
+def strategy_signals(strategy, df):
+    """int8 signal array from any strategy (compute_signals, else generate_signals)"""
+    compute = getattr(strategy, 'compute_signals', None)
+    if compute is not None:
+        return compute(df)
+    return df_signal_array(strategy.generate_signals(df))
+
 class BaseStrategy(ABC):
     """Abstract base class for strategies"""
     
@@ -20,6 +36,47 @@ class BaseStrategy(ABC):
         """
         pass
     
+    def indicators(self, df):
+        """
+        Indicator arrays by column name (only computed when asked for)
+        
+        Returns a dict {name: array aligned with df}; that dict is what
+        compute_signals(df, indicators) takes back.
+        """
+        return {}
+    
+    def compute_signals(self, df, indicators=None):
+        """
+        Signals only: int8 array (1 = buy, 0 = hold, -1 = sell), len(df)
+        
+        Nothing is added to (or copied from) df. Strategies override this;
+        the default falls back to generate_signals.
+        
+        Args:
+            indicators: The dict indicators(df) returned for this same df,
+                        so it is not computed twice (not a DataFrame);
+                        None computes it
+        """
+        return df_signal_array(self.generate_signals(df))
+    
+    def _indicators(self, df, indicators):
+        """The compute_signals `indicators` argument, resolved to a dict"""
+        if indicators is None:
+            return self.indicators(df)
+        if not isinstance(indicators, dict):
+            raise TypeError(f"indicators must be the dict returned by indicators(df), "
+                            f"not {type(indicators).__name__}")
+        return indicators
+    
+    def signal_frame(self, df):
+        """generate_signals() built from indicators() + compute_signals()"""
+        indicators = self.indicators(df)
+        df = df.copy()
+        for name, values in indicators.items():
+            df[name] = values
+        df['signal'] = self.compute_signals(df, indicators)
+        return df
+    
     def calculate_indicators(self, df):
         """Calculate technical indicators (optional)"""
         return df
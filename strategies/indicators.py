@@ -0,0 +1,424 @@
+# strategies/indicators.py
+"""
+Technical indicators: NumPy batch kernels + O(1) streaming state
+
+One definition of each indicator, used both by the backtest (batch over
+a whole series) and by live bots (one update per closed candle), so
+live and backtest values agree:
+
+    SMA, EMA, RSI (Wilder), ATR (Wilder), Bollinger Bands, MACD
+
+Batch functions take array-likes and return float64 arrays of the same
+length, NaN during warmup. Streaming classes return the current value
+from update() (None during warmup). validate() checks that both agree.
+
+Missing values (NaN / inf: the warmup of an inner indicator as in
+sma(ema(close, 10), 5), or a 0 / 0 on a flat candle) are handled the same
+way by both:
+    - window indicators (SMA, Bollinger): NaN while a missing value is in
+      the window, like pandas rolling(n).mean(); they recover after n bars
+    - recursive indicators (EMA, RSI, MACD): the bar is skipped (NaN output,
+      state unchanged), so a leading gap just delays the start
+
+Conventions follow the `ta` package the strategies used before, so
+backtest results do not change:
+    - EMA / MACD: pandas ewm(span=n, adjust=False), seeded with the first value
+    - RSI: Wilder smoothing (alpha = 1/n) of gains and losses, seeded with
+      zero change on the first bar; 100 when there are no losses, also on
+      a flat window (ta.momentum.RSIIndicator)
+    - ATR: Wilder smoothing seeded with the mean of the first n true ranges
+    - Bollinger: population standard deviation (ddof=0)
+
+Usage:
+    from strategies.indicators import rsi, RSIState
+    values = rsi(df['close'], 14)             # backtest
+    state = RSIState(14)
+    value = state.update(candle['close'])     # live, per closed candle
+"""
+import math
+from collections import deque
+
+import numpy as np
+
+# Block length of the EMA kernel (matrix form of the recursion per block)
+_EMA_BLOCK = 128
+
+
+def _array(values):
+    return np.asarray(values, dtype=np.float64)
+
+
+def _nan(n):
+    return np.full(n, np.nan)
+
+
+# ==================== KERNELS ====================
+
+def _smooth(x, alpha, start=0, seed=None):
+    """
+    y[i] = y[i-1] + alpha * (x[i] - y[i-1]) for i > start, y[start] = seed or x[start]
+
+    Vectorised per block: within a block of B values the recursion is a
+    lower-triangular matrix product, only the carry between blocks loops
+    (n / B Python iterations instead of n).
+    """
+    n = len(x)
+    out = _nan(n)
+    if start >= n:
+        return out
+
+    decay = 1.0 - alpha
+    out[start] = x[start] if seed is None else seed
+    rest = x[start + 1:]
+    if not len(rest):
+        return out
+
+    block = min(_EMA_BLOCK, len(rest))
+    lags = np.arange(block)
+    # weights[j, k] = alpha * decay^(j-k) for k <= j
+    with np.errstate(under='ignore'):
+        exponent = lags[:, None] - lags[None, :]
+        weights = np.where(exponent >= 0, alpha * decay ** np.maximum(exponent, 0), 0.0)
+        carry_weights = decay ** (lags + 1)
+
+    padded = np.zeros(-(-len(rest) // block) * block)
+    padded[:len(rest)] = rest
+    partial = padded.reshape(-1, block) @ weights.T
+
+    previous = out[start]
+    result = np.empty_like(partial)
+    for b in range(len(partial)):
+        result[b] = partial[b] + carry_weights * previous
+        previous = result[b, -1]
+    out[start + 1:] = result.ravel()[:len(rest)]
+    return out
+
+
+def _skip_missing(kernel, x, *args):
+    """Run kernel over the finite values only; NaN where the input was missing"""
+    valid = np.isfinite(x)
+    if valid.all():
+        return kernel(x, *args)
+    out = _nan(len(x))
+    out[valid] = kernel(x[valid], *args)
+    return out
+
+
+# ==================== BATCH ====================
+
+def sma(values, period):
+    """Simple moving average; NaN while a missing value is in the window"""
+    x = _array(values)
+    out = _nan(len(x))
+    valid = np.isfinite(x)
+    if len(x) < period or not valid.any():
+        return out
+
+    # Cumulative sums around the first value keep float error small; missing
+    # values add 0 and are counted, so a window holding one is left NaN
+    reference = x[np.argmax(valid)]
+    shifted = np.where(valid, x - reference, 0.0)
+    csum = np.cumsum(np.concatenate(([0.0], shifted)))
+    count = np.cumsum(np.concatenate(([0], valid)))
+    full = count[period:] - count[:-period] == period
+    out[period - 1:] = np.where(full, (csum[period:] - csum[:-period]) / period + reference, np.nan)
+    return out
+
+
+def _ema(x, period, min_periods):
+    out = _smooth(x, 2.0 / (period + 1))
+    out[:(period if min_periods is None else min_periods) - 1] = np.nan
+    return out
+
+
+def ema(values, period, min_periods=None):
+    """Exponential moving average, alpha = 2 / (period + 1)"""
+    return _skip_missing(_ema, _array(values), period, min_periods)
+
+
+def _rsi(x, period):
+    if not len(x):
+        return _nan(0)
+
+    # The first bar has no change: gain = loss = 0 (seeds the averages)
+    delta = np.diff(x, prepend=x[0])
+    gains = np.where(delta > 0, delta, 0.0)
+    losses = np.where(delta < 0, -delta, 0.0)
+    avg_gain = _smooth(gains, 1.0 / period)
+    avg_loss = _smooth(losses, 1.0 / period)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out = np.where(avg_loss == 0, 100.0, 100.0 * avg_gain / (avg_gain + avg_loss))
+    out[:period - 1] = np.nan
+    return out
+
+
+def rsi(values, period=14):
+    """Relative Strength Index with Wilder smoothing"""
+    return _skip_missing(_rsi, _array(values), period)
+
+
+def true_range(high, low, close):
+    high, low, close = _array(high), _array(low), _array(close)
+    previous = np.concatenate(([np.nan], close[:-1]))
+    return np.fmax(high, previous) - np.fmin(low, previous)
+
+
+def atr(high, low, close, period=14):
+    """Average True Range with Wilder smoothing"""
+    tr = true_range(high, low, close)
+    if len(tr) < period:
+        return _nan(len(tr))
+    return _smooth(tr, 1.0 / period, start=period - 1, seed=tr[:period].mean())
+
+
+def bollinger(values, period=20, width=2.0):
+    """
+    Bollinger Bands
+
+    Returns:
+        (middle, upper, lower)
+    """
+    x = _array(values)
+    middle = sma(x, period)
+    std = _nan(len(x))
+    if len(x) >= period:
+        windows = np.lib.stride_tricks.sliding_window_view(x, period)
+        with np.errstate(invalid='ignore'):
+            std[period - 1:] = windows.std(axis=1)
+        std[np.isnan(middle)] = np.nan
+    return middle, middle + width * std, middle - width * std
+
+
+def macd(values, fast=12, slow=26, signal=9):
+    """
+    MACD line, signal line and histogram
+
+    Returns:
+        (macd, signal, histogram)
+    """
+    x = _array(values)
+    line = ema(x, fast) - ema(x, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+# ==================== STREAMING ====================
+
+class SMAState:
+    """Streaming SMA: O(1) per update; None while a missing value is in the window"""
+
+    # Running sum is recomputed exactly this often (bounds float drift)
+    RESUM_EVERY = 10_000
+
+    def __init__(self, period):
+        self.period = period
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+        self.missing = 0
+        self.updates = 0
+        self.value = None
+
+    def update(self, x):
+        if len(self.window) == self.period:
+            oldest = self.window[0]
+            if math.isfinite(oldest):
+                self.total -= oldest
+            else:
+                self.missing -= 1
+        self.window.append(x)
+        if math.isfinite(x):
+            self.total += x
+        else:
+            self.missing += 1
+        self.updates += 1
+        if self.updates % self.RESUM_EVERY == 0:
+            self.total = math.fsum(v for v in self.window if math.isfinite(v))
+
+        full = len(self.window) == self.period and not self.missing
+        self.value = self.total / self.period if full else None
+        return self.value
+
+
+class EMAState:
+    """Streaming EMA (pandas ewm adjust=False semantics)"""
+
+    def __init__(self, period=None, alpha=None, min_periods=None):
+        self.alpha = alpha if alpha is not None else 2.0 / (period + 1)
+        self.min_periods = min_periods if min_periods is not None else (period or 1)
+        self.current = None
+        self.count = 0
+        self.value = None
+
+    def update(self, x):
+        if not math.isfinite(x):
+            return None   # missing: skipped
+        self.current = x if self.current is None else self.current + self.alpha * (x - self.current)
+        self.count += 1
+        self.value = self.current if self.count >= self.min_periods else None
+        return self.value
+
+
+class RSIState:
+    """Streaming Wilder RSI"""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.gain = EMAState(alpha=1.0 / period, min_periods=1)
+        self.loss = EMAState(alpha=1.0 / period, min_periods=1)
+        self.previous = None
+        self.count = 0
+        self.value = None
+
+    def update(self, close):
+        if not math.isfinite(close):
+            return None   # missing: skipped
+        delta = 0.0 if self.previous is None else close - self.previous
+        gain = self.gain.update(delta if delta > 0 else 0.0)
+        loss = self.loss.update(-delta if delta < 0 else 0.0)
+        self.previous = close
+        self.count += 1
+        if self.count >= self.period:
+            self.value = 100.0 * gain / (gain + loss) if loss else 100.0
+        return self.value
+
+
+class ATRState:
+    """Streaming Wilder ATR"""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.previous_close = None
+        self.seed = []
+        self.value = None
+
+    def update(self, high, low, close):
+        if self.previous_close is None:
+            tr = high - low
+        else:
+            tr = max(high, self.previous_close) - min(low, self.previous_close)
+        self.previous_close = close
+
+        if self.value is not None:
+            self.value += (tr - self.value) / self.period
+        else:
+            self.seed.append(tr)
+            if len(self.seed) == self.period:
+                self.value = sum(self.seed) / self.period
+                self.seed = None
+        return self.value
+
+
+class BollingerState:
+    """Streaming Bollinger Bands; update() returns (middle, upper, lower)"""
+
+    def __init__(self, period=20, width=2.0):
+        self.period = period
+        self.width = width
+        self.window = deque(maxlen=period)
+        self.sma = SMAState(period)
+        self.value = None
+
+    def update(self, x):
+        self.window.append(x)
+        middle = self.sma.update(x)
+        if middle is None:
+            return None
+        # Deviations from the mean of a short window: exact, no sum-of-squares cancellation
+        std = math.sqrt(sum((v - middle) ** 2 for v in self.window) / self.period)
+        self.value = (middle, middle + self.width * std, middle - self.width * std)
+        return self.value
+
+
+class MACDState:
+    """Streaming MACD; update() returns (macd, signal, histogram)"""
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = EMAState(fast)
+        self.slow = EMAState(slow)
+        self.signal = EMAState(signal)
+        self.value = None
+
+    def update(self, x):
+        if not math.isfinite(x):
+            return None   # missing: skipped
+        fast, slow = self.fast.update(x), self.slow.update(x)
+        if fast is None or slow is None:
+            return None
+        line = fast - slow
+        signal = self.signal.update(line)
+        self.value = None if signal is None else (line, signal, line - signal)
+        return self.value
+
+
+# ==================== VALIDATION ====================
+
+def validate(df, tolerance=1e-9):
+    """
+    Check that streaming state reproduces the batch kernels on df (OHLCV)
+
+    Returns:
+        {indicator: max absolute difference}; raises AssertionError above tolerance
+    """
+    high, low, close = (df[c].to_numpy(dtype=np.float64) for c in ('high', 'low', 'close'))
+    batch = {
+        'sma': sma(close, 20),
+        'ema': ema(close, 20),
+        'rsi': rsi(close, 14),
+        'atr': atr(high, low, close, 14),
+        'bollinger_upper': bollinger(close, 20)[1],
+        'macd_signal': macd(close)[1],
+    }
+    states = {'sma': SMAState(20), 'ema': EMAState(20), 'rsi': RSIState(14),
+              'atr': ATRState(14), 'bollinger_upper': BollingerState(20), 'macd_signal': MACDState()}
+    streamed = {name: _nan(len(close)) for name in batch}
+
+    for i in range(len(close)):
+        for name, state in states.items():
+            if name == 'atr':
+                value = state.update(high[i], low[i], close[i])
+            else:
+                value = state.update(close[i])
+            if isinstance(value, tuple):
+                value = value[1]
+            if value is not None:
+                streamed[name][i] = value
+
+    differences = {}
+    for name in batch:
+        a, b = batch[name], streamed[name]
+        if not np.array_equal(np.isnan(a), np.isnan(b)):
+            raise AssertionError(f"{name}: warmup differs between batch and streaming")
+        both = ~np.isnan(a)
+        differences[name] = float(np.max(np.abs(a[both] - b[both]))) if both.any() else 0.0
+        if differences[name] > tolerance:
+            raise AssertionError(f"{name}: batch and streaming differ by {differences[name]:g}")
+    return differences
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    import time
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from data.synthetic import SyntheticMarketGenerator
+
+    df = SyntheticMarketGenerator(seed=42).generate(20_000, interval='1h')
+    print(f"✅ Streaming == batch: {validate(df)}")
+
+    close = df['close'].to_numpy()
+    big = np.tile(close, 50)
+    for name, fn in [('sma', lambda: sma(big, 50)), ('ema', lambda: ema(big, 50)),
+                     ('rsi', lambda: rsi(big, 14)), ('macd', lambda: macd(big))]:
+        started = time.perf_counter()
+        fn()
+        print(f"   {name:<5} {len(big):,} values: {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    try:
+        import ta
+        import pandas as pd
+        reference = ta.momentum.RSIIndicator(close=pd.Series(close), window=14).rsi().to_numpy()
+        print(f"   rsi vs ta: max diff {np.nanmax(np.abs(rsi(close, 14) - reference)):.2e}")
+    except ImportError:
+        pass
@@ -0,0 +1,242 @@
+# strategies/registry.py
+"""
+Strategy registry: select strategies by name, import them only when used
+
+Strategies are discovered without importing their modules:
+    - package scan: BaseStrategy subclasses in strategies/*.py, found by
+      parsing the source (ast), not by importing it
+    - entry points: installed packages can add strategies under the
+      "trads.strategies" group, e.g. in their pyproject.toml:
+          [project.entry-points."trads.strategies"]
+          breakout = "my_pkg.breakout:Breakout"
+
+A strategy is selected by a config string, the strategy name optionally
+followed by parameters in call syntax (literals only):
+
+    create_strategy('sma_crossover')                        # class defaults
+    create_strategy('sma_crossover(fast_period=10, slow_period=30)')
+    create_strategy('sma_rsi_combo', sma_fast=20)           # keyword overrides
+    create_strategy("dsl(buy='rsi(close) < 30', sell='rsi(close) > 70')")
+
+Names are the module name when the module defines one strategy
+(sma_crossover, sma_rsi_combo, dsl), otherwise the class name in snake case.
+"""
+import ast
+import importlib
+import os
+import re
+import threading
+
+BASE_CLASSES = {'BaseStrategy'}
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+SKIP_MODULES = {'__init__', 'base_strategy', 'indicators', 'registry'}
+
+# Import settings
+try:
+    from config.settings import settings
+except ImportError:
+    # Fallback
+    class SimpleSettings:
+        STRATEGY = "sma_crossover"
+        STRATEGY_ENTRY_POINT_GROUP = "trads.strategies"
+    settings = SimpleSettings()
+
+
+def _snake(name):
+    return re.sub(r'(?<=[a-z0-9])(?=[A-Z])', '_', name).lower()
+
+
+class StrategySpec:
+    """A registered strategy: where it lives, imported on first use"""
+
+    def __init__(self, name, target, source='package', description=''):
+        self.name = name
+        self.target = target            # "module.path:ClassName"
+        self.source = source            # package / entry_point / manual
+        self.description = description
+        self._cls = None
+
+    def load(self):
+        if self._cls is None:
+            module_name, _, attr = self.target.partition(':')
+            self._cls = getattr(importlib.import_module(module_name), attr)
+        return self._cls
+
+    @property
+    def loaded(self):
+        return self._cls is not None
+
+    def __repr__(self):
+        return f"StrategySpec({self.name!r}, {self.target!r})"
+
+
+def parse_strategy(config):
+    """
+    "name(arg, key=value)" -> (name, args, kwargs); parameters must be literals
+
+    Raises:
+        ValueError: Not a name / call with literal arguments
+    """
+    try:
+        node = ast.parse(config.strip(), mode='eval').body
+    except SyntaxError:
+        raise ValueError(f"Invalid strategy config {config!r}") from None
+
+    if isinstance(node, ast.Name):
+        return node.id, (), {}
+    if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)):
+        raise ValueError(f"Invalid strategy config {config!r}: expected name or name(...)")
+    try:
+        args = tuple(ast.literal_eval(a) for a in node.args)
+        kwargs = {k.arg: ast.literal_eval(k.value) for k in node.keywords if k.arg}
+    except ValueError:
+        raise ValueError(f"Strategy parameters must be literals: {config!r}") from None
+    return node.func.id, args, kwargs
+
+
+class StrategyRegistry:
+    """Name -> StrategySpec, discovered lazily"""
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, package_dir=PACKAGE_DIR, package='strategies', entry_point_group=None):
+        self.package_dir = package_dir
+        self.package = package
+        self.entry_point_group = entry_point_group or settings.STRATEGY_ENTRY_POINT_GROUP
+        self._specs = {}
+        self._discovered = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    # ==================== DISCOVERY ====================
+
+    def register(self, name, target, description=''):
+        """Register a strategy by "module:Class" string (or a class, already imported)"""
+        if isinstance(target, type):
+            spec = StrategySpec(name, f"{target.__module__}:{target.__name__}", 'manual',
+                                description or (target.__doc__ or '').strip())
+            spec._cls = target
+        else:
+            spec = StrategySpec(name, target, 'manual', description)
+        with self._lock:
+            self._specs[name] = spec
+        return spec
+
+    def _scan_package(self):
+        """Find BaseStrategy subclasses by parsing module source (nothing is imported)"""
+        specs = []
+        for filename in sorted(os.listdir(self.package_dir)):
+            module, ext = os.path.splitext(filename)
+            if ext != '.py' or module in SKIP_MODULES:
+                continue
+            try:
+                with open(os.path.join(self.package_dir, filename), encoding='utf-8') as f:
+                    tree = ast.parse(f.read(), filename)
+            except (OSError, SyntaxError) as e:
+                print(f"⚠️  Strategy scan skipped {filename}: {e}")
+                continue
+
+            classes = [node for node in tree.body if isinstance(node, ast.ClassDef) and any(
+                isinstance(base, ast.Name) and base.id in BASE_CLASSES for base in node.bases)]
+            for node in classes:
+                name = module if len(classes) == 1 else _snake(node.name)
+                doc = (ast.get_docstring(node) or ast.get_docstring(tree) or '').strip()
+                specs.append(StrategySpec(name, f"{self.package}.{module}:{node.name}",
+                                          'package', doc.splitlines()[0] if doc else ''))
+        return specs
+
+    def _scan_entry_points(self):
+        try:
+            from importlib.metadata import entry_points
+            found = entry_points(group=self.entry_point_group)
+        except Exception as e:
+            print(f"⚠️  Strategy entry points unavailable: {e}")
+            return []
+        return [StrategySpec(ep.name, ep.value, 'entry_point') for ep in found]
+
+    def discover(self, refresh=False):
+        """Populate the registry; manual registrations take precedence, then the package"""
+        with self._lock:
+            if self._discovered and not refresh:
+                return self
+            found = self._scan_entry_points() + self._scan_package()
+            for spec in found:
+                current = self._specs.get(spec.name)
+                if current is None or (current.source != 'manual' and not current.loaded):
+                    self._specs[spec.name] = spec
+            self._discovered = True
+        return self
+
+    # ==================== LOOKUP ====================
+
+    def names(self):
+        return sorted(self.discover()._specs)
+
+    def specs(self):
+        self.discover()
+        return [self._specs[name] for name in sorted(self._specs)]
+
+    def spec(self, name):
+        spec = self._specs.get(name) or self.discover()._specs.get(name)
+        if spec is None:
+            raise KeyError(f"Unknown strategy {name!r} (available: {', '.join(self.names())})")
+        return spec
+
+    def get(self, name):
+        """Strategy class by name (imports its module)"""
+        return self.spec(name).load()
+
+    def create(self, config=None, **overrides):
+        """
+        Instantiate a strategy from a config string
+
+        Args:
+            config: "name" or "name(key=value, ...)"; default settings.STRATEGY
+            **overrides: Parameters taking precedence over the config string
+        """
+        name, args, kwargs = parse_strategy(config or settings.STRATEGY)
+        kwargs.update(overrides)
+        return self.get(name)(*args, **kwargs)
+
+
+def create_strategy(config=None, **overrides):
+    return StrategyRegistry.shared().create(config, **overrides)
+
+
+def get_strategy(name):
+    return StrategyRegistry.shared().get(name)
+
+
+def list_strategies():
+    return StrategyRegistry.shared().names()
+
+
+def resolve_strategy(strategy):
+    """Strategy instance from an instance or a config string"""
+    return create_strategy(strategy) if isinstance(strategy, str) else strategy
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    sys.path.insert(0, os.path.dirname(PACKAGE_DIR))
+
+    started = time.perf_counter()
+    registry = StrategyRegistry.shared()
+    names = registry.names()
+    elapsed = time.perf_counter() - started
+    print(f"✅ {len(names)} strategies discovered in {elapsed * 1000:.1f}ms: {', '.join(names)}")
+    for spec in registry.specs():
+        print(f"   {spec.name:<15} {spec.target:<40} {spec.description}")
+
+    strategy = create_strategy('sma_crossover(fast_period=10, slow_period=30)')
+    print(f"   created {strategy.name}; imported: "
+          f"{[s.name for s in registry.specs() if s.loaded]}")
@@ -2,8 +2,10 @@
 """
 Simple Moving Average Crossover Strategy
 """
+import numpy as np
 import pandas as pd
-from .base_strategy import BaseStrategy
+from .base_strategy import BaseStrategy, BUY, SELL
+from .indicators import sma
 
 # Import settings
 try:
@@ -39,28 +41,33 @@ class SMACrossover(BaseStrategy):
     def generate_signals(self, df):
         """
         Generate buy/sell signals using SMA crossover
+        (copy of df with SMA_fast, SMA_slow and signal columns)
         """
-        df = df.copy()
-        
-        # Calculate SMAs
-        df['SMA_fast'] = df['close'].rolling(window=self.fast_period).mean()
-        df['SMA_slow'] = df['close'].rolling(window=self.slow_period).mean()
-        
-        # Initialize signal column
-        df['signal'] = 0  # 0 = hold, 1 = buy, -1 = sell
-        
-        # Buy when fast SMA crosses above slow SMA
-        df.loc[(df['SMA_fast'] > df['SMA_slow']) & 
-               (df['SMA_fast'].shift(1) <= df['SMA_slow'].shift(1)), 'signal'] = 1
+        return self.signal_frame(df)
+    
+    def indicators(self, df):
+        close = df['close'].to_numpy(dtype=np.float64)
+        return {
+            'SMA_fast': sma(close, self.fast_period),
+            'SMA_slow': sma(close, self.slow_period),
+        }
+    
+    def compute_signals(self, df, indicators=None):
+        """int8 signals: 1 = buy, 0 = hold, -1 = sell"""
+        indicators = self._indicators(df, indicators)
+        fast, slow = indicators['SMA_fast'], indicators['SMA_slow']
+        signals = np.zeros(len(fast), dtype=np.int8)
         
-        # Sell when fast SMA crosses below slow SMA
-        df.loc[(df['SMA_fast'] < df['SMA_slow']) & 
-               (df['SMA_fast'].shift(1) >= df['SMA_slow'].shift(1)), 'signal'] = -1
+        # NaN comparisons are False, like the shifted pandas version
+        with np.errstate(invalid='ignore'):
+            # Buy when fast SMA crosses above slow SMA
+            signals[1:][(fast[1:] > slow[1:]) & (fast[:-1] <= slow[:-1])] = BUY
+            # Sell when fast SMA crosses below slow SMA
+            signals[1:][(fast[1:] < slow[1:]) & (fast[:-1] >= slow[:-1])] = SELL
         
         # Remove early signals (warmup period)
-        df.iloc[:self.slow_period, df.columns.get_loc('signal')] = 0
-        
-        return df
+        signals[:self.slow_period] = 0
+        return signals
     
     def plot_signals(self, df, num_candles=200):
         """Plot price, SMAs, and signals"""
@@ -4,9 +4,10 @@ SMA + RSI Combo Strategy
 Buy: SMA Golden Cross AND RSI < 65 (not overbought)
 Sell: SMA Death Cross AND RSI > 35 (not oversold)
 """
+import numpy as np
 import pandas as pd
-import ta
-from .base_strategy import BaseStrategy
+from .base_strategy import BaseStrategy, BUY, SELL
+from .indicators import rsi, sma
 
 class SMA_RSI_Combo(BaseStrategy):
     def __init__(self, sma_fast=50, sma_slow=80, rsi_period=14, 
@@ -20,45 +21,40 @@ class SMA_RSI_Combo(BaseStrategy):
         self.rsi_oversold = rsi_oversold
     
     def generate_signals(self, df):
-        df = df.copy()
-        
-        # SMA
-        df['SMA_fast'] = df['close'].rolling(window=self.sma_fast).mean()
-        df['SMA_slow'] = df['close'].rolling(window=self.sma_slow).mean()
-        
-        # RSI
-        df['RSI'] = ta.momentum.RSIIndicator(
-            close=df['close'], 
-            window=self.rsi_period
-        ).rsi()
-        
-        # Base SMA signals
-        df['sma_signal'] = 0
-        df.loc[df['SMA_fast'] > df['SMA_slow'], 'sma_signal'] = 1
-        df.loc[df['SMA_fast'] < df['SMA_slow'], 'sma_signal'] = -1
-        
-        # Final signals dengan RSI filter
-        df['signal'] = 0
-        
-        # Buy: SMA bullish DAN RSI tidak overbought
-        buy_condition = (
-            (df['sma_signal'] == 1) & 
-            (df['sma_signal'].shift(1) != 1) &  # New signal
-            (df['RSI'] < self.rsi_overbought)
-        )
-        
-        # Sell: SMA bearish DAN RSI tidak oversold  
-        sell_condition = (
-            (df['sma_signal'] == -1) & 
-            (df['sma_signal'].shift(1) != -1) &  # New signal
-            (df['RSI'] > self.rsi_oversold)
-        )
-        
-        df.loc[buy_condition, 'signal'] = 1
-        df.loc[sell_condition, 'signal'] = -1
+        """Copy of df with SMA_fast, SMA_slow, RSI, sma_signal and signal columns"""
+        df = self.signal_frame(df)
+        df['sma_signal'] = self._sma_signal(df['SMA_fast'].to_numpy(), df['SMA_slow'].to_numpy())
+        return df
+    
+    def indicators(self, df):
+        close = df['close'].to_numpy(dtype=np.float64)
+        return {
+            'SMA_fast': sma(close, self.sma_fast),
+            'SMA_slow': sma(close, self.sma_slow),
+            'RSI': rsi(close, self.rsi_period),
+        }
+    
+    @staticmethod
+    def _sma_signal(fast, slow):
+        """1 = fast above slow, -1 = below, 0 = equal / warmup"""
+        with np.errstate(invalid='ignore'):
+            return (fast > slow).astype(np.int8) - (fast < slow).astype(np.int8)
+    
+    def compute_signals(self, df, indicators=None):
+        """int8 signals: 1 = buy, 0 = hold, -1 = sell"""
+        indicators = self._indicators(df, indicators)
+        trend = self._sma_signal(indicators['SMA_fast'], indicators['SMA_slow'])
+        rsi_values = indicators['RSI']
+        signals = np.zeros(len(trend), dtype=np.int8)
+        
+        # The bar before the first has no trend (new signal possible at 0)
+        previous = np.concatenate(([0], trend[:-1]))
+        with np.errstate(invalid='ignore'):
+            # Buy: SMA bullish DAN RSI tidak overbought
+            signals[(trend == 1) & (previous != 1) & (rsi_values < self.rsi_overbought)] = BUY
+            # Sell: SMA bearish DAN RSI tidak oversold
+            signals[(trend == -1) & (previous != -1) & (rsi_values > self.rsi_oversold)] = SELL
         
         # Warmup period
-        warmup = max(self.sma_slow, self.rsi_period)
-        df.iloc[:warmup, df.columns.get_loc('signal')] = 0
-        
-        return df
\ No newline at end of file
+        signals[:max(self.sma_slow, self.rsi_period)] = 0
+        return signals
@@ -0,0 +1,55 @@
+# tests/test_bot_runtime.py
+"""BotRuntime.remove_group waits for a group's runs already in the pool"""
+import threading
+import time
+
+import pytest
+
+from runtime.bot_runtime import BotRuntime
+
+
+@pytest.fixture
+def runtime():
+    runtime = BotRuntime(name='test', workers=4)
+    thread = threading.Thread(target=runtime.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while runtime.loop is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    yield runtime
+    runtime.stop()
+    thread.join(timeout=5)
+
+
+def test_remove_group_waits_for_running_job(runtime):
+    started, finished = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        time.sleep(0.3)
+        finished.set()
+
+    runtime.every(60, slow, name='bot.slow', group='bot')
+    other = runtime.every(60, lambda: None, name='other.check', group='other')
+    assert started.wait(5)
+
+    removed, running = runtime.remove_group('bot')
+    assert finished.is_set()
+    assert [job.name for job in removed] == ['bot.slow']
+    assert running == []
+    assert runtime.jobs == [other]
+
+
+def test_remove_group_reports_stuck_job(runtime):
+    started, release = threading.Event(), threading.Event()
+
+    def stuck():
+        started.set()
+        release.wait(5)
+
+    runtime.every(60, stuck, name='bot.stuck', group='bot')
+    assert started.wait(5)
+
+    _, running = runtime.remove_group('bot', timeout=0.1)
+    assert [job.name for job in running] == ['bot.stuck']
+    release.set()
@@ -0,0 +1,101 @@
+# tests/test_gateway.py
+"""OrderGateway against the local fake exchange: lost responses never double-fill"""
+import pytest
+from requests.exceptions import ConnectionError as NetworkError, ReadTimeout
+
+from exchange.client import create_client
+from exchange.fake_server import FakeBinanceExchange
+from exchange.filters import ExchangeInfoCache
+from exchange.gateway import OrderGateway, OrderIntent
+
+SYMBOL = 'NXPCUSDT'
+
+
+class FlakyClient:
+    """Real client whose first create_order / get_order calls fail as configured"""
+
+    def __init__(self, client, create_errors=(), lookup_errors=()):
+        self._client = client
+        self.create_errors = list(create_errors)    # (error, after_sending)
+        self.lookup_errors = list(lookup_errors)
+        self.creates = 0
+        self.lookups = 0
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def create_order(self, **params):
+        self.creates += 1
+        if self.create_errors:
+            error, after_sending = self.create_errors.pop(0)
+            if after_sending:
+                self._client.create_order(**params)   # filled, response lost
+            raise error
+        return self._client.create_order(**params)
+
+    def get_order(self, **params):
+        self.lookups += 1
+        if self.lookup_errors:
+            raise self.lookup_errors.pop(0)
+        return self._client.get_order(**params)
+
+
+@pytest.fixture
+def exchange():
+    fake = FakeBinanceExchange(symbols=(SYMBOL,), history_bars=300, future_bars=600,
+                               balances={'USDT': 10_000.0}).start(websocket=False)
+    yield fake
+    fake.stop()
+
+
+def make_gateway(exchange, **errors):
+    client = FlakyClient(create_client(base_url=exchange.base_url, ping=False), **errors)
+    gateway = OrderGateway(client, filters=ExchangeInfoCache(client), retry_delay=0.01,
+                           lookup_settle=0.01)
+    return gateway, client
+
+
+def buy(gateway, exchange):
+    price = exchange.market(SYMBOL).last_price(exchange.now_ms())
+    return gateway.submit(OrderIntent(SYMBOL, 'BUY', 20 / price, reference_price=price))
+
+
+def test_lost_response_and_failed_lookup_place_one_order(exchange):
+    gateway, client = make_gateway(exchange, create_errors=[(ReadTimeout('lost'), True)],
+                                   lookup_errors=[NetworkError('reset')])
+    order = buy(gateway, exchange)
+    assert gateway.wait(order, timeout=10)
+
+    assert len(exchange.orders) == 1
+    assert client.creates == 1
+    assert order.status == 'FILLED'
+    assert gateway.recovered == 1
+    gateway.shutdown()
+
+
+def test_lookup_that_keeps_failing_leaves_order_unknown(exchange):
+    gateway, client = make_gateway(exchange, create_errors=[(ReadTimeout('lost'), True)],
+                                   lookup_errors=[NetworkError('reset')] * 3)
+    order = buy(gateway, exchange)
+    assert not gateway.wait(order, timeout=10)   # not final, not resent
+
+    assert len(exchange.orders) == 1
+    assert client.creates == 1
+    assert order.status == 'UNKNOWN' and order.is_open
+
+    # Reconciliation finds the fill later
+    gateway.refresh(order)
+    assert order.status == 'FILLED'
+    gateway.shutdown()
+
+
+def test_request_that_never_arrived_is_resent_once(exchange):
+    gateway, client = make_gateway(exchange, create_errors=[(ReadTimeout('lost'), False)])
+    order = buy(gateway, exchange)
+    assert gateway.wait(order, timeout=10)
+
+    assert len(exchange.orders) == 1
+    assert client.creates == 2
+    assert client.lookups == 2     # "does not exist" confirmed after settling
+    assert order.status == 'FILLED'
+    gateway.shutdown()
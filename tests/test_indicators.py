@@ -0,0 +1,114 @@
+# tests/test_indicators.py
+"""Batch kernels == streaming state, also with missing (NaN) inputs"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.synthetic import SyntheticMarketGenerator
+from strategies import indicators as ind
+
+
+@pytest.fixture(scope='module')
+def df():
+    return SyntheticMarketGenerator(seed=7).generate(3000, interval='1h')
+
+
+def streamed(state, values):
+    """Feed every value, missing ones included (the state handles them)"""
+    out = np.full(len(values), np.nan)
+    for i, x in enumerate(values):
+        value = state.update(float(x))
+        if isinstance(value, tuple):
+            value = value[1]
+        if value is not None:
+            out[i] = value
+    return out
+
+
+def assert_same(batch, stream, tolerance=1e-9):
+    np.testing.assert_array_equal(np.isnan(batch), np.isnan(stream))
+    both = ~np.isnan(batch)
+    assert both.any()
+    assert np.max(np.abs(batch[both] - stream[both])) < tolerance
+
+
+CASES = [
+    ('sma', lambda x: ind.sma(x, 20), lambda: ind.SMAState(20)),
+    ('ema', lambda x: ind.ema(x, 20), lambda: ind.EMAState(20)),
+    ('rsi', lambda x: ind.rsi(x, 14), lambda: ind.RSIState(14)),
+    ('bollinger_upper', lambda x: ind.bollinger(x, 20)[1], lambda: ind.BollingerState(20)),
+    ('macd_signal', lambda x: ind.macd(x)[1], lambda: ind.MACDState()),
+]
+
+
+def test_validate(df):
+    differences = ind.validate(df)
+    assert set(differences) == {'sma', 'ema', 'rsi', 'atr', 'bollinger_upper', 'macd_signal'}
+
+
+@pytest.mark.parametrize('name, batch, state', CASES, ids=[c[0] for c in CASES])
+def test_batch_equals_stream(df, name, batch, state):
+    close = df['close'].to_numpy(dtype=np.float64)
+    assert_same(batch(close), streamed(state(), close))
+
+
+@pytest.mark.parametrize('name, batch, state', CASES, ids=[c[0] for c in CASES])
+def test_nan_leading_input(df, name, batch, state):
+    # The warmup of an inner indicator, e.g. sma(ema(close, 10), 5)
+    inner = ind.ema(df['close'].to_numpy(dtype=np.float64), 10)
+    assert np.isnan(inner[0])
+    assert_same(batch(inner), streamed(state(), inner))
+
+
+@pytest.mark.parametrize('name, batch, state', CASES, ids=[c[0] for c in CASES])
+def test_mid_series_nan(df, name, batch, state):
+    # One missing value, e.g. (close - open) / (high - low) on a flat candle
+    close = df['close'].to_numpy(dtype=np.float64).copy()
+    close[[100, 101, 500]] = np.nan
+    close[900] = np.inf
+    out = batch(close)
+    assert_same(out, streamed(state(), close))
+    assert not np.isnan(out[-100:]).any()   # recovered
+
+
+def test_sma_matches_pandas_rolling_with_gaps():
+    x = np.arange(60.0)
+    x[[20, 41]] = np.nan
+    expected = pd.Series(x).rolling(5).mean().to_numpy()
+    np.testing.assert_allclose(ind.sma(x, 5), expected, equal_nan=True)
+    assert ind.sma(x, 5)[30] == 28.0
+
+
+def test_bollinger_recovers_after_gap():
+    x = np.arange(60.0)
+    x[20] = np.nan
+    middle, upper, lower = ind.bollinger(x, 5)
+    assert np.isnan(upper[20:25]).all()
+    expected = pd.Series(x).rolling(5).std(ddof=0).to_numpy() * 2 + middle
+    np.testing.assert_allclose(upper[25:], expected[25:])
+
+
+def test_nan_leading_sma_is_not_poisoned():
+    values = np.concatenate(([np.nan] * 3, np.arange(1.0, 11.0)))
+    out = ind.sma(values, 5)
+    assert np.isnan(out[:7]).all()
+    np.testing.assert_allclose(out[7:], np.arange(3.0, 9.0))
+
+
+@pytest.mark.parametrize('values', [
+    np.ones(40),
+    np.concatenate((np.arange(20.0), np.full(20, 19.0))),
+    np.concatenate((np.arange(20.0, 0, -1), np.full(20, 1.0))),
+    np.concatenate((np.linspace(1, 2, 30), np.full(30, 2.0), np.linspace(2, 1.5, 30))),
+], ids=['flat', 'up_then_flat', 'down_then_flat', 'mixed'])
+def test_rsi_matches_ta_on_flat_stretches(values):
+    ta = pytest.importorskip('ta')
+    expected = ta.momentum.RSIIndicator(close=pd.Series(values), window=14).rsi().to_numpy()
+    np.testing.assert_allclose(ind.rsi(values, 14), expected, equal_nan=True, atol=1e-9)
+    assert_same(ind.rsi(values, 14), streamed(ind.RSIState(14), values))
+
+
+def test_all_nan_input():
+    values = np.full(10, np.nan)
+    for _, batch, _ in CASES:
+        assert np.isnan(batch(values)).all()
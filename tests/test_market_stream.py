@@ -0,0 +1,115 @@
+# tests/test_market_stream.py
+"""MarketStream against the local fake exchange (exchange/fake_server.py)"""
+import time
+
+import pytest
+
+pytest.importorskip('websockets')
+
+import data.stream
+from data.stream import MarketStream
+from exchange.client import create_client
+from exchange.fake_server import FakeBinanceExchange
+
+SYMBOL = 'NXPCUSDT'
+STEP_MS = 60_000
+
+
+@pytest.fixture
+def exchange():
+    fake = FakeBinanceExchange(symbols=(SYMBOL,), history_bars=300, future_bars=600,
+                               ws_tick=0.05).start()
+    yield fake
+    fake.stop()
+
+
+@pytest.fixture
+def stream(exchange):
+    client = create_client(base_url=exchange.base_url, ping=False)
+    market = MarketStream(ws_url=exchange.ws_url, client=client)
+    yield market
+    market.stop()
+
+
+def collect(subscription, count, timeout=5.0):
+    items, deadline = [], time.monotonic() + timeout
+    while len(items) < count and time.monotonic() < deadline:
+        item = subscription.get(timeout=0.2)
+        if item is not None:
+            items.append(item)
+    return items
+
+
+def contiguous(candles):
+    times = [c['open_time'] for c in candles]
+    return all(b - a == STEP_MS for a, b in zip(times, times[1:]))
+
+
+def test_history_then_live_candles(exchange, stream):
+    subscription = stream.subscribe_klines(SYMBOL, '1m', history=5)
+    history = subscription.drain()
+    assert len(history) == 5
+
+    stream.start(timeout=5)
+    assert stream.connected.is_set()
+    exchange.advance(3)
+    live = collect(subscription, 3)
+
+    assert len(live) == 3
+    assert all(c['closed'] for c in live)
+    assert contiguous(history + live)
+
+
+def test_gap_is_backfilled_in_order(exchange, stream):
+    subscription = stream.subscribe_klines(SYMBOL, '1m', history=1)
+    last = subscription.drain()[-1]['open_time']
+    stream.start(timeout=5)
+    # First message handled: the on-connect catch-up backfill is done
+    deadline = time.monotonic() + 5
+    while not stream.messages and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+    # Pretend the last 5 closed candles were missed while disconnected
+    stream._last_closed[(SYMBOL, '1m')] = last - 5 * STEP_MS
+    exchange.advance(1)
+    candles = collect(subscription, 6)
+
+    # (one more when the wall clock crosses a minute meanwhile)
+    assert stream.backfilled >= 5
+    assert [(c['open_time'] - last) // STEP_MS for c in candles] == [-4, -3, -2, -1, 0, 1]
+
+
+def test_ticker_price(exchange, stream):
+    stream.subscribe_ticker(SYMBOL)
+    stream.start(timeout=5)
+    price = stream.wait_for_price(SYMBOL, timeout=5)
+    assert price == pytest.approx(exchange.market(SYMBOL).last_price(exchange.now_ms()), rel=0.05)
+
+
+def test_unsubscribe_stops_delivery(exchange, stream):
+    subscription = stream.subscribe_klines(SYMBOL, '1m')
+    stream.start(timeout=5)
+    stream.unsubscribe(subscription)
+    exchange.advance(2)
+    assert collect(subscription, 1, timeout=0.5) == []
+    assert not stream.subscriptions
+
+
+def test_stream_added_while_connecting_is_subscribed(exchange, stream, monkeypatch):
+    connect = data.stream.ws_connect
+
+    def connect_and_subscribe(url):
+        # Lands after the URL is built, before the socket is assigned
+        stream.subscribe_ticker(SYMBOL)
+        return connect(url)
+
+    monkeypatch.setattr(data.stream, 'ws_connect', connect_and_subscribe)
+    stream.subscribe_klines(SYMBOL, '1m')
+    stream.start(timeout=5)
+    assert stream.wait_for_price(SYMBOL, timeout=5) is not None
+
+
+def test_start_without_websockets_fails(monkeypatch):
+    monkeypatch.setattr(data.stream, 'ws_connect', None)
+    with pytest.raises(ImportError):
+        MarketStream(ws_url='ws://127.0.0.1:1').start(wait=False)
@@ -0,0 +1,32 @@
+# tests/test_notifier.py
+"""TelegramNotifier digest formatting: every text within the Telegram limit, no empty digests"""
+import pytest
+
+from utils.notifier import TELEGRAM_MAX_LENGTH, TelegramNotifier
+
+
+@pytest.fixture
+def notifier(tmp_path):
+    return TelegramNotifier('token', 'chat', parse_mode=None, autostart=False,
+                            spill_file=str(tmp_path / 'spill.jsonl'),
+                            dead_letter_file=str(tmp_path / 'dead.jsonl'))
+
+
+def test_short_messages_share_one_digest(notifier):
+    texts = notifier._format(['one', 'two', 'three'])
+    assert len(texts) == 1
+    assert texts[0].startswith('📬 3 updates')
+    assert all(m in texts[0] for m in ('one', 'two', 'three'))
+
+
+@pytest.mark.parametrize('batch', [
+    ['x' * 5000, 'short'],
+    ['short', 'x' * 5000],
+    ['x' * 5000, 'y' * 5000, 'short'],
+])
+def test_oversized_messages_never_leave_header_only_digest(notifier, batch):
+    header = f"📬 {len(batch)} updates\n\n"
+    texts = notifier._format(batch)
+    assert all(len(text) <= TELEGRAM_MAX_LENGTH for text in texts)
+    assert all(len(text) > len(header) for text in texts)
+    assert sum(text.count('short') for text in texts) == 1
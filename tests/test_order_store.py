@@ -0,0 +1,119 @@
+# tests/test_order_store.py
+"""OrderStore crash recovery: snapshot + journal replay, torn last line"""
+import json
+import os
+
+import pytest
+
+from exchange.order_store import OrderStore, store_name
+
+
+def crash(store):
+    """Drop the store without close(): no final snapshot, journal left as is"""
+    store._journal.close()
+    store._journal = None
+
+
+def buy(store, cid, quantity, price):
+    store.record(cid, symbol='NXPCUSDT', side='BUY', type='MARKET', quantity=quantity,
+                 status='PENDING')
+    store.record(cid, status='FILLED', executed_qty=quantity, quote_qty=quantity * price)
+
+
+def sell(store, cid, quantity, price):
+    store.record(cid, symbol='NXPCUSDT', side='SELL', type='MARKET', quantity=quantity,
+                 status='FILLED', executed_qty=quantity, quote_qty=quantity * price)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'bot')
+
+
+def test_recovers_from_journal(path):
+    store = OrderStore(path, fsync=False)
+    buy(store, 'a', 10.0, 0.5)
+    crash(store)
+
+    store = OrderStore(path, fsync=False)
+    assert store.replayed == 2
+    assert store.position('NXPCUSDT').quantity == pytest.approx(10.0)
+    assert store.position('NXPCUSDT').entry_price == pytest.approx(0.5)
+    assert len(store.trades) == 1
+
+
+def test_recovers_from_snapshot_and_journal_tail(path):
+    store = OrderStore(path, snapshot_every=2, fsync=False)
+    buy(store, 'a', 10.0, 0.5)          # folded into the snapshot
+    sell(store, 'b', 4.0, 0.6)          # journal tail
+    crash(store)
+
+    store = OrderStore(path, fsync=False)
+    assert store.replayed == 1
+    position = store.position('NXPCUSDT')
+    assert position.quantity == pytest.approx(6.0)
+    assert position.realized_pnl == pytest.approx(0.4)
+
+
+def test_journal_entries_already_in_snapshot_are_skipped(path):
+    store = OrderStore(path, fsync=False)
+    buy(store, 'a', 10.0, 0.5)
+    with open(store.journal_file) as f:
+        journal = f.read()
+    store.snapshot()
+    crash(store)
+    # Crash between the snapshot replace and the journal truncate
+    with open(store.journal_file, 'w') as f:
+        f.write(journal)
+
+    store = OrderStore(path, fsync=False)
+    assert store.replayed == 0
+    assert store.position('NXPCUSDT').quantity == pytest.approx(10.0)
+    assert len(store.trades) == 1
+
+
+def test_torn_last_line_is_cut(path):
+    store = OrderStore(path, fsync=False)
+    buy(store, 'a', 10.0, 0.5)
+    crash(store)
+    with open(store.journal_file, 'a') as f:
+        f.write('{"seq": 3, "time": "2024-')   # crash mid-write
+
+    store = OrderStore(path, fsync=False)
+    assert store.truncated
+    assert store.replayed == 2
+    with open(store.journal_file) as f:
+        assert all(json.loads(line) for line in f)
+
+    # Entries written after recovery survive the next crash
+    sell(store, 'b', 10.0, 0.7)
+    crash(store)
+    store = OrderStore(path, fsync=False)
+    assert not store.truncated
+    assert store.replayed == 3
+    assert not store.position('NXPCUSDT').is_open
+    assert store.realized_pnl('NXPCUSDT') == pytest.approx(2.0)
+
+
+def test_close_snapshots_and_empties_journal(path):
+    store = OrderStore(path, fsync=False)
+    buy(store, 'a', 10.0, 0.5)
+    store.close()
+    assert os.path.getsize(store.journal_file) == 0
+
+    store = OrderStore(path, fsync=False)
+    assert store.replayed == 0
+    assert store.position('NXPCUSDT').quantity == pytest.approx(10.0)
+
+
+def test_terminal_orders_ignore_late_events(path):
+    store = OrderStore(path, fsync=False)
+    buy(store, 'a', 10.0, 0.5)
+    assert store.record('a', status='FILLED', executed_qty=10.0, quote_qty=5.0) is None
+    assert store.position('NXPCUSDT').quantity == pytest.approx(10.0)
+
+
+def test_store_name_is_stable_across_modes():
+    assert store_name('NXPCUSDT', 'telegram_config.py') == 'NXPCUSDT_telegram_config'
+    assert store_name('NXPCUSDT', '/srv/bots/telegram_config.py') == 'NXPCUSDT_telegram_config'
+    assert store_name('NXPCUSDT') == 'NXPCUSDT'
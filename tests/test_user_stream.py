@@ -0,0 +1,77 @@
+# tests/test_user_stream.py
+"""BalanceBook event ordering and reconciliation against live (uncached) state"""
+from data.market_cache import CachedClient
+from exchange.user_stream import BalanceBook, UserDataStream
+
+
+def position(asset, free, update_ms, locked=0.0):
+    return {'e': 'outboundAccountPosition', 'E': update_ms + 1, 'u': update_ms,
+            'B': [{'a': asset, 'f': str(free), 'l': str(locked)}]}
+
+
+def delta(asset, amount, clear_ms):
+    return {'e': 'balanceUpdate', 'E': clear_ms + 1, 'a': asset, 'd': str(amount),
+            'T': clear_ms}
+
+
+def account(balances, update_ms):
+    return {'updateTime': update_ms,
+            'balances': [{'asset': a, 'free': str(f), 'locked': '0'} for a, f in balances.items()]}
+
+
+def test_delta_then_position():
+    book = BalanceBook()
+    book.apply_position(position('USDT', 100.0, 1000))
+    book.apply_delta(delta('USDT', 50.0, 2000))
+    book.apply_position(position('USDT', 150.0, 2000))
+    assert book.free('USDT') == 150.0
+
+
+def test_delta_after_newer_position_is_not_counted_twice():
+    book = BalanceBook()
+    book.apply_position(position('USDT', 150.0, 2000))   # already includes the deposit
+    book.apply_delta(delta('USDT', 50.0, 2000))
+    book.apply_delta(delta('USDT', 50.0, 1500))
+    assert book.free('USDT') == 150.0
+    assert book.events == 3
+
+
+def test_deltas_in_the_same_millisecond_both_apply():
+    book = BalanceBook()
+    book.apply_position(position('USDT', 100.0, 1000))
+    book.apply_delta(delta('USDT', 10.0, 2000))
+    book.apply_delta(delta('USDT', 20.0, 2000))
+    assert book.free('USDT') == 130.0
+
+
+def test_older_snapshot_does_not_undo_delta():
+    book = BalanceBook()
+    book.apply_snapshot(account({'USDT': 100.0}, 1000))
+    book.apply_delta(delta('USDT', 50.0, 3000))
+    book.apply_snapshot(account({'USDT': 100.0}, 2000))
+    assert book.free('USDT') == 150.0
+    book.apply_snapshot(account({'USDT': 150.0}, 4000))
+    book.apply_delta(delta('USDT', 50.0, 3000))
+    assert book.free('USDT') == 150.0
+
+
+class AccountClient:
+    def __init__(self, free):
+        self.free = free
+        self.calls = 0
+
+    def get_account(self):
+        self.calls += 1
+        return account({'USDT': self.free}, 1000 * self.calls)
+
+
+def test_reconcile_bypasses_cached_client():
+    raw = AccountClient(100.0)
+    cached = CachedClient(raw)
+    cached.get_account()                  # cached snapshot, 100 USDT
+    raw.free = 175.0
+
+    user = UserDataStream(client=cached)
+    user.reconcile()
+    assert raw.calls == 2
+    assert user.book.free('USDT') == 175.0
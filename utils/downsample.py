@@ -0,0 +1,226 @@
+# utils/downsample.py
+"""
+Visual downsampling for large charts
+
+A 1m backtest has 500k+ equity points; plotting all of them makes HTML
+dashboards tens of MB and freezes the browser, while a chart is a few
+thousand pixels wide. Above a point budget (settings.PLOT_MAX_POINTS)
+series are reduced before plotting:
+    - lttb:   largest-triangle-three-buckets, keeps the visual shape of a line
+    - minmax: min and max of every bucket, keeps the envelope (every spike)
+    - candles are merged into coarser candles (first open, max high,
+      min low, last close), so no high or low is lost
+
+The equity curve keeps the peak and trough of the maximum drawdown, and
+the drawdown series is reduced with minmax, so the plotted max drawdown
+is exact.
+
+Usage:
+    from utils.downsample import equity_plot_data, downsample_ohlc
+
+    data = equity_plot_data(equity_df['timestamp'], equity_df['equity'])
+    ax.plot(data['equity_x'], data['equity_y'])
+    ax.fill_between(data['drawdown_x'], 0, data['drawdown_y'])
+"""
+import numpy as np
+
+# Import settings
+try:
+    from config.settings import settings
+except ImportError:
+    # Fallback
+    class SimpleSettings:
+        PLOT_MAX_POINTS = 5000
+        PLOT_MAX_CANDLES = 2000
+        PLOT_DOWNSAMPLE = "lttb"
+    settings = SimpleSettings()
+
+METHODS = ('lttb', 'minmax', 'none')
+
+
+def _as_float(x):
+    """x values as float (datetimes as ns since the first point)"""
+    values = np.asarray(x)
+    if values.dtype.kind == 'M':
+        values = values.astype('datetime64[ns]').view('i8')
+        return (values - values[0]).astype(np.float64)
+    if values.dtype.kind in 'iuf':
+        return values.astype(np.float64)
+    return np.arange(len(values), dtype=np.float64)   # objects / strings: position
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-triangle-three-buckets
+
+    Returns:
+        Sorted indices of the n_out points to keep (first and last included)
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = _as_float(x)
+
+    # n_out - 2 buckets between the fixed first and last point
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / counts
+    mean_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / counts
+    # The point after the last bucket is the last point
+    mean_x = np.append(mean_x[1:], x[-1])
+    mean_y = np.append(mean_y[1:], y[-1])
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - mean_x[i]) * (y[lo:hi] - y[a])
+                      - (x[a] - x[lo:hi]) * (mean_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def minmax_indices(y, n_out):
+    """
+    Min/max envelope: the lowest and highest point of (n_out - 2) // 2 buckets
+
+    Returns:
+        Sorted unique indices (first and last included)
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    buckets = (n_out - 2) // 2
+    if n_out >= n or buckets < 1:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    keep = [0, n - 1]
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi > lo:
+            window = y[lo:hi]
+            keep.append(lo + int(np.argmin(window)))
+            keep.append(lo + int(np.argmax(window)))
+    return np.unique(keep)
+
+
+def downsample_indices(x, y, budget=None, method=None, keep=()):
+    """
+    Indices to plot: all of them within the budget, else reduced by method
+
+    Args:
+        budget: Max points (default settings.PLOT_MAX_POINTS)
+        method: lttb / minmax / none (default settings.PLOT_DOWNSAMPLE)
+        keep: Indices that must survive (e.g. drawdown extremes)
+    """
+    budget = budget or settings.PLOT_MAX_POINTS
+    method = method or settings.PLOT_DOWNSAMPLE
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method {method!r} (available: {', '.join(METHODS)})")
+
+    n = len(y)
+    if method == 'none' or n <= budget:
+        return np.arange(n)
+    keep = np.asarray(keep, dtype=np.int64)
+    n_out = max(3, budget - len(keep))
+    idx = lttb_indices(x, y, n_out) if method == 'lttb' else minmax_indices(y, n_out)
+    return np.union1d(idx, keep) if len(keep) else idx
+
+
+def drawdown(equity):
+    """Drawdown in % from the running peak"""
+    equity = np.asarray(equity, dtype=np.float64)
+    peak = np.maximum.accumulate(equity)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dd = np.where(peak > 0, (peak - equity) / peak * 100, 0.0)
+    return dd
+
+
+def drawdown_extremes(equity, dd=None):
+    """(peak index, trough index) of the maximum drawdown"""
+    equity = np.asarray(equity, dtype=np.float64)
+    if len(equity) == 0:
+        return ()
+    dd = drawdown(equity) if dd is None else dd
+    trough = int(np.argmax(dd))
+    peak = int(np.argmax(equity[:trough + 1]))
+    return peak, trough
+
+
+def equity_plot_data(timestamps, equity, budget=None, method=None):
+    """
+    Equity and drawdown series ready to plot, downsampled above the budget
+
+    Drawdown is computed on the full series before reducing it.
+
+    Returns:
+        dict: equity_x, equity_y, drawdown_x, drawdown_y (numpy arrays),
+        max_drawdown (%, from the full series)
+    """
+    x = np.asarray(timestamps)
+    y = np.asarray(equity, dtype=np.float64)
+    dd = drawdown(y)
+    extremes = drawdown_extremes(y, dd)
+
+    eq_idx = downsample_indices(x, y, budget, method, keep=extremes)
+    dd_method = 'none' if (method or settings.PLOT_DOWNSAMPLE) == 'none' else 'minmax'
+    dd_idx = downsample_indices(x, dd, budget, dd_method, keep=extremes)
+    return {
+        'equity_x': x[eq_idx],
+        'equity_y': y[eq_idx],
+        'drawdown_x': x[dd_idx],
+        'drawdown_y': dd[dd_idx],
+        'max_drawdown': float(dd.max()) if len(dd) else 0.0,
+    }
+
+
+def downsample_ohlc(df, budget=None):
+    """
+    Merge candles into at most `budget` coarser candles
+
+    Each merged candle keeps the first open, highest high, lowest low and
+    last close of its bucket (volume summed), indexed by its first candle.
+    """
+    budget = budget or settings.PLOT_MAX_CANDLES
+    n = len(df)
+    if n <= budget:
+        return df
+
+    starts = np.linspace(0, n, budget + 1).astype(np.int64)[:-1]
+    starts = np.unique(starts)
+    ends = np.append(starts[1:], n) - 1
+    merged = {}
+    if 'open' in df:
+        merged['open'] = df['open'].to_numpy()[starts]
+    if 'high' in df:
+        merged['high'] = np.maximum.reduceat(df['high'].to_numpy(), starts)
+    if 'low' in df:
+        merged['low'] = np.minimum.reduceat(df['low'].to_numpy(), starts)
+    if 'close' in df:
+        merged['close'] = df['close'].to_numpy()[ends]
+    if 'volume' in df:
+        merged['volume'] = np.add.reduceat(df['volume'].to_numpy(), starts)
+    return type(df)(merged, index=df.index[starts])
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    import time
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import pandas as pd
+
+    n = 500_000
+    rng = np.random.default_rng(42)
+    timestamps = pd.date_range('2024-01-01', periods=n, freq='1min').to_numpy()
+    equity = 1000 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+
+    started = time.perf_counter()
+    data = equity_plot_data(timestamps, equity)
+    elapsed = time.perf_counter() - started
+    print(f"✅ {n:,} points -> equity {len(data['equity_y']):,}, drawdown {len(data['drawdown_y']):,} "
+          f"in {elapsed * 1000:.0f}ms")
+    print(f"   max drawdown full {drawdown(equity).max():.4f}% / plotted {data['drawdown_y'].max():.4f}%")
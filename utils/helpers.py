@@ -2,8 +2,7 @@
 """
 Helper functions
 """
-import pandas as pd
-import numpy as np
+import sys
 from datetime import datetime, timedelta
 import time
 
@@ -17,7 +16,9 @@ def format_percentage(value):
 
 def format_time(timestamp):
     """Format timestamp"""
-    if isinstance(timestamp, pd.Timestamp):
+    # pandas is not imported here (startup time): an unloaded pandas means no pd.Timestamp
+    pd = sys.modules.get('pandas')
+    if pd is not None and isinstance(timestamp, pd.Timestamp):
         return timestamp.strftime('%Y-%m-%d %H:%M')
     return timestamp
 
@@ -58,4 +59,26 @@ def create_dataframe_summary(df, name="DataFrame"):
         'memory_usage': f"{df.memory_usage(deep=True).sum() / 1024 / 1024:.2f} MB"
     }
     
-    return summary
\ No newline at end of file
+    return summary
+
+# Exchange interval units ('1m', '4h', '1d', '1w', '1M' ...) in seconds
+INTERVAL_UNITS = {
+    's': 1,
+    'm': 60,
+    'h': 3600,
+    'd': 86400,
+    'w': 604800,
+    'M': 2592000,  # 30 days
+}
+
+def interval_to_seconds(interval):
+    """Convert interval string like '15m' or '4h' to seconds"""
+    unit = interval[-1]
+    if unit not in INTERVAL_UNITS or not interval[:-1].isdigit():
+        raise ValueError(f"Invalid interval: {interval!r}")
+    
+    return int(interval[:-1]) * INTERVAL_UNITS[unit]
+
+def periods_per_year(interval):
+    """Bars per year for an interval ('1h' -> 8760), for annualising returns"""
+    return 365 * 86400 / interval_to_seconds(interval)
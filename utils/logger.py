@@ -1,83 +1,363 @@
-# utils/logger.py - FIXED SINGLETON
+# utils/logger.py - ASYNC PIPELINE
 """
 Logging system
+
+Non-blocking: the trading thread only enqueues, a background thread
+formats and writes in batches.
+    - text log:  logs/trading_YYYYMMDD.log (+ console), same format as before
+    - events:    logs/events_YYYYMMDD.jsonl, one JSON object per line for
+                 trades, signals, latencies and custom events:
+                 {"time": ..., "event": "trade", "data": {...caller fields}}
+    - files roll over at midnight and past LOG_MAX_BYTES
+      (trading_YYYYMMDD.1.log, events_YYYYMMDD.1.jsonl, ...)
+    - when the queue is full records are dropped (counted), never waited on
+
+Usage:
+    from utils.logger import get_logger, log_info, log_trade, log_latency
+
+    logger = get_logger()
+    logger.trade({'type': 'BUY', 'price': 0.45, 'amount': 15})
+    with logger.timed('order_submit', symbol='NXPCUSDT'):
+        gateway.submit(order)
+    logger.flush()      # wait until written (tests, shutdown)
 """
+import atexit
+import json
 import logging
 import os
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 
+# Import settings
+try:
+    from config.settings import settings
+except ImportError:
+    # Fallback
+    class SimpleSettings:
+        LOG_LEVEL = "INFO"
+        LOG_CONSOLE = True
+        LOG_QUEUE_SIZE = 10000
+        LOG_BATCH_SIZE = 500
+        LOG_FLUSH_INTERVAL = 0.2
+        LOG_MAX_BYTES = 50 * 1024 * 1024
+    settings = SimpleSettings()
+
+LOGGER_NAME = 'TradingBot'
+
+
+def _json_default(value):
+    if hasattr(value, 'item'):
+        return value.item()      # numpy scalars
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def _asctime(ts):
+    """logging's default asctime format: 2024-01-01 12:00:00,123"""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(ts)) + f",{int(ts % 1 * 1000):03d}"
+
+
+class RotatingFile:
+    """
+    Append-only <prefix>_<YYYYMMDD>[.N]<ext>: new file per day and past max_bytes
+
+    A batch is never split across files, so a file can exceed max_bytes by
+    at most one batch.
+    """
+
+    def __init__(self, logs_dir, prefix, ext, max_bytes):
+        self.logs_dir = logs_dir
+        self.prefix = prefix
+        self.ext = ext
+        self.max_bytes = max_bytes
+        self.path = None
+        self._file = None
+        self._day = None
+        self._part = 0
+        self._size = 0
+
+    def _name(self, day, part):
+        suffix = f".{part}" if part else ""
+        return os.path.join(self.logs_dir, f"{self.prefix}_{day}{suffix}{self.ext}")
+
+    def _open(self, day, part):
+        self.close()
+        os.makedirs(self.logs_dir, exist_ok=True)
+        # Resume today's last file after a restart
+        while os.path.exists(self._name(day, part + 1)):
+            part += 1
+        self.path = self._name(day, part)
+        self._file = open(self.path, 'ab')
+        self._day, self._part = day, part
+        self._size = self._file.tell()
+
+    def write(self, text):
+        data = text.encode('utf-8')
+        day = datetime.now().strftime('%Y%m%d')
+        if self._file is None or day != self._day:
+            self._open(day, 0)
+        if self._size and self._size + len(data) > self.max_bytes:
+            self._open(day, self._part + 1)
+        self._file.write(data)
+        self._size += len(data)
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class _EnqueueHandler(logging.Handler):
+    """Hands stdlib records to the pipeline unformatted (formatting happens in the writer)"""
+
+    def __init__(self, owner):
+        super().__init__()
+        self.owner = owner
+
+    def emit(self, record):
+        self.owner._put(('record', record.created, record))
+
+
 class TradingLogger:
     _instance = None
     _initialized = False
-    
+
     def __new__(cls, logs_dir="logs"):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance._logs_dir = logs_dir
         return cls._instance
-    
+
     def __init__(self, logs_dir="logs"):
         # Prevent re-initialization
         if TradingLogger._initialized:
             return
-        
-        # Create logs directory
+
         self._logs_dir = logs_dir
-        os.makedirs(self._logs_dir, exist_ok=True)
-        
-        # Setup logging
-        timestamp = datetime.now().strftime('%Y%m%d')
-        log_file = os.path.join(self._logs_dir, f'trading_{timestamp}.log')
-        
-        self.logger = logging.getLogger('TradingBot')
-        self.logger.setLevel(logging.INFO)
-        
-        # File handler
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(logging.INFO)
-        
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        
-        # Formatter
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
-        
-        # Add handlers
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
-        
+        self.level = logging.getLevelName(settings.LOG_LEVEL)
+        self.console = settings.LOG_CONSOLE
+        self.queue_size = settings.LOG_QUEUE_SIZE
+        self.batch_size = settings.LOG_BATCH_SIZE
+        self.flush_interval = settings.LOG_FLUSH_INTERVAL
+
+        # Files are opened by the writer on first write
+        self.text_file = RotatingFile(logs_dir, 'trading', '.log', settings.LOG_MAX_BYTES)
+        self.event_file = RotatingFile(logs_dir, 'events', '.jsonl', settings.LOG_MAX_BYTES)
+        self.formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+        self.queue = queue.SimpleQueue()
+        self._thread = None
+        self._stopped = False
+
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.errors = 0
+        self._dropped_reported = 0
+
+        # Records from logging.getLogger('TradingBot') take the same path
+        self.logger = logging.getLogger(LOGGER_NAME)
+        self.logger.setLevel(self.level)
+        self.logger.propagate = False
+        self.logger.addHandler(_EnqueueHandler(self))
+
         TradingLogger._initialized = True
-        self.logger.info(f"Logger initialized. Log file: {log_file}")
-    
+        self.start()
+        atexit.register(self.stop)
+        self.info(f"Logger initialized. Log file: {self.text_file._name(datetime.now().strftime('%Y%m%d'), 0)}")
+
+    # ==================== PRODUCER SIDE ====================
+
+    def _put(self, item):
+        """Enqueue; never blocks (drops when LOG_QUEUE_SIZE records are pending)"""
+        if self.queue.qsize() >= self.queue_size:
+            self.dropped += 1
+            return False
+        self.queue.put(item)
+        self.enqueued += 1
+        return True
+
+    def log(self, level, message):
+        if level >= self.level:
+            self._put(('log', time.time(), (level, message)))
+
+    def debug(self, message):
+        self.log(logging.DEBUG, message)
+
     def info(self, message):
-        self.logger.info(message)
-    
+        self.log(logging.INFO, message)
+
     def warning(self, message):
-        self.logger.warning(message)
-    
+        self.log(logging.WARNING, message)
+
     def error(self, message):
-        self.logger.error(message)
-    
+        self.log(logging.ERROR, message)
+
+    def event(self, name, **fields):
+        """Structured event -> one JSONL line {"time", "event", "data": fields}"""
+        return self._put(('event', time.time(), (name, fields)))
+
     def trade(self, trade_data):
-        """Log trade information"""
-        message = f"TRADE - {trade_data}"
-        self.logger.info(message)
-    
+        """Log trade information (JSONL event + text line)"""
+        # Shallow copy: the caller may keep mutating its dict after this returns
+        fields = dict(trade_data) if isinstance(trade_data, dict) else {'value': trade_data}
+        return self._put(('event', time.time(), ('trade', fields)))
+
     def strategy_signal(self, signal, price, timestamp):
         """Log strategy signal"""
-        message = f"SIGNAL - {signal} @ ${price:.2f} - {timestamp}"
-        self.logger.info(message)
+        return self._put(('event', time.time(), ('signal', {'signal': signal, 'price': price,
+                                                             'timestamp': timestamp})))
 
-# Test the logger
-if __name__ == "__main__":
-    logger = TradingLogger("test_logs")
-    logger.info("Test message")
-    print("✅ Logger test successful!")
+    def latency(self, name, seconds, **fields):
+        """Latency event in ms (JSONL only, not on the console)"""
+        return self._put(('event', time.time(), ('latency', {'name': name, 'ms': seconds * 1000, **fields})))
+
+    @contextmanager
+    def timed(self, name, **fields):
+        """Time a block and log it as a latency event"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.latency(name, time.perf_counter() - started, **fields)
+
+    # ==================== WORKER ====================
+
+    def _collect_batch(self):
+        """First item (blocking) plus whatever arrives within flush_interval"""
+        try:
+            batch = [self.queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size and batch[-1] is not None:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self.queue.get(timeout=remaining) if remaining > 0
+                             else self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _format(self, batch):
+        """(text lines, JSONL lines, flush markers) for one batch"""
+        text, events, marks = [], [], []
+        for item in batch:
+            if item is None:
+                continue
+            kind, ts, payload = item
+            try:
+                self._format_item(kind, ts, payload, text, events, marks)
+            except Exception as e:
+                # A bad record must not stop the writer thread
+                self.errors += 1
+                text.append(f"{_asctime(ts or time.time())} - {LOGGER_NAME} - ERROR - "
+                            f"Unloggable {kind} record: {type(e).__name__}: {e}\n")
+        return text, events, marks
+
+    def _format_item(self, kind, ts, payload, text, events, marks):
+        if kind == 'log':
+            level, message = payload
+            text.append(f"{_asctime(ts)} - {LOGGER_NAME} - {logging.getLevelName(level)} - {message}\n")
+        elif kind == 'record':
+            text.append(self.formatter.format(payload) + '\n')
+        elif kind == 'event':
+            name, fields = payload
+            when = datetime.fromtimestamp(ts).isoformat(timespec='milliseconds')
+            # Caller fields nested: a trade's own 'time' must not replace the envelope's
+            events.append(json.dumps({'time': when, 'event': name, 'data': fields},
+                                     default=_json_default) + '\n')
+            if name == 'trade':
+                text.append(f"{_asctime(ts)} - {LOGGER_NAME} - INFO - TRADE - {fields}\n")
+            elif name == 'signal':
+                text.append(f"{_asctime(ts)} - {LOGGER_NAME} - INFO - SIGNAL - {fields['signal']} "
+                            f"@ ${fields['price']:.2f} - {fields['timestamp']}\n")
+        elif kind == 'mark':
+            marks.append(payload)
+
+    def _write(self, text, events):
+        dropped = self.dropped - self._dropped_reported
+        if dropped:
+            self._dropped_reported += dropped
+            text.append(f"{_asctime(time.time())} - {LOGGER_NAME} - WARNING - "
+                        f"{dropped} log records dropped (queue full)\n")
+        try:
+            if text:
+                self.text_file.write(''.join(text))
+                self.text_file.flush()
+            if events:
+                self.event_file.write(''.join(events))
+                self.event_file.flush()
+        except OSError as e:
+            self.errors += 1
+            print(f"⚠️  Log write failed: {e}", file=sys.stderr)
+        if self.console and text:
+            sys.stderr.write(''.join(text))
+            sys.stderr.flush()
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            if not batch:
+                continue
+            text, events, marks = self._format(batch)
+            self._write(text, events)
+            self.written += len(batch) - len(marks)
+            self.batches += 1
+            for mark in marks:
+                mark.set()
+            if batch[-1] is None:
+                break
+        self.text_file.close()
+        self.event_file.close()
+
+    # ==================== LIFECYCLE ====================
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name='trading-logger', daemon=True)
+            self._thread.start()
+        return self
+
+    def flush(self, timeout=5.0):
+        """Wait until everything enqueued so far is on disk"""
+        if self._thread is None or not self._thread.is_alive():
+            return False
+        mark = threading.Event()
+        self.queue.put(('mark', None, mark))
+        return mark.wait(timeout)
+
+    def stop(self, timeout=5.0):
+        """Write what is queued, then stop the writer thread"""
+        if self._stopped or self._thread is None:
+            return
+        self._stopped = True
+        self.queue.put(None)
+        self._thread.join(timeout)
+
+    def get_stats(self):
+        return {
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'batches': self.batches,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'pending': self.queue.qsize(),
+            'text_file': self.text_file.path,
+            'event_file': self.event_file.path,
+        }
 
 # Global instance
 _logger_instance = None
@@ -105,10 +385,26 @@ def log_trade(trade_data):
 def log_signal(signal, price, timestamp):
     get_logger().strategy_signal(signal, price, timestamp)
 
+def log_event(name, **fields):
+    get_logger().event(name, **fields)
+
+def log_latency(name, seconds, **fields):
+    get_logger().latency(name, seconds, **fields)
+
 # Test jika di-run langsung
 if __name__ == "__main__":
     logger = get_logger("test_logs")
     log_info("Test info message")
     log_warning("Test warning")
     log_trade({"action": "BUY", "price": 50000})
-    print("✅ Logger functions test successful!")
\ No newline at end of file
+    log_signal("BUY", 0.4512, datetime.now())
+
+    logger.console = False
+    n = 5000
+    started = time.perf_counter()
+    for i in range(n):
+        logger.latency('tick', 0.0001, seq=i)
+    enqueue_us = (time.perf_counter() - started) / n * 1e6
+    logger.flush(30)
+    print(f"✅ Logger functions test successful! {enqueue_us:.2f}µs per event on the caller, "
+          f"stats: {logger.get_stats()}")
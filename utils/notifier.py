@@ -0,0 +1,379 @@
+# utils/notifier.py
+"""
+Non-blocking Telegram notifier
+
+The trading loop only enqueues; a background thread delivers. Messages
+arriving in a burst are coalesced into one digest, failed sends are
+retried with exponential backoff on a persistent HTTP session, and when
+the queue is full (or Telegram stays down) messages are spilled to a
+JSONL file and replayed once the notifier catches up. Texts Telegram
+rejects outright (4xx other than 429) are not retried: they go to a
+dead-letter file instead.
+"""
+import json
+import os
+import queue
+import re
+import threading
+import time
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Import settings
+try:
+    from config.settings import settings
+except ImportError:
+    # Fallback
+    class SimpleSettings:
+        NOTIFY_QUEUE_SIZE = 500
+        NOTIFY_BATCH_WINDOW = 2.0
+        NOTIFY_MAX_BATCH = 20
+        NOTIFY_MAX_RETRIES = 5
+        NOTIFY_RETRY_BACKOFF = 1.0
+        NOTIFY_TIMEOUT = 10.0
+        NOTIFY_SPILL_FILE = "logs/notifications_spill.jsonl"
+        NOTIFY_DEAD_LETTER_FILE = "logs/notifications_dead.jsonl"
+    settings = SimpleSettings()
+
+TELEGRAM_API_URL = "https://api.telegram.org"
+TELEGRAM_MAX_LENGTH = 4096
+DIGEST_SEPARATOR = "\n———\n"
+
+# _post results
+SENT, RETRY, REJECTED = 'sent', 'retry', 'rejected'
+
+_HTML_TAG = re.compile(r'<(/?)([a-zA-Z][\w-]*)[^>]*>')
+_PARTIAL_ENTITY = re.compile(r'&#?\w*$')
+
+
+class _Formatted(str):
+    """A text already formatted for sending (a spilled digest): replayed as is"""
+
+
+class TelegramNotifier:
+    """Background Telegram sender with batching, retry and disk spill"""
+
+    def __init__(self, token, chat_id, parse_mode='HTML', api_url=TELEGRAM_API_URL,
+                 queue_size=None, batch_window=None, max_batch=None, max_retries=None,
+                 retry_backoff=None, timeout=None, spill_file=None, dead_letter_file=None,
+                 autostart=True):
+        self.token = token
+        self.chat_id = chat_id
+        self.parse_mode = parse_mode
+        self.url = f"{api_url.rstrip('/')}/bot{token}/sendMessage"
+
+        self.batch_window = settings.NOTIFY_BATCH_WINDOW if batch_window is None else batch_window
+        self.max_batch = max_batch or settings.NOTIFY_MAX_BATCH
+        self.max_retries = settings.NOTIFY_MAX_RETRIES if max_retries is None else max_retries
+        self.retry_backoff = settings.NOTIFY_RETRY_BACKOFF if retry_backoff is None else retry_backoff
+        self.timeout = timeout or settings.NOTIFY_TIMEOUT
+        self.spill_file = settings.NOTIFY_SPILL_FILE if spill_file is None else spill_file
+        self.dead_letter_file = (settings.NOTIFY_DEAD_LETTER_FILE if dead_letter_file is None
+                                 else dead_letter_file)
+
+        self.queue = queue.Queue(queue_size or settings.NOTIFY_QUEUE_SIZE)
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=2))
+
+        self._spill_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread = None
+
+        self.enqueued = 0
+        self.messages_sent = 0
+        self.requests_sent = 0
+        self.digests = 0
+        self.retries = 0
+        self.failed = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.restored = 0
+
+        if autostart:
+            self.start()
+
+    # ==================== PRODUCER SIDE ====================
+
+    def send(self, message):
+        """Enqueue a message; never blocks, never touches the network"""
+        try:
+            self._idle.clear()
+            self.queue.put_nowait(message)
+            self.enqueued += 1
+            return True
+        except queue.Full:
+            return self._spill([message])
+
+    def _spill(self, messages, formatted=False):
+        """
+        Append messages to the spill file (or drop them without one)
+
+        formatted: texts ready to send (digests); replayed verbatim instead
+        of being coalesced again
+        """
+        if not self.spill_file or not self._append(self.spill_file, messages, formatted=formatted):
+            self.dropped += len(messages)
+            return False
+        self.spilled += len(messages)
+        return True
+
+    def _dead_letter(self, text, status):
+        """Keep a text Telegram rejected (retrying it would fail the same way)"""
+        self.rejected += 1
+        if self.dead_letter_file:
+            self._append(self.dead_letter_file, [text], status=status)
+
+    def _append(self, path, texts, **fields):
+        try:
+            with self._spill_lock:
+                os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+                with open(path, 'a', encoding='utf-8') as f:
+                    for text in texts:
+                        f.write(json.dumps({'time': datetime.now().isoformat(),
+                                            'text': text, **fields}) + '\n')
+            return True
+        except OSError as e:
+            print(f"⚠️  Notification spill failed: {e}")
+            return False
+
+    def _restore_spilled(self):
+        """Move spilled messages back into the queue while there is room"""
+        if not self.spill_file or not os.path.exists(self.spill_file):
+            return
+
+        with self._spill_lock:
+            try:
+                with open(self.spill_file, encoding='utf-8') as f:
+                    lines = f.readlines()
+            except OSError:
+                return
+
+            room = self.queue.maxsize - self.queue.qsize()
+            restore, keep = lines[:room], lines[room:]
+            for line in restore:
+                try:
+                    entry = json.loads(line)
+                    text = _Formatted(entry['text']) if entry.get('formatted') else entry['text']
+                    self.queue.put_nowait(text)
+                    self.restored += 1
+                except (ValueError, KeyError, queue.Full):
+                    continue
+
+            if keep:
+                with open(self.spill_file, 'w', encoding='utf-8') as f:
+                    f.writelines(keep)
+            else:
+                os.remove(self.spill_file)
+
+    # ==================== WORKER ====================
+
+    def _collect_batch(self):
+        """First message (blocking) plus whatever arrives within batch_window"""
+        try:
+            first = self.queue.get(timeout=0.5)
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 and self.queue.empty():
+                break
+            try:
+                batch.append(self.queue.get(timeout=max(remaining, 0)) if remaining > 0
+                             else self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _format(self, batch):
+        """
+        One text per request: single message as-is, bursts as digest(s)
+
+        Replayed texts (already formatted) are sent as they are.
+        """
+        texts = [text for text in batch if isinstance(text, _Formatted)]
+        messages = [message for message in batch if not isinstance(message, _Formatted)]
+        if len(messages) <= 1:
+            return texts + [self._truncate(message, TELEGRAM_MAX_LENGTH) for message in messages]
+
+        header = f"📬 {len(messages)} updates\n\n"
+        current = header
+        for message in messages:
+            part = message if current == header else DIGEST_SEPARATOR + message
+            if len(current) + len(part) > TELEGRAM_MAX_LENGTH:
+                if current != header:   # never send a header without messages
+                    texts.append(current)
+                current = header + self._truncate(message, TELEGRAM_MAX_LENGTH - len(header))
+            else:
+                current += part
+        texts.append(current)
+        return texts
+
+    def _truncate(self, text, limit):
+        """Cut text to limit; with HTML, never inside a tag or entity, open tags closed"""
+        if len(text) <= limit:
+            return text
+        if self.parse_mode != 'HTML':
+            return text[:limit]
+
+        cut = limit
+        while True:
+            part = text[:cut]
+            if part.rfind('<') > part.rfind('>'):
+                part = part[:part.rfind('<')]
+            part = _PARTIAL_ENTITY.sub('', part)
+
+            open_tags = []
+            for match in _HTML_TAG.finditer(part):
+                closing, tag = match.group(1), match.group(2).lower()
+                if not closing:
+                    open_tags.append(tag)
+                elif tag in open_tags:
+                    del open_tags[len(open_tags) - 1 - open_tags[::-1].index(tag)]
+            suffix = ''.join(f"</{tag}>" for tag in reversed(open_tags))
+            if len(part) + len(suffix) <= limit:
+                return part + suffix
+            cut = len(part) - len(suffix)
+
+    def _post(self, text):
+        """
+        POST with retry/backoff
+
+        Returns:
+            SENT, RETRY (network / 5xx / rate limit: worth replaying later)
+            or REJECTED (4xx: the text itself is the problem)
+        """
+        delay = self.retry_backoff
+        payload = {'chat_id': self.chat_id, 'text': text}
+        if self.parse_mode:
+            payload['parse_mode'] = self.parse_mode
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.retries += 1
+                if self._stopping.wait(delay):
+                    delay = 0   # shutting down: retry immediately, once per attempt
+                delay *= 2
+
+            try:
+                response = self.session.post(self.url, json=payload, timeout=self.timeout)
+                self.requests_sent += 1
+            except requests.RequestException as e:
+                print(f"   ⚠️  Telegram error: {e}")
+                continue
+
+            if response.status_code == 200:
+                return SENT
+            if response.status_code == 429:
+                try:
+                    delay = max(delay, response.json()['parameters']['retry_after'])
+                except (ValueError, KeyError, TypeError):
+                    pass
+                continue
+            if response.status_code < 500:
+                # Bad request / token: retrying will not help
+                print(f"   ❌ Telegram rejected message: {response.status_code}")
+                return REJECTED
+
+        return RETRY
+
+    def _run(self):
+        while not (self._stopping.is_set() and self.queue.empty()):
+            batch = self._collect_batch()
+            if not batch:
+                self._restore_spilled()
+                if self.queue.empty():
+                    self._idle.set()
+                continue
+
+            texts = self._format(batch)
+            if sum(not isinstance(m, _Formatted) for m in batch) > 1:
+                self.digests += 1
+
+            rejected = False
+            for i, text in enumerate(texts):
+                result = self._post(text)
+                if result == SENT:
+                    continue
+                self.failed += 1
+                if result == REJECTED:
+                    self._dead_letter(text, 'rejected')
+                    rejected = True
+                    continue
+                # Keep what could not be delivered for a later replay, as sent
+                self._spill(texts[i:], formatted=True)
+                break
+            else:
+                if not rejected:
+                    self.messages_sent += len(batch)
+
+        self._idle.set()
+
+    # ==================== LIFECYCLE ====================
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name='telegram-notifier', daemon=True)
+            self._thread.start()
+        return self
+
+    def flush(self, timeout=None):
+        """Wait until everything queued so far has been handled"""
+        return self._idle.wait(timeout)
+
+    def stop(self, timeout=10.0):
+        """Deliver what is queued (bounded by timeout), then stop"""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                # Could not drain in time: keep the rest on disk
+                self._spill(self.drain())
+            self._thread = None
+        self.session.close()
+
+    def drain(self):
+        items = []
+        while True:
+            try:
+                items.append(self.queue.get_nowait())
+            except queue.Empty:
+                return items
+
+    def stats(self):
+        return {
+            'enqueued': self.enqueued,
+            'pending': self.queue.qsize(),
+            'messages_sent': self.messages_sent,
+            'requests_sent': self.requests_sent,
+            'digests': self.digests,
+            'retries': self.retries,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'dropped': self.dropped,
+            'spilled': self.spilled,
+            'restored': self.restored,
+        }
+
+
+if __name__ == "__main__":
+    try:
+        from telegram_config import TELEGRAM_TOKEN, CHAT_ID
+    except ImportError:
+        TELEGRAM_TOKEN, CHAT_ID = settings.TELEGRAM_BOT_TOKEN, settings.TELEGRAM_CHAT_ID
+
+    notifier = TelegramNotifier(TELEGRAM_TOKEN, CHAT_ID)
+    for i in range(5):
+        notifier.send(f"🧪 Notifier test {i + 1}/5")
+    print("📨 5 messages queued (returned immediately), delivering as one digest...")
+    notifier.stop()
+    print(f"✅ {notifier.stats()}")
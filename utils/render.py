@@ -0,0 +1,232 @@
+# utils/render.py
+"""
+Headless batch chart rendering
+
+Renders many backtest results at once, without a display and without
+blocking on plt.show():
+    - matplotlib figures are built on the Agg backend (PNG)
+    - the Plotly dashboard is written as HTML (PNG export needs kaleido)
+    - results are rendered across a process pool
+    - unchanged results are skipped: each result is hashed and the hash is
+      kept in <out_dir>/manifest.json next to the files it produced
+
+Usage:
+    from utils.render import render_batch
+
+    summary = render_batch({'sma_10_30': results_a, 'sma_20_50': results_b})
+    print(summary['rendered'], summary['skipped'], summary['failed'])
+
+    python -m utils.render --demo 8            # synthetic backtests, twice (2nd run skips)
+"""
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import settings
+try:
+    from config.settings import settings
+except ImportError:
+    # Fallback
+    class SimpleSettings:
+        RENDER_DIR = "reports/batch"
+        RENDER_WORKERS = 0
+        RENDER_DPI = 100
+        RENDER_KINDS = ['equity', 'trades', 'dashboard']
+        RENDER_PLOTLYJS = "cdn"
+    settings = SimpleSettings()
+
+# Bump when figure code changes so existing outputs are re-rendered
+RENDER_VERSION = 2
+MANIFEST_FILE = "manifest.json"
+KINDS = {
+    'equity': '_equity.png',
+    'trades': '_trades.png',
+    'dashboard': '_dashboard.html',
+}
+
+
+def safe_name(name):
+    """File-name-safe result name"""
+    return re.sub(r'[^\w.-]+', '_', str(name)).strip('_') or 'result'
+
+
+def result_hash(result, kinds, dpi):
+    """Content hash of a result + everything that changes its charts"""
+    payload = json.dumps({'result': result, 'kinds': sorted(kinds), 'dpi': dpi,
+                          'version': RENDER_VERSION}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def render_result(name, result, out_dir, kinds=None, dpi=None, plotlyjs=None):
+    """
+    Render one result's charts into out_dir
+
+    Returns:
+        List of files written (charts without data are left out)
+    """
+    from backtest.analyzer import ResultAnalyzer
+    from utils.visualization import ChartBuilder
+
+    kinds = kinds or settings.RENDER_KINDS
+    dpi = dpi or settings.RENDER_DPI
+    plotlyjs = settings.RENDER_PLOTLYJS if plotlyjs is None else plotlyjs
+    base = os.path.join(out_dir, safe_name(name))
+    analyzer = ResultAnalyzer(result)
+    files = []
+
+    for kind in kinds:
+        path = base + KINDS[kind]
+        if kind == 'dashboard':
+            fig = ChartBuilder.dashboard_figure(result, str(name))
+            if fig is not None:
+                fig.write_html(path, include_plotlyjs=plotlyjs)
+                files.append(path)
+            continue
+
+        fig = analyzer.equity_figure() if kind == 'equity' else analyzer.trade_distribution_figure()
+        if fig is not None:
+            fig.savefig(path, dpi=dpi)   # plain Figure: Agg canvas, nothing to close
+            files.append(path)
+    return files
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+    sys.stdout = open(os.devnull, 'w')
+
+
+def _worker_job(job):
+    name, result, out_dir, kinds, dpi, plotlyjs = job
+    try:
+        return render_result(name, result, out_dir, kinds, dpi, plotlyjs), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def render_batch(results, out_dir=None, kinds=None, workers=None, dpi=None,
+                 plotlyjs=None, force=False, progress=None):
+    """
+    Render a batch of results, skipping the ones already rendered
+
+    Args:
+        results: {name: backtest result dict} or [(name, result)]
+        workers: Processes (None = settings.RENDER_WORKERS, 0 = one per CPU,
+            1 = in this process)
+        force: Re-render even when the hash is unchanged
+        progress: Optional callback(done, total, name, error)
+
+    Returns:
+        dict: rendered, skipped (names), failed ({name: error}),
+        files ({name: [paths]}), out_dir
+    """
+    items = list(results.items()) if isinstance(results, dict) else list(results)
+    out_dir = out_dir or settings.RENDER_DIR
+    kinds = list(kinds or settings.RENDER_KINDS)
+    unknown = [kind for kind in kinds if kind not in KINDS]
+    if unknown:
+        raise ValueError(f"Unknown chart kind(s) {unknown} (available: {', '.join(KINDS)})")
+    dpi = dpi or settings.RENDER_DPI
+    plotlyjs = settings.RENDER_PLOTLYJS if plotlyjs is None else plotlyjs
+    workers = settings.RENDER_WORKERS if workers is None else workers
+    workers = workers or os.cpu_count() or 1
+
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = load_manifest(out_dir)
+    summary = {'rendered': [], 'skipped': [], 'failed': {}, 'files': {}, 'out_dir': out_dir}
+
+    jobs, hashes = [], {}
+    for name, result in items:
+        name = str(name)
+        digest = result_hash(result, kinds, dpi)
+        entry = manifest.get(name)
+        if (not force and entry and entry.get('hash') == digest
+                and all(os.path.exists(path) for path in entry.get('files', []))):
+            summary['skipped'].append(name)
+            summary['files'][name] = entry['files']
+            continue
+        hashes[name] = digest
+        jobs.append((name, result, out_dir, kinds, dpi, plotlyjs))
+
+    def finish(done, job, files, error):
+        name = job[0]
+        if error:
+            summary['failed'][name] = error
+            manifest.pop(name, None)
+        else:
+            summary['rendered'].append(name)
+            summary['files'][name] = files
+            manifest[name] = {'hash': hashes[name], 'files': files}
+        if progress:
+            progress(done, len(jobs), name, error)
+
+    if workers <= 1 or len(jobs) <= 1:
+        for done, job in enumerate(jobs, 1):
+            finish(done, job, *_worker_job(job))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs)),
+                                 initializer=_init_worker) as executor:
+            futures = {executor.submit(_worker_job, job): job for job in jobs}
+            for done, future in enumerate(as_completed(futures), 1):
+                finish(done, futures[future], *future.result())
+
+    if jobs:
+        _save_manifest(out_dir, manifest)
+    return summary
+
+
+def print_summary(summary):
+    print(f"\n🖼️  RENDER: {len(summary['rendered'])} rendered, {len(summary['skipped'])} unchanged, "
+          f"{len(summary['failed'])} failed → {summary['out_dir']}")
+    for name, error in summary['failed'].items():
+        print(f"❌ {name}: {error}")
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Batch chart rendering demo')
+    parser.add_argument('--demo', type=int, default=8, help='Synthetic results to render')
+    parser.add_argument('--candles', type=int, default=2000)
+    parser.add_argument('--out', default=os.path.join(settings.RENDER_DIR, 'demo'))
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    import contextlib
+    from backtest.engine import BacktestEngine
+    from benchmarks.harness import make_synthetic_ohlcv
+    from strategies.registry import create_strategy
+
+    df = make_synthetic_ohlcv(args.candles, interval='1h')
+    batch = {}
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        for i in range(args.demo):
+            config = f"sma_crossover(fast_period={5 + 5 * i}, slow_period={30 + 10 * i})"
+            batch[f"sma_{5 + 5 * i}_{30 + 10 * i}"] = BacktestEngine().run(df, create_strategy(config))
+    for attempt in ("first run", "second run"):
+        started = time.perf_counter()
+        summary = render_batch(batch, args.out, workers=args.workers)
+        print(f"{attempt}: {time.perf_counter() - started:.2f}s")
+        print_summary(summary)
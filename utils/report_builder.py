@@ -0,0 +1,464 @@
+# utils/report_builder.py
+"""
+Static multi-strategy HTML report
+
+One report directory for any number of backtest runs, instead of one HTML
+file per figure with the 4.6MB Plotly bundle embedded in each:
+
+    <out_dir>/index.html           summary table (sortable) + one section per run
+    <out_dir>/assets/plotly.min.js shared by every chart (or the CDN, REPORT_PLOTLYJS)
+    <out_dir>/assets/report.js     loader + chart code, report.css
+    <out_dir>/data/<run>.js        series per run: downsampled, float32/float64
+                                   base64 (about 1/3 the size of JSON numbers)
+
+Run sections load their data file only when scrolled into view, so a
+500-run report opens as fast as a 5-run one. Data files are plain <script>
+includes (not fetch), so the report works from file:// without a server.
+
+Usage:
+    from utils.report_builder import ReportBuilder
+
+    report = ReportBuilder('reports/sweep', title='SMA sweep')
+    for name, results in runs.items():
+        report.add_run(name, results, params={'fast': 10})
+    path = report.build()
+"""
+import base64
+import html
+import json
+import os
+import re
+import sys
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import settings
+try:
+    from config.settings import settings
+except ImportError:
+    # Fallback
+    class SimpleSettings:
+        REPORT_DIR = "reports/report"
+        REPORT_MAX_POINTS = 2000
+        REPORT_OVERVIEW_RUNS = 20
+        REPORT_PLOTLYJS = "local"
+    settings = SimpleSettings()
+
+from utils.downsample import downsample_indices, equity_plot_data
+
+# (key in engine results, column title, format)
+METRICS = [
+    ('total_return_pct', 'Return %', '{:+.2f}'),
+    ('sharpe_ratio', 'Sharpe', '{:.2f}'),
+    ('max_drawdown', 'Max DD %', '{:.2f}'),
+    ('win_rate', 'Win %', '{:.1f}'),
+    ('profit_factor', 'PF', '{:.2f}'),
+    ('total_trades', 'Trades', '{:d}'),
+    ('final_equity', 'Final equity', '{:,.2f}'),
+]
+
+# assets/report.js: data loader (script include per run), lazy sections, sortable table
+REPORT_JS = r"""(function () {
+  var callbacks = {};
+
+  window.tradsReport = {
+    load: function (id, payload) {
+      var done = callbacks[id];
+      delete callbacks[id];
+      if (done) done(payload);
+    }
+  };
+
+  function decode(field) {
+    var raw = atob(field.b64), bytes = new Uint8Array(raw.length);
+    for (var i = 0; i < raw.length; i++) bytes[i] = raw.charCodeAt(i);
+    return field.dtype === 'f8' ? new Float64Array(bytes.buffer) : new Float32Array(bytes.buffer);
+  }
+
+  function include(section, done) {
+    callbacks[section.id] = done;
+    var script = document.createElement('script');
+    script.src = section.getAttribute('data-src');
+    script.onerror = function () { section.classList.add('failed'); };
+    document.head.appendChild(script);
+  }
+
+  var config = {responsive: true, displaylogo: false};
+  var dark = {paper_bgcolor: '#111', plot_bgcolor: '#111', font: {color: '#ddd'},
+              margin: {l: 60, r: 20, t: 30, b: 40}, hovermode: 'x unified'};
+
+  function merge(a, b) {
+    var out = {}, key;
+    for (key in a) out[key] = a[key];
+    for (key in b) out[key] = b[key];
+    return out;
+  }
+
+  function drawRun(el, s) {
+    var traces = [
+      {x: decode(s.equity_x), y: decode(s.equity_y), type: 'scatter', mode: 'lines', name: 'Equity',
+       line: {color: '#4e9af1'}},
+      {x: decode(s.drawdown_x), y: decode(s.drawdown_y), type: 'scatter', mode: 'lines', name: 'Drawdown %',
+       fill: 'tozeroy', line: {color: '#e05252'}, xaxis: 'x', yaxis: 'y2'}
+    ];
+    var layout = merge(dark, {
+      height: 420, showlegend: false,
+      xaxis: {type: 'date', anchor: 'y2'},
+      yaxis: {domain: [0.38, 1], title: 'Equity'},
+      yaxis2: {domain: [0, 0.3], title: 'DD %', autorange: 'reversed'}
+    });
+    if (s.initial_capital) {
+      layout.shapes = [{type: 'line', xref: 'paper', x0: 0, x1: 1, yref: 'y', y0: s.initial_capital,
+                        y1: s.initial_capital, line: {dash: 'dash', color: '#888', width: 1}}];
+    }
+    if (s.trade_returns) {
+      layout.xaxis.domain = [0, 0.72];
+      layout.xaxis3 = {domain: [0.78, 1], anchor: 'y3', title: 'Trade return %'};
+      layout.yaxis3 = {domain: [0, 1], anchor: 'x3'};
+      traces.push({x: decode(s.trade_returns), type: 'histogram', name: 'Trades', xaxis: 'x3', yaxis: 'y3',
+                   marker: {color: '#7bc67b'}});
+    }
+    Plotly.newPlot(el, traces, layout, config);
+  }
+
+  function drawOverview(el, runs) {
+    var traces = runs.map(function (run) {
+      return {x: decode(run.x), y: decode(run.y), type: 'scatter', mode: 'lines', name: run.name};
+    });
+    Plotly.newPlot(el, traces, merge(dark, {height: 460, xaxis: {type: 'date'},
+                                            yaxis: {title: 'Cumulative return %'}}), config);
+  }
+
+  function show(section) {
+    var el = section.querySelector('.chart');
+    if (!el || section.getAttribute('data-loaded')) return;
+    section.setAttribute('data-loaded', '1');
+    include(section, function (payload) {
+      if (el.getAttribute('data-kind') === 'overview') drawOverview(el, payload);
+      else drawRun(el, payload);
+    });
+  }
+
+  function sortable(table) {
+    var headers = table.querySelectorAll('th');
+    Array.prototype.forEach.call(headers, function (th, col) {
+      th.addEventListener('click', function () {
+        var body = table.tBodies[0], rows = Array.prototype.slice.call(body.rows);
+        var desc = th.getAttribute('data-sort') !== 'desc';
+        Array.prototype.forEach.call(headers, function (h) { h.removeAttribute('data-sort'); });
+        th.setAttribute('data-sort', desc ? 'desc' : 'asc');
+        rows.sort(function (a, b) {
+          var x = a.cells[col], y = b.cells[col];
+          var nx = parseFloat(x.getAttribute('data-value')), ny = parseFloat(y.getAttribute('data-value'));
+          var cmp = (!isNaN(nx) || !isNaN(ny))
+            ? (isNaN(nx) ? -Infinity : nx) - (isNaN(ny) ? -Infinity : ny)
+            : x.textContent.localeCompare(y.textContent, undefined, {numeric: true});
+          return desc ? -cmp : cmp;
+        });
+        rows.forEach(function (row) { body.appendChild(row); });
+      });
+    });
+  }
+
+  document.addEventListener('DOMContentLoaded', function () {
+    var table = document.getElementById('summary');
+    if (table) sortable(table);
+
+    var sections = document.querySelectorAll('section[data-src]');
+    if (!('IntersectionObserver' in window)) {
+      Array.prototype.forEach.call(sections, show);
+      return;
+    }
+    var observer = new IntersectionObserver(function (entries) {
+      entries.forEach(function (entry) {
+        if (entry.isIntersecting) {
+          observer.unobserve(entry.target);
+          show(entry.target);
+        }
+      });
+    }, {rootMargin: '400px 0px'});
+    Array.prototype.forEach.call(sections, function (section) { observer.observe(section); });
+  });
+})();
+"""
+
+REPORT_CSS = """body { background: #111; color: #ddd; font: 14px/1.4 -apple-system, "Segoe UI", sans-serif; margin: 0 2rem 4rem; }
+h1 { margin: 1.5rem 0 0.2rem; } h2 { margin: 0 0 0.3rem; font-size: 1.1rem; }
+a { color: #4e9af1; text-decoration: none; }
+.meta { color: #999; margin: 0.1rem 0; }
+section { border-top: 1px solid #333; padding: 1rem 0; }
+section .chart { min-height: 420px; }
+section.failed .chart::before { content: "Data file could not be loaded"; color: #e05252; }
+.empty { color: #777; }
+table { border-collapse: collapse; margin: 1rem 0; width: 100%; }
+th, td { padding: 0.25rem 0.6rem; border-bottom: 1px solid #2a2a2a; text-align: left; white-space: nowrap; }
+th { cursor: pointer; position: sticky; top: 0; background: #1b1b1b; user-select: none; }
+th[data-sort="asc"]::after { content: " \\25B2"; } th[data-sort="desc"]::after { content: " \\25BC"; }
+td.num, th.num { text-align: right; font-variant-numeric: tabular-nums; }
+tbody tr:hover { background: #1e1e1e; }
+"""
+
+
+def _encode(values, dtype):
+    """Array -> {dtype, b64}: little-endian float32 ('f4') or float64 ('f8')"""
+    array = np.ascontiguousarray(values, dtype='<' + dtype)
+    return {'dtype': dtype, 'b64': base64.b64encode(array.tobytes()).decode('ascii')}
+
+
+def _epoch_ms(timestamps):
+    """Timestamps -> float64 ms since epoch (UTC), what Plotly date axes take"""
+    import pandas as pd
+    index = pd.DatetimeIndex(pd.to_datetime(timestamps, utc=True))
+    return index.as_unit('ms').asi8.astype(np.float64)
+
+
+def _number(value):
+    """JSON-safe metric value (numpy scalars, inf/nan -> None)"""
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+
+def _script_json(value):
+    """JSON for inline <script> (no "</script>" break-out)"""
+    return json.dumps(value, separators=(',', ':')).replace('</', '<\\/')
+
+
+def _write_if_changed(path, content):
+    """Write text unless the file already has it (rebuilds keep mtimes, skip I/O)"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return True
+
+
+class ReportBuilder:
+    """Collects runs, then writes one report directory"""
+
+    def __init__(self, out_dir=None, title="Strategy Report", max_points=None, plotlyjs=None):
+        self.out_dir = out_dir or settings.REPORT_DIR
+        self.title = title
+        self.max_points = max_points or settings.REPORT_MAX_POINTS
+        self.plotlyjs = plotlyjs or settings.REPORT_PLOTLYJS
+        self.runs = []
+        self._ids = set()
+
+    def _run_id(self, name):
+        base = 'run-' + (re.sub(r'[^\w-]+', '_', name).strip('_')[:60] or str(len(self.runs)))
+        run_id, n = base, 1
+        while run_id in self._ids:
+            n += 1
+            run_id = f"{base}_{n}"
+        self._ids.add(run_id)
+        return run_id
+
+    def add_run(self, name, results, params=None):
+        """
+        Add one backtest (engine results dict)
+
+        Series are downsampled and encoded here, so the full results do not
+        need to stay in memory while a large sweep is collected.
+        """
+        name = str(name)
+        run = {
+            'id': self._run_id(name),
+            'name': name,
+            'params': {k: _number(v) for k, v in (params or {}).items()},
+            'metrics': {key: _number(results.get(key)) for key, _, _ in METRICS},
+            'series': None,
+            'overview': None,
+        }
+
+        curve = results.get('equity_curve') or []
+        if curve:
+            x = _epoch_ms([point['timestamp'] for point in curve])
+            equity = np.array([point['equity'] for point in curve], dtype=np.float64)
+            data = equity_plot_data(x, equity, budget=self.max_points)
+            series = {
+                'equity_x': _encode(data['equity_x'], 'f8'),
+                'equity_y': _encode(data['equity_y'], 'f4'),
+                'drawdown_x': _encode(data['drawdown_x'], 'f8'),
+                'drawdown_y': _encode(data['drawdown_y'], 'f4'),
+                'initial_capital': _number(results.get('initial_capital')),
+            }
+            returns = [t['profit_pct'] for t in results.get('trades', [])
+                       if 'SELL' in str(t.get('type', '')) and 'profit_pct' in t]
+            if returns:
+                series['trade_returns'] = _encode(returns, 'f4')
+            run['series'] = series
+
+            # Cumulative return line for the overview chart (coarser)
+            initial = results.get('initial_capital') or equity[0]
+            cumulative = (equity / initial - 1) * 100
+            idx = downsample_indices(x, cumulative, budget=max(100, self.max_points // 4))
+            run['overview'] = {'x': _encode(x[idx], 'f8'),
+                               'y': _encode(cumulative[idx], 'f4')}
+
+        self.runs.append(run)
+        return run['id']
+
+    # ==================== OUTPUT ====================
+
+    def _plotly_src(self, assets):
+        if self.plotlyjs == 'cdn':
+            from plotly.offline import get_plotlyjs_version
+            return f"https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"
+
+        path = os.path.join(assets, 'plotly.min.js')
+        from plotly.offline import get_plotlyjs
+        _write_if_changed(path, get_plotlyjs())
+        return 'assets/plotly.min.js'
+
+    def _write_assets(self):
+        assets = os.path.join(self.out_dir, 'assets')
+        os.makedirs(assets, exist_ok=True)
+        _write_if_changed(os.path.join(assets, 'report.js'), REPORT_JS)
+        _write_if_changed(os.path.join(assets, 'report.css'), REPORT_CSS)
+        return self._plotly_src(assets)
+
+    def _write_data(self):
+        data_dir = os.path.join(self.out_dir, 'data')
+        os.makedirs(data_dir, exist_ok=True)
+        wanted = set()
+
+        for run in self.runs:
+            if run['series'] is None:
+                continue
+            filename = f"{run['id']}.js"
+            wanted.add(filename)
+            _write_if_changed(os.path.join(data_dir, filename),
+                              f"tradsReport.load({_script_json(run['id'])},{_script_json(run['series'])});\n")
+
+        # Overview: best runs by return
+        ranked = sorted((run for run in self.runs if run['overview']),
+                        key=lambda run: run['metrics']['total_return_pct'] or 0, reverse=True)
+        overview = [{'name': run['name'], **run['overview']}
+                    for run in ranked[:settings.REPORT_OVERVIEW_RUNS]]
+        wanted.add('_overview.js')
+        _write_if_changed(os.path.join(data_dir, '_overview.js'),
+                          f"tradsReport.load(\"_overview\",{_script_json(overview)});\n")
+
+        # Runs removed since the last build
+        for filename in os.listdir(data_dir):
+            if filename.endswith('.js') and filename not in wanted:
+                os.remove(os.path.join(data_dir, filename))
+
+    def _table(self):
+        param_names = sorted({name for run in self.runs for name in run['params']})
+        head = ''.join(f'<th>{html.escape(name)}</th>' for name in ['Run'] + param_names)
+        head += ''.join(f'<th class="num">{title}</th>' for _, title, _ in METRICS)
+
+        rows = []
+        for run in self.runs:
+            cells = [f'<td><a href="#{run["id"]}">{html.escape(run["name"])}</a></td>']
+            cells += [f'<td>{html.escape(str(run["params"].get(name, "")))}</td>' for name in param_names]
+            for key, _, fmt in METRICS:
+                value = run['metrics'][key]
+                text = fmt.format(value) if isinstance(value, (int, float)) else '-'
+                cells.append(f'<td class="num" data-value="{value if value is not None else ""}">{text}</td>')
+            rows.append(f"<tr>{''.join(cells)}</tr>")
+        return f'<table id="summary"><thead><tr>{head}</tr></thead><tbody>\n' + '\n'.join(rows) + '\n</tbody></table>'
+
+    def _sections(self):
+        sections = []
+        for run in self.runs:
+            metrics = ' · '.join(f"{title} {fmt.format(run['metrics'][key])}" for key, title, fmt in METRICS
+                                 if isinstance(run['metrics'][key], (int, float)))
+            params = ', '.join(f"{k}={v}" for k, v in run['params'].items())
+            body = ('<div class="chart" data-kind="run"></div>' if run['series']
+                    else '<p class="empty">No equity data</p>')
+            sections.append(
+                f'<section id="{run["id"]}" data-src="data/{run["id"]}.js">'
+                f'<h2>{html.escape(run["name"])}</h2>'
+                f'<p class="meta">{html.escape(params)}</p><p class="meta">{html.escape(metrics)}</p>'
+                f'{body}</section>')
+        return '\n'.join(sections)
+
+    def build(self):
+        """Write the report; returns the index.html path"""
+        os.makedirs(self.out_dir, exist_ok=True)
+        plotly_src = self._write_assets()
+        self._write_data()
+
+        page = f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(self.title)}</title>
+<link rel="stylesheet" href="assets/report.css">
+<script src="{plotly_src}"></script>
+<script src="assets/report.js"></script>
+</head>
+<body>
+<header><h1>{html.escape(self.title)}</h1>
+<p class="meta">{len(self.runs)} runs · generated {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p></header>
+<section id="_overview" data-src="data/_overview.js"><h2>Top {min(len(self.runs), settings.REPORT_OVERVIEW_RUNS)} by return</h2>
+<div class="chart" data-kind="overview"></div></section>
+{self._table()}
+{self._sections()}
+</body>
+</html>
+"""
+        path = os.path.join(self.out_dir, 'index.html')
+        _write_if_changed(path, page)
+        print(f"📊 Report saved: {path} ({len(self.runs)} runs)")
+        return path
+
+
+def build_report(runs, out_dir=None, title="Strategy Report", params=None):
+    """
+    One-call report from {name: engine results}
+
+    Args:
+        params: Optional {name: params dict} shown as table columns
+    """
+    report = ReportBuilder(out_dir, title)
+    for name, results in runs.items():
+        report.add_run(name, results, (params or {}).get(name))
+    return report.build()
+
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+
+if __name__ == "__main__":
+    import argparse
+    import contextlib
+    import time
+
+    parser = argparse.ArgumentParser(description='Report builder demo (synthetic SMA sweep)')
+    parser.add_argument('--runs', type=int, default=50)
+    parser.add_argument('--candles', type=int, default=5000)
+    parser.add_argument('--out', default=os.path.join(settings.REPORT_DIR, 'demo'))
+    args = parser.parse_args()
+
+    from backtest.engine import BacktestEngine
+    from benchmarks.harness import make_synthetic_ohlcv
+    from strategies.registry import create_strategy
+    import shutil
+
+    df = make_synthetic_ohlcv(args.candles, interval='1h')
+    shutil.rmtree(args.out, ignore_errors=True)
+    started = time.perf_counter()
+    report = ReportBuilder(args.out, title=f"SMA sweep ({args.runs} runs)")
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        for i in range(args.runs):
+            fast, slow = 5 + i % 10 * 3, 30 + i // 10 * 10
+            params = {'fast_period': fast, 'slow_period': slow}
+            report.add_run(f"sma_{fast}_{slow}", BacktestEngine().run(df, create_strategy('sma_crossover', **params)),
+                           params)
+    path = report.build()
+    print(f"✅ {args.runs} runs in {time.perf_counter() - started:.1f}s, "
+          f"{directory_size(args.out) / 1024:.0f}KB total "
+          f"(index.html {os.path.getsize(path) / 1024:.0f}KB)")
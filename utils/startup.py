@@ -0,0 +1,179 @@
+# utils/startup.py
+"""
+Startup time report and budget check
+
+Measures the cold import of an entry point in a fresh interpreter
+(python -X importtime) and reports where the time goes, per module and
+per top-level package. Used to keep heavy dependencies (pandas,
+matplotlib, plotly, ccxt, binance) out of the startup path:
+
+    python -m utils.startup main                  # report
+    python -m utils.startup main --check          # exit 1 if over budget
+    python -m utils.startup main runtime.host --check --json
+
+Budgets (ms) and the packages the menu must not load come from
+settings.STARTUP_BUDGET_MS / STARTUP_DEFERRED_MODULES.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Import settings
+try:
+    from config.settings import settings
+except ImportError:
+    # Fallback
+    class SimpleSettings:
+        STARTUP_BUDGET_MS = {'main': 400}
+        STARTUP_DEFERRED_MODULES = ['pandas', 'matplotlib', 'plotly', 'ccxt', 'binance']
+    settings = SimpleSettings()
+
+_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def measure_imports(module, python=None, cwd=PROJECT_ROOT):
+    """
+    Import `module` in a fresh interpreter with -X importtime
+
+    Returns:
+        List of (name, self_us, cumulative_us, depth) in import order
+
+    Raises:
+        RuntimeError: The import failed
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [cwd, os.getenv('PYTHONPATH')])))
+    proc = subprocess.run([python or sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          cwd=cwd, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'unknown error'
+        raise RuntimeError(f"import {module} failed: {error}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            rows.append((match.group(4), int(match.group(1)), int(match.group(2)),
+                         len(match.group(3)) // 2))
+    return rows
+
+
+def _own_imports(rows, module):
+    """Rows of module's import tree (interpreter startup, e.g. site, left out)"""
+    end = next((i for i, row in enumerate(rows) if row[0] == module and row[3] == 0), None)
+    if end is None:
+        return rows
+    start = end
+    while start > 0 and rows[start - 1][3] > 0:
+        start -= 1
+    return rows[start:end + 1]
+
+
+def import_report(module, top=15, repeat=3, python=None):
+    """
+    Startup report for one entry point
+
+    The import is repeated (bytecode caches warm after the first run) and
+    the fastest run is reported.
+
+    Returns:
+        dict: total_ms, modules (count), packages (self time per top-level
+        package), slowest (direct imports by cumulative time)
+    """
+    runs = [_own_imports(measure_imports(module, python), module) for _ in range(max(1, repeat))]
+    rows = min(runs, key=lambda r: r[-1][2])
+    total_us = rows[-1][2]
+
+    packages = {}
+    for name, self_us, _, _ in rows:
+        root = name.split('.')[0]
+        packages[root] = packages.get(root, 0) + self_us
+
+    direct = [row for row in rows if row[3] == 1]
+    return {
+        'module': module,
+        'total_ms': round(total_us / 1000, 1),
+        'modules': len(rows),
+        'loaded': sorted({row[0].split('.')[0] for row in rows}),
+        'packages': [(name, round(us / 1000, 1)) for name, us in
+                     sorted(packages.items(), key=lambda kv: -kv[1])[:top]],
+        'slowest': [(name, round(cumulative / 1000, 1)) for name, _, cumulative, _ in
+                    sorted(direct, key=lambda row: -row[2])[:top]],
+    }
+
+
+def check_budget(report, budget_ms=None, deferred=None):
+    """
+    Compare a report with its budget
+
+    Returns:
+        List of problems (empty = within budget)
+    """
+    module = report['module']
+    budget_ms = budget_ms if budget_ms is not None else settings.STARTUP_BUDGET_MS.get(module)
+    if deferred is None:
+        deferred = settings.STARTUP_DEFERRED_MODULES if module == 'main' else []
+
+    problems = []
+    if budget_ms is not None and report['total_ms'] > budget_ms:
+        problems.append(f"{module}: {report['total_ms']:.0f}ms > budget {budget_ms}ms")
+    loaded = [name for name in deferred if name in report['loaded']]
+    if loaded:
+        problems.append(f"{module}: imports {', '.join(loaded)} at startup (should be deferred)")
+    return problems
+
+
+def print_report(report, problems=()):
+    print(f"\n⏱️  STARTUP: import {report['module']} — {report['total_ms']:.0f}ms, "
+          f"{report['modules']} modules")
+    print("-" * 50)
+    print("Heaviest packages (self time):")
+    for name, ms in report['packages']:
+        print(f"   {name:<30} {ms:8.1f}ms")
+    print("Slowest direct imports (cumulative):")
+    for name, ms in report['slowest']:
+        print(f"   {name:<30} {ms:8.1f}ms")
+    for problem in problems:
+        print(f"❌ {problem}")
+    if not problems:
+        print("✅ Within budget")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Entry point import time report')
+    parser.add_argument('modules', nargs='*', default=None,
+                        help='Modules to import (default: every module in STARTUP_BUDGET_MS)')
+    parser.add_argument('--check', action='store_true', help='Exit 1 when over budget')
+    parser.add_argument('--budget', type=float, help='Budget in ms (overrides settings)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--json', action='store_true', help='Print JSON instead of the table')
+    args = parser.parse_args(argv)
+
+    failed = False
+    reports = []
+    for module in args.modules or list(settings.STARTUP_BUDGET_MS):
+        try:
+            report = import_report(module, args.top, args.repeat)
+        except RuntimeError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            failed = True
+            continue
+        problems = check_budget(report, args.budget)
+        failed = failed or bool(problems)
+        report['problems'] = problems
+        reports.append(report)
+        if not args.json:
+            print_report(report, problems)
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    return 1 if failed and args.check else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,24 +2,25 @@
 """
 Visualization utilities - OPTIMIZED FOR CLOUD
 """
-import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import os
 from datetime import datetime
 from config.settings import settings
+from utils.downsample import downsample_indices, downsample_ohlc, equity_plot_data
 
 class ChartBuilder:
     @staticmethod
     def plot_candlestick(df, title="Price Chart", num_candles=100, filename=None):
         """Create candlestick chart"""
+        import plotly.graph_objects as go
+        
         if filename is None:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = f"candlestick_{timestamp}"
         
         plot_df = df.tail(num_candles) if len(df) > num_candles else df
+        plot_df = downsample_ohlc(plot_df)   # merged candles above PLOT_MAX_CANDLES
         
         fig = go.Figure(data=[go.Candlestick(
             x=plot_df.index,
@@ -47,6 +48,8 @@ class ChartBuilder:
     @staticmethod
     def plot_strategy_comparison(strategies_results, benchmark_return=0, filename=None):
         """Compare multiple strategies"""
+        import plotly.graph_objects as go
+        
         if filename is None:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = f"strategy_comparison_{timestamp}"
@@ -60,10 +63,11 @@ class ChartBuilder:
                 # Calculate cumulative return
                 initial = results.get('initial_capital', 1000)
                 equity_df['cumulative_return'] = (equity_df['equity'] / initial - 1) * 100
+                idx = downsample_indices(equity_df['timestamp'], equity_df['cumulative_return'])
                 
                 fig.add_trace(go.Scatter(
-                    x=equity_df['timestamp'],
-                    y=equity_df['cumulative_return'],
+                    x=equity_df['timestamp'].to_numpy()[idx],
+                    y=equity_df['cumulative_return'].to_numpy()[idx],
                     mode='lines',
                     name=strategy_name
                 ))
@@ -93,6 +97,8 @@ class ChartBuilder:
     @staticmethod
     def plot_performance_metrics(metrics_dict, filename=None):
         """Plot performance metrics as bar chart"""
+        import plotly.graph_objects as go
+        
         if filename is None:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = f"performance_metrics_{timestamp}"
@@ -124,16 +130,14 @@ class ChartBuilder:
         return html_path
     
     @staticmethod
-    def create_dashboard(results, strategy_name="Strategy"):
-        """Create comprehensive dashboard - FIXED VERSION"""
+    def dashboard_figure(results, strategy_name="Strategy"):
+        """Build the dashboard figure (None without equity data)"""
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+        
         if 'equity_curve' not in results or not results['equity_curve']:
-            print("No data for dashboard")
             return None
         
-        # Generate filename
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"dashboard_{strategy_name}_{timestamp}"
-        
         equity_df = pd.DataFrame(results['equity_curve'])
         trades_df = pd.DataFrame(results['trades']) if 'trades' in results else pd.DataFrame()
         
@@ -152,9 +156,12 @@ class ChartBuilder:
             horizontal_spacing=0.1
         )
         
+        # Downsampled above PLOT_MAX_POINTS (drawdown extremes kept exactly)
+        data = equity_plot_data(equity_df['timestamp'], equity_df['equity'])
+        
         # 1. Equity Curve (row 1, col 1)
         fig.add_trace(
-            go.Scatter(x=equity_df['timestamp'], y=equity_df['equity'],
+            go.Scatter(x=data['equity_x'], y=data['equity_y'],
                       mode='lines', name='Equity', line=dict(color='blue')),
             row=1, col=1
         )
@@ -162,12 +169,8 @@ class ChartBuilder:
                      line_color="red", row=1, col=1)
         
         # 2. Drawdown (row 1, col 2)
-        equity_series = pd.Series(equity_df['equity'].values, index=equity_df['timestamp'])
-        rolling_max = equity_series.expanding().max()
-        drawdown = (rolling_max - equity_series) / rolling_max * 100
-        
         fig.add_trace(
-            go.Scatter(x=equity_df['timestamp'], y=drawdown,
+            go.Scatter(x=data['drawdown_x'], y=data['drawdown_y'],
                       mode='lines', name='Drawdown', 
                       fill='tozeroy', line=dict(color='red')),
             row=1, col=2
@@ -253,6 +256,20 @@ class ChartBuilder:
         fig.update_xaxes(title_text="Month", row=2, col=2)
         fig.update_yaxes(title_text="Return (%)", row=2, col=2)
         
+        return fig
+    
+    @staticmethod
+    def create_dashboard(results, strategy_name="Strategy"):
+        """Create comprehensive dashboard - FIXED VERSION"""
+        fig = ChartBuilder.dashboard_figure(results, strategy_name)
+        if fig is None:
+            print("No data for dashboard")
+            return None
+        
+        # Generate filename
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f"dashboard_{strategy_name}_{timestamp}"
+        
         # Save dashboard
         os.makedirs('reports', exist_ok=True)
         os.makedirs(settings.RESULTS_DIR, exist_ok=True)
@@ -271,6 +288,8 @@ class ChartBuilder:
     @staticmethod
     def plot_equity_curve_simple(results, filename=None):
         """Simple equity curve plot"""
+        import plotly.graph_objects as go
+        
         if filename is None:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = f"equity_curve_{timestamp}"
@@ -281,10 +300,12 @@ class ChartBuilder:
         
         equity_df = pd.DataFrame(results['equity_curve'])
         
+        data = equity_plot_data(equity_df['timestamp'], equity_df['equity'])
+        
         fig = go.Figure()
         fig.add_trace(go.Scatter(
-            x=equity_df['timestamp'],
-            y=equity_df['equity'],
+            x=data['equity_x'],
+            y=data['equity_y'],
             mode='lines',
             name='Equity',
             line=dict(color='blue', width=2)